@@ -0,0 +1,101 @@
+"""Benchmark MIDI events/sec for midi_send_batch versus individual tool calls.
+
+Both modes go through the MCP ``tools/call`` request handler, including
+input schema validation, and write to an in-memory output port.
+
+Usage:
+    uv run python benchmarks/bench_batch.py [--events N] [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import time
+
+import mido
+from mcp import types
+
+from fruityloops_mcp.server import FLStudioMCPServer
+
+
+class CountingPort:
+    """Output port stand-in that counts messages."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def send(self, _msg: mido.Message) -> None:
+        self.count += 1
+
+    def close(self) -> None:
+        pass
+
+
+def _call(name: str, arguments: dict) -> types.CallToolRequest:
+    return types.CallToolRequest(
+        method="tools/call", params=types.CallToolRequestParams(name=name, arguments=arguments)
+    )
+
+
+def _make_server() -> tuple[FLStudioMCPServer, CountingPort]:
+    server = FLStudioMCPServer()
+    port = CountingPort()
+    server.midi._output_port = port
+    server.midi._is_connected = True
+    return server, port
+
+
+async def run(events: int, batch_size: int) -> dict[str, float]:
+    """Send ``events`` note-on/note-off events both ways.
+
+    Args:
+        events: Total events to send per mode
+        batch_size: Events per midi_send_batch call
+
+    Returns:
+        Events per second for each mode
+    """
+    server, port = _make_server()
+    handler = server.server.request_handlers[types.CallToolRequest]
+    single = [
+        _call("midi_send_note_on" if i % 2 == 0 else "midi_send_note_off", {"note": 60 + i % 12})
+        for i in range(events)
+    ]
+    start = time.perf_counter()
+    for request in single:
+        await handler(request)
+    single_rate = port.count / (time.perf_counter() - start)
+
+    server, port = _make_server()
+    handler = server.server.request_handlers[types.CallToolRequest]
+    batch_events = [
+        {"type": "note_on" if i % 2 == 0 else "note_off", "note": 60 + i % 12}
+        for i in range(batch_size)
+    ]
+    batches = [
+        _call("midi_send_batch", {"events": batch_events}) for _ in range(events // batch_size)
+    ]
+    start = time.perf_counter()
+    for request in batches:
+        await handler(request)
+    batch_rate = port.count / (time.perf_counter() - start)
+
+    return {"single_events_per_sec": single_rate, "batch_events_per_sec": batch_rate}
+
+
+def main() -> None:
+    """Run the batch benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.events, args.batch_size))
+    single = results["single_events_per_sec"]
+    batch = results["batch_events_per_sec"]
+    print(f"individual tool calls: {single:>12,.0f} events/sec")
+    print(f"midi_send_batch ({args.batch_size:>4}): {batch:>12,.0f} events/sec")
+    print(f"speedup: {batch / single:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Micro-benchmark for tool dispatch latency versus registered tool count.
+
+Registers N synthetic no-op tools on top of the built-in ones and times
+``_execute_tool`` for the last synthetic tool and for an unknown tool.
+Registry lookups should stay flat as N grows; the linear column shows what
+an if/elif chain of the same length costs for comparison.
+
+Usage:
+    uv run python benchmarks/bench_dispatch.py [--iterations N]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import time
+from typing import Any
+
+from fruityloops_mcp.server import FLStudioMCPServer
+from fruityloops_mcp.tools import ToolSpec
+
+# Synthetic tools registered above the built-in ones; at least one, which is timed
+EXTRA_TOOL_COUNTS = (1, 100, 300, 1000)
+
+
+async def _noop(_args: dict[str, Any]) -> str:
+    return ""
+
+
+def _linear_dispatch(names: list[str], name: str) -> bool:
+    """Emulate an if/elif chain by comparing against each name in turn."""
+    return any(candidate == name for candidate in names)
+
+
+async def _time_execute(server: FLStudioMCPServer, name: str, iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        with contextlib.suppress(ValueError):
+            await server._execute_tool(name, {})
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def _time_linear(names: list[str], name: str, iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        _linear_dispatch(names, name)
+    return (time.perf_counter_ns() - start) / iterations
+
+
+async def run(iterations: int) -> list[dict[str, float]]:
+    """Run the benchmark for each number of synthetic tools.
+
+    Args:
+        iterations: Number of dispatches timed per measurement
+
+    Returns:
+        One result row per tool count, latencies in nanoseconds
+    """
+    rows = []
+    for extra in EXTRA_TOOL_COUNTS:
+        server = FLStudioMCPServer()
+        for i in range(max(extra, 1)):
+            server.tools.register(ToolSpec(name=f"bench_tool_{i}", description="", handler=_noop))
+        names = [spec.name for spec in server.tools]
+        last = f"bench_tool_{max(extra, 1) - 1}"
+        rows.append(
+            {
+                "tools": len(server.tools),
+                "last_ns": await _time_execute(server, last, iterations),
+                "unknown_ns": await _time_execute(server, "no_such_tool", iterations),
+                "linear_last_ns": _time_linear(names, last, iterations),
+            }
+        )
+        server.fl.shutdown()
+    return rows
+
+
+def main() -> None:
+    """Run the dispatch benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args.iterations))
+    print(f"{'tools':>6} {'last (ns)':>12} {'unknown (ns)':>14} {'if/elif last (ns)':>18}")
+    for row in rows:
+        print(
+            f"{row['tools']:>6} {row['last_ns']:>12.0f} {row['unknown_ns']:>14.0f} "
+            f"{row['linear_last_ns']:>18.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
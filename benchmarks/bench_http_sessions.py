@@ -0,0 +1,139 @@
+"""Load test the streamable HTTP transport with many concurrent client sessions.
+
+A local server instance is started on an ephemeral port. Every client opens
+its own MCP session, calls a MIDI tool a number of times and closes the
+session, all sessions running at once against the one shared server and
+MIDI interface. MIDI messages go to an in-memory port.
+
+Usage:
+    uv run python benchmarks/bench_http_sessions.py [--sessions N] [--calls N]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import socket
+import time
+
+import uvicorn
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+from fruityloops_mcp.server import FLStudioMCPServer
+
+
+class CountingPort:
+    """Output port stand-in that counts messages."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def send(self, _msg) -> None:
+        self.count += 1
+
+    def close(self) -> None:
+        pass
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+@contextlib.asynccontextmanager
+async def serve(server: FLStudioMCPServer, max_sessions: int):
+    """Run ``server`` over HTTP on an ephemeral local port.
+
+    Yields:
+        URL of the MCP endpoint
+    """
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    app = server.http_app(max_sessions=max_sessions)
+    config = uvicorn.Config(app, log_level="warning", backlog=4096)
+    http = uvicorn.Server(config)
+    task = asyncio.create_task(http.serve(sockets=[sock]))
+    while not http.started:
+        await asyncio.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}/mcp"
+    finally:
+        http.should_exit = True
+        await task
+        sock.close()
+
+
+async def client(url: str, calls: int, latencies: list[float]) -> None:
+    """Open a session, call ``midi_send_cc`` ``calls`` times and close it."""
+    async with (
+        streamablehttp_client(url, timeout=60) as (read, write, _),
+        ClientSession(read, write) as session,
+    ):
+        await session.initialize()
+        for i in range(calls):
+            t0 = time.perf_counter()
+            await session.call_tool("midi_send_cc", {"control": 7, "value": i % 128})
+            latencies.append(time.perf_counter() - t0)
+
+
+async def run(sessions: int, calls: int) -> dict[str, float]:
+    """Drive ``sessions`` concurrent sessions against a local server.
+
+    Args:
+        sessions: Concurrent client sessions
+        calls: Tool calls per session
+
+    Returns:
+        Tool call throughput, latency percentiles in milliseconds and the
+        server's session counters
+    """
+    server = FLStudioMCPServer()
+    port = CountingPort()
+    server.midi._output_port = port
+    server.midi._is_connected = True
+
+    latencies: list[float] = []
+    async with serve(server, max_sessions=sessions) as url:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(url, calls, latencies) for _ in range(sessions)))
+        elapsed = time.perf_counter() - start
+        # Give session DELETE requests time to be accounted for
+        await asyncio.sleep(0.1)
+        stats = server.sessions.stats()
+
+    assert port.count == sessions * calls
+    return {
+        "calls_per_s": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "elapsed_s": elapsed,
+        "opened": stats["opened"],
+        "closed": stats["closed"],
+        "rejected": stats["rejected"],
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--calls", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    result = asyncio.run(run(args.sessions, args.calls))
+    print(f"{args.sessions} sessions x {args.calls} calls in {result['elapsed_s']:.2f}s")
+    print(
+        f"  {result['calls_per_s']:.0f} calls/s, "
+        f"p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms"
+    )
+    print(
+        f"  sessions opened {result['opened']}, closed {result['closed']}, "
+        f"rejected {result['rejected']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Micro-benchmark for the cost of recording metrics.
+
+Times what every tool call and MIDI write pays for metrics: recording a
+tool call in ``ServerMetrics`` and counting a write in ``ThroughputMeter``.
+Reading metrics back is timed too, though it only happens on request.
+
+Usage:
+    uv run python benchmarks/bench_metrics.py [--iterations N]
+"""
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+from fruityloops_mcp.metrics import ServerMetrics, ThroughputMeter, prometheus_text
+
+
+def _per_call_ns(func: Callable[[int], object], iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for i in range(iterations):
+        func(i)
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def run(iterations: int) -> dict[str, float]:
+    """Time each metrics operation.
+
+    Args:
+        iterations: Calls per recording operation
+
+    Returns:
+        Nanoseconds per call, per operation
+    """
+    rng = random.Random(0)
+    durations = [int(rng.lognormvariate(11, 1.5)) for _ in range(1024)]
+    names = [f"tool_{i}" for i in range(40)]
+    metrics = ServerMetrics()
+    meter = ThroughputMeter()
+
+    results = {
+        "record_tool": _per_call_ns(
+            lambda i: metrics.record_tool(names[i % 40], durations[i % 1024]), iterations
+        ),
+        "throughput.record": _per_call_ns(lambda _i: meter.record(1, 3), iterations),
+        "summary": _per_call_ns(lambda _i: metrics.summary(), 100),
+        "prometheus_text": _per_call_ns(
+            lambda _i: prometheus_text(metrics, {"port": meter.summary()}), 100
+        ),
+    }
+    return results
+
+
+def main() -> None:
+    """Run the metrics benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+    print(f"{'operation':<20}{'per call (us)':>16}")
+    for name, ns in results.items():
+        print(f"{name:<20}{ns / 1000:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark memory and decode time for streaming versus loading a MIDI file.
+
+Generates a multi-megabyte Standard MIDI File, then walks every message
+with ``file_steps`` (what ``midi_play_file`` plays from) and with
+``mido.MidiFile``, which parses all tracks into message objects up front.
+Peak memory is measured with ``tracemalloc``; streaming should stay flat as
+the file grows.
+
+Usage:
+    uv run python benchmarks/bench_midi_file.py [--megabytes N] [--tracks N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import mido
+
+from fruityloops_mcp.midi_file import MidiFileReader, file_steps
+
+# Delta 0 note on, delta 1 note off: 8 bytes per note
+NOTE_EVENTS = b"\x00\x90\x3c\x40\x01\x80\x3c\x00"
+END_OF_TRACK = b"\x00\xff\x2f\x00"
+
+
+def write_file(path: str, megabytes: float, tracks: int) -> int:
+    """Write a file of note on/off pairs spread over ``tracks`` tracks.
+
+    Returns:
+        Number of channel messages in the file
+    """
+    notes = int(megabytes * 1024 * 1024 / len(NOTE_EVENTS) / tracks)
+    track = NOTE_EVENTS * notes + END_OF_TRACK
+    with open(path, "wb") as file:
+        file.write(b"MThd" + (6).to_bytes(4, "big"))
+        file.write((1).to_bytes(2, "big") + tracks.to_bytes(2, "big") + (96).to_bytes(2, "big"))
+        for _ in range(tracks):
+            file.write(b"MTrk" + len(track).to_bytes(4, "big") + track)
+    return notes * 2 * tracks
+
+
+def _streamed(path: str) -> int:
+    return sum(len(messages) for _, messages in file_steps(MidiFileReader(path)))
+
+
+def _loaded(path: str) -> int:
+    return sum(1 for message in mido.MidiFile(path) if not message.is_meta)
+
+
+def run(megabytes: float, tracks: int) -> dict[str, dict[str, float]]:
+    """Walk a generated file both ways.
+
+    Args:
+        megabytes: Size of the generated file
+        tracks: Number of tracks the notes are spread over
+
+    Returns:
+        Peak traced memory in MiB and wall time in seconds, per mode
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.mid")
+        expected = write_file(path, megabytes, tracks)
+        for mode, walk in (("streamed", _streamed), ("mido", _loaded)):
+            tracemalloc.start()
+            start = time.perf_counter()
+            count = walk(path)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert count == expected, (mode, count, expected)
+            results[mode] = {"peak_mib": peak / 1024 / 1024, "seconds": elapsed}
+    return results
+
+
+def main() -> None:
+    """Run the MIDI file benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=4.0)
+    parser.add_argument("--tracks", type=int, default=4)
+    args = parser.parse_args()
+
+    results = run(args.megabytes, args.tracks)
+    print(f"{'mode':<10}{'peak (MiB)':>14}{'time (s)':>12}")
+    for mode, stats in results.items():
+        print(f"{mode:<10}{stats['peak_mib']:>14.2f}{stats['seconds']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
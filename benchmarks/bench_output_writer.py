@@ -0,0 +1,97 @@
+"""Benchmark caller-side send latency for direct versus threaded MIDI output.
+
+A fake output port sleeps for a fixed time per message to stand in for a
+slow driver. In direct mode every send blocks the caller for that long; in
+threaded mode the caller only pays for the enqueue.
+
+Usage:
+    uv run python benchmarks/bench_output_writer.py [--messages N] [--port-delay-us N]
+"""
+
+import argparse
+import time
+
+from fruityloops_mcp.midi_interface import MIDIInterface
+from fruityloops_mcp.midi_output import OutputWriter
+
+
+class SlowPort:
+    """Output port stand-in that takes a fixed time per message."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.count = 0
+
+    def send(self, _msg) -> None:
+        time.sleep(self.delay)
+        self.count += 1
+
+    def close(self) -> None:
+        pass
+
+
+def _percentile(samples: list[int], pct: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))] / 1000
+
+
+def _make_midi(output_mode: str, port: SlowPort, queue_size: int) -> MIDIInterface:
+    midi = MIDIInterface(output_mode=output_mode, queue_size=queue_size)
+    midi._output_port = port
+    midi._is_connected = True
+    if output_mode == "threaded":
+        midi._writer = OutputWriter(port.send, maxsize=queue_size, block_timeout=60)
+        midi._writer.start()
+    return midi
+
+
+def run(messages: int, port_delay: float) -> dict[str, dict[str, float]]:
+    """Send ``messages`` note-ons in each output mode.
+
+    Args:
+        messages: Messages to send per mode
+        port_delay: Seconds the fake port spends per message
+
+    Returns:
+        Caller-side p50/p99 latency in microseconds and the total time
+        until every message reached the port, per mode
+    """
+    results = {}
+    for mode in ("direct", "threaded"):
+        port = SlowPort(port_delay)
+        midi = _make_midi(mode, port, queue_size=messages)
+        samples = []
+        start = time.perf_counter()
+        for i in range(messages):
+            t0 = time.perf_counter_ns()
+            midi.send_note_on(60 + i % 12)
+            samples.append(time.perf_counter_ns() - t0)
+        if midi._writer is not None:
+            midi._writer.stop(drain=True, timeout=60)
+        elapsed = time.perf_counter() - start
+        assert port.count == messages
+        results[mode] = {
+            "p50_us": _percentile(samples, 50),
+            "p99_us": _percentile(samples, 99),
+            "total_ms": elapsed * 1000,
+        }
+    return results
+
+
+def main() -> None:
+    """Run the output writer benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2_000)
+    parser.add_argument("--port-delay-us", type=int, default=100)
+    args = parser.parse_args()
+
+    results = run(args.messages, args.port_delay_us / 1_000_000)
+    print(f"{'mode':<10}{'p50 (us)':>12}{'p99 (us)':>12}{'total (ms)':>14}")
+    for mode, stats in results.items():
+        print(
+            f"{mode:<10}{stats['p50_us']:>12.1f}{stats['p99_us']:>12.1f}{stats['total_ms']:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
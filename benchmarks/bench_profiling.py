@@ -0,0 +1,76 @@
+"""Benchmark the cost of profiling spans on a MIDI tool call.
+
+Times ``_execute_tool("midi_send_cc")`` against an in-memory port with
+profiling off, on with nothing sampled, and on with every call sampled. Off
+must match an uninstrumented server, since nothing is wrapped then.
+
+Usage:
+    uv run python benchmarks/bench_profiling.py [--iterations N]
+"""
+
+import argparse
+import asyncio
+import time
+
+from fruityloops_mcp.profiling import Tracer
+from fruityloops_mcp.server import FLStudioMCPServer
+
+MODES = {"off": None, "sampled 0%": 0.0, "sampled 10%": 0.1, "sampled 100%": 1.0}
+
+
+class NullPort:
+    """Output port stand-in that discards messages."""
+
+    def send(self, _msg: object) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def _make_server(sample_rate: float | None) -> FLStudioMCPServer:
+    tracer = None if sample_rate is None else Tracer(sample_rate=sample_rate)
+    server = FLStudioMCPServer(tracer=tracer)
+    server.midi._output_port = NullPort()
+    server.midi._is_connected = True
+    return server
+
+
+async def run(iterations: int) -> dict[str, float]:
+    """Time a MIDI tool call in each profiling mode.
+
+    Args:
+        iterations: Calls timed per mode
+
+    Returns:
+        Mean nanoseconds per call, per mode
+    """
+    results = {}
+    for mode, sample_rate in MODES.items():
+        server = _make_server(sample_rate)
+        args = {"control": 7, "value": 1}
+        for _ in range(1000):
+            await server._execute_tool("midi_send_cc", args)
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            await server._execute_tool("midi_send_cc", args)
+        results[mode] = (time.perf_counter_ns() - start) / iterations
+        server.fl.shutdown()
+    return results
+
+
+def main() -> None:
+    """Run the profiling overhead benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50_000)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.iterations))
+    baseline = results["off"]
+    print(f"{'mode':<14}{'per call (us)':>16}{'overhead (us)':>16}")
+    for mode, ns in results.items():
+        print(f"{mode:<14}{ns / 1000:>16.2f}{(ns - baseline) / 1000:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
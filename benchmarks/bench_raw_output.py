@@ -0,0 +1,86 @@
+"""Benchmark MIDI note throughput for the raw byte path versus mido.Message.
+
+Sends note on/off pairs through ``MIDIInterface.send_note_on`` and
+``send_note_off`` to an in-memory port that supports both ``send`` and the
+raw ``send_bytes`` interface, once with ``raw_output`` enabled and once with
+it disabled.
+
+Usage:
+    uv run python benchmarks/bench_raw_output.py [--events N]
+"""
+
+import argparse
+import time
+
+import mido
+
+from fruityloops_mcp.midi_encoding import raw_sender
+from fruityloops_mcp.midi_interface import MIDIInterface
+
+
+class CountingRawPort:
+    """Output port stand-in with a raw interface that counts messages."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def send(self, _msg: mido.Message) -> None:
+        self.count += 1
+
+    def send_bytes(self, _data: bytes) -> None:
+        self.count += 1
+
+    def close(self) -> None:
+        pass
+
+
+def _make_midi(raw_output: bool) -> tuple[MIDIInterface, CountingRawPort]:
+    midi = MIDIInterface(raw_output=raw_output)
+    port = CountingRawPort()
+    midi._output_port = port
+    midi._raw_send = raw_sender(port) if raw_output else None
+    midi._is_connected = True
+    return midi, port
+
+
+def run(events: int) -> dict[str, float]:
+    """Send ``events`` note events through each path.
+
+    Args:
+        events: Total note on plus note off events per path
+
+    Returns:
+        Events per second for each path
+    """
+    results = {}
+    for name, raw_output in (("mido", False), ("raw", True)):
+        midi, port = _make_midi(raw_output)
+        note_on = midi.send_note_on
+        note_off = midi.send_note_off
+        start = time.perf_counter()
+        for i in range(events // 2):
+            note = 36 + i % 48
+            note_on(note, 100, i % 16)
+            note_off(note, 0, i % 16)
+        elapsed = time.perf_counter() - start
+        assert port.count == events // 2 * 2
+        results[f"{name}_events_per_sec"] = port.count / elapsed
+    return results
+
+
+def main() -> None:
+    """Run the raw output benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    results = run(args.events)
+    mido_rate = results["mido_events_per_sec"]
+    raw_rate = results["raw_events_per_sec"]
+    print(f"mido.Message path: {mido_rate:>12,.0f} events/sec")
+    print(f"raw byte path:     {raw_rate:>12,.0f} events/sec")
+    print(f"speedup: {raw_rate / mido_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
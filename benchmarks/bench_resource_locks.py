@@ -0,0 +1,103 @@
+"""Benchmark tool call throughput with per-resource locking under mixed workloads.
+
+Tools with a fixed simulated latency are registered on a server and called
+concurrently through ``_execute_tool``. Each workload is run with three
+locking strategies:
+
+- ``global``: every call takes one lock, as if calls were serialized
+- ``resource``: calls lock only the resources they touch
+- ``none``: no locking at all, the upper bound
+
+Usage:
+    uv run python benchmarks/bench_resource_locks.py [--calls N] [--latency-ms N]
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+from fruityloops_mcp.resources import midi_resources, resource
+from fruityloops_mcp.server import FLStudioMCPServer
+from fruityloops_mcp.tools import ToolSpec
+
+# Tool name, resource function, argument generator
+WORKLOAD_TOOLS = {
+    "mixer": (resource("mixer_track", "track_num"), lambda r: {"track_num": r.randrange(125)}),
+    "midi": (midi_resources, lambda r: {"channel": r.randrange(4)}),
+    "transport": (resource("transport"), lambda _r: {}),
+    "hot_track": (resource("mixer_track", "track_num"), lambda _r: {"track_num": 0}),
+}
+
+WORKLOADS = {
+    "independent": {"mixer": 1.0},
+    "mixed": {"mixer": 0.6, "midi": 0.3, "transport": 0.1},
+    "contended": {"hot_track": 0.5, "mixer": 0.5},
+    "conflicting": {"hot_track": 1.0},
+}
+
+STRATEGIES = ("global", "resource", "none")
+
+
+def _make_server(strategy: str, latency: float) -> FLStudioMCPServer:
+    server = FLStudioMCPServer()
+
+    async def handler(_args):
+        await asyncio.sleep(latency)
+        return "ok"
+
+    for name, (resources, _) in WORKLOAD_TOOLS.items():
+        if strategy == "global":
+            resources = resource("global")
+        elif strategy == "none":
+            resources = None
+        server.tools.register(ToolSpec(f"bench_{name}", name, handler, resources=resources))
+    return server
+
+
+async def _run_workload(server: FLStudioMCPServer, mix: dict[str, float], calls: int) -> float:
+    rng = random.Random(42)
+    names = rng.choices(list(mix), weights=list(mix.values()), k=calls)
+    requests = [(f"bench_{n}", WORKLOAD_TOOLS[n][1](rng)) for n in names]
+    start = time.perf_counter()
+    await asyncio.gather(*(server._execute_tool(name, args) for name, args in requests))
+    return calls / (time.perf_counter() - start)
+
+
+def run(calls: int, latency: float) -> dict[str, dict[str, float]]:
+    """Run every workload with every locking strategy.
+
+    Args:
+        calls: Concurrent calls per workload
+        latency: Seconds each simulated tool call takes
+
+    Returns:
+        Calls per second by workload and strategy
+    """
+    results: dict[str, dict[str, float]] = {}
+    for workload, mix in WORKLOADS.items():
+        results[workload] = {}
+        for strategy in STRATEGIES:
+            server = _make_server(strategy, latency)
+            results[workload][strategy] = asyncio.run(_run_workload(server, mix, calls))
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = run(args.calls, args.latency_ms / 1000)
+    print(f"{args.calls} concurrent calls, {args.latency_ms} ms each (calls/s)")
+    print(f"{'workload':<14}" + "".join(f"{s:>12}" for s in STRATEGIES))
+    for workload, by_strategy in results.items():
+        print(f"{workload:<14}" + "".join(f"{by_strategy[s]:>12.0f}" for s in STRATEGIES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""Reproducible benchmark suite for the server, with JSON results.
+
+Runs ``FLStudioMCPServer`` in-process against the ``fake_midi`` mido backend,
+which timestamps every message written to the port, and the ``fake_fl`` FL
+Studio stand-in, which adds a fixed latency to every API call. Requests go
+through the registered MCP ``tools/list`` and ``tools/call`` handlers, so
+argument validation and result serialization are timed; transports are not.
+
+Scenarios:
+    tools_list         ``tools/list`` with FL Studio tools enabled
+    note_on, cc        one MIDI event per call
+    batch              ``midi_send_batch`` of 64 events
+    mixer_volume       ``mixer_set_track_volume``, one FL Studio API call
+    mixer_set_volumes  ``mixer_set_volumes`` of 32 tracks, through the flush window
+    mixer_snapshot     ``mixer_get_all_tracks`` of all 127 tracks
+    sequence           ``midi_play_sequence``, timing of port writes against the schedule
+
+For MIDI scenarios, ``wire`` is the time from the start of the call to the
+last message reaching the port. Results carry the git commit and Python
+version; pass an earlier results file to ``--compare`` to see what changed.
+
+Usage:
+    uv run python benchmarks/bench_suite.py [--iterations N] [--fl-latency-us US]
+        [--only SCENARIO ...] [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from importlib import metadata
+from typing import Any
+
+import fake_midi
+import mido
+from fake_fl import FLStandIn, installed
+from mcp import types
+
+from fruityloops_mcp.metrics import LatencyHistogram
+from fruityloops_mcp.server import FLStudioMCPServer
+
+BATCH_EVENTS = [
+    {"type": "note_on" if i % 2 == 0 else "note_off", "note": 36 + i // 2, "velocity": 100}
+    for i in range(64)
+]
+VOLUMES = [{"index": i, "volume": i / 32} for i in range(1, 33)]
+SEQUENCE_EVENTS = 200
+SEQUENCE_SPACING = 0.005
+
+Scenario = Callable[[FLStudioMCPServer, fake_midi.Output, int], Awaitable[dict[str, Any]]]
+
+
+def _call_request(name: str, arguments: dict[str, Any]) -> types.CallToolRequest:
+    return types.CallToolRequest(
+        method="tools/call", params=types.CallToolRequestParams(name=name, arguments=arguments)
+    )
+
+
+async def _time_requests(
+    server: FLStudioMCPServer,
+    port: fake_midi.Output | None,
+    request: types.CallToolRequest | types.ListToolsRequest,
+    iterations: int,
+) -> dict[str, Any]:
+    """Send one request repeatedly and summarize its latency.
+
+    Args:
+        server: Server whose request handler is called
+        port: Fake port to measure wire latency on, or None
+        request: Request to send
+        iterations: Requests timed, after a short warm-up
+
+    Returns:
+        Calls, calls per second, and latency (and wire) summaries
+
+    Raises:
+        RuntimeError: If the request fails
+    """
+    handler = server.server.request_handlers[type(request)]
+    for _ in range(min(iterations, 50)):
+        await handler(request)
+    latency = LatencyHistogram()
+    wire = LatencyHistogram()
+    messages = port.count if port else 0
+    started = time.perf_counter_ns()
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        result = await handler(request)
+        latency.record(time.perf_counter_ns() - start)
+        if port is not None:
+            wire.record(port.sent[-1][0] - start)
+        if getattr(result.root, "isError", False):
+            raise RuntimeError(f"{request.method} failed: {result.root.content[0].text}")
+    elapsed = time.perf_counter_ns() - started
+
+    row: dict[str, Any] = {
+        "calls": iterations,
+        "calls_per_sec": round(iterations / elapsed * 1e9, 1),
+        "latency": latency.summary(),
+    }
+    if port is not None:
+        row["wire"] = wire.summary()
+        row["messages_per_sec"] = round((port.count - messages) / elapsed * 1e9, 1)
+    return row
+
+
+def _tool(name: str, arguments: dict[str, Any], midi: bool = False, scale: int = 1) -> Scenario:
+    """Build a scenario timing one tool call.
+
+    Args:
+        name: Tool name
+        arguments: Tool arguments
+        midi: True to measure wire latency on the port
+        scale: Divides the iteration count, for slow tools
+    """
+
+    async def scenario(
+        server: FLStudioMCPServer, port: fake_midi.Output, iterations: int
+    ) -> dict[str, Any]:
+        request = _call_request(name, arguments)
+        return await _time_requests(
+            server, port if midi else None, request, max(iterations // scale, 1)
+        )
+
+    return scenario
+
+
+async def _tools_list(
+    server: FLStudioMCPServer, _port: fake_midi.Output, iterations: int
+) -> dict[str, Any]:
+    return await _time_requests(
+        server, None, types.ListToolsRequest(method="tools/list"), iterations
+    )
+
+
+async def _sequence(
+    server: FLStudioMCPServer, port: fake_midi.Output, iterations: int
+) -> dict[str, Any]:
+    """Play sequences and measure when each event reached the port.
+
+    Deviations are taken from the median offset of each sequence, so a
+    constant start delay is not counted as jitter.
+    """
+    events = [
+        {"type": "note_on", "note": 60 + i % 12, "velocity": 100, "time": i * SEQUENCE_SPACING}
+        for i in range(SEQUENCE_EVENTS)
+    ]
+    request = _call_request("midi_play_sequence", {"events": events, "wait": True})
+    handler = server.server.request_handlers[types.CallToolRequest]
+    jitter = LatencyHistogram()
+    sequences = max(iterations // 1000, 1)
+    for _ in range(sequences):
+        port.clear()
+        await handler(request)
+        sent = port.timestamps()
+        if len(sent) != SEQUENCE_EVENTS:
+            raise RuntimeError(f"Sequence sent {len(sent)} of {SEQUENCE_EVENTS} events")
+        offsets = [
+            sent_ns - sent[0] - round(event["time"] * 1e9) for sent_ns, event in zip(sent, events)
+        ]
+        median = statistics.median(offsets)
+        for offset in offsets:
+            jitter.record(round(abs(offset - median)))
+    return {"sequences": sequences, "events": SEQUENCE_EVENTS, "jitter": jitter.summary()}
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "tools_list": _tools_list,
+    "note_on": _tool("midi_send_note_on", {"note": 60, "velocity": 100}, midi=True),
+    "cc": _tool("midi_send_cc", {"control": 7, "value": 100}, midi=True),
+    "batch": _tool("midi_send_batch", {"events": BATCH_EVENTS}, midi=True, scale=4),
+    "mixer_volume": _tool("mixer_set_track_volume", {"track_num": 1, "volume": 0.5}),
+    "mixer_set_volumes": _tool("mixer_set_volumes", {"volumes": VOLUMES}, scale=20),
+    "mixer_snapshot": _tool("mixer_get_all_tracks", {}, scale=100),
+    "sequence": _sequence,
+}
+
+
+async def run(
+    iterations: int, fl_latency_us: float, scenarios: list[str] | None = None
+) -> dict[str, dict[str, Any]]:
+    """Run the scenarios, each against a new server.
+
+    Args:
+        iterations: Calls timed per fast scenario; slow ones run fewer
+        fl_latency_us: Latency of each FL Studio API call in microseconds
+        scenarios: Names of the scenarios to run, all if None
+
+    Returns:
+        Results per scenario, latencies in microseconds
+    """
+    mido.set_backend("fake_midi")
+    results = {}
+    for name in scenarios or SCENARIOS:
+        with installed(FLStandIn(fl_latency_us)) as standin:
+            server = FLStudioMCPServer()
+            try:
+                await server.server.request_handlers[types.CallToolRequest](
+                    _call_request("midi_connect", {})
+                )
+                port = fake_midi.outputs[server.midi.port_name]
+                calls = standin.calls
+                results[name] = await SCENARIOS[name](server, port, iterations)
+                if standin.calls > calls:
+                    results[name]["fl_calls"] = standin.calls - calls
+            finally:
+                server.midi_pool.close()
+                server.fl.shutdown()
+    return results
+
+
+def _git(*args: str) -> str | None:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment(fl_latency_us: float, iterations: int) -> dict[str, Any]:
+    """Describe the run, so results from different commits can be compared."""
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mido": metadata.version("mido"),
+        "mcp": metadata.version("mcp"),
+        "iterations": iterations,
+        "fl_latency_us": fl_latency_us,
+    }
+
+
+def _headline(row: dict[str, Any]) -> dict[str, float]:
+    """Pick the latency that matters for a scenario."""
+    summary = row.get("latency") or row["jitter"]
+    return {"p50_us": summary["p50_us"], "p99_us": summary["p99_us"]}
+
+
+def _cell(value: float | None, width: int, precision: int = 1) -> str:
+    return f"{value:>{width}.{precision}f}" if value is not None else f"{'-':>{width}}"
+
+
+def print_results(results: dict[str, dict[str, Any]], baseline: dict[str, Any] | None) -> None:
+    """Print one line per scenario, with changes against a baseline if given.
+
+    The sequence scenario reports timing jitter in the latency columns.
+    """
+    header = f"{'scenario':<18}{'calls/s':>10}{'p50 (us)':>11}{'p99 (us)':>11}{'wire p99':>10}"
+    print(header + ("  p50 / p99 vs baseline" if baseline else ""))
+    for name, row in results.items():
+        headline = _headline(row)
+        line = (
+            f"{name:<18}{_cell(row.get('calls_per_sec'), 10, 0)}"
+            f"{_cell(headline['p50_us'], 11)}{_cell(headline['p99_us'], 11)}"
+            f"{_cell(row.get('wire', {}).get('p99_us'), 10)}"
+        )
+        previous = (baseline or {}).get("results", {}).get(name)
+        if previous:
+            before = _headline(previous)
+            changes = [
+                f"{(headline[key] - before[key]) / before[key]:+.0%}" if before[key] else "n/a"
+                for key in ("p50_us", "p99_us")
+            ]
+            line += f"  {changes[0]:>6} / {changes[1]}"
+        print(line)
+
+
+def main() -> None:
+    """Run the suite, print a table and optionally write JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--fl-latency-us", type=float, default=50.0)
+    parser.add_argument("--only", nargs="+", choices=list(SCENARIOS), metavar="SCENARIO")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Results file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    results = asyncio.run(run(args.iterations, args.fl_latency_us, args.only))
+    print_results(results, baseline)
+    if args.output:
+        document = {
+            "environment": environment(args.fl_latency_us, args.iterations),
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(document, file, indent=2)
+            file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""FL Studio API stand-in with injected call latency.
+
+Outside FL Studio the server talks to ``StubModule``, which answers every
+call instantly with itself. ``FLStandIn`` instead provides real
+``channels``, ``general``, ``mixer``, ``patterns``, ``playlist``,
+``transport`` and ``ui`` modules backed by a small in-memory project, and
+sleeps for a fixed latency in every API call to approximate the cost of
+reaching into the host.
+
+``installed()`` swaps the stand-in into ``fruityloops_mcp.server`` for an
+in-process server. A server subprocess gets it from ``install()``, which
+``standin_site/sitecustomize.py`` calls at interpreter startup when that
+directory and ``benchmarks/`` are on ``PYTHONPATH``.
+"""
+
+import contextlib
+import os
+import sys
+import time
+import types
+from collections.abc import Callable, Iterator
+from typing import Any
+from unittest.mock import patch
+
+# Latency of each API call in microseconds, when none is given
+LATENCY_ENV = "FAKE_FL_LATENCY_US"
+DEFAULT_LATENCY_US = 50.0
+
+MIXER_TRACKS = 127
+CHANNELS = 16
+PATTERNS = 20
+
+
+class FLStandIn:
+    """In-memory FL Studio project exposed as the FL Studio API modules."""
+
+    def __init__(
+        self,
+        latency_us: float | None = None,
+        mixer_tracks: int = MIXER_TRACKS,
+        channels: int = CHANNELS,
+        patterns: int = PATTERNS,
+    ):
+        """Build the project and its API modules.
+
+        Args:
+            latency_us: Delay added to every API call in microseconds;
+                ``FAKE_FL_LATENCY_US`` or 50 if None
+            mixer_tracks: Number of mixer tracks
+            channels: Number of channels
+            patterns: Number of patterns, numbered from 1
+        """
+        if latency_us is None:
+            latency_us = float(os.environ.get(LATENCY_ENV, DEFAULT_LATENCY_US))
+        self.latency_us = latency_us
+        self.calls = 0
+        self.tracks = [
+            {"name": f"Insert {i}", "volume": 0.8, "pan": 0.0, "muted": False}
+            for i in range(mixer_tracks)
+        ]
+        self.channels = [
+            {"name": f"Channel {i}", "volume": 0.78, "pan": 0.0, "muted": False}
+            for i in range(channels)
+        ]
+        self.patterns = {i: {"name": f"Pattern {i}", "length": 16} for i in range(1, patterns + 1)}
+        self.song_pos = 0.0
+        self.playing = False
+        self.recording = False
+        self.modules = self._build_modules()
+
+    def _api(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap an API function so it counts calls and takes the latency."""
+        delay = self.latency_us / 1_000_000
+
+        def call(*args: Any) -> Any:
+            self.calls += 1
+            if delay:
+                time.sleep(delay)
+            return func(*args)
+
+        call.__name__ = func.__name__
+        return call
+
+    def _module(self, name: str, **functions: Callable[..., Any]) -> types.ModuleType:
+        module = types.ModuleType(name, f"FL Studio {name} API stand-in")
+        for function_name, func in functions.items():
+            func.__name__ = function_name
+            setattr(module, function_name, self._api(func))
+        return module
+
+    def _build_modules(self) -> dict[str, types.ModuleType]:
+        tracks, chans, pats = self.tracks, self.channels, self.patterns
+
+        def toggle_mute(index: int, *_args: Any) -> None:
+            chans[index]["muted"] = not chans[index]["muted"]
+
+        def set_transport(field: str, value: Any) -> Callable[..., None]:
+            return lambda *_args: setattr(self, field, value)
+
+        def toggle_record(*_args: Any) -> None:
+            self.recording = not self.recording
+
+        return {
+            "mixer": self._module(
+                "mixer",
+                trackCount=lambda: len(tracks),
+                getTrackName=lambda i, *_: tracks[i]["name"],
+                setTrackName=lambda i, name, *_: tracks[i].update(name=name),
+                getTrackVolume=lambda i, *_: tracks[i]["volume"],
+                setTrackVolume=lambda i, volume, *_: tracks[i].update(volume=volume),
+                getTrackPan=lambda i, *_: tracks[i]["pan"],
+                isTrackMuted=lambda i: tracks[i]["muted"],
+            ),
+            "channels": self._module(
+                "channels",
+                channelCount=lambda *_: len(chans),
+                getChannelName=lambda i, *_: chans[i]["name"],
+                getChannelVolume=lambda i, *_: chans[i]["volume"],
+                setChannelVolume=lambda i, volume, *_: chans[i].update(volume=volume),
+                getChannelPan=lambda i, *_: chans[i]["pan"],
+                isChannelMuted=lambda i, *_: chans[i]["muted"],
+                muteChannel=toggle_mute,
+            ),
+            "patterns": self._module(
+                "patterns",
+                patternCount=lambda: len(pats),
+                getPatternName=lambda i: pats[i]["name"],
+                setPatternName=lambda i, name: pats[i].update(name=name),
+                getPatternLength=lambda i: pats[i]["length"],
+            ),
+            "general": self._module(
+                "general",
+                getProjectTitle=lambda: "Benchmark",
+                getVersion=lambda: 36,
+            ),
+            "playlist": self._module("playlist", getTrackName=lambda i: f"Track {i}"),
+            "transport": self._module(
+                "transport",
+                start=set_transport("playing", True),
+                stop=set_transport("playing", False),
+                record=toggle_record,
+                getSongPos=lambda *_: self.song_pos,
+                setSongPos=lambda pos, *_: setattr(self, "song_pos", pos),
+            ),
+            "ui": self._module("ui", showWindow=lambda _window: None),
+        }
+
+
+def install(standin: FLStandIn | None = None) -> FLStandIn:
+    """Make the stand-in modules importable as the FL Studio API.
+
+    Must run before ``fruityloops_mcp.server`` is imported, which checks
+    for the FL Studio API once.
+
+    Args:
+        standin: Stand-in to install; a new one with the default latency if None
+
+    Returns:
+        The installed stand-in
+    """
+    standin = standin or FLStandIn()
+    sys.modules.update(standin.modules)
+    return standin
+
+
+@contextlib.contextmanager
+def installed(standin: FLStandIn | None = None) -> Iterator[FLStandIn]:
+    """Serve the FL Studio tools of in-process servers from a stand-in.
+
+    Servers must be created inside the block, since the tool list depends
+    on whether FL Studio is available.
+
+    Args:
+        standin: Stand-in to install; a new one with the default latency if None
+
+    Yields:
+        The installed stand-in
+    """
+    standin = standin or FLStandIn()
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(patch.dict(sys.modules, standin.modules))
+        stack.enter_context(patch("fruityloops_mcp.server.FL_STUDIO_AVAILABLE", True))
+        for name, module in standin.modules.items():
+            stack.enter_context(patch(f"fruityloops_mcp.server.{name}", module))
+        yield standin
@@ -0,0 +1,109 @@
+"""In-memory mido backend that timestamps every message written to it.
+
+Select it in-process with ``mido.set_backend("fake_midi")``, or for a
+subprocess with ``MIDO_BACKEND=fake_midi`` and ``benchmarks/`` on
+``PYTHONPATH``. Every port name is reported as available. Output ports
+define ``send_bytes``, so the server takes its raw byte path, and record
+``(perf_counter_ns, bytes)`` for each message; input ports take a callback
+and only receive what ``Input.inject`` hands them.
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+DEFAULT_PORT = "FLStudio_MIDI"
+
+# Messages kept per output port; older ones are dropped but still counted
+MAX_SENT = 1_000_000
+
+# Ports opened so far, by name; the newest port of a name replaces older ones
+outputs: dict[str, "Output"] = {}
+inputs: dict[str, "Input"] = {}
+
+_port_names = [DEFAULT_PORT]
+
+
+def get_devices(**_kwargs: Any) -> list[dict[str, Any]]:
+    """List the fake ports, each as both an input and an output."""
+    names = dict.fromkeys([*_port_names, *outputs, *inputs])
+    return [{"name": name, "is_input": True, "is_output": True} for name in names]
+
+
+def add_port(name: str) -> None:
+    """Report another port name as available."""
+    if name not in _port_names:
+        _port_names.append(name)
+
+
+class Output:
+    """Output port recording when each message was written."""
+
+    def __init__(self, name: str | None = None, **_kwargs: Any):
+        """Open the port and register it in ``outputs``."""
+        self.name = name or DEFAULT_PORT
+        self.closed = False
+        self.count = 0
+        self.sent: deque[tuple[int, bytes]] = deque(maxlen=MAX_SENT)
+        outputs[self.name] = self
+
+    def send_bytes(self, data: bytes) -> None:
+        """Record one encoded message."""
+        self.sent.append((time.perf_counter_ns(), bytes(data)))
+        self.count += 1
+
+    def send(self, msg: Any) -> None:
+        """Record one ``mido.Message``."""
+        self.send_bytes(msg.bin())
+
+    def clear(self) -> None:
+        """Forget the recorded messages."""
+        self.sent.clear()
+        self.count = 0
+
+    def timestamps(self) -> list[int]:
+        """Get the write time of each recorded message, oldest first."""
+        return [sent_ns for sent_ns, _ in self.sent]
+
+    def reset(self) -> None:
+        """Accept a reset request; nothing is sent."""
+
+    def close(self) -> None:
+        """Close the port."""
+        self.closed = True
+
+
+class Input:
+    """Input port delivering injected messages to its callback."""
+
+    def __init__(
+        self, name: str | None = None, callback: Callable[[Any], None] | None = None, **_kwargs: Any
+    ):
+        """Open the port and register it in ``inputs``."""
+        self.name = name or DEFAULT_PORT
+        self.closed = False
+        self._callback = callback
+        self._lock = threading.Lock()
+        inputs[self.name] = self
+
+    @property
+    def callback(self) -> Callable[[Any], None] | None:
+        """Function called with each received message."""
+        return self._callback
+
+    @callback.setter
+    def callback(self, callback: Callable[[Any], None] | None) -> None:
+        self._callback = callback
+
+    def inject(self, msg: Any) -> None:
+        """Deliver a message as if it had been received."""
+        with self._lock:
+            if self._callback is not None and not self.closed:
+                self._callback(msg)
+
+    def close(self) -> None:
+        """Close the port."""
+        self.closed = True
+        self._callback = None
@@ -0,0 +1,356 @@
+"""End-to-end load generator for the server over stdio.
+
+Spawns ``python -m fruityloops_mcp``, completes the MCP handshake
+(``initialize``, then ``notifications/initialized``) and sends ``tools/call``
+requests as newline-delimited JSON-RPC, as an MCP client does. Latency runs
+from writing a request to reading its response, so JSON-RPC framing and the
+stdio pipes are included. Comparing it with the server's own tool latency,
+read from ``server_get_metrics`` at the end, shows what the protocol costs.
+
+The server gets the fake MIDI backend and FL Studio stand-in through its
+environment: ``MIDO_BACKEND=fake_midi``, ``FAKE_FL_LATENCY_US`` and
+``PYTHONPATH`` with ``benchmarks/standin_site`` and ``benchmarks/``. With
+``--real`` the environment is passed through unchanged.
+
+Requests are started at ``--rate`` calls per second, or back to back if 0,
+with at most ``--concurrency`` in flight. At a fixed rate, ``lag`` is how
+late requests were sent because the concurrency limit was reached.
+``--mix`` weights the tools, e.g. ``note_on=8,cc=4,mixer_volume=1``.
+
+Usage:
+    uv run python benchmarks/load_stdio.py [--duration S] [--rate N] [--concurrency N]
+        [--mix NAME=WEIGHT,...] [--fl-latency-us US] [--real] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from fruityloops_mcp.metrics import LatencyHistogram
+
+BENCHMARKS = Path(__file__).resolve().parent
+
+PROTOCOL_VERSION = "2025-06-18"
+
+# Tools the mix can draw from: name in --mix to tool name and arguments
+TOOLS: dict[str, tuple[str, dict[str, Any]]] = {
+    "note_on": ("midi_send_note_on", {"note": 60, "velocity": 100}),
+    "note_off": ("midi_send_note_off", {"note": 60}),
+    "cc": ("midi_send_cc", {"control": 7, "value": 100}),
+    "pitch_bend": ("midi_send_pitch_bend", {"pitch": 0}),
+    "batch": (
+        "midi_send_batch",
+        {"events": [{"type": "note_on", "note": 48 + i, "velocity": 90} for i in range(16)]},
+    ),
+    "mixer_volume": ("mixer_set_track_volume", {"track_num": 1, "volume": 0.5}),
+    "mixer_get_volume": ("mixer_get_track_volume", {"track_num": 1}),
+    "mixer_snapshot": ("mixer_get_all_tracks", {"limit": 16}),
+    "channel_name": ("channels_get_channel_name", {"channel_num": 0}),
+}
+DEFAULT_MIX = "note_on=6,cc=3,mixer_volume=1"
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """Parse ``name=weight`` pairs separated by commas.
+
+    Raises:
+        ValueError: If a name is unknown or a weight is not positive
+    """
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in TOOLS:
+            raise ValueError(f"Unknown tool {name!r}, expected one of {', '.join(TOOLS)}")
+        mix[name] = float(weight or 1)
+        if mix[name] <= 0:
+            raise ValueError(f"Weight of {name} must be positive")
+    return mix
+
+
+def server_env(fl_latency_us: float) -> dict[str, str]:
+    """Environment selecting the fake MIDI backend and FL Studio stand-in."""
+    env = dict(os.environ)
+    paths = [str(BENCHMARKS / "standin_site"), str(BENCHMARKS)]
+    if env.get("PYTHONPATH"):
+        paths.append(env["PYTHONPATH"])
+    env["PYTHONPATH"] = os.pathsep.join(paths)
+    env["MIDO_BACKEND"] = "fake_midi"
+    env["FAKE_FL_LATENCY_US"] = str(fl_latency_us)
+    return env
+
+
+class StdioClient:
+    """Minimal MCP client speaking newline-delimited JSON-RPC to a process."""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        """Wrap a started server process; call ``start`` before requests."""
+        self.process = process
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future[tuple[dict[str, Any], int]]] = {}
+        self._reader: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start reading responses."""
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        assert self.process.stdout is not None
+        while line := await self.process.stdout.readline():
+            received = time.perf_counter_ns()
+            message = json.loads(line)
+            future = self._pending.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result((message, received))
+        for future in self._pending.values():
+            future.set_exception(ConnectionError("Server closed its output"))
+
+    def _write(self, message: dict[str, Any]) -> None:
+        assert self.process.stdin is not None
+        self.process.stdin.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+
+    async def request(self, method: str, params: dict[str, Any]) -> tuple[dict[str, Any], int]:
+        """Send a request and wait for its response.
+
+        Returns:
+            The response message and its round trip in nanoseconds
+        """
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        start = time.perf_counter_ns()
+        self._write({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        message, received = await future
+        return message, received - start
+
+    def notify(self, method: str) -> None:
+        """Send a notification."""
+        self._write({"jsonrpc": "2.0", "method": method})
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> tuple[bool, int]:
+        """Call a tool.
+
+        Returns:
+            Whether the call succeeded, and its round trip in nanoseconds
+        """
+        message, elapsed = await self.request("tools/call", {"name": name, "arguments": arguments})
+        result = message.get("result")
+        return result is not None and not result.get("isError", False), elapsed
+
+    async def close(self) -> None:
+        """Close the server's input and wait for it to exit."""
+        assert self.process.stdin is not None
+        self.process.stdin.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), 5)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+        if self._reader is not None:
+            self._reader.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reader
+
+
+async def spawn(env: dict[str, str] | None) -> tuple[StdioClient, int]:
+    """Start a server and complete the MCP handshake.
+
+    Returns:
+        The client and the time from spawning to the initialize response
+        in nanoseconds
+    """
+    start = time.perf_counter_ns()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "fruityloops_mcp",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+        env=env,
+        limit=16 * 1024 * 1024,
+    )
+    client = StdioClient(process)
+    client.start()
+    await client.request(
+        "initialize",
+        {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {"name": "load-stdio", "version": "0"},
+        },
+    )
+    initialized = time.perf_counter_ns() - start
+    client.notify("notifications/initialized")
+    return client, initialized
+
+
+async def generate(
+    client: StdioClient,
+    mix: dict[str, float],
+    duration: float,
+    rate: float,
+    concurrency: int,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Send tool calls for a while and summarize their latency.
+
+    Args:
+        client: Initialized client
+        mix: Relative weight of each tool in ``TOOLS``
+        duration: Seconds to start new calls for
+        rate: Calls started per second, or 0 to start them back to back
+        concurrency: Maximum calls in flight
+        seed: Seed for drawing tools from the mix
+
+    Returns:
+        Calls, errors, calls per second, and latency summaries overall and
+        per tool
+    """
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = list(mix.values())
+    latency = {name: LatencyHistogram() for name in names}
+    overall = LatencyHistogram()
+    lag = LatencyHistogram()
+    errors = 0
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+
+    async def call(name: str) -> None:
+        nonlocal errors
+        try:
+            ok, elapsed = await client.call_tool(*TOOLS[name])
+        finally:
+            slots.release()
+        latency[name].record(elapsed)
+        overall.record(elapsed)
+        errors += not ok
+
+    start = time.perf_counter_ns()
+    end = start + int(duration * 1e9)
+    for i in itertools.count():
+        scheduled = start + int(i * 1e9 / rate) if rate else time.perf_counter_ns()
+        if scheduled >= end:
+            break
+        delay = scheduled - time.perf_counter_ns()
+        if delay > 0:
+            await asyncio.sleep(delay / 1e9)
+        await slots.acquire()
+        if rate:
+            lag.record(time.perf_counter_ns() - scheduled)
+        task = asyncio.create_task(call(rng.choices(names, weights)[0]))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter_ns() - start
+
+    results: dict[str, Any] = {
+        "calls": overall.count,
+        "errors": errors,
+        "calls_per_sec": round(overall.count / elapsed * 1e9, 1),
+        "latency": overall.summary(),
+        "tools": {TOOLS[name][0]: latency[name].summary() for name in names},
+    }
+    if rate:
+        results["lag"] = lag.summary()
+    return results
+
+
+async def server_latency(client: StdioClient) -> dict[str, Any]:
+    """Read the server's own per-tool latency from ``server_get_metrics``."""
+    message, _ = await client.request("tools/call", {"name": "server_get_metrics", "arguments": {}})
+    result = message["result"]
+    metrics = result.get("structuredContent") or json.loads(result["content"][0]["text"])
+    return {name: tool["latency"] for name, tool in metrics["tools"].items()}
+
+
+async def run(
+    duration: float,
+    rate: float,
+    concurrency: int,
+    mix: dict[str, float],
+    fl_latency_us: float,
+    real: bool = False,
+) -> dict[str, Any]:
+    """Spawn a server, put it under load and shut it down.
+
+    Returns:
+        Handshake time, load results and the server's own tool latency
+    """
+    client, initialized = await spawn(None if real else server_env(fl_latency_us))
+    try:
+        connected, _ = await client.call_tool("midi_connect", {})
+        if not connected:
+            raise RuntimeError("midi_connect failed; is the MIDI port available?")
+        results = await generate(client, mix, duration, rate, concurrency)
+        results["initialize_ms"] = round(initialized / 1e6, 1)
+        results["server"] = await server_latency(client)
+    finally:
+        await client.close()
+    return results
+
+
+def _cell(value: float | None, width: int) -> str:
+    return f"{value:>{width}.0f}" if value is not None else f"{'-':>{width}}"
+
+
+def print_results(results: dict[str, Any]) -> None:
+    """Print the client and server latency of each tool."""
+    print(
+        f"initialize: {results['initialize_ms']} ms   calls: {results['calls']}   "
+        f"errors: {results['errors']}   calls/s: {results['calls_per_sec']:.0f}"
+    )
+    if "lag" in results:
+        print(f"send lag p99: {results['lag']['p99_us']:.0f} us")
+    print(
+        f"{'tool':<28}{'p50 (us)':>10}{'p99 (us)':>10}{'p999 (us)':>11}"
+        f"{'server p50':>12}{'server p99':>12}"
+    )
+    rows = {**results["tools"], "all": results["latency"]}
+    for name, summary in rows.items():
+        server = results["server"].get(name, {})
+        print(
+            f"{name:<28}{_cell(summary['p50_us'], 10)}{_cell(summary['p99_us'], 10)}"
+            f"{_cell(summary['p999_us'], 11)}"
+            f"{_cell(server.get('p50_us'), 12)}{_cell(server.get('p99_us'), 12)}"
+        )
+
+
+def main() -> None:
+    """Run the load generator and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    parser.add_argument("--rate", type=float, default=0.0, help="Calls per second, 0 for max")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum calls in flight")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Tool weights, NAME=WEIGHT,...")
+    parser.add_argument("--fl-latency-us", type=float, default=50.0)
+    parser.add_argument("--real", action="store_true", help="Use the real MIDI and FL Studio")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    results = asyncio.run(
+        run(args.duration, args.rate, args.concurrency, mix, args.fl_latency_us, args.real)
+    )
+    print_results(results)
+    if args.output:
+        results["options"] = {**vars(args), "mix": mix}
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
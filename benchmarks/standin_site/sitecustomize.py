@@ -0,0 +1,9 @@
+"""Install the FL Studio stand-in in every interpreter started with this directory on PYTHONPATH.
+
+``benchmarks/`` must be on ``PYTHONPATH`` too. The call latency comes from
+``FAKE_FL_LATENCY_US``.
+"""
+
+import fake_fl
+
+fake_fl.install()
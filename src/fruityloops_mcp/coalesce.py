@@ -0,0 +1,97 @@
+"""Coalescing of repeated writes to the same target."""
+
+import asyncio
+import itertools
+from collections.abc import Awaitable, Callable, Hashable, Mapping
+from typing import Any
+
+
+class WriteCoalescer:
+    """Merges writes made within a flush window and applies the final values.
+
+    The first write after a flush starts the window; writes arriving before
+    it closes are merged, a later value for a target replacing an earlier
+    one, and everything is applied with one ``apply`` call. Writers wait for
+    the flush that carries their values, so errors reach every writer of a
+    failed batch.
+    """
+
+    def __init__(
+        self,
+        apply: Callable[[dict[Hashable, Any]], Awaitable[None]],
+        window: float = 0.005,
+    ):
+        """Initialize with nothing pending.
+
+        Args:
+            apply: Coroutine function applying a batch of target to value
+            window: Seconds writes are collected before they are applied; 0
+                still merges writes made in the same event loop iteration
+        """
+        self.apply = apply
+        self.window = window
+        self._ids = itertools.count()
+        self._pending: dict[Hashable, tuple[Any, int]] = {}
+        self._flush: asyncio.Future[dict[Hashable, int]] | None = None
+        self._flushers: set[asyncio.Task[None]] = set()
+
+        self.writes = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.applied = 0
+
+    async def write(self, values: Mapping[Hashable, Any]) -> int:
+        """Write values and wait until they are applied or superseded.
+
+        Args:
+            values: Target to value
+
+        Returns:
+            Number of this call's values applied; the rest were replaced by
+            later writes to the same targets before the flush
+        """
+        if not values:
+            return 0
+        writer = next(self._ids)
+        for target, value in values.items():
+            if target in self._pending:
+                self.coalesced += 1
+            self._pending[target] = (value, writer)
+        self.writes += len(values)
+
+        if self._flush is None:
+            self._flush = asyncio.get_running_loop().create_future()
+            flusher = asyncio.create_task(self._flush_later(self._flush))
+            self._flushers.add(flusher)
+            flusher.add_done_callback(self._flushers.discard)
+        owners = await asyncio.shield(self._flush)
+        return sum(1 for target in values if owners[target] == writer)
+
+    def stats(self) -> dict[str, int]:
+        """Get write counters.
+
+        Returns:
+            Values written, values replaced before being applied, flushes
+            and values applied
+        """
+        return {
+            "writes": self.writes,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "applied": self.applied,
+        }
+
+    async def _flush_later(self, done: asyncio.Future[dict[Hashable, int]]) -> None:
+        await asyncio.sleep(self.window)
+        pending, self._pending = self._pending, {}
+        self._flush = None
+        self.flushes += 1
+        self.applied += len(pending)
+        try:
+            await self.apply({target: value for target, (value, _) in pending.items()})
+        except Exception as e:
+            done.set_exception(e)
+            # Mark the exception retrieved in case every writer was cancelled
+            done.exception()
+        else:
+            done.set_result({target: writer for target, (_, writer) in pending.items()})
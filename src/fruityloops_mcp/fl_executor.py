@@ -0,0 +1,166 @@
+"""Run FL Studio API calls off the event loop with timeouts."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from fruityloops_mcp.midi_output import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_POLICIES = ("inline", "thread", "pool")
+
+
+class FLCallError(Exception):
+    """Base class for FL Studio API calls that could not complete."""
+
+
+class FLCallTimeoutError(FLCallError, TimeoutError):
+    """Raised when an FL Studio API call does not finish in time."""
+
+
+class FLExecutorFullError(FLCallError):
+    """Raised when too many FL Studio API calls are already pending."""
+
+
+class FLExecutor:
+    """Runs FL Studio API calls according to an execution policy.
+
+    - ``inline``: call on the event loop thread; no timeout is enforced
+    - ``thread``: call on one dedicated thread, in submission order
+    - ``pool``: call on a pool of ``max_workers`` threads
+
+    With ``thread`` and ``pool`` a stalled host call only stalls its caller,
+    which gives up after ``timeout`` seconds, while the event loop and MIDI
+    output keep running. Latency, as seen by the caller, is recorded per call
+    name.
+    """
+
+    def __init__(
+        self,
+        policy: str = "thread",
+        timeout: float | None = 5.0,
+        max_workers: int = 4,
+        max_pending: int = 256,
+        latency_window: int = 1024,
+    ):
+        """Initialize the executor; threads are started on first use.
+
+        Args:
+            policy: ``inline``, ``thread`` or ``pool``
+            timeout: Seconds a call may take, including time queued, or None
+                to wait forever
+            max_workers: Threads used by the ``pool`` policy
+            max_pending: Calls that may be queued or running at once; more
+                are rejected with ``FLExecutorFullError``
+            latency_window: Recent samples kept per call name for percentiles
+
+        Raises:
+            ValueError: If the policy is unknown
+        """
+        if policy not in EXECUTION_POLICIES:
+            raise ValueError(
+                f"Unknown execution policy {policy!r}, expected one of {EXECUTION_POLICIES}"
+            )
+        self.policy = policy
+        self.timeout = timeout
+        self.max_workers = max_workers if policy == "pool" else 1
+        self.max_pending = max_pending
+        self._latency_window = latency_window
+        self._executor: ThreadPoolExecutor | None = None
+        self._latency: dict[str, LatencyStats] = {}
+        self._errors: dict[str, int] = {}
+
+        self.pending = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    async def call(self, name: str, func: Callable[..., Any], *args: Any) -> Any:
+        """Call an FL Studio API function.
+
+        Args:
+            name: Name the latency is recorded under, e.g. ``mixer.getTrackVolume``
+            func: API function
+            *args: Positional arguments for ``func``
+
+        Returns:
+            Return value of ``func``
+
+        Raises:
+            FLCallTimeoutError: If the call takes longer than the timeout
+            FLExecutorFullError: If ``max_pending`` calls are already pending
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise FLExecutorFullError(
+                f"Cannot call {name}: {self.pending} FL Studio calls already pending"
+            )
+
+        self.pending += 1
+        start = time.perf_counter_ns()
+        try:
+            if self.policy == "inline":
+                result = func(*args)
+            else:
+                future = asyncio.wrap_future(self._get_executor().submit(func, *args))
+                result = await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._errors[name] = self._errors.get(name, 0) + 1
+            logger.warning(f"FL Studio call {name} timed out after {self.timeout}s")
+            raise FLCallTimeoutError(
+                f"FL Studio call {name} timed out after {self.timeout}s"
+            ) from None
+        except Exception:
+            self._errors[name] = self._errors.get(name, 0) + 1
+            raise
+        finally:
+            self.pending -= 1
+
+        stats = self._latency.get(name)
+        if stats is None:
+            stats = self._latency[name] = LatencyStats(self._latency_window)
+        stats.record(time.perf_counter_ns() - start)
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """Get executor counters and per-call latency.
+
+        Returns:
+            Policy, pending, timed out and rejected call counts, and for each
+            call name its latency summary in microseconds and error count
+        """
+        names = sorted(self._latency.keys() | self._errors.keys())
+        return {
+            "policy": self.policy,
+            "pending": self.pending,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "calls": {
+                name: {
+                    **(
+                        self._latency[name].summary()
+                        if name in self._latency
+                        else LatencyStats(1).summary()
+                    ),
+                    "errors": self._errors.get(name, 0),
+                }
+                for name in names
+            },
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads without waiting for stalled calls."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="fl-api"
+            )
+        return self._executor
@@ -0,0 +1,424 @@
+"""Streamable HTTP transport with session limits and accounting.
+
+One MCP server, event loop and MIDI interface serve every HTTP client
+session. ``SessionTracker`` sits in front of the MCP session manager,
+refuses new sessions beyond a limit, expires sessions whose clients went
+away without closing them and keeps per-session counters. Requests whose
+``Host`` or ``Origin`` header names another site are refused, so web pages
+cannot reach the unauthenticated endpoint through DNS rebinding.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable, Collection
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from mcp.server.lowlevel import Server
+from mcp.server.streamable_http import MCP_SESSION_ID_HEADER
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from mcp.server.transport_security import TransportSecuritySettings
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+_SESSION_HEADER = MCP_SESSION_ID_HEADER.encode()
+
+# Headers copied from a session's first request when ending it in the app
+_KEPT_HEADERS = (b"host", b"origin", b"mcp-protocol-version")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Seconds without requests after which a session is closed
+DEFAULT_IDLE_TIMEOUT = 600.0
+
+# Host header values accepted when no allowed hosts are given: loopback on any port
+LOOPBACK_HOSTS = ("127.0.0.1:*", "localhost:*", "[::1]:*")
+
+
+@dataclass(slots=True)
+class SessionStats:
+    """Counters for one HTTP client session.
+
+    Attributes:
+        session_id: MCP session ID assigned by the server
+        opened_at: Unix time the session was created
+        last_active: Unix time of the latest request
+        requests: HTTP requests made in the session
+        tool_calls: Tools called in the session
+        tool_errors: Tool calls that failed
+        bytes_in: Request body bytes received
+        bytes_out: Response body bytes sent
+        open_requests: Requests still being answered, such as SSE streams
+    """
+
+    session_id: str
+    opened_at: float
+    last_active: float
+    requests: int = 0
+    tool_calls: int = 0
+    tool_errors: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    open_requests: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the stats to a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+class SessionTracker:
+    """ASGI middleware that limits and accounts for MCP HTTP sessions.
+
+    A request without an ``mcp-session-id`` header starts a session. If
+    ``max_sessions`` sessions are already open, or being opened, it is
+    answered with ``503 Service Unavailable``. A session counts as open from
+    the response that assigns its ID until the client deletes it, it has
+    had no request for ``idle_timeout`` seconds, or the app answers one of
+    its requests with ``404``. Idle sessions are looked for whenever a new
+    session is requested, so clients that vanish without deleting their
+    session do not use up the limit. They are ended in the app with the
+    ``DELETE`` request a client would send.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_sessions: int = 100,
+        idle_timeout: float | None = DEFAULT_IDLE_TIMEOUT,
+    ):
+        """Initialize the tracker.
+
+        Args:
+            app: ASGI app handling MCP requests
+            max_sessions: Maximum concurrently open sessions
+            idle_timeout: Seconds without requests before a session is
+                closed, None to keep idle sessions open
+
+        Raises:
+            ValueError: If max_sessions is less than 1
+        """
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+        self.app = app
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._sessions: dict[str, SessionStats] = {}
+        # Scope of the request that opened each session, to end it in the app
+        self._scopes: dict[str, Scope] = {}
+        self._pending = 0
+
+        self.opened = 0
+        self.closed = 0
+        self.expired = 0
+        self.rejected = 0
+
+    @property
+    def active(self) -> int:
+        """Number of open sessions."""
+        return len(self._sessions)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        session_id = _header(scope, _SESSION_HEADER)
+        if session_id is None:
+            await self._handle_new(scope, receive, send)
+            return
+
+        stats = self._sessions.get(session_id)
+        if stats is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = await self._forward(stats, scope, receive, send)
+        # The app answers 404 for sessions it has ended
+        if status == 404 or (scope["method"] == "DELETE" and status == 200):
+            self._close(session_id)
+
+    def record_call(self, session_id: str | None, failed: bool = False) -> None:
+        """Count a tool call against a session.
+
+        Args:
+            session_id: Session the call was made in; ignored if unknown
+            failed: True if the tool raised
+        """
+        stats = self._sessions.get(session_id) if session_id else None
+        if stats is None:
+            return
+        stats.tool_calls += 1
+        if failed:
+            stats.tool_errors += 1
+
+    async def expire(self) -> list[str]:
+        """Close idle sessions.
+
+        A session with a request still open is never idle. Idle sessions
+        are also ended in the app, so their clients get ``404`` instead of
+        continuing outside the limit.
+
+        Returns:
+            IDs of the sessions closed
+        """
+        if self.idle_timeout is None:
+            return []
+        now = time.time()
+        with self._lock:
+            idle = [
+                sid
+                for sid, stats in self._sessions.items()
+                if not stats.open_requests and now - stats.last_active > self.idle_timeout
+            ]
+            for session_id in idle:
+                del self._sessions[session_id]
+            self.closed += len(idle)
+            self.expired += len(idle)
+            scopes = [self._scopes.pop(session_id) for session_id in idle]
+        for session_id, scope in zip(idle, scopes):
+            logger.info(f"MCP session expired after {self.idle_timeout:g}s idle: {session_id}")
+            try:
+                await self._end(session_id, scope)
+            except Exception as e:
+                logger.warning(f"Error ending expired MCP session {session_id}: {e}")
+        return idle
+
+    def session(self, session_id: str) -> SessionStats | None:
+        """Get the stats of an open session."""
+        return self._sessions.get(session_id)
+
+    def stats(self) -> dict[str, Any]:
+        """Get session totals and per-session counters.
+
+        Returns:
+            Open, opened, closed, expired and rejected session counts, the
+            session limit and idle timeout, and the counters of every open
+            session
+        """
+        return {
+            "active": self.active,
+            "max_sessions": self.max_sessions,
+            "idle_timeout": self.idle_timeout,
+            "opened": self.opened,
+            "closed": self.closed,
+            "expired": self.expired,
+            "rejected": self.rejected,
+            "sessions": [s.to_dict() for s in list(self._sessions.values())],
+        }
+
+    async def _handle_new(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.expire()
+        with self._lock:
+            if len(self._sessions) + self._pending >= self.max_sessions:
+                self.rejected += 1
+                rejected = True
+            else:
+                self._pending += 1
+                rejected = False
+        if rejected:
+            logger.warning(f"Rejecting MCP session: limit of {self.max_sessions} reached")
+            await _reject(send, self.max_sessions)
+            return
+
+        now = time.time()
+        stats = SessionStats(session_id="", opened_at=now, last_active=now)
+        try:
+            await self._forward(stats, scope, receive, send)
+        finally:
+            if not stats.session_id:
+                with self._lock:
+                    self._pending -= 1
+
+    async def _forward(
+        self, stats: SessionStats, scope: Scope, receive: Receive, send: Send
+    ) -> int | None:
+        """Pass a request to the app, counting bytes in and out.
+
+        Returns:
+            Response status code, None if no response was started
+        """
+        stats.requests += 1
+        stats.last_active = time.time()
+        status: int | None = None
+
+        async def counting_receive() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                stats.bytes_in += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if not stats.session_id and status == 200:
+                    session_id = _header(message, _SESSION_HEADER)
+                    if session_id is not None:
+                        self._open(stats, session_id, scope)
+            elif message["type"] == "http.response.body":
+                stats.bytes_out += len(message.get("body", b""))
+            await send(message)
+
+        stats.open_requests += 1
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            stats.open_requests -= 1
+            stats.last_active = time.time()
+        return status
+
+    def _open(self, stats: SessionStats, session_id: str, scope: Scope) -> None:
+        """Register a new session once the app has assigned its ID."""
+        stats.session_id = session_id
+        with self._lock:
+            self._pending -= 1
+            self._sessions[session_id] = stats
+            self._scopes[session_id] = scope
+            self.opened += 1
+        logger.info(f"MCP session opened: {session_id}")
+
+    def _close(self, session_id: str) -> None:
+        with self._lock:
+            stats = self._sessions.pop(session_id, None)
+            if stats is None:
+                return
+            self._scopes.pop(session_id, None)
+            self.closed += 1
+        logger.info(
+            f"MCP session closed: {session_id} ({stats.requests} requests, "
+            f"{stats.tool_calls} tool calls, {time.time() - stats.opened_at:.1f}s)"
+        )
+
+    async def _end(self, session_id: str, scope: Scope) -> None:
+        """End a session in the app with the request its client would send."""
+        headers = [(key, value) for key, value in scope["headers"] if key in _KEPT_HEADERS]
+        headers.append((_SESSION_HEADER, session_id.encode()))
+        delete = {**scope, "method": "DELETE", "headers": headers, "query_string": b""}
+        status: int | None = None
+
+        async def receive() -> Message:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await self.app(delete, receive, send)
+        if status not in (200, 404):
+            logger.warning(f"Ending MCP session {session_id} returned {status}")
+
+
+def create_http_app(
+    server: Server,
+    max_sessions: int = 100,
+    json_response: bool = False,
+    metrics: Callable[[], str] | None = None,
+    idle_timeout: float | None = DEFAULT_IDLE_TIMEOUT,
+    allowed_hosts: Collection[str] | None = None,
+    allowed_origins: Collection[str] | None = None,
+) -> Starlette:
+    """Create an ASGI app serving an MCP server over streamable HTTP.
+
+    The MCP endpoint is ``/mcp``. The app's ``state.sessions`` holds its
+    ``SessionTracker``.
+
+    Args:
+        server: Low-level MCP server shared by every session
+        max_sessions: Maximum concurrently open sessions
+        json_response: Answer with plain JSON instead of SSE streams
+        metrics: Renders metrics in the Prometheus text format, served from
+            ``/metrics`` if given
+        idle_timeout: Seconds without requests before a session is closed,
+            None to keep idle sessions open
+        allowed_hosts: Accepted ``Host`` header values, ``host:*`` matching
+            any port; loopback addresses if None
+        allowed_origins: Accepted ``Origin`` header values; ``http://`` and
+            ``https://`` origins of the allowed hosts if None
+
+    Returns:
+        Starlette app; its lifespan runs the session manager
+    """
+    hosts = list(allowed_hosts or LOOPBACK_HOSTS)
+    if allowed_origins is None:
+        allowed_origins = [f"{scheme}://{host}" for scheme in ("http", "https") for host in hosts]
+    security = TransportSecuritySettings(
+        enable_dns_rebinding_protection=True,
+        allowed_hosts=hosts,
+        allowed_origins=list(allowed_origins),
+    )
+    manager = StreamableHTTPSessionManager(
+        server, json_response=json_response, security_settings=security
+    )
+    tracker = SessionTracker(
+        manager.handle_request, max_sessions=max_sessions, idle_timeout=idle_timeout
+    )
+    routes = [Route("/mcp", endpoint=tracker, methods=["GET", "POST", "DELETE"])]
+    if metrics is not None:
+
+        async def metrics_endpoint(_request: Request) -> PlainTextResponse:
+            return PlainTextResponse(metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+        routes.append(Route("/metrics", endpoint=metrics_endpoint, methods=["GET"]))
+    app = Starlette(routes=routes, lifespan=lambda _app: manager.run())
+    app.state.sessions = tracker
+    return app
+
+
+def default_allowed_hosts(host: str, port: int) -> list[str]:
+    """List the ``Host`` header values a server bound to ``host`` accepts.
+
+    Loopback names are always accepted. A wildcard bind address adds
+    nothing, so remote clients need explicitly allowed hosts.
+
+    Args:
+        host: Interface the server listens on
+        port: TCP port the server listens on
+
+    Returns:
+        Host header values for ``create_http_app``
+    """
+    hosts = [f"127.0.0.1:{port}", f"localhost:{port}", f"[::1]:{port}"]
+    if host not in ("0.0.0.0", "::", ""):
+        bound = f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+        if bound not in hosts:
+            hosts.append(bound)
+    return hosts
+
+
+def _header(source: Scope | Message, name: bytes) -> str | None:
+    for key, value in source.get("headers", ()):
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _reject(send: Send, max_sessions: int) -> None:
+    body = json.dumps(
+        {
+            "jsonrpc": "2.0",
+            "id": None,
+            "error": {"code": -32000, "message": f"Session limit of {max_sessions} reached"},
+        }
+    ).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", b"1"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,71 @@
+"""Deferred imports of modules that are slow to load or may be missing."""
+
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access.
+
+    Bind it to the name the module would have been imported as, e.g.
+    ``mido = LazyModule("mido")``. Attribute lookups go through to the real
+    module once it is loaded, so calling code reads the same, and the name
+    can still be patched in tests.
+    """
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        """Initialize without importing anything.
+
+        Args:
+            name: Absolute module name
+        """
+        self._name = name
+        self._module: ModuleType | None = None
+
+    @property
+    def loaded(self) -> bool:
+        """Check if the module has been imported through this stand-in."""
+        return self._module is not None
+
+    def load(self) -> ModuleType:
+        """Import the module if needed.
+
+        Returns:
+            The real module
+
+        Raises:
+            ImportError: If the module cannot be imported
+        """
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return module
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self.load(), item)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+def module_available(name: str) -> bool:
+    """Check if a module can be imported without importing it.
+
+    Args:
+        name: Absolute module name
+
+    Returns:
+        True if the module is already imported or can be found
+    """
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
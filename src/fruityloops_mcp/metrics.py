@@ -0,0 +1,347 @@
+"""Low-overhead server metrics: latency histograms, counters and throughput.
+
+Everything here is cheap enough to record on every tool call and MIDI
+write: recording is a few integer operations into preallocated storage,
+and summaries are only computed when metrics are read.
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+# Significant bits kept per value; buckets are within 1/32 (about 3%) of it
+_SUB_BUCKET_BITS = 5
+# Values below this get a bucket each
+_LINEAR_LIMIT = 1 << (_SUB_BUCKET_BITS + 1)
+
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def _bucket_index(value: int) -> int:
+    if value < _LINEAR_LIMIT:
+        return value
+    shift = value.bit_length() - _SUB_BUCKET_BITS - 1
+    return (shift << _SUB_BUCKET_BITS) + (value >> shift)
+
+
+def _bucket_upper(index: int) -> int:
+    """Highest value that falls into a bucket."""
+    if index < _LINEAR_LIMIT:
+        return index
+    shift = (index >> _SUB_BUCKET_BITS) - 1
+    mantissa = index - (shift << _SUB_BUCKET_BITS)
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Fixed-memory latency histogram in the style of HdrHistogram.
+
+    Values are counted in log-linear buckets: each power of two is split into
+    32 buckets, so any percentile is reported within about 3% of the true
+    value, from nanoseconds to ``max_ns``, in about a thousand counters.
+    Unlike ``LatencyStats`` nothing is sorted and no samples are dropped, so
+    tail percentiles cover the whole lifetime.
+    """
+
+    __slots__ = ("count", "total_ns", "max_ns", "_counts")
+
+    def __init__(self, max_ns: int = 60_000_000_000):
+        """Initialize an empty histogram.
+
+        Args:
+            max_ns: Largest value tracked precisely; larger values are
+                counted in the last bucket
+        """
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self._counts = [0] * (_bucket_index(max_ns) + 1)
+
+    def record(self, value_ns: int) -> None:
+        """Record one value in nanoseconds."""
+        if value_ns < 0:
+            value_ns = 0
+        index = _bucket_index(value_ns)
+        counts = self._counts
+        if index >= len(counts):
+            index = len(counts) - 1
+        counts[index] += 1
+        self.count += 1
+        self.total_ns += value_ns
+        if value_ns > self.max_ns:
+            self.max_ns = value_ns
+
+    def percentile(self, pct: float) -> int:
+        """Get a percentile in nanoseconds.
+
+        Args:
+            pct: Percentile between 0 and 100
+
+        Returns:
+            Highest value of the bucket holding the percentile, capped at
+            the largest value recorded, or 0 if nothing was recorded
+        """
+        return self.percentiles([pct])[0]
+
+    def percentiles(self, pcts: Sequence[float]) -> list[int]:
+        """Get several percentiles in nanoseconds in one pass.
+
+        Args:
+            pcts: Percentiles between 0 and 100, in ascending order
+
+        Returns:
+            The value at each percentile, as for ``percentile``
+        """
+        if not self.count:
+            return [0] * len(pcts)
+        ranks = [max(1, -(-self.count * pct // 100)) for pct in pcts]
+        values: list[int] = []
+        last = len(self._counts) - 1
+        seen = 0
+        for index, bucket in enumerate(self._counts):
+            seen += bucket
+            while seen >= ranks[len(values)]:
+                # The last bucket also holds every value beyond the range
+                upper = _bucket_upper(index) if index < last else self.max_ns
+                values.append(min(upper, self.max_ns))
+                if len(values) == len(ranks):
+                    return values
+        return values + [self.max_ns] * (len(ranks) - len(values))
+
+    def summary(self) -> dict[str, float]:
+        """Summarize the histogram in microseconds."""
+        p50, p90, p99, p999 = self.percentiles((50, 90, 99, 99.9))
+        return {
+            "count": self.count,
+            "mean_us": self.total_ns / self.count / 1000 if self.count else 0.0,
+            "p50_us": p50 / 1000,
+            "p90_us": p90 / 1000,
+            "p99_us": p99 / 1000,
+            "p999_us": p999 / 1000,
+            "max_us": self.max_ns / 1000,
+        }
+
+
+class ThroughputMeter:
+    """Message and byte counters with rates over a sliding window.
+
+    Counts are kept per second of the monotonic clock, for the last
+    ``window`` seconds. Writes may come from any thread.
+    """
+
+    def __init__(self, window: int = 10):
+        """Initialize empty counters.
+
+        Args:
+            window: Seconds the rates are averaged over
+        """
+        self.window = window
+        self.messages = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._seconds: deque[list[int]] = deque(maxlen=window + 1)
+
+    def record(self, messages: int, size: int) -> None:
+        """Count messages written.
+
+        Args:
+            messages: Number of messages
+            size: Their total size in bytes
+        """
+        second = int(time.monotonic())
+        with self._lock:
+            self.messages += messages
+            self.bytes += size
+            seconds = self._seconds
+            if not seconds or seconds[-1][0] != second:
+                seconds.append([second, 0, 0])
+            current = seconds[-1]
+            current[1] += messages
+            current[2] += size
+
+    def summary(self) -> dict[str, float]:
+        """Get totals and rates averaged over the window."""
+        cutoff = int(time.monotonic()) - self.window
+        with self._lock:
+            recent = [(m, b) for second, m, b in self._seconds if second > cutoff]
+            messages, size = self.messages, self.bytes
+        return {
+            "messages": messages,
+            "bytes": size,
+            "messages_per_sec": sum(m for m, _ in recent) / self.window,
+            "bytes_per_sec": sum(b for _, b in recent) / self.window,
+        }
+
+
+class ToolMetrics:
+    """Call and error counters and a latency histogram for one tool."""
+
+    __slots__ = ("calls", "errors", "latency")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+    def summary(self) -> dict[str, Any]:
+        """Summarize the tool's counters and latency in microseconds."""
+        return {"calls": self.calls, "errors": self.errors, "latency": self.latency.summary()}
+
+
+class ServerMetrics:
+    """Per-tool metrics and result serialization time for one server."""
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.tools: dict[str, ToolMetrics] = {}
+        self.serialize = LatencyHistogram()
+
+    def record_tool(self, name: str, duration_ns: int, failed: bool = False) -> None:
+        """Record one tool call.
+
+        Args:
+            name: Tool name
+            duration_ns: Time the call took, including waiting for locks
+            failed: The call raised an exception
+        """
+        metrics = self.tools.get(name)
+        if metrics is None:
+            metrics = self.tools[name] = ToolMetrics()
+        metrics.calls += 1
+        if failed:
+            metrics.errors += 1
+        metrics.latency.record(duration_ns)
+
+    def summary(self) -> dict[str, Any]:
+        """Get uptime, per-tool metrics and serialization time."""
+        return {
+            "uptime_s": round(time.monotonic() - self.started, 3),
+            "tools": {name: self.tools[name].summary() for name in sorted(self.tools)},
+            "serialize": self.serialize.summary(),
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _metric(lines: list[str], name: str, kind: str, help_text: str) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _samples(
+    lines: list[str],
+    name: str,
+    kind: str,
+    help_text: str,
+    samples: Iterable[tuple[dict[str, str], float]],
+) -> None:
+    _metric(lines, name, kind, help_text)
+    lines.extend(f"{name}{_labels(labels)} {value:g}" for labels, value in samples)
+
+
+def _summaries(
+    lines: list[str],
+    name: str,
+    help_text: str,
+    histograms: Iterable[tuple[dict[str, str], LatencyHistogram]],
+) -> None:
+    _metric(lines, name, "summary", help_text)
+    for labels, histogram in histograms:
+        values = histogram.percentiles([quantile * 100 for quantile in SUMMARY_QUANTILES])
+        for quantile, value_ns in zip(SUMMARY_QUANTILES, values):
+            value = value_ns / 1e9
+            lines.append(f"{name}{_labels({**labels, 'quantile': str(quantile)})} {value:.9f}")
+        lines.append(f"{name}_sum{_labels(labels)} {histogram.total_ns / 1e9:.9f}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+
+def prometheus_text(
+    metrics: ServerMetrics,
+    midi: Mapping[str, Mapping[str, float]] | None = None,
+    fl: Mapping[str, Mapping[str, float]] | None = None,
+    prefix: str = "fruityloops_mcp",
+) -> str:
+    """Render metrics in the Prometheus text exposition format.
+
+    Latency is exported as summaries in seconds, with quantiles over the
+    server's lifetime.
+
+    Args:
+        metrics: Server metrics
+        midi: MIDI port names and their ``ThroughputMeter`` summaries
+        fl: FL Studio API call names and their latency summaries, as in
+            ``FLExecutor.stats()``, whose percentiles cover recent calls
+        prefix: Prefix of every metric name
+
+    Returns:
+        Exposition text ending with a newline
+    """
+    lines: list[str] = []
+    uptime = time.monotonic() - metrics.started
+    _samples(lines, f"{prefix}_uptime_seconds", "gauge", "Seconds since start.", [({}, uptime)])
+
+    tools = [({"tool": name}, metrics.tools[name]) for name in sorted(metrics.tools)]
+    _samples(
+        lines,
+        f"{prefix}_tool_calls_total",
+        "counter",
+        "Tool calls.",
+        [(labels, tool.calls) for labels, tool in tools],
+    )
+    _samples(
+        lines,
+        f"{prefix}_tool_errors_total",
+        "counter",
+        "Tool calls that failed.",
+        [(labels, tool.errors) for labels, tool in tools],
+    )
+    _summaries(
+        lines,
+        f"{prefix}_tool_duration_seconds",
+        "Tool call latency, including waiting for locks.",
+        [(labels, tool.latency) for labels, tool in tools],
+    )
+    _summaries(
+        lines,
+        f"{prefix}_result_serialize_seconds",
+        "Time spent rendering tool results.",
+        [({}, metrics.serialize)],
+    )
+
+    ports = [({"port": port}, stats) for port, stats in (midi or {}).items()]
+    for name, key, kind, help_text in (
+        ("midi_messages_sent_total", "messages", "counter", "MIDI messages written."),
+        ("midi_bytes_sent_total", "bytes", "counter", "MIDI bytes written."),
+        ("midi_messages_per_second", "messages_per_sec", "gauge", "MIDI messages per second."),
+        ("midi_bytes_per_second", "bytes_per_sec", "gauge", "MIDI bytes per second."),
+    ):
+        _samples(lines, f"{prefix}_{name}", kind, help_text, [(lb, s[key]) for lb, s in ports])
+
+    calls = [({"call": name}, stats) for name, stats in sorted((fl or {}).items())]
+    name = f"{prefix}_fl_call_duration_seconds"
+    _metric(lines, name, "summary", "FL Studio API call latency, including time queued.")
+    for labels, stats in calls:
+        for quantile, key in ((0.5, "p50_us"), (0.99, "p99_us")):
+            value = stats[key] / 1e6
+            lines.append(f"{name}{_labels({**labels, 'quantile': str(quantile)})} {value:.9f}")
+        total = stats["mean_us"] * stats["count"] / 1e6
+        lines.append(f"{name}_sum{_labels(labels)} {total:.9f}")
+        lines.append(f"{name}_count{_labels(labels)} {stats['count']}")
+    _samples(
+        lines,
+        f"{prefix}_fl_call_errors_total",
+        "counter",
+        "FL Studio API calls that failed.",
+        [(labels, stats["errors"]) for labels, stats in calls],
+    )
+    return "\n".join(lines) + "\n"
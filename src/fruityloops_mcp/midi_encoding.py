@@ -0,0 +1,154 @@
+"""Direct byte encoding of MIDI channel voice messages.
+
+Building a ``mido.Message`` validates every keyword argument and allocates a
+message object per event. The encoders here produce the wire bytes straight
+from precomputed status byte tables, for ports that can take raw bytes.
+"""
+
+import contextlib
+from collections.abc import Callable
+from typing import Any
+
+# mido message type -> status byte without the channel nibble
+STATUS_BASES = {
+    "note_off": 0x80,
+    "note_on": 0x90,
+    "control_change": 0xB0,
+    "program_change": 0xC0,
+    "pitchwheel": 0xE0,
+}
+
+# mido message type -> status byte for each of the 16 channels
+STATUS_BYTES: dict[str, tuple[int, ...]] = {
+    msg_type: tuple(base | channel for channel in range(16))
+    for msg_type, base in STATUS_BASES.items()
+}
+
+_NOTE_OFF = STATUS_BYTES["note_off"]
+_NOTE_ON = STATUS_BYTES["note_on"]
+_CONTROL_CHANGE = STATUS_BYTES["control_change"]
+_PROGRAM_CHANGE = STATUS_BYTES["program_change"]
+_PITCHWHEEL = STATUS_BYTES["pitchwheel"]
+
+# Integer membership in a range is a constant-time check
+_CHANNELS = range(16)
+_DATA = range(128)
+_PITCH = range(-8192, 8192)
+
+
+def _out_of_range(**values: Any) -> ValueError:
+    """Build the error for the first out-of-range value."""
+    for name, value in values.items():
+        valid = _CHANNELS if name == "channel" else _PITCH if name == "pitch" else _DATA
+        if value not in valid:
+            return ValueError(f"{name} must be in {valid.start}..{valid.stop - 1}, got {value!r}")
+    return ValueError(f"Invalid MIDI message values: {values}")  # pragma: no cover
+
+
+def encode_note_on(note: int, velocity: int = 64, channel: int = 0) -> bytes:
+    """Encode a note on message.
+
+    Raises:
+        ValueError: If a value is out of range
+    """
+    if note in _DATA and velocity in _DATA and channel in _CHANNELS:
+        return bytes((_NOTE_ON[channel], note, velocity))
+    raise _out_of_range(note=note, velocity=velocity, channel=channel)
+
+
+def encode_note_off(note: int, velocity: int = 64, channel: int = 0) -> bytes:
+    """Encode a note off message.
+
+    Raises:
+        ValueError: If a value is out of range
+    """
+    if note in _DATA and velocity in _DATA and channel in _CHANNELS:
+        return bytes((_NOTE_OFF[channel], note, velocity))
+    raise _out_of_range(note=note, velocity=velocity, channel=channel)
+
+
+def encode_control_change(control: int, value: int, channel: int = 0) -> bytes:
+    """Encode a control change message.
+
+    Raises:
+        ValueError: If a value is out of range
+    """
+    if control in _DATA and value in _DATA and channel in _CHANNELS:
+        return bytes((_CONTROL_CHANGE[channel], control, value))
+    raise _out_of_range(control=control, value=value, channel=channel)
+
+
+def encode_program_change(program: int, channel: int = 0) -> bytes:
+    """Encode a program change message.
+
+    Raises:
+        ValueError: If a value is out of range
+    """
+    if program in _DATA and channel in _CHANNELS:
+        return bytes((_PROGRAM_CHANGE[channel], program))
+    raise _out_of_range(program=program, channel=channel)
+
+
+def encode_pitchwheel(pitch: int, channel: int = 0) -> bytes:
+    """Encode a pitch wheel message.
+
+    Args:
+        pitch: Pitch bend value (-8192 to 8191), 0 is centered
+        channel: MIDI channel (0-15)
+
+    Raises:
+        ValueError: If a value is out of range
+    """
+    if pitch in _PITCH and channel in _CHANNELS:
+        value = pitch + 8192
+        return bytes((_PITCHWHEEL[channel], value & 0x7F, value >> 7))
+    raise _out_of_range(pitch=pitch, channel=channel)
+
+
+# mido message type -> encoder taking the mido field names as keywords
+ENCODERS: dict[str, Callable[..., bytes]] = {
+    "note_on": encode_note_on,
+    "note_off": encode_note_off,
+    "control_change": encode_control_change,
+    "program_change": encode_program_change,
+    "pitchwheel": encode_pitchwheel,
+}
+
+
+def raw_sender(port: Any) -> Callable[[bytes], None] | None:
+    """Find a way to write raw bytes to a mido output port.
+
+    Ports whose class defines ``send_bytes(data)`` use that method. Ports
+    from mido's rtmidi backend write straight to the underlying
+    ``rtmidi.MidiOut``, holding the port's lock and refusing closed ports
+    like ``port.send`` does, since sequencer threads and the event loop may
+    write to one port at the same time. Anything else has no raw interface.
+
+    Args:
+        port: Open mido output port
+
+    Returns:
+        Callable writing one encoded message, or None if the port has no
+        raw interface and messages must go through ``port.send``
+    """
+    port_type = type(port)
+    if callable(getattr(port_type, "send_bytes", None)):
+        return port.send_bytes
+    if port_type.__module__ == "mido.backends.rtmidi":
+        midi_out = getattr(port, "_rt", None)
+        if midi_out is not None:
+            return _locked_sender(port, midi_out.send_message)
+    return None
+
+
+def _locked_sender(port: Any, send: Callable[[bytes], None]) -> Callable[[bytes], None]:
+    """Wrap a raw write in the checks and lock of mido's ``BaseOutput.send``."""
+    lock = getattr(port, "_lock", None) or contextlib.nullcontext()
+
+    def send_locked(data: bytes) -> None:
+        if port.closed:
+            raise ValueError("send() called on closed port")
+        with lock:
+            send(data)
+
+    return send_locked
@@ -0,0 +1,339 @@
+"""Streaming Standard MIDI File reader and writer.
+
+``mido.MidiFile`` parses every track into lists of message objects up front.
+``MidiFileReader`` instead maps the file into memory and decodes each track
+lazily, merging the tracks by time, so playing a file needs the same memory
+whatever its size. Channel messages are yielded as raw bytes, ready for a
+port with a raw interface.
+
+``MidiFileWriter`` is the counterpart for recording: events are appended to
+a single track as they come, and the track length is filled in on close.
+"""
+
+import heapq
+import mmap
+import struct
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from fruityloops_mcp.midi_sequencer import SequenceStep
+
+DEFAULT_TEMPO = 500_000  # Microseconds per beat, i.e. 120 BPM
+
+# Status bytes of channel messages that set state rather than play notes
+_STATE_STATUSES = frozenset((0xB0, 0xC0, 0xE0))
+
+
+def _read_varlen(data: Any, pos: int) -> tuple[int, int]:
+    """Read a variable-length quantity.
+
+    Returns:
+        The value and the position after it
+    """
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, pos
+
+
+def _varlen(value: int) -> bytes:
+    """Encode a variable-length quantity."""
+    encoded = bytearray((value & 0x7F,))
+    value >>= 7
+    while value:
+        encoded.append(0x80 | (value & 0x7F))
+        value >>= 7
+    encoded.reverse()
+    return bytes(encoded)
+
+
+def _track_events(data: Any, pos: int, end: int) -> Iterator[tuple[int, int, bytes | None]]:
+    """Decode one track chunk.
+
+    Yields:
+        (absolute tick, tempo or -1, message bytes) tuples; tempo changes
+        carry the new tempo and no message, and the end of the track has
+        neither
+    """
+    tick = 0
+    running = 0
+    while pos < end:
+        delta, pos = _read_varlen(data, pos)
+        tick += delta
+        status = data[pos]
+        if status & 0x80:
+            pos += 1
+        elif running:
+            status = running
+        else:
+            raise ValueError(f"Data byte without running status at offset {pos}")
+
+        if status == 0xFF:
+            meta_type = data[pos]
+            length, pos = _read_varlen(data, pos + 1)
+            if meta_type == 0x51 and length == 3:
+                yield tick, int.from_bytes(data[pos : pos + 3], "big"), None
+            elif meta_type == 0x2F:
+                yield tick, -1, None
+                return
+            pos += length
+            running = 0
+        elif status in (0xF0, 0xF7):
+            length, pos = _read_varlen(data, pos)
+            pos += length
+            running = 0
+        else:
+            size = 1 if status & 0xF0 in (0xC0, 0xD0) else 2
+            yield tick, -1, bytes((status,)) + data[pos : pos + size]
+            pos += size
+            running = status
+    yield tick, -1, None
+
+
+class MidiFileReader:
+    """Reads a Standard MIDI File as a time-ordered stream of messages."""
+
+    def __init__(self, path: str):
+        """Open a file and read its header.
+
+        Args:
+            path: Path of a ``.mid`` file
+
+        Raises:
+            OSError: If the file cannot be opened
+            ValueError: If it is not a supported Standard MIDI File
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            try:
+                self._data: Any = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"{path} is empty") from None
+        try:
+            self._parse_header()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse_header(self) -> None:
+        data = self._data
+        if data[:4] != b"MThd" or len(data) < 14:
+            raise ValueError(f"{self.path} is not a Standard MIDI File")
+        length = struct.unpack_from(">I", data, 4)[0]
+        self.format, track_count, division = struct.unpack_from(">HHh", data, 8)
+        if division <= 0:
+            raise ValueError("SMPTE time division is not supported")
+        self.ticks_per_beat = division
+
+        self._tracks: list[tuple[int, int]] = []
+        pos = 8 + length
+        while pos + 8 <= len(data) and len(self._tracks) < track_count:
+            chunk_type = data[pos : pos + 4]
+            chunk_length = struct.unpack_from(">I", data, pos + 4)[0]
+            if chunk_type == b"MTrk":
+                self._tracks.append((pos + 8, min(pos + 8 + chunk_length, len(data))))
+            pos += 8 + chunk_length
+
+    @property
+    def track_count(self) -> int:
+        """Number of tracks in the file."""
+        return len(self._tracks)
+
+    def messages(self) -> Iterator[tuple[float, bytes | None]]:
+        """Iterate over the messages of all tracks, merged by time.
+
+        Only one pending event per track is held at a time. Tempo changes
+        are applied as they are reached.
+
+        Yields:
+            (seconds from the start, message bytes) tuples, and the end of
+            each track with None in place of a message
+        """
+        tracks = [_track_events(self._data, start, end) for start, end in self._tracks]
+        tempo = DEFAULT_TEMPO
+        base_tick = 0
+        base_seconds = 0.0
+        for tick, new_tempo, message in heapq.merge(*tracks, key=lambda event: event[0]):
+            seconds = base_seconds + (tick - base_tick) * tempo / 1e6 / self.ticks_per_beat
+            if new_tempo >= 0:
+                tempo = new_tempo
+                base_tick = tick
+                base_seconds = seconds
+                continue
+            yield seconds, message
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._data.close()
+
+    def __enter__(self) -> "MidiFileReader":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+
+def file_steps(
+    reader: MidiFileReader,
+    start: float = 0.0,
+    loop: bool = False,
+    tempo_scale: float = 1.0,
+    convert: Callable[[bytes], Any] | None = None,
+) -> Iterator[SequenceStep]:
+    """Turn a MIDI file into sequencer steps, streaming.
+
+    Messages at the same time are grouped into one step. Controller, program
+    and pitch bend messages before ``start`` are sent at once so playback
+    begins with the right sound; notes before it are skipped. The reader is
+    closed when the generator finishes or is closed.
+
+    Args:
+        reader: Open file reader
+        start: Seconds into the file to start from
+        loop: Repeat from ``start`` after the end of the file
+        tempo_scale: Playback speed, 2.0 plays twice as fast
+        convert: Converts message bytes for the output port; bytes are kept
+            if None
+
+    Yields:
+        (offset in seconds, messages) steps
+    """
+    convert = convert or (lambda message: message)
+    offset = 0.0
+    try:
+        while True:
+            step_time = 0.0
+            messages: list[Any] = []
+            end = start
+            chased: list[Any] = []
+            for seconds, message in reader.messages():
+                end = max(end, seconds)
+                if message is None:
+                    continue
+                if seconds < start:
+                    if message[0] & 0xF0 in _STATE_STATUSES:
+                        chased.append(convert(message))
+                    continue
+                if chased:
+                    yield offset, chased
+                    chased = []
+                at = offset + (seconds - start) / tempo_scale
+                if messages and at != step_time:
+                    yield step_time, messages
+                    messages = []
+                step_time = at
+                messages.append(convert(message))
+            if chased:
+                yield offset, chased
+            if messages:
+                yield step_time, messages
+            length = (end - start) / tempo_scale
+            if not loop or length <= 0:
+                return
+            offset += length
+    finally:
+        reader.close()
+
+
+class MidiFileWriter:
+    """Writes a format 0 Standard MIDI File one event at a time.
+
+    Only the current position is kept in memory. The track chunk is written
+    with a zero length, which ``close`` overwrites with the real one, so a
+    file that was never closed has to be repaired before other programs will
+    read all of it.
+    """
+
+    def __init__(self, path: str, ticks_per_beat: int = 480, tempo: int = DEFAULT_TEMPO):
+        """Create the file and write its header and tempo.
+
+        Args:
+            path: Path of the ``.mid`` file, replaced if it exists
+            ticks_per_beat: Time resolution in ticks per quarter note
+            tempo: Tempo in microseconds per beat
+
+        Raises:
+            OSError: If the file cannot be created
+            ValueError: If ``ticks_per_beat`` or ``tempo`` is out of range
+        """
+        if not 0 < ticks_per_beat < 0x8000 or not 0 < tempo < 0x1000000:
+            raise ValueError("ticks_per_beat or tempo out of range")
+        self.path = path
+        self.ticks_per_beat = ticks_per_beat
+        self.tempo = tempo
+        self.events = 0
+        self._tick = 0
+        self._file = open(path, "wb")  # noqa: SIM115 - closed by close()
+        self._file.write(b"MThd" + struct.pack(">IHHH", 6, 0, 1, ticks_per_beat))
+        self._length_pos = self._file.tell() + 4
+        self._file.write(b"MTrk\x00\x00\x00\x00")
+        self._track_start = self._file.tell()
+        self._file.write(b"\x00\xff\x51\x03" + tempo.to_bytes(3, "big"))
+        self.size = self._file.tell()
+
+    @property
+    def closed(self) -> bool:
+        """Check if the file has been closed."""
+        return self._file.closed
+
+    def write(self, tick: int, message: bytes) -> bool:
+        """Append a message.
+
+        Args:
+            tick: Absolute time in ticks; earlier than the previous message
+                is written at the same time as it
+            message: Encoded channel or system exclusive message
+
+        Returns:
+            True if written, False for messages a MIDI file cannot hold,
+            such as system real-time messages
+        """
+        status = message[0]
+        if status == 0xF0:
+            data = b"\xf0" + _varlen(len(message) - 1) + message[1:]
+        elif status < 0xF0:
+            data = message
+        else:
+            return False
+        delta = tick - self._tick
+        if delta > 0:
+            self._tick = tick
+        else:
+            delta = 0
+        data = _varlen(delta) + data
+        self._file.write(data)
+        self.size += len(data)
+        self.events += 1
+        return True
+
+    def flush(self) -> None:
+        """Hand buffered events to the operating system."""
+        self._file.flush()
+
+    def close(self, end_tick: int = 0) -> int:
+        """End the track, fill in its length and close the file.
+
+        Args:
+            end_tick: Absolute time of the end of the track, to keep silence
+                after the last message; the last message's time if earlier
+
+        Returns:
+            Size of the file in bytes
+        """
+        if self._file.closed:
+            return self.size
+        self._file.write(_varlen(max(end_tick - self._tick, 0)) + b"\xff\x2f\x00")
+        self.size = self._file.tell()
+        self._file.seek(self._length_pos)
+        self._file.write(struct.pack(">I", self.size - self._track_start))
+        self._file.close()
+        return self.size
+
+    def __enter__(self) -> "MidiFileWriter":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
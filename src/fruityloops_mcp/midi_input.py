@@ -0,0 +1,372 @@
+"""Background MIDI input listener with a ring buffer and async subscriptions."""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import mido
+
+logger = logging.getLogger(__name__)
+
+# System real-time messages that arrive continuously and carry no content
+DEFAULT_IGNORE_TYPES = ("clock", "active_sensing")
+
+
+@dataclass(frozen=True, slots=True)
+class InputEvent:
+    """A received MIDI message and the wall-clock time it arrived.
+
+    ``clock_ns`` is ``time.perf_counter_ns()`` at arrival, for measuring the
+    time between events with sub-microsecond resolution.
+    """
+
+    message: "mido.Message"
+    timestamp: float
+    clock_ns: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get the message fields and the wall-clock arrival time as a dictionary."""
+        data = self.message.dict()
+        data["time"] = self.timestamp
+        return data
+
+    def __str__(self) -> str:
+        """Format the event as a single line."""
+        fields = " ".join(
+            f"{key}={value}"
+            for key, value in self.message.dict().items()
+            if key not in ("type", "time")
+        )
+        return f"{self.timestamp:.6f} {self.message.type} {fields}".rstrip()
+
+
+def _matches(
+    message: "mido.Message", types: frozenset[str] | None, channels: frozenset[int] | None
+) -> bool:
+    if types is not None and message.type not in types:
+        return False
+    return channels is None or getattr(message, "channel", None) in channels
+
+
+InputSink = Callable[[InputEvent], None]
+
+
+class InputSubscription:
+    """Async iterator over received MIDI events matching a filter.
+
+    Events are delivered on the event loop the subscription was created in.
+    The queue is bounded; when a slow consumer falls behind, the oldest queued
+    events are dropped and counted in ``dropped``.
+    """
+
+    def __init__(
+        self,
+        listener: "InputListener",
+        types: Iterable[str] | None,
+        channels: Iterable[int] | None,
+        maxsize: int,
+    ):
+        """Initialize the subscription; use ``InputListener.subscribe`` instead."""
+        self.types = frozenset(types) if types is not None else None
+        self.channels = frozenset(channels) if channels is not None else None
+        self.dropped = 0
+        self._listener = listener
+        self._queue: asyncio.Queue[InputEvent | None] = asyncio.Queue(maxsize)
+        self._closed = False
+
+    def matches(self, message: "mido.Message") -> bool:
+        """Check whether a message passes the type and channel filters."""
+        return _matches(message, self.types, self.channels)
+
+    def close(self) -> None:
+        """Stop receiving events and end iteration."""
+        if self._closed:
+            return
+        self._closed = True
+        self._listener._unsubscribe(self)
+        self._put(None)
+
+    def _put(self, event: InputEvent | None) -> None:
+        """Queue an event, dropping the oldest one if the queue is full."""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+    def __aiter__(self) -> "InputSubscription":
+        """Iterate over events until the subscription is closed."""
+        return self
+
+    async def __anext__(self) -> InputEvent:
+        """Wait for the next matching event."""
+        if self._closed and self._queue.empty():
+            raise StopAsyncIteration
+        event = await self._queue.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    def __enter__(self) -> "InputSubscription":
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Context manager exit."""
+        self.close()
+
+
+class InputListener:
+    """Reads a MIDI input port in the background.
+
+    Messages are received off the event loop: through the port's callback
+    when the backend supports one (rtmidi does), otherwise by a polling
+    thread. Every message is timestamped and kept in a bounded ring buffer
+    of recent events, and handed to matching subscriptions on their event
+    loop in batches.
+
+    Types listed in ``ignore_types`` (clock and active sensing by default)
+    are only counted, so a flood of them costs no memory and never pushes
+    real events out of the ring buffer. All other buffers are bounded too.
+
+    Sinks added with ``add_sink`` are called with every kept event on the
+    receiving thread itself, before it is handed to the event loop, so they
+    must return quickly.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = 256,
+        ignore_types: Iterable[str] = DEFAULT_IGNORE_TYPES,
+        max_pending: int = 4096,
+        poll_interval: float = 0.001,
+    ):
+        """Initialize the listener.
+
+        Args:
+            buffer_size: Number of recent events kept for ``recent``
+            ignore_types: Message types that are counted but not kept
+            max_pending: Maximum events waiting to be handed to subscriptions
+            poll_interval: Seconds the polling thread sleeps when idle
+        """
+        self.buffer_size = buffer_size
+        self.ignore_types = frozenset(ignore_types)
+        self.poll_interval = poll_interval
+        self.received = 0
+        self.ignored = 0
+        self.dropped = 0
+
+        self._port: Any = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._buffer: deque[InputEvent] = deque(maxlen=buffer_size)
+        self._pending: deque[InputEvent] = deque(maxlen=max_pending)
+        self._wakeup_scheduled = False
+        self._subscriptions: list[InputSubscription] = []
+        # Replaced rather than mutated, so the receiving thread reads it without the lock
+        self._sinks: tuple[InputSink, ...] = ()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the listener is attached to a port."""
+        return self._port is not None
+
+    def start(self, port: Any) -> bool:
+        """Start receiving from an open input port.
+
+        Args:
+            port: Open mido input port
+
+        Returns:
+            True if the port is being listened to, False if it supports
+            neither callbacks nor polling
+        """
+        self.stop()
+        port_type = type(port)
+        if isinstance(getattr(port_type, "callback", None), property):
+            port.callback = self._on_message
+        elif callable(getattr(port_type, "poll", None)):
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._poll, args=(port,), name="midi-input-listener", daemon=True
+            )
+            self._thread.start()
+        else:
+            logger.warning("MIDI input port supports neither callbacks nor polling")
+            return False
+        self._port = port
+        return True
+
+    def stop(self) -> None:
+        """Stop receiving; the ring buffer and subscriptions are kept."""
+        port = self._port
+        if port is None:
+            return
+        self._port = None
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(1.0)
+            self._thread = None
+        else:
+            try:
+                port.callback = None
+            except Exception as e:
+                logger.debug(f"Error removing MIDI input callback: {e}")
+
+    def subscribe(
+        self,
+        types: Iterable[str] | None = None,
+        channels: Iterable[int] | None = None,
+        maxsize: int = 1024,
+    ) -> InputSubscription:
+        """Subscribe to received events on the running event loop.
+
+        Args:
+            types: Message types to receive, all types if None
+            channels: MIDI channels to receive, all channels if None;
+                messages without a channel only match None
+            maxsize: Maximum queued events before the oldest are dropped
+
+        Returns:
+            Subscription to iterate with ``async for``
+
+        Raises:
+            RuntimeError: If called without a running event loop
+        """
+        loop = asyncio.get_running_loop()
+        subscription = InputSubscription(self, types, channels, maxsize)
+        with self._lock:
+            self._loop = loop
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def add_sink(self, sink: "InputSink") -> None:
+        """Call a function with every kept event on the receiving thread.
+
+        Args:
+            sink: Called with each event; exceptions it raises are logged
+        """
+        with self._lock:
+            self._sinks = (*self._sinks, sink)
+
+    def remove_sink(self, sink: "InputSink") -> None:
+        """Stop calling a function added with ``add_sink``."""
+        with self._lock:
+            self._sinks = tuple(s for s in self._sinks if s != sink)
+
+    def recent(
+        self,
+        limit: int | None = None,
+        types: Iterable[str] | None = None,
+        channels: Iterable[int] | None = None,
+        since: float | None = None,
+    ) -> list[InputEvent]:
+        """Get recent events from the ring buffer, oldest first.
+
+        Args:
+            limit: Maximum number of events, the most recent are kept
+            types: Only include these message types
+            channels: Only include these MIDI channels
+            since: Only include events received after this timestamp
+
+        Returns:
+            Matching events
+        """
+        with self._lock:
+            events = list(self._buffer)
+        types = frozenset(types) if types is not None else None
+        channels = frozenset(channels) if channels is not None else None
+        events = [
+            event
+            for event in events
+            if (since is None or event.timestamp > since)
+            and _matches(event.message, types, channels)
+        ]
+        return events[-limit:] if limit else events
+
+    def clear(self) -> None:
+        """Empty the ring buffer."""
+        with self._lock:
+            self._buffer.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Get receive counters."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            buffered = len(self._buffer)
+        return {
+            "received": self.received,
+            "ignored": self.ignored,
+            "dropped": self.dropped + sum(subscription.dropped for subscription in subscriptions),
+            "buffered": buffered,
+            "subscriptions": len(subscriptions),
+            "sinks": len(self._sinks),
+        }
+
+    def _on_message(self, message: "mido.Message") -> None:
+        """Handle a message on the receiving thread."""
+        if message.type in self.ignore_types:
+            self.ignored += 1
+            return
+        event = InputEvent(message, time.time(), time.perf_counter_ns())
+        for sink in self._sinks:
+            try:
+                sink(event)
+            except Exception as e:
+                logger.error(f"Error in MIDI input sink: {e}")
+        with self._lock:
+            self.received += 1
+            self._buffer.append(event)
+            if not self._subscriptions:
+                return
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append(event)
+            if self._wakeup_scheduled:
+                return
+            self._wakeup_scheduled = True
+            loop = self._loop
+        try:
+            loop.call_soon_threadsafe(self._deliver)
+        except RuntimeError:
+            # The subscribers' event loop is closed
+            with self._lock:
+                self._wakeup_scheduled = False
+                self._pending.clear()
+
+    def _deliver(self) -> None:
+        """Hand pending events to subscriptions on the event loop."""
+        with self._lock:
+            events = list(self._pending)
+            self._pending.clear()
+            self._wakeup_scheduled = False
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            for event in events:
+                if subscription.matches(event.message):
+                    subscription._put(event)
+
+    def _unsubscribe(self, subscription: InputSubscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def _poll(self, port: Any) -> None:
+        """Polling loop for ports without callback support."""
+        while not self._stop.is_set():
+            try:
+                message = port.poll()
+            except Exception as e:
+                logger.error(f"Error reading MIDI input: {e}")
+                return
+            if message is None:
+                self._stop.wait(self.poll_interval)
+            else:
+                self._on_message(message)
@@ -1,32 +1,204 @@
 """MIDI interface for FL Studio MCP server using mido library."""
 
+import functools
 import logging
-from typing import Any
+import threading
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any, TypeAlias
 
-import mido
+from fruityloops_mcp.lazy import LazyModule
+from fruityloops_mcp.metrics import ThroughputMeter
+from fruityloops_mcp.midi_encoding import (
+    ENCODERS,
+    encode_control_change,
+    encode_note_off,
+    encode_note_on,
+    encode_pitchwheel,
+    encode_program_change,
+    raw_sender,
+)
+from fruityloops_mcp.midi_file import MidiFileReader, file_steps
+from fruityloops_mcp.midi_input import (
+    DEFAULT_IGNORE_TYPES,
+    InputEvent,
+    InputListener,
+    InputSubscription,
+)
+from fruityloops_mcp.midi_output import BACKPRESSURE_POLICIES, LatencyStats, OutputWriter
+from fruityloops_mcp.midi_ports import PortCatalog, PortChange, PortListener
+from fruityloops_mcp.midi_reconnect import ReconnectPolicy, ReconnectSupervisor
+from fruityloops_mcp.midi_recorder import InputRecorder
+from fruityloops_mcp.midi_scheduler import MIDIScheduler
+from fruityloops_mcp.midi_sequencer import SequencePlayer, SequenceStep, ticks_to_seconds
+
+if TYPE_CHECKING:
+    import mido
+else:
+    # mido and its port backend are loaded when MIDI is first used
+    mido = LazyModule("mido")
 
 logger = logging.getLogger(__name__)
 
+# Batch event type -> (mido message type, {field: (minimum, maximum, default)})
+# A default of None marks the field as required.
+BATCH_EVENT_TYPES: dict[str, tuple[str, dict[str, tuple[int, int, int | None]]]] = {
+    "note_on": ("note_on", {"note": (0, 127, None), "velocity": (0, 127, 64)}),
+    "note_off": ("note_off", {"note": (0, 127, None), "velocity": (0, 127, 64)}),
+    "cc": ("control_change", {"control": (0, 127, None), "value": (0, 127, None)}),
+    "program_change": ("program_change", {"program": (0, 127, None)}),
+    "pitchwheel": ("pitchwheel", {"pitch": (-8192, 8191, None)}),
+}
+
+
+OUTPUT_MODES = ("direct", "threaded")
+
+# Control change sent on each channel a stopped sequence used
+ALL_NOTES_OFF = 123
+
+# A message ready for the output port: pre-encoded bytes for ports with a raw
+# interface, otherwise a mido.Message
+OutputMessage: TypeAlias = "mido.Message | bytes"
+
+
+def _is_port_lost(error: Exception) -> bool:
+    """Check whether a failed send means the MIDI port has gone away."""
+    # mido ports raise ValueError from send() once they are closed
+    if isinstance(error, ValueError) and "closed port" in str(error):
+        return True
+    # python-rtmidi raises RtMidiError subclasses when the device fails
+    if type(error).__module__.partition(".")[0] == "rtmidi":
+        return True
+    # Only some mido releases define PortNotOpenError
+    error_type = getattr(mido.ports, "PortNotOpenError", None)
+    return isinstance(error_type, type) and isinstance(error, error_type)
+
 
 class MIDIInterface:
-    """Interface for MIDI communication using mido library."""
+    """Interface for MIDI communication using mido library.
+
+    In the default ``direct`` output mode messages are written to the port on
+    the calling thread. In ``threaded`` mode they are queued and written by a
+    dedicated writer thread, so a slow MIDI backend never stalls the caller;
+    the ``send_*`` methods then return True once the message is queued.
 
-    def __init__(self, port_name: str = "FLStudio_MIDI"):
+    When the output port has a raw byte interface (see ``raw_sender``),
+    messages are encoded straight to bytes instead of building a
+    ``mido.Message`` per event; other ports fall back to ``mido``.
+
+    While connected, the input port is read in the background by an
+    ``InputListener``: recent events can be queried with
+    ``recent_input_events``, streamed with ``subscribe_input`` and recorded
+    to a Standard MIDI File with ``start_recording``.
+
+    With ``reconnect`` enabled, a lost port is reopened in the background with
+    exponential backoff, and sends made in the meantime are held and replayed
+    or dropped according to the ``ReconnectPolicy``.
+    """
+
+    def __init__(
+        self,
+        port_name: str = "FLStudio_MIDI",
+        output_mode: str = "direct",
+        queue_size: int = 1024,
+        backpressure: str = "block",
+        raw_output: bool = True,
+        input_buffer_size: int = 256,
+        ignore_input_types: Iterable[str] = DEFAULT_IGNORE_TYPES,
+        port_cache_ttl: float = 2.0,
+        port_poll_interval: float | None = None,
+        reconnect: bool = False,
+        reconnect_policy: ReconnectPolicy | None = None,
+        port_catalog: PortCatalog | None = None,
+    ):
         """Initialize MIDI interface.
 
         Args:
             port_name: Name of the MIDI port to connect to
+            output_mode: ``direct`` to write on the calling thread, or
+                ``threaded`` to write from a dedicated writer thread
+            queue_size: Maximum queued messages in ``threaded`` mode
+            backpressure: Policy when the queue is full in ``threaded`` mode:
+                ``block``, ``drop_oldest`` or ``error``
+            raw_output: Write pre-encoded bytes when the port supports it,
+                False to always send ``mido.Message`` objects
+            input_buffer_size: Number of recent input events kept
+            ignore_input_types: Input message types that are counted but not
+                kept, clock and active sensing by default
+            port_cache_ttl: Seconds a port listing is reused before the system
+                is enumerated again
+            port_poll_interval: If set, ports are enumerated every this many
+                seconds in the background once ``connect`` is first called,
+                and added or removed ports are reported to port listeners
+            reconnect: Reopen the port automatically when it is lost
+            reconnect_policy: Backoff and outage handling for ``reconnect``
+            port_catalog: Port listing shared with other interfaces, such as
+                those of a ``MIDIPool``; one of its own if None, using
+                ``port_cache_ttl``
+
+        Raises:
+            ValueError: If output_mode or backpressure is unknown
         """
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode {output_mode!r}, expected one of {OUTPUT_MODES}")
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"Unknown backpressure policy {backpressure!r}, "
+                f"expected one of {BACKPRESSURE_POLICIES}"
+            )
         self.port_name = port_name
+        self.output_mode = output_mode
+        self.queue_size = queue_size
+        self.backpressure = backpressure
+        self.raw_output = raw_output
         self._output_port: mido.ports.BaseOutput | None = None
         self._input_port: mido.ports.BaseInput | None = None
         self._is_connected = False
+        self._scheduler = MIDIScheduler()
+        self._writer: OutputWriter | None = None
+        self._raw_send: Callable[[bytes], None] | None = None
+        self._listener = InputListener(input_buffer_size, ignore_input_types)
+        self._players: dict[int, SequencePlayer] = {}
+        self._recorders: dict[int, InputRecorder] = {}
+        self._sequence_timing = LatencyStats()
+        self._throughput = ThroughputMeter()
+        self.port_poll_interval = port_poll_interval
+        self._owns_ports = port_catalog is None
+        if port_catalog is None:
+            # Look mido up at call time so the enumeration functions can be replaced
+            port_catalog = PortCatalog(
+                lambda: mido.get_input_names(), lambda: mido.get_output_names(), port_cache_ttl
+            )
+        self._ports = port_catalog
+        self._watching_ports = False
+        self._supervisor: ReconnectSupervisor | None = None
+        # Thread replaying held sends after a reconnect, the only one allowed
+        # to send before the interface counts as connected again
+        self._replay_thread: int | None = None
+        if reconnect:
+            self._supervisor = ReconnectSupervisor(
+                self._reopen, reconnect_policy, resume=self._resume
+            )
 
     @property
     def is_connected(self) -> bool:
         """Check if MIDI ports are connected."""
         return self._is_connected
 
+    @property
+    def is_busy(self) -> bool:
+        """Check if sequences, files, recordings or input subscriptions use the port."""
+        return bool(self._players or self._recorders or self._listener.stats()["subscriptions"])
+
+    @property
+    def port_catalog(self) -> PortCatalog:
+        """Port listing used by ``connect`` and ``list_ports``."""
+        return self._ports
+
+    @property
+    def uses_raw_output(self) -> bool:
+        """Check if messages are written to the port as pre-encoded bytes."""
+        return self._raw_send is not None
+
     def connect(self) -> bool:
         """Connect to MIDI ports.
 
@@ -35,38 +207,40 @@ class MIDIInterface:
         """
         if self._is_connected:
             return True
-
-        try:
-            # Check if port exists in available ports
-            output_ports = mido.get_output_names()
-            input_ports = mido.get_input_names()
-
-            if self.port_name not in output_ports:
-                logger.warning(
-                    f"Output port '{self.port_name}' not found. Available: {output_ports}"
-                )
-                return False
-
-            if self.port_name not in input_ports:
-                logger.warning(f"Input port '{self.port_name}' not found. Available: {input_ports}")
-                return False
-
-            # Open ports
-            self._output_port = mido.open_output(self.port_name)
-            self._input_port = mido.open_input(self.port_name)
-            self._is_connected = True
-            logger.info(f"Connected to MIDI port: {self.port_name}")
-            return True
-
-        except Exception as e:
-            logger.error(f"Failed to connect to MIDI port: {e}")
+        if not self._open_ports():
             return False
+        self._is_connected = True
+        logger.info(f"Connected to MIDI port: {self.port_name}")
+        return True
 
     def disconnect(self) -> None:
-        """Disconnect from MIDI ports."""
+        """Disconnect from MIDI ports.
+
+        Ports that were lost are released too, whether or not they were
+        being reconnected.
+        """
+        if self._supervisor is not None and self._supervisor.is_reconnecting:
+            self._supervisor.stop()
+        if self._watching_ports:
+            self._ports.remove_listener(self._on_port_change)
+            self._watching_ports = False
         if not self._is_connected:
+            # Nothing can be sent to a lost port; just let go of everything
+            self.stop_playback()
+            self.stop_recording()
+            self._release_ports()
             return
 
+        # Silence sequences and deliver pending note-offs before the port goes away
+        self.stop_playback()
+        self.stop_recording()
+        self._scheduler.flush()
+        if self._writer is not None:
+            self._writer.stop(drain=True)
+            self._writer = None
+        self._raw_send = None
+        self._listener.stop()
+
         try:
             if self._output_port:
                 self._output_port.close()
@@ -93,21 +267,17 @@ class MIDIInterface:
         Returns:
             True if message sent successfully, False otherwise
         """
-        if not self._is_connected or not self._output_port:
-            logger.warning("Cannot send note_on: MIDI not connected")
-            return False
+        if not (self._is_connected or self._replaying()) or not self._output_port:
+            return self._unavailable("note_on", self.send_note_on, note, velocity, channel)
 
         try:
-            msg = mido.Message("note_on", note=note, velocity=velocity, channel=channel)
-            self._output_port.send(msg)
-            return True
-        except mido.ports.PortNotOpenError:
-            self._is_connected = False
-            logger.error("MIDI port is not open")
-            return False
+            if self._raw_send is not None:
+                return self._write(encode_note_on(note, velocity, channel))
+            return self._write(
+                mido.Message("note_on", note=note, velocity=velocity, channel=channel)
+            )
         except Exception as e:
-            logger.error(f"Error sending note_on: {e}")
-            return False
+            return self._send_failed("note_on", e)
 
     def send_note_off(self, note: int, velocity: int = 64, channel: int = 0) -> bool:
         """Send MIDI note off message.
@@ -120,21 +290,38 @@ class MIDIInterface:
         Returns:
             True if message sent successfully, False otherwise
         """
-        if not self._is_connected or not self._output_port:
-            logger.warning("Cannot send note_off: MIDI not connected")
-            return False
+        if not (self._is_connected or self._replaying()) or not self._output_port:
+            return self._unavailable("note_off", self.send_note_off, note, velocity, channel)
 
         try:
-            msg = mido.Message("note_off", note=note, velocity=velocity, channel=channel)
-            self._output_port.send(msg)
-            return True
-        except mido.ports.PortNotOpenError:
-            self._is_connected = False
-            logger.error("MIDI port is not open")
-            return False
+            if self._raw_send is not None:
+                return self._write(encode_note_off(note, velocity, channel))
+            return self._write(
+                mido.Message("note_off", note=note, velocity=velocity, channel=channel)
+            )
         except Exception as e:
-            logger.error(f"Error sending note_off: {e}")
-            return False
+            return self._send_failed("note_off", e)
+
+    def schedule_note_off(
+        self, note: int, velocity: int = 64, channel: int = 0, delay: float = 0.0
+    ) -> None:
+        """Schedule a MIDI note off message without blocking.
+
+        The note off is sent from the running event loop after ``delay``
+        seconds. Pending note offs are sent immediately on ``disconnect``.
+
+        Args:
+            note: MIDI note number (0-127)
+            velocity: Note velocity (0-127)
+            channel: MIDI channel (0-15)
+            delay: Seconds to wait before sending the note off
+
+        Raises:
+            RuntimeError: If called without a running event loop
+        """
+        self._scheduler.schedule(
+            delay, lambda: self.send_note_off(note, velocity, channel), flush=True
+        )
 
     def send_control_change(self, control: int, value: int, channel: int = 0) -> bool:
         """Send MIDI control change message.
@@ -147,17 +334,19 @@ class MIDIInterface:
         Returns:
             True if message sent successfully, False otherwise
         """
-        if not self._is_connected or not self._output_port:
-            logger.warning("Cannot send control_change: MIDI not connected")
-            return False
+        if not (self._is_connected or self._replaying()) or not self._output_port:
+            return self._unavailable(
+                "control_change", self.send_control_change, control, value, channel
+            )
 
         try:
-            msg = mido.Message("control_change", control=control, value=value, channel=channel)
-            self._output_port.send(msg)
-            return True
+            if self._raw_send is not None:
+                return self._write(encode_control_change(control, value, channel))
+            return self._write(
+                mido.Message("control_change", control=control, value=value, channel=channel)
+            )
         except Exception as e:
-            logger.error(f"Error sending control_change: {e}")
-            return False
+            return self._send_failed("control_change", e)
 
     def send_program_change(self, program: int, channel: int = 0) -> bool:
         """Send MIDI program change message.
@@ -169,17 +358,15 @@ class MIDIInterface:
         Returns:
             True if message sent successfully, False otherwise
         """
-        if not self._is_connected or not self._output_port:
-            logger.warning("Cannot send program_change: MIDI not connected")
-            return False
+        if not (self._is_connected or self._replaying()) or not self._output_port:
+            return self._unavailable("program_change", self.send_program_change, program, channel)
 
         try:
-            msg = mido.Message("program_change", program=program, channel=channel)
-            self._output_port.send(msg)
-            return True
+            if self._raw_send is not None:
+                return self._write(encode_program_change(program, channel))
+            return self._write(mido.Message("program_change", program=program, channel=channel))
         except Exception as e:
-            logger.error(f"Error sending program_change: {e}")
-            return False
+            return self._send_failed("program_change", e)
 
     def send_pitch_bend(self, pitch: int, channel: int = 0) -> bool:
         """Send MIDI pitch bend message.
@@ -191,25 +378,651 @@ class MIDIInterface:
         Returns:
             True if message sent successfully, False otherwise
         """
+        if not (self._is_connected or self._replaying()) or not self._output_port:
+            return self._unavailable("pitch_bend", self.send_pitch_bend, pitch, channel)
+
+        try:
+            if self._raw_send is not None:
+                return self._write(encode_pitchwheel(pitch, channel))
+            return self._write(mido.Message("pitchwheel", pitch=pitch, channel=channel))
+        except Exception as e:
+            return self._send_failed("pitch_bend", e)
+
+    def send_batch(self, events: list[dict[str, Any]]) -> bool:
+        """Send a batch of MIDI events.
+
+        The whole batch is validated before anything is sent. Events without a
+        time offset are written to the output port in one pass; events with a
+        ``time`` offset (in seconds) are scheduled on the running event loop,
+        with events sharing an offset written together.
+
+        Each event is a dictionary with a ``type`` of ``note_on``, ``note_off``,
+        ``cc``, ``program_change`` or ``pitchwheel``, the fields for that type
+        (see ``BATCH_EVENT_TYPES``), and optional ``channel`` and ``time``.
+
+        Args:
+            events: Events to send
+
+        Returns:
+            True if all immediate events were sent and timed events scheduled,
+            False otherwise
+
+        Raises:
+            ValueError: If any event is invalid; nothing is sent in that case
+        """
+        immediate, timed = self._build_batch(events)
+
+        if not (self._is_connected or self._replaying()) or not self._output_port:
+            return self._unavailable("batch", self.send_batch, events)
+
+        for (offset, is_note_off), messages in sorted(timed.items()):
+            self._scheduler.schedule(
+                offset, lambda messages=messages: self._write_batch(messages), flush=is_note_off
+            )
+        return self._write_batch(immediate) if immediate else True
+
+    def play_sequence(
+        self,
+        events: list[dict[str, Any]],
+        tempo: float = 120.0,
+        ppq: int = 480,
+        spin: float = 0.0005,
+    ) -> SequencePlayer | None:
+        """Play a timed phrase from a dedicated sequencer thread.
+
+        Events are the same as for ``send_batch``, except that an event may
+        give its offset as ``tick`` instead of ``time``; ticks are converted
+        to seconds at ``tempo`` and ``ppq``. Timing is kept by the sequencer
+        rather than the caller, so request latency does not affect it.
+        Stopping the sequence sends All Notes Off on every channel it uses.
+
+        Args:
+            events: Events to play
+            tempo: Tempo in beats per minute for ``tick`` offsets
+            ppq: Ticks per quarter note beat
+            spin: Seconds busy-waited before each event for accuracy
+
+        Returns:
+            The started player, or None if not connected
+
+        Raises:
+            ValueError: If any event, the tempo or ppq is invalid; nothing is
+                played in that case
+        """
+        if tempo <= 0 or ppq <= 0:
+            raise ValueError("tempo and ppq must be positive")
+        timed_events = []
+        for index, event in enumerate(events):
+            tick = event.get("tick")
+            if tick is not None:
+                if isinstance(tick, bool) or not isinstance(tick, int | float) or tick < 0:
+                    raise ValueError(f"Event {index}: tick must be a non-negative number")
+                event = {**event, "time": ticks_to_seconds(tick, tempo, ppq)}
+            timed_events.append(event)
+        immediate, timed = self._build_batch(timed_events)
+
+        if not self._is_connected or not self._output_port:
+            logger.warning("Cannot play MIDI sequence: MIDI not connected")
+            return None
+
+        # Note offs go first where they share an offset with note ons, so
+        # a repeated note is released before it is struck again
+        steps: list[SequenceStep] = [(0.0, immediate)] if immediate else []
+        for (offset, _), messages in sorted(
+            timed.items(), key=lambda item: (item[0][0], not item[0][1])
+        ):
+            steps.append((offset, messages))
+        channels = sorted({event.get("channel", 0) for event in timed_events})
+        return self._play(steps, channels, spin)
+
+    def play_file(
+        self,
+        path: str,
+        start: float = 0.0,
+        loop: bool = False,
+        tempo_scale: float = 1.0,
+        spin: float = 0.0005,
+    ) -> SequencePlayer | None:
+        """Play a Standard MIDI File from a dedicated sequencer thread.
+
+        The file is streamed: tracks are decoded and merged as playback
+        reaches them, so memory use does not grow with the file size.
+        Stopping or pausing sends All Notes Off on every channel.
+
+        Args:
+            path: Path of a ``.mid`` file
+            start: Seconds into the file to start from
+            loop: Repeat from ``start`` after the end of the file
+            tempo_scale: Playback speed, 2.0 plays twice as fast
+            spin: Seconds busy-waited before each event for accuracy
+
+        Returns:
+            The started player, or None if not connected
+
+        Raises:
+            OSError: If the file cannot be opened
+            ValueError: If it is not a supported MIDI file, or ``start`` or
+                ``tempo_scale`` is invalid
+        """
+        if start < 0 or tempo_scale <= 0:
+            raise ValueError("start must be non-negative and tempo_scale positive")
         if not self._is_connected or not self._output_port:
-            logger.warning("Cannot send pitch_bend: MIDI not connected")
-            return False
+            logger.warning("Cannot play MIDI file: MIDI not connected")
+            return None
+
+        reader = MidiFileReader(path)
+        convert = None if self._raw_send is not None else mido.Message.from_bytes
+        steps = file_steps(reader, start, loop, tempo_scale, convert)
+        return self._play(steps, list(range(16)), spin)
+
+    def stop_playback(self, playback_id: int | None = None) -> list[int]:
+        """Stop sequences and files started by this interface.
+
+        Args:
+            playback_id: ID of the playback to stop, or None for all of them
+
+        Returns:
+            IDs of the playbacks that were stopped
+        """
+        players = self._select_players(playback_id)
+        for player in players:
+            player.stop()
+        for player in players:
+            player.join(1.0)
+        return [player.id for player in players]
+
+    def pause_playback(self, playback_id: int | None = None) -> list[int]:
+        """Pause sequences and files started by this interface.
+
+        Args:
+            playback_id: ID of the playback to pause, or None for all of them
+
+        Returns:
+            IDs of the playbacks that were paused
+        """
+        players = self._select_players(playback_id)
+        for player in players:
+            player.pause()
+        return [player.id for player in players]
+
+    def resume_playback(self, playback_id: int | None = None) -> list[int]:
+        """Resume paused sequences and files.
+
+        Args:
+            playback_id: ID of the playback to resume, or None for all of them
+
+        Returns:
+            IDs of the playbacks that were resumed
+        """
+        players = self._select_players(playback_id)
+        for player in players:
+            player.resume()
+        return [player.id for player in players]
+
+    def _select_players(self, playback_id: int | None) -> list[SequencePlayer]:
+        return [
+            player
+            for player in list(self._players.values())
+            if playback_id is None or player.id == playback_id
+        ]
+
+    def playback(self, playback_id: int) -> SequencePlayer | None:
+        """Get a sequence that is still playing.
+
+        Args:
+            playback_id: Sequence ID
+
+        Returns:
+            Its player, or None if it has ended or does not exist
+        """
+        return self._players.get(playback_id)
+
+    def sequencer_stats(self) -> dict[str, Any]:
+        """Get sequencer timing statistics.
+
+        Returns:
+            IDs of the sequences playing, and how late their events were
+            written in microseconds over all sequences
+        """
+        return {
+            "playing": sorted(self._players),
+            "timing": self._sequence_timing.summary(),
+        }
+
+    def _play(self, steps: list[SequenceStep], channels: list[int], spin: float) -> SequencePlayer:
+        """Start a player writing through this interface."""
+        if self._raw_send is not None:
+            encode = ENCODERS["control_change"]
+            all_notes_off = [encode(channel=c, control=ALL_NOTES_OFF, value=0) for c in channels]
+        else:
+            all_notes_off = [
+                mido.Message("control_change", channel=c, control=ALL_NOTES_OFF, value=0)
+                for c in channels
+            ]
+        player = SequencePlayer(
+            steps,
+            self._write_batch,
+            release=lambda: self._write_batch(all_notes_off),
+            spin=spin,
+            stats=self._sequence_timing,
+            on_done=lambda p: self._players.pop(p.id, None),
+        )
+        self._players[player.id] = player
+        return player.start()
+
+    def _build_batch(
+        self, events: list[dict[str, Any]]
+    ) -> tuple[list[OutputMessage], dict[tuple[float, bool], list[OutputMessage]]]:
+        """Validate batch events and convert them to messages for the port.
+
+        Messages are pre-encoded bytes when the port has a raw interface and
+        ``mido.Message`` objects otherwise.
+
+        Returns:
+            Immediate messages, and timed messages grouped by
+            (offset, is_note_off)
+
+        Raises:
+            ValueError: If any event is invalid
+        """
+        immediate: list[OutputMessage] = []
+        timed: dict[tuple[float, bool], list[OutputMessage]] = {}
+        raw = self._raw_send is not None
+
+        for index, event in enumerate(events):
+            event_type = event.get("type")
+            if event_type not in BATCH_EVENT_TYPES:
+                raise ValueError(f"Event {index}: unknown type {event_type!r}")
+            msg_type, fields = BATCH_EVENT_TYPES[event_type]
+
+            values = {}
+            for field_name, (minimum, maximum, default) in fields.items():
+                value = event.get(field_name, default)
+                if value is None:
+                    raise ValueError(f"Event {index}: missing {field_name!r}")
+                if (
+                    isinstance(value, bool)
+                    or not isinstance(value, int)
+                    or not minimum <= value <= maximum
+                ):
+                    raise ValueError(
+                        f"Event {index}: {field_name} must be an integer "
+                        f"in {minimum}..{maximum}, got {value!r}"
+                    )
+                values[field_name] = value
+
+            channel = event.get("channel", 0)
+            if not isinstance(channel, int) or not 0 <= channel <= 15:
+                raise ValueError(f"Event {index}: channel must be an integer in 0..15")
+
+            offset = event.get("time", 0)
+            if not isinstance(offset, int | float) or offset < 0:
+                raise ValueError(f"Event {index}: time must be a non-negative number")
+
+            if raw:
+                msg = ENCODERS[msg_type](channel=channel, **values)
+            else:
+                msg = mido.Message(msg_type, channel=channel, **values)
+            if offset:
+                timed.setdefault((float(offset), msg_type == "note_off"), []).append(msg)
+            else:
+                immediate.append(msg)
+
+        return immediate, timed
+
+    def _write_batch(self, messages: list[OutputMessage]) -> bool:
+        """Write messages to the output port in a single loop.
+
+        Returns:
+            True if every message was sent, False otherwise
+        """
+        port = self._output_port
+        if not (self._is_connected or self._replaying()) or not port:
+            return self._unavailable("batch", self._write_batch, messages)
 
         try:
-            msg = mido.Message("pitchwheel", pitch=pitch, channel=channel)
+            if self._writer is not None:
+                put = self._writer.put
+                written = True
+                for msg in messages:
+                    written = put(msg) and written
+            else:
+                send = self._raw_send or port.send
+                for msg in messages:
+                    send(msg)
+                written = True
+        except Exception as e:
+            return self._send_failed("batch", e)
+        self._throughput.record(len(messages), sum(map(len, messages)))
+        return written
+
+    def _write(self, msg: OutputMessage) -> bool:
+        """Write one message to the port or hand it to the writer thread."""
+        if self._writer is not None:
+            written = self._writer.put(msg)
+        elif self._raw_send is not None:
+            self._raw_send(msg)
+            written = True
+        else:
             self._output_port.send(msg)
+            written = True
+        self._throughput.record(1, len(msg))
+        return written
+
+    def _send_failed(self, label: str, error: Exception) -> bool:
+        """Log a failed send and track a closed port.
+
+        Returns:
+            Always False, for use as the send method's return value
+        """
+        if _is_port_lost(error):
+            self._port_lost()
+        else:
+            logger.error(f"Error sending {label}: {error}")
+        return False
+
+    def _on_writer_error(self, error: Exception) -> None:
+        """Handle a failed write reported by the writer thread."""
+        if _is_port_lost(error):
+            self._port_lost()
+
+    def _unavailable(self, label: str, send: Callable[..., bool], *args: Any) -> bool:
+        """Handle a send made while not connected.
+
+        During a reconnect the send is held for replay if the policy allows
+        it; otherwise it fails.
+
+        Returns:
+            True if the send is held, False otherwise
+        """
+        supervisor = self._supervisor
+        if supervisor is not None and supervisor.is_reconnecting:
+            if supervisor.hold(functools.partial(send, *args)):
+                return True
+            if self._is_connected:
+                # The held sends were replayed since the check above
+                return send(*args)
+            return False
+        logger.warning(f"Cannot send {label}: MIDI not connected")
+        return False
+
+    def _port_lost(self) -> None:
+        """Mark the port closed and reconnect, or release it if reconnect is off."""
+        self._is_connected = False
+        logger.error("MIDI port is not open")
+        if self._supervisor is not None:
+            self._supervisor.start()
+        else:
+            self._release_ports()
+
+    def _open_ports(self) -> bool:
+        """Open the ports and start the threads serving them.
+
+        Returns:
+            True if the ports were opened, False otherwise
+        """
+        if self.port_poll_interval is not None:
+            self._ports.start_polling(self.port_poll_interval)
+        if self._supervisor is not None and not self._watching_ports:
+            self._ports.add_listener(self._on_port_change)
+            self._watching_ports = True
+
+        try:
+            # Check if port exists in available ports
+            ports = self._ports.get(require=self.port_name)
+            output_ports = ports["output"]
+            input_ports = ports["input"]
+
+            if self.port_name not in output_ports:
+                logger.warning(
+                    f"Output port '{self.port_name}' not found. Available: {output_ports}"
+                )
+                return False
+
+            if self.port_name not in input_ports:
+                logger.warning(f"Input port '{self.port_name}' not found. Available: {input_ports}")
+                return False
+
+            # Open ports
+            self._output_port = mido.open_output(self.port_name)
+            self._input_port = mido.open_input(self.port_name)
+            self._listener.start(self._input_port)
+            if self.raw_output:
+                self._raw_send = raw_sender(self._output_port)
+            if self.output_mode == "threaded":
+                self._writer = OutputWriter(
+                    self._raw_send or self._output_port.send,
+                    maxsize=self.queue_size,
+                    backpressure=self.backpressure,
+                    on_error=self._on_writer_error,
+                )
+                self._writer.start()
             return True
+
         except Exception as e:
-            logger.error(f"Error sending pitch_bend: {e}")
+            logger.error(f"Failed to connect to MIDI port: {e}")
+            return False
+
+    def _reopen(self) -> bool:
+        """Reopen the ports after they were lost; run by the supervisor.
+
+        The interface stays disconnected, so new sends keep being held, until
+        the supervisor has replayed the held ones and calls ``_resume``.
+        """
+        if self._is_connected:
+            return True
+        self._release_ports()
+        if not self._open_ports():
             return False
+        self._replay_thread = threading.get_ident()
+        return True
+
+    def _resume(self) -> None:
+        """Count as connected again once held sends are replayed."""
+        self._replay_thread = None
+        self._is_connected = True
+
+    def _replaying(self) -> bool:
+        """Check if the calling thread is replaying held sends."""
+        return self._replay_thread == threading.get_ident()
+
+    def _release_ports(self) -> None:
+        """Close lost ports without draining or raising."""
+        if self._writer is not None:
+            self._writer.stop(drain=False)
+            self._writer = None
+        self._raw_send = None
+        self._replay_thread = None
+        self._listener.stop()
+        for port in (self._output_port, self._input_port):
+            if port is not None:
+                try:
+                    port.close()
+                except Exception as e:
+                    logger.debug(f"Error closing lost MIDI port: {e}")
+        self._output_port = None
+        self._input_port = None
+
+    def _on_port_change(self, change: PortChange) -> None:
+        """Treat the port disappearing as lost, and retry when it reappears."""
+        if change.name != self.port_name or self._supervisor is None:
+            return
+        if change.kind == "removed" and self._is_connected:
+            self._port_lost()
+        elif change.kind == "added":
+            self._supervisor.wake()
+
+    def reconnect_stats(self) -> dict[str, Any] | None:
+        """Get automatic reconnect metrics.
+
+        Returns:
+            Outage count and durations, reconnect attempts, and held, dropped
+            and replayed sends, or None if ``reconnect`` is disabled
+        """
+        return self._supervisor.stats() if self._supervisor is not None else None
+
+    def throughput_stats(self) -> dict[str, float]:
+        """Get output throughput.
+
+        Messages are counted when they are written to the port, or queued
+        for the writer thread in ``threaded`` mode.
+
+        Returns:
+            Total messages and bytes, and messages and bytes per second over
+            the last few seconds
+        """
+        return self._throughput.summary()
+
+    def output_stats(self) -> dict[str, Any] | None:
+        """Get output queue statistics.
+
+        Returns:
+            Queue counters and enqueue-to-wire latency in microseconds, or
+            None when not connected in ``threaded`` mode
+        """
+        return self._writer.stats() if self._writer is not None else None
+
+    def subscribe_input(
+        self,
+        types: Iterable[str] | None = None,
+        channels: Iterable[int] | None = None,
+        maxsize: int = 1024,
+    ) -> InputSubscription:
+        """Stream received MIDI events.
+
+        The subscription stays open across disconnects and reconnects until
+        it is closed. Use it with ``async for``.
+
+        Args:
+            types: Message types to receive, all types if None
+            channels: MIDI channels to receive, all channels if None
+            maxsize: Maximum queued events before the oldest are dropped
+
+        Returns:
+            Async iterator of ``InputEvent``
+
+        Raises:
+            RuntimeError: If called without a running event loop
+        """
+        return self._listener.subscribe(types, channels, maxsize)
+
+    def recent_input_events(
+        self,
+        limit: int | None = None,
+        types: Iterable[str] | None = None,
+        channels: Iterable[int] | None = None,
+        since: float | None = None,
+    ) -> list[InputEvent]:
+        """Get recently received MIDI events, oldest first.
+
+        Args:
+            limit: Maximum number of events, the most recent are kept
+            types: Only include these message types
+            channels: Only include these MIDI channels
+            since: Only include events received after this timestamp
 
-    def list_ports(self) -> dict[str, list[str]]:
+        Returns:
+            Matching events from the input ring buffer
+        """
+        return self._listener.recent(limit, types, channels, since)
+
+    def input_stats(self) -> dict[str, int]:
+        """Get MIDI input counters.
+
+        Returns:
+            Received, ignored and dropped message counts, buffered events and
+            open subscriptions
+        """
+        return self._listener.stats()
+
+    def start_recording(
+        self, path: str, tempo: float = 120.0, ticks_per_beat: int = 480
+    ) -> InputRecorder | None:
+        """Record received MIDI input to a Standard MIDI File.
+
+        Events are written to the file as they arrive, in batches from a
+        writer thread, so a recording of any length takes the same memory
+        and never runs on the event loop. Recording continues across
+        automatic reconnects and ends on ``disconnect``.
+
+        Args:
+            path: Path of the ``.mid`` file, replaced if it exists
+            tempo: Tempo in BPM used to convert arrival times to ticks
+            ticks_per_beat: Time resolution in ticks per quarter note
+
+        Returns:
+            The started recorder, or None if not connected
+
+        Raises:
+            OSError: If the file cannot be created
+            ValueError: If ``tempo`` or ``ticks_per_beat`` is out of range
+        """
+        if not self._is_connected or not self._input_port:
+            logger.warning("Cannot record MIDI input: MIDI not connected")
+            return None
+        recorder = InputRecorder(path, tempo, ticks_per_beat, on_done=self._recording_done)
+        recorder.start()
+        self._recorders[recorder.id] = recorder
+        self._listener.add_sink(recorder.record)
+        return recorder
+
+    def stop_recording(self, recording_id: int | None = None) -> list[dict[str, Any]]:
+        """Stop recordings and finish their files.
+
+        Args:
+            recording_id: ID of the recording to stop, or None for all of them
+
+        Returns:
+            Summaries of the recordings that were stopped
+        """
+        recorders = [
+            recorder
+            for recorder in list(self._recorders.values())
+            if recording_id is None or recorder.id == recording_id
+        ]
+        return [recorder.stop() for recorder in recorders]
+
+    def _recording_done(self, recorder: InputRecorder) -> None:
+        self._listener.remove_sink(recorder.record)
+        self._recorders.pop(recorder.id, None)
+
+    def list_ports(self, refresh: bool = False) -> dict[str, list[str]]:
         """List available MIDI ports.
 
+        The listing is cached for ``port_cache_ttl`` seconds.
+
+        Args:
+            refresh: True to enumerate ports even if the cached listing is fresh
+
         Returns:
             Dictionary with 'input' and 'output' keys containing lists of port names
         """
-        return {"input": mido.get_input_names(), "output": mido.get_output_names()}
+        return self._ports.get(refresh=refresh)
+
+    def add_port_listener(self, listener: PortListener) -> None:
+        """Get notified when MIDI ports appear or disappear.
+
+        Changes are detected whenever ports are enumerated, including by the
+        background poller enabled with ``port_poll_interval``. The listener is
+        called with a ``PortChange`` on the enumerating thread.
+        """
+        self._ports.add_listener(listener)
+
+    def remove_port_listener(self, listener: PortListener) -> None:
+        """Stop notifying a listener added with ``add_port_listener``."""
+        self._ports.remove_listener(listener)
+
+    def port_stats(self) -> dict[str, Any]:
+        """Get port catalog counters.
+
+        Returns:
+            Cache hits, enumerations, and whether background polling is on
+        """
+        return {
+            "hits": self._ports.hits,
+            "refreshes": self._ports.refreshes,
+            "polling": self._ports.is_polling,
+        }
 
     def __enter__(self) -> "MIDIInterface":
         """Context manager entry."""
@@ -219,3 +1032,5 @@ class MIDIInterface:
     def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         """Context manager exit."""
         self.disconnect()
+        if self._owns_ports:
+            self._ports.stop_polling()
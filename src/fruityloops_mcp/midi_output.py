@@ -0,0 +1,255 @@
+"""Queued MIDI output drained by a dedicated writer thread."""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+BACKPRESSURE_POLICIES = ("block", "drop_oldest", "error")
+
+
+class OutputQueueFullError(Exception):
+    """Raised when the output queue is full and the policy is ``error``."""
+
+
+class LatencyStats:
+    """Running enqueue-to-wire latency statistics.
+
+    Keeps totals for the whole lifetime plus a bounded window of recent
+    samples used for percentiles.
+    """
+
+    def __init__(self, window: int = 4096):
+        """Initialize empty statistics.
+
+        Args:
+            window: Number of recent samples kept for percentiles
+        """
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self._recent: deque[int] = deque(maxlen=window)
+
+    def record(self, latency_ns: int) -> None:
+        """Record one latency sample in nanoseconds."""
+        self.count += 1
+        self.total_ns += latency_ns
+        if latency_ns > self.max_ns:
+            self.max_ns = latency_ns
+        self._recent.append(latency_ns)
+
+    def percentile(self, pct: float) -> int:
+        """Get a percentile of the recent samples in nanoseconds.
+
+        Args:
+            pct: Percentile between 0 and 100
+
+        Returns:
+            Latency at that percentile, or 0 if there are no samples
+        """
+        samples = sorted(self._recent)
+        if not samples:
+            return 0
+        index = min(len(samples) - 1, int(len(samples) * pct / 100))
+        return samples[index]
+
+    def summary(self) -> dict[str, float]:
+        """Summarize the statistics in microseconds."""
+        return {
+            "count": self.count,
+            "mean_us": self.total_ns / self.count / 1000 if self.count else 0.0,
+            "p50_us": self.percentile(50) / 1000,
+            "p99_us": self.percentile(99) / 1000,
+            "max_us": self.max_ns / 1000,
+        }
+
+
+class OutputWriter:
+    """Bounded output queue drained by a background writer thread.
+
+    Producers append to a ``collections.deque``, whose append and popleft are
+    atomic, so enqueueing never takes a lock. Events are only used to wake the
+    writer when work arrives and to wake blocked producers when space frees up.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Any], None],
+        maxsize: int = 1024,
+        backpressure: str = "block",
+        block_timeout: float = 1.0,
+        on_error: Callable[[Exception], None] | None = None,
+        name: str = "midi-output-writer",
+    ):
+        """Initialize the writer.
+
+        Args:
+            send: Callable that writes one message to the port
+            maxsize: Maximum number of queued messages
+            backpressure: What to do when the queue is full: ``block`` waits up
+                to ``block_timeout`` for space, except on a thread running an
+                event loop, where it rejects the message at once;
+                ``drop_oldest`` discards the oldest queued message; ``error``
+                raises ``OutputQueueFullError``
+            block_timeout: Seconds to wait for space with the ``block`` policy
+            on_error: Called from the writer thread when ``send`` raises
+            name: Writer thread name
+
+        Raises:
+            ValueError: If maxsize or backpressure is invalid
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"Unknown backpressure policy {backpressure!r}, "
+                f"expected one of {BACKPRESSURE_POLICIES}"
+            )
+        self._send = send
+        self.maxsize = maxsize
+        self.backpressure = backpressure
+        self.block_timeout = block_timeout
+        self._on_error = on_error
+        self._name = name
+
+        self._queue: deque[tuple[Any, int]] = deque()
+        self._ready = threading.Event()
+        self._space = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+        self.latency = LatencyStats()
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of queued messages not yet written."""
+        return len(self._queue)
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the writer thread is accepting messages."""
+        return self._running
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self, drain: bool = True, timeout: float = 2.0) -> None:
+        """Stop the writer thread.
+
+        Args:
+            drain: True to write queued messages before stopping,
+                False to discard them
+            timeout: Seconds to wait for the thread to finish
+        """
+        if not self._running:
+            return
+        self._running = False
+        if not drain:
+            self.dropped += len(self._queue)
+            self._queue.clear()
+        self._ready.set()
+        self._space.set()
+        # The writer thread stops itself when a failed write closes the port
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def put(self, message: Any) -> bool:
+        """Queue a message for the writer thread.
+
+        Args:
+            message: Message passed to ``send``
+
+        Returns:
+            True if the message was queued, False if it was rejected
+
+        Raises:
+            OutputQueueFullError: If the queue is full and the policy is ``error``
+        """
+        if not self._running:
+            return False
+
+        queue = self._queue
+        if len(queue) >= self.maxsize:
+            if self.backpressure == "error":
+                self.dropped += 1
+                raise OutputQueueFullError(f"MIDI output queue full ({self.maxsize} messages)")
+            if self.backpressure == "drop_oldest":
+                try:
+                    queue.popleft()
+                    self.dropped += 1
+                except IndexError:
+                    pass  # The writer emptied the queue in the meantime
+            elif not self._wait_for_space():
+                self.dropped += 1
+                return False
+
+        queue.append((message, time.perf_counter_ns()))
+        self._ready.set()
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        """Get queue counters and enqueue-to-wire latency statistics."""
+        return {
+            "pending": self.pending,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "latency": self.latency.summary(),
+        }
+
+    def _wait_for_space(self) -> bool:
+        # Waiting on the event loop would stall every other tool call
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            return False
+        deadline = time.monotonic() + self.block_timeout
+        while len(self._queue) >= self.maxsize:
+            self._space.clear()
+            if len(self._queue) < self.maxsize:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._running:
+                return False
+            self._space.wait(remaining)
+        return True
+
+    def _run(self) -> None:
+        queue = self._queue
+        while True:
+            self._ready.wait()
+            self._ready.clear()
+            while queue:
+                try:
+                    message, enqueued_ns = queue.popleft()
+                except IndexError:
+                    break
+                self._space.set()
+                try:
+                    self._send(message)
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"Error writing MIDI message: {e}")
+                    if self._on_error is not None:
+                        self._on_error(e)
+                else:
+                    self.sent += 1
+                    self.latency.record(time.perf_counter_ns() - enqueued_ns)
+            if not self._running and not queue:
+                return
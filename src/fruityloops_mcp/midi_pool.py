@@ -0,0 +1,156 @@
+"""Pool of MIDI interfaces keyed by port name."""
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+
+from fruityloops_mcp.midi_interface import MIDIInterface
+
+logger = logging.getLogger(__name__)
+
+
+class MIDIPool:
+    """Open MIDI ports by name, on demand.
+
+    The default interface is always available and is connected and
+    disconnected explicitly. Other ports are created and connected the first
+    time they are used, and the least recently used idle one is disconnected
+    when more than ``max_ports`` of them are open. Ports that are playing,
+    recording or streaming input are never evicted, so the pool can exceed
+    ``max_ports`` while they are busy. Evicted ports are disconnected on a
+    background thread, since disconnecting joins the port's writer thread
+    and ``get`` is called from the event loop.
+
+    The factory should give every interface the default interface's
+    ``port_catalog`` so that ports are enumerated, and polled, once.
+    """
+
+    def __init__(
+        self,
+        default: MIDIInterface,
+        factory: Callable[[str], MIDIInterface],
+        max_ports: int = 8,
+    ):
+        """Initialize the pool.
+
+        Args:
+            default: Interface used when no port name is given
+            factory: Creates an interface for a port name
+            max_ports: Maximum open ports besides the default one
+
+        Raises:
+            ValueError: If max_ports is less than 1
+        """
+        if max_ports < 1:
+            raise ValueError("max_ports must be at least 1")
+        self.default = default
+        self.max_ports = max_ports
+        self._factory = factory
+        self._ports: OrderedDict[str, MIDIInterface] = OrderedDict()
+        self._closing: list[threading.Thread] = []
+        self.opened = 0
+        self.evicted = 0
+
+    def get(self, port: str | None = None, connect: bool = True) -> MIDIInterface:
+        """Get the interface for a port.
+
+        Args:
+            port: Port name, None for the default port
+            connect: Connect a pooled port that is not connected yet; the
+                default port is never connected implicitly
+
+        Returns:
+            Interface for the port
+        """
+        if port is None or port == self.default.port_name:
+            return self.default
+
+        midi = self._ports.get(port)
+        if midi is None:
+            midi = self._factory(port)
+            self._ports[port] = midi
+            self.opened += 1
+            self._evict()
+        else:
+            self._ports.move_to_end(port)
+
+        if connect and not midi.is_connected:
+            midi.connect()
+        return midi
+
+    def release(self, port: str | None = None) -> None:
+        """Disconnect a port and, unless it is the default, drop it from the pool.
+
+        Args:
+            port: Port name, None for the default port
+        """
+        if port is None or port == self.default.port_name:
+            self.default.disconnect()
+            return
+        midi = self._ports.pop(port, None)
+        if midi is not None:
+            midi.disconnect()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Disconnect every pooled port; the default port is left alone.
+
+        Args:
+            timeout: Seconds to wait for each evicted port still disconnecting
+        """
+        while self._ports:
+            _, midi = self._ports.popitem(last=False)
+            midi.disconnect()
+        for thread in self._closing:
+            thread.join(timeout)
+        self._closing.clear()
+
+    def stats(self) -> dict[str, object]:
+        """Get pool counters.
+
+        Returns:
+            Pooled port names from least to most recently used, and how many
+            ports were opened and evicted
+        """
+        return {
+            "default": self.default.port_name,
+            "ports": list(self._ports),
+            "opened": self.opened,
+            "evicted": self.evicted,
+        }
+
+    def __contains__(self, port: str) -> bool:
+        """Check if a port is pooled."""
+        return port in self._ports
+
+    def __iter__(self) -> Iterator[MIDIInterface]:
+        """Iterate over the default and pooled interfaces."""
+        yield self.default
+        yield from self._ports.values()
+
+    def __len__(self) -> int:
+        """Number of pooled ports, not counting the default."""
+        return len(self._ports)
+
+    def _evict(self) -> None:
+        excess = len(self._ports) - self.max_ports
+        if excess <= 0:
+            return
+        # The most recently used port was just asked for
+        candidates = list(self._ports.items())[:-1]
+        idle = [name for name, midi in candidates if not midi.is_busy][:excess]
+        self._closing = [thread for thread in self._closing if thread.is_alive()]
+        for name in idle:
+            midi = self._ports.pop(name)
+            self.evicted += 1
+            logger.info(f"Closing least recently used MIDI port: {name}")
+            thread = threading.Thread(
+                target=midi.disconnect, name=f"midi-pool-close-{name}", daemon=True
+            )
+            thread.start()
+            self._closing.append(thread)
+        if len(self._ports) > self.max_ports:
+            logger.warning(
+                f"{len(self._ports)} MIDI ports open, more than {self.max_ports}: "
+                "the others are busy"
+            )
@@ -0,0 +1,177 @@
+"""Cached MIDI port enumeration with change detection."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class PortChange:
+    """A MIDI port that appeared or disappeared."""
+
+    kind: str  # "added" or "removed"
+    direction: str  # "input" or "output"
+    name: str
+
+
+PortListener = Callable[[PortChange], None]
+
+
+class PortCatalog:
+    """Cache of available MIDI port names.
+
+    Enumerating ports can take tens of milliseconds on some backends, so the
+    listing is cached for ``ttl`` seconds. With ``start_polling`` a
+    background thread keeps the cache current and reports ports that appear
+    or disappear to registered listeners.
+    """
+
+    def __init__(
+        self,
+        get_input_names: Callable[[], list[str]],
+        get_output_names: Callable[[], list[str]],
+        ttl: float = 2.0,
+    ):
+        """Initialize an empty catalog.
+
+        Args:
+            get_input_names: Enumerates input port names
+            get_output_names: Enumerates output port names
+            ttl: Seconds a listing is reused before enumerating again
+        """
+        self._get_input_names = get_input_names
+        self._get_output_names = get_output_names
+        self.ttl = ttl
+        self.hits = 0
+        self.refreshes = 0
+
+        self._lock = threading.Lock()
+        self._inputs: list[str] = []
+        self._outputs: list[str] = []
+        self._loaded_at: float | None = None
+        self._listed = False
+        self._listeners: list[PortListener] = []
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @property
+    def is_polling(self) -> bool:
+        """Check if the background poller is running."""
+        return self._thread is not None
+
+    def get(self, refresh: bool = False, require: str | None = None) -> dict[str, list[str]]:
+        """Get the available port names.
+
+        Args:
+            refresh: True to enumerate even if the cached listing is fresh
+            require: Port name the caller is looking for; if a cached listing
+                lacks it as an input or output, ports are enumerated again in
+                case it appeared since
+
+        Returns:
+            Dictionary with 'input' and 'output' keys containing lists of port names
+        """
+        changes: list[PortChange] = []
+        with self._lock:
+            if refresh or self._expired() or self._missing(require):
+                changes = self._refresh_locked()
+            else:
+                self.hits += 1
+            ports = {"input": list(self._inputs), "output": list(self._outputs)}
+        self._notify(changes)
+        return ports
+
+    def refresh(self) -> list[PortChange]:
+        """Enumerate ports now and report what changed.
+
+        Returns:
+            Ports added or removed since the previous listing; empty for the
+            first listing
+        """
+        with self._lock:
+            changes = self._refresh_locked()
+        self._notify(changes)
+        return changes
+
+    def invalidate(self) -> None:
+        """Drop the cached listing so the next lookup enumerates ports."""
+        with self._lock:
+            self._loaded_at = None
+
+    def add_listener(self, listener: PortListener) -> None:
+        """Call ``listener`` with every ``PortChange``.
+
+        Listeners run on the thread that detected the change, usually the
+        polling thread, and must not block.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: PortListener) -> None:
+        """Stop calling a listener added with ``add_listener``."""
+        self._listeners.remove(listener)
+
+    def start_polling(self, interval: float = 1.0) -> None:
+        """Enumerate ports every ``interval`` seconds on a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._poll, args=(interval,), name="midi-port-poller", daemon=True
+        )
+        self._thread.start()
+
+    def stop_polling(self) -> None:
+        """Stop the background poller."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(2.0)
+        self._thread = None
+
+    def _expired(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl
+
+    def _missing(self, name: str | None) -> bool:
+        return name is not None and not (name in self._inputs and name in self._outputs)
+
+    def _refresh_locked(self) -> list[PortChange]:
+        inputs = list(self._get_input_names())
+        outputs = list(self._get_output_names())
+        self.refreshes += 1
+
+        changes: list[PortChange] = []
+        if self._listed:
+            for direction, old, new in (
+                ("input", self._inputs, inputs),
+                ("output", self._outputs, outputs),
+            ):
+                changes.extend(PortChange("added", direction, n) for n in new if n not in old)
+                changes.extend(PortChange("removed", direction, n) for n in old if n not in new)
+
+        self._inputs = inputs
+        self._outputs = outputs
+        self._loaded_at = time.monotonic()
+        self._listed = True
+        return changes
+
+    def _notify(self, changes: list[PortChange]) -> None:
+        for change in changes:
+            logger.info(f"MIDI {change.direction} port {change.kind}: {change.name}")
+            for listener in list(self._listeners):
+                try:
+                    listener(change)
+                except Exception as e:
+                    logger.error(f"Error in MIDI port listener: {e}")
+
+    def _poll(self, interval: float) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error enumerating MIDI ports: {e}")
+            if self._stop.wait(interval):
+                return
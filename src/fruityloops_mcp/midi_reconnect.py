@@ -0,0 +1,253 @@
+"""Automatic MIDI port reconnection with backoff."""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+OUTAGE_POLICIES = ("buffer", "drop")
+
+
+@dataclass(frozen=True)
+class ReconnectPolicy:
+    """How to retry a lost MIDI port and what to do with sends meanwhile.
+
+    Attributes:
+        initial_delay: Seconds before the first reconnect attempt
+        max_delay: Upper bound for the delay between attempts
+        multiplier: Factor the delay grows by after each failed attempt
+        jitter: Random fraction (0-1) the delay is varied by, so several
+            clients do not retry in lockstep
+        max_attempts: Attempts before giving up, None to retry forever
+        outage_policy: ``buffer`` to hold sends and replay them after
+            reconnecting, ``drop`` to fail them
+        buffer_size: Maximum held sends; the oldest are dropped beyond that
+    """
+
+    initial_delay: float = 0.1
+    max_delay: float = 10.0
+    multiplier: float = 2.0
+    jitter: float = 0.1
+    max_attempts: int | None = None
+    outage_policy: str = "buffer"
+    buffer_size: int = 1024
+
+    def __post_init__(self) -> None:
+        """Validate the policy.
+
+        Raises:
+            ValueError: If outage_policy is unknown or jitter is out of range
+        """
+        if self.outage_policy not in OUTAGE_POLICIES:
+            raise ValueError(
+                f"Unknown outage policy {self.outage_policy!r}, expected one of {OUTAGE_POLICIES}"
+            )
+        if not 0 <= self.jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+    def delay(self, attempt: int, rng: random.Random | None = None) -> float:
+        """Get the delay before an attempt.
+
+        Args:
+            attempt: Attempt number, starting at 1
+            rng: Random source for jitter
+
+        Returns:
+            Seconds to wait before the attempt
+        """
+        base = min(self.max_delay, self.initial_delay * self.multiplier ** (attempt - 1))
+        if self.jitter:
+            base *= 1 + (rng or random).uniform(-self.jitter, self.jitter)
+        return min(self.max_delay, base)
+
+
+class ReconnectSupervisor:
+    """Reopens a lost MIDI port on a background thread.
+
+    ``start`` begins an outage: attempts run with exponential backoff until
+    ``reopen`` succeeds, the policy gives up, or ``stop`` is called. ``wake``
+    skips the current wait, e.g. when the port reappears. While an outage
+    lasts, sends can be held with ``hold`` and are replayed in order once the
+    port is back. The outage lasts until every held send, including those
+    held during the replay, has run, and only then is ``resume`` called, so
+    new sends cannot overtake held ones.
+    """
+
+    def __init__(
+        self,
+        reopen: Callable[[], bool],
+        policy: ReconnectPolicy | None = None,
+        rng: random.Random | None = None,
+        resume: Callable[[], None] | None = None,
+    ):
+        """Initialize the supervisor.
+
+        Args:
+            reopen: Tries to reopen the port, returns True on success
+            policy: Backoff and outage policy
+            rng: Random source for jitter
+            resume: Called once held sends are replayed, as the outage ends
+        """
+        self.policy = policy or ReconnectPolicy()
+        self._reopen = reopen
+        self._resume = resume
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+        self._held: deque[Callable[[], Any]] = deque(maxlen=self.policy.buffer_size)
+        self._outage_started: float | None = None
+
+        self.outages = 0
+        self.reconnects = 0
+        self.failures = 0
+        self.attempts = 0
+        self.dropped = 0
+        self.replayed = 0
+        self.last_outage = 0.0
+        self.total_outage = 0.0
+
+    @property
+    def is_reconnecting(self) -> bool:
+        """Check if an outage is in progress."""
+        return self._outage_started is not None
+
+    def start(self) -> None:
+        """Begin reconnecting; does nothing if already reconnecting."""
+        with self._lock:
+            if self._outage_started is not None:
+                return
+            self._outage_started = time.monotonic()
+            self._stopped = False
+            self._wake.clear()
+            self.outages += 1
+            self._thread = threading.Thread(target=self._run, name="midi-reconnect", daemon=True)
+            self._thread.start()
+        logger.warning("MIDI port lost, reconnecting")
+
+    def stop(self) -> None:
+        """Stop reconnecting and drop held sends."""
+        with self._lock:
+            thread = self._thread
+            self._stopped = True
+            self._thread = None
+        self._wake.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(2.0)
+        self._end_outage(replay=False)
+
+    def wake(self) -> None:
+        """Attempt to reconnect now instead of waiting out the backoff."""
+        self._wake.set()
+
+    def hold(self, send: Callable[[], Any]) -> bool:
+        """Hold a send until the port is back.
+
+        Args:
+            send: Callable that performs the send once reconnected
+
+        Returns:
+            True if the send is held, False if the policy drops sends or no
+            outage is in progress; only the former counts as dropped
+        """
+        with self._lock:
+            if self._outage_started is None:
+                return False
+            if self.policy.outage_policy != "buffer":
+                self.dropped += 1
+                return False
+            if len(self._held) == self._held.maxlen:
+                self.dropped += 1
+            self._held.append(send)
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        """Get outage and reconnect metrics.
+
+        Returns:
+            Counters plus outage durations in seconds
+        """
+        started = self._outage_started
+        return {
+            "reconnecting": started is not None,
+            "outages": self.outages,
+            "reconnects": self.reconnects,
+            "failures": self.failures,
+            "attempts": self.attempts,
+            "held": len(self._held),
+            "dropped": self.dropped,
+            "replayed": self.replayed,
+            "current_outage_s": time.monotonic() - started if started is not None else 0.0,
+            "last_outage_s": self.last_outage,
+            "total_outage_s": self.total_outage,
+        }
+
+    def _run(self) -> None:
+        attempt = 0
+        while True:
+            attempt += 1
+            self._wake.wait(self.policy.delay(attempt, self._rng))
+            self._wake.clear()
+            if self._stopped:
+                return
+            self.attempts += 1
+            try:
+                reopened = self._reopen()
+            except Exception as e:
+                logger.error(f"Error reconnecting MIDI port: {e}")
+                reopened = False
+            if self._stopped:
+                return
+            if reopened:
+                self.reconnects += 1
+                duration = self._end_outage(replay=True)
+                logger.info(f"MIDI port reconnected after {duration:.3f}s ({attempt} attempts)")
+                return
+            max_attempts = self.policy.max_attempts
+            if max_attempts is not None and attempt >= max_attempts:
+                self.failures += 1
+                self._end_outage(replay=False)
+                logger.error(f"Giving up reconnecting MIDI port after {attempt} attempts")
+                return
+
+    def _end_outage(self, replay: bool) -> float:
+        """Finish the outage, replaying or dropping held sends.
+
+        Sends held while replaying are replayed too; the outage ends, and
+        ``resume`` is called, once none are left.
+
+        Returns:
+            Outage duration in seconds
+        """
+        while True:
+            with self._lock:
+                started = self._outage_started
+                if started is None:
+                    return 0.0
+                held = list(self._held)
+                self._held.clear()
+                replay = replay and not self._stopped
+                if not (replay and held):
+                    duration = time.monotonic() - started
+                    self.last_outage = duration
+                    self.total_outage += duration
+                    self._outage_started = None
+                    self._thread = None
+                    self.dropped += len(held)
+                    if replay and self._resume is not None:
+                        self._resume()
+                    return duration
+            for send in held:
+                try:
+                    send()
+                    self.replayed += 1
+                except Exception as e:
+                    self.dropped += 1
+                    logger.error(f"Error replaying held MIDI send: {e}")
@@ -0,0 +1,195 @@
+"""Recording of received MIDI input to a Standard MIDI File."""
+
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from fruityloops_mcp.midi_file import MidiFileWriter
+
+if TYPE_CHECKING:
+    import mido
+
+    from fruityloops_mcp.midi_input import InputEvent
+
+logger = logging.getLogger(__name__)
+
+
+class InputRecorder:
+    """Writes received MIDI messages to a file as a session goes on.
+
+    ``record`` runs on the thread receiving MIDI and only appends the
+    message and its ``perf_counter_ns`` arrival time to a bounded queue. A
+    writer thread drains the queue every ``flush_interval`` seconds,
+    converts arrival times to ticks at the recording tempo and appends the
+    events to a ``MidiFileWriter``, so nothing touches the event loop and
+    memory stays the same however long the recording runs.
+
+    Ticks are computed from the time since the start of the recording, not
+    from the previous event, so rounding never accumulates into drift.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(
+        self,
+        path: str,
+        tempo: float = 120.0,
+        ticks_per_beat: int = 480,
+        flush_interval: float = 0.25,
+        max_pending: int = 65536,
+        on_done: Callable[["InputRecorder"], object] | None = None,
+    ):
+        """Initialize a recorder; call ``start`` to create the file.
+
+        Args:
+            path: Path of the ``.mid`` file, replaced if it exists
+            tempo: Tempo in BPM written to the file and used for ticks
+            ticks_per_beat: Time resolution in ticks per quarter note
+            flush_interval: Seconds between writes to the file
+            max_pending: Events queued for the writer before new ones are
+                dropped
+            on_done: Called once the recording has been stopped
+
+        Raises:
+            ValueError: If ``tempo`` or ``ticks_per_beat`` is out of range
+        """
+        if tempo <= 0 or ticks_per_beat < 1:
+            raise ValueError("tempo and ticks_per_beat must be positive")
+        self.id = next(self._ids)
+        self.path = path
+        self.tempo = tempo
+        self.ticks_per_beat = ticks_per_beat
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._on_done = on_done
+        self._ticks_per_ns = ticks_per_beat * tempo / 60e9
+
+        self._queue: deque[tuple[int, mido.Message]] = deque()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._writer: MidiFileWriter | None = None
+        self._running = False
+        self._start_ns = 0
+        self._stop_ns = 0
+
+        self.dropped = 0
+        self.skipped = 0
+        self.errors = 0
+
+    @property
+    def is_recording(self) -> bool:
+        """Check if events are being recorded."""
+        return self._running
+
+    def start(self) -> "InputRecorder":
+        """Create the file and start the writer thread.
+
+        Returns:
+            This recorder
+
+        Raises:
+            OSError: If the file cannot be created
+        """
+        self._writer = MidiFileWriter(
+            self.path, self.ticks_per_beat, round(60_000_000 / self.tempo)
+        )
+        self._start_ns = time.perf_counter_ns()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name=f"midi-recorder-{self.id}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def record(self, event: "InputEvent") -> None:
+        """Queue a received event; called on the receiving thread."""
+        if not self._running:
+            return
+        if len(self._queue) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._queue.append((event.clock_ns or time.perf_counter_ns(), event.message))
+
+    def stop(self, timeout: float = 5.0) -> dict[str, Any]:
+        """Write the queued events, finish the file and stop.
+
+        Args:
+            timeout: Seconds to wait for the writer thread
+
+        Returns:
+            Summary of the recording
+        """
+        thread = self._thread
+        if thread is None:
+            return self.summary()
+        self._thread = None
+        if self._running:
+            self._stop_ns = time.perf_counter_ns()
+            self._running = False
+        self._wake.set()
+        thread.join(timeout)
+        if self._on_done is not None:
+            self._on_done(self)
+        return self.summary()
+
+    def summary(self) -> dict[str, Any]:
+        """Get the path, counters and length of the recording."""
+        end_ns = self._stop_ns if not self._running else time.perf_counter_ns()
+        return {
+            "id": self.id,
+            "path": self.path,
+            "recording": self._running,
+            "events": self._writer.events if self._writer else 0,
+            "dropped": self.dropped,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "seconds": round(max(end_ns - self._start_ns, 0) / 1e9, 3),
+            "tempo": self.tempo,
+            "ticks_per_beat": self.ticks_per_beat,
+            "bytes": self._writer.size if self._writer else 0,
+        }
+
+    def _run(self) -> None:
+        writer = self._writer
+        assert writer is not None
+        try:
+            while self._running:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                self._drain(writer)
+            self._drain(writer)
+        except Exception as e:
+            self.errors += 1
+            if isinstance(e, OSError):
+                logger.error(f"Error writing MIDI recording {self.path}: {e}")
+            else:
+                logger.exception(f"Error recording MIDI to {self.path}")
+        finally:
+            # Whatever happened, stop recording and leave a valid file behind
+            if self._running:
+                self._stop_ns = time.perf_counter_ns()
+                self._running = False
+            end_tick = round((self._stop_ns - self._start_ns) * self._ticks_per_ns)
+            try:
+                writer.close(end_tick)
+            except OSError as e:
+                self.errors += 1
+                logger.error(f"Error closing MIDI recording {self.path}: {e}")
+
+    def _drain(self, writer: MidiFileWriter) -> None:
+        """Write the queued events and hand them to the operating system."""
+        queue = self._queue
+        if not queue:
+            return
+        start_ns = self._start_ns
+        ticks_per_ns = self._ticks_per_ns
+        while queue:
+            clock_ns, message = queue.popleft()
+            tick = round((clock_ns - start_ns) * ticks_per_ns)
+            if not writer.write(tick, message.bin()):
+                self.skipped += 1
+        writer.flush()
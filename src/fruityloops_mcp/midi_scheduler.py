@@ -0,0 +1,105 @@
+"""Deferred MIDI event scheduling on the asyncio event loop."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(order=True)
+class _Entry:
+    deadline: float
+    seq: int
+    callback: Callable[[], object] = field(compare=False)
+    flush: bool = field(compare=False)
+
+
+class MIDIScheduler:
+    """Run MIDI callbacks at a later time without blocking the caller.
+
+    Pending callbacks are kept in a binary heap ordered by deadline, so
+    scheduling costs O(log n) regardless of how many events are pending.
+    A single event loop timer is armed for the earliest deadline and
+    re-armed after each batch of due events has run.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty scheduler."""
+        self._heap: list[_Entry] = []
+        self._counter = itertools.count()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_deadline: float | None = None
+
+    @property
+    def pending(self) -> int:
+        """Number of callbacks waiting to run."""
+        return len(self._heap)
+
+    def schedule(self, delay: float, callback: Callable[[], object], flush: bool = False) -> None:
+        """Schedule a callback to run after a delay.
+
+        Must be called from a running event loop. Callbacks run on that loop.
+
+        Args:
+            delay: Seconds from now until the callback runs
+            callback: Zero-argument callable to run
+            flush: True to run the callback when the scheduler is flushed,
+                False to drop it instead (use True for note-offs)
+
+        Raises:
+            RuntimeError: If called without a running event loop
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._cancel_timer()
+            self._loop = loop
+
+        entry = _Entry(loop.time() + max(delay, 0.0), next(self._counter), callback, flush)
+        heapq.heappush(self._heap, entry)
+        if self._timer_deadline is None or entry.deadline < self._timer_deadline:
+            self._arm(loop, entry.deadline)
+
+    def flush(self) -> None:
+        """Run all flushable callbacks now and drop everything else.
+
+        Flushable callbacks run in deadline order so that, for example, note-offs
+        are delivered before the output port is closed.
+        """
+        self._cancel_timer()
+        heap, self._heap = self._heap, []
+        heap.sort()
+        for entry in heap:
+            if entry.flush:
+                self._run(entry)
+
+    def _arm(self, loop: asyncio.AbstractEventLoop, deadline: float) -> None:
+        self._cancel_timer()
+        self._timer = loop.call_at(deadline, self._on_timer, loop)
+        self._timer_deadline = deadline
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+        self._timer_deadline = None
+
+    def _on_timer(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._timer = None
+        self._timer_deadline = None
+        now = loop.time()
+        while self._heap and self._heap[0].deadline <= now:
+            self._run(heapq.heappop(self._heap))
+        if self._heap:
+            self._arm(loop, self._heap[0].deadline)
+
+    @staticmethod
+    def _run(entry: _Entry) -> None:
+        try:
+            entry.callback()
+        except Exception as e:
+            logger.error(f"Error running scheduled MIDI event: {e}")
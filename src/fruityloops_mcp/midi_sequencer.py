@@ -0,0 +1,247 @@
+"""Timestamped MIDI sequence playback on a dedicated thread."""
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from fruityloops_mcp.midi_output import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+# (offset in seconds from the start, messages written together at that offset)
+SequenceStep = tuple[float, list[Any]]
+
+PLAYBACK_STATES = ("playing", "paused", "stopped", "finished")
+
+
+def ticks_to_seconds(ticks: float, tempo: float, ppq: int) -> float:
+    """Convert a tick offset to seconds.
+
+    Args:
+        ticks: Offset in ticks
+        tempo: Tempo in beats per minute
+        ppq: Ticks per quarter note beat
+
+    Returns:
+        Offset in seconds
+    """
+    return ticks * 60.0 / (tempo * ppq)
+
+
+class SequencePlayer:
+    """Plays timestamped MIDI steps against a monotonic clock.
+
+    Steps are written by a dedicated thread, away from event loop stalls.
+    Every deadline is computed from the start time rather than from the
+    previous step, so sleep overshoot never accumulates into drift. The
+    thread sleeps until ``spin`` seconds before a deadline and busy-waits
+    the rest. How late each step was written is recorded as timing jitter.
+
+    Steps may come from any iterable, including a generator, and are only
+    read as they are played. Pausing shifts all later deadlines by the time
+    spent paused. Stopping or pausing calls ``release``, e.g. to silence
+    sounding notes.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(
+        self,
+        steps: Iterable[SequenceStep],
+        write: Callable[[list[Any]], object],
+        release: Callable[[], object] | None = None,
+        spin: float = 0.0005,
+        stats: LatencyStats | None = None,
+        on_done: Callable[["SequencePlayer"], object] | None = None,
+    ):
+        """Initialize a player; call ``start`` to begin playback.
+
+        Args:
+            steps: Steps in offset order
+            write: Writes the messages of one step
+            release: Called when playback is stopped or paused
+            spin: Seconds before each deadline spent busy-waiting instead of
+                sleeping, for sub-millisecond accuracy
+            stats: Shared statistics also receiving this player's jitter
+            on_done: Called on the playback thread once playback ends
+        """
+        self.id = next(self._ids)
+        self._steps = steps
+        self._write = write
+        self._release = release
+        self._spin_ns = int(spin * 1e9)
+        self._shared_stats = stats
+        self._on_done = on_done
+        self.timing = LatencyStats()
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._paused = False
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
+
+        self.state = "playing"
+        self.steps_played = 0
+        self.position = 0.0
+
+    @property
+    def done(self) -> bool:
+        """Check if playback has ended, by finishing or being stopped."""
+        return self.state in ("stopped", "finished")
+
+    def start(self) -> "SequencePlayer":
+        """Start playback on a new thread.
+
+        Returns:
+            This player
+        """
+        self._thread = threading.Thread(
+            target=self._run, name=f"midi-sequencer-{self.id}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def pause(self) -> None:
+        """Pause playback; later steps keep their spacing when resumed."""
+        if not self.done:
+            self._paused = True
+            self._wake.set()
+
+    def resume(self) -> None:
+        """Resume paused playback."""
+        self._paused = False
+        self._wake.set()
+
+    def stop(self) -> None:
+        """Stop playback; remaining steps are not written."""
+        self._stopped = True
+        self._wake.set()
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait for playback to end.
+
+        Args:
+            timeout: Seconds to wait, or None to wait forever
+
+        Returns:
+            True if playback has ended
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.done
+
+    async def wait(self) -> None:
+        """Wait for playback to end without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self.done:
+                return
+            self._waiters.append((loop, future))
+        await future
+
+    def summary(self) -> dict[str, Any]:
+        """Get playback progress and timing.
+
+        Returns:
+            ID, state, steps played, position in seconds, and how late steps
+            were written in microseconds
+        """
+        return {
+            "id": self.id,
+            "state": self.state,
+            "steps": self.steps_played,
+            "position": round(self.position, 6),
+            "timing": self.timing.summary(),
+        }
+
+    def _run(self) -> None:
+        clock = time.perf_counter_ns
+        start = clock()
+        state = "finished"
+        try:
+            for offset, messages in self._steps:
+                deadline = start + int(offset * 1e9)
+                shifted = self._sleep_until(deadline)
+                if shifted is None:
+                    state = "stopped"
+                    break
+                start += shifted
+                deadline += shifted
+                # Spin out the last fraction of a millisecond
+                now = clock()
+                while now < deadline:
+                    now = clock()
+                self._write(messages)
+                lateness = now - deadline
+                self.timing.record(lateness)
+                if self._shared_stats is not None:
+                    self._shared_stats.record(lateness)
+                self.steps_played += 1
+                self.position = offset
+        except Exception as e:
+            logger.error(f"Error playing MIDI sequence {self.id}: {e}")
+            state = "stopped"
+        finally:
+            # Let streaming sources such as files release what they hold
+            close = getattr(self._steps, "close", None)
+            if close is not None:
+                close()
+            if state == "stopped":
+                self._call_release()
+            self._finish(state)
+
+    def _sleep_until(self, deadline: int) -> int | None:
+        """Sleep until ``spin`` before a deadline, handling pause and stop.
+
+        Returns:
+            Nanoseconds spent paused, by which the deadline moves, or None
+            if playback was stopped
+        """
+        clock = time.perf_counter_ns
+        shifted = 0
+        while True:
+            if self._stopped:
+                return None
+            if self._paused:
+                self.state = "paused"
+                self._call_release()
+                paused_at = clock()
+                while self._paused and not self._stopped:
+                    self._wake.wait()
+                    self._wake.clear()
+                shifted += clock() - paused_at
+                self.state = "playing"
+                continue
+            remaining = deadline + shifted - clock()
+            if remaining <= self._spin_ns:
+                return shifted
+            self._wake.wait((remaining - self._spin_ns) / 1e9)
+            self._wake.clear()
+
+    def _call_release(self) -> None:
+        if self._release is None:
+            return
+        try:
+            self._release()
+        except Exception as e:
+            logger.error(f"Error releasing notes of MIDI sequence {self.id}: {e}")
+
+    def _finish(self, state: str) -> None:
+        with self._lock:
+            self.state = state
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+        if self._on_done is not None:
+            self._on_done(self)
+
+
+def _resolve(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,224 @@
+"""Opt-in, sampled trace spans exported as Chrome trace events.
+
+A ``Tracer`` instruments objects by replacing methods on the instance with
+wrappers that time each call. Nothing is wrapped unless profiling is turned
+on, so when it is off the hot path is unchanged.
+
+Spans form traces: a span started outside any other span is a root, and the
+sampling decision made for it covers every span nested under it, on the same
+task or in tasks and threads that inherit its context. Each trace is drawn
+on its own row when the exported file is opened in ``chrome://tracing`` or
+Perfetto.
+"""
+
+import functools
+import inspect
+import itertools
+import json
+import os
+import random
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from contextvars import ContextVar
+from typing import Any
+
+# Trace ID of the enclosing span; 0 inside a trace that was not sampled
+_current_trace: ContextVar[int | None] = ContextVar("fruityloops_mcp_trace", default=None)
+
+# (name, category, trace ID, start ns, duration ns, arguments)
+Span = tuple[str, str, int, int, int, dict[str, Any] | None]
+
+SpanLabel = Callable[..., tuple[str, dict[str, Any] | None]]
+
+
+class Tracer:
+    """Records sampled timing spans around instrumented methods."""
+
+    def __init__(self, sample_rate: float = 1.0, max_spans: int = 100_000, path: str | None = None):
+        """Initialize an empty tracer.
+
+        Args:
+            sample_rate: Fraction of traces recorded, between 0 and 1
+            max_spans: Spans kept; the oldest are dropped beyond this
+            path: File ``export`` writes to by default
+
+        Raises:
+            ValueError: If the sample rate is outside 0 to 1
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"Sample rate must be between 0 and 1, got {sample_rate}")
+        self.sample_rate = sample_rate
+        self.path = path
+        self._spans: deque[Span] = deque(maxlen=max_spans)
+        self._trace_ids = itertools.count(1)
+        self._random = random.Random()
+        self._origin_ns = time.perf_counter_ns()
+        self.traces = 0
+        self.sampled = 0
+
+    @property
+    def spans(self) -> list[Span]:
+        """Recorded spans, oldest first."""
+        return list(self._spans)
+
+    def instrument(
+        self,
+        obj: object,
+        names: Iterable[str],
+        category: str,
+        label: SpanLabel | None = None,
+        args: dict[str, Any] | None = None,
+    ) -> None:
+        """Wrap methods of one object in spans.
+
+        Args:
+            obj: Object whose methods are replaced on the instance
+            names: Method names
+            category: Span category, e.g. ``midi``
+            label: Builds the span name and arguments from the call
+                arguments; the method name and ``args`` are used if None
+            args: Arguments attached to every span
+        """
+        for name in names:
+            setattr(obj, name, self.wrap(getattr(obj, name), name, category, label, args))
+
+    def wrap(
+        self,
+        func: Callable[..., Any],
+        name: str,
+        category: str,
+        label: SpanLabel | None = None,
+        args: dict[str, Any] | None = None,
+    ) -> Callable[..., Any]:
+        """Wrap a function or coroutine function in a span.
+
+        Args:
+            func: Function to wrap
+            name: Span name, unless ``label`` gives one
+            category: Span category
+            label: Builds the span name and arguments from the call arguments
+            args: Arguments attached to every span, unless ``label`` is given
+
+        Returns:
+            Wrapper with the same signature
+        """
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def traced_async(*call_args: Any, **kwargs: Any) -> Any:
+                trace, token = self._enter()
+                if not trace:
+                    try:
+                        return await func(*call_args, **kwargs)
+                    finally:
+                        _current_trace.reset(token)
+                start = time.perf_counter_ns()
+                try:
+                    return await func(*call_args, **kwargs)
+                finally:
+                    self._record(name, category, label, args, call_args, kwargs, trace, start)
+                    _current_trace.reset(token)
+
+            return traced_async
+
+        @functools.wraps(func)
+        def traced(*call_args: Any, **kwargs: Any) -> Any:
+            trace, token = self._enter()
+            if not trace:
+                try:
+                    return func(*call_args, **kwargs)
+                finally:
+                    _current_trace.reset(token)
+            start = time.perf_counter_ns()
+            try:
+                return func(*call_args, **kwargs)
+            finally:
+                self._record(name, category, label, args, call_args, kwargs, trace, start)
+                _current_trace.reset(token)
+
+        return traced
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Build a Chrome trace-event document of the recorded spans.
+
+        Returns:
+            Document with complete (``X``) events, in microseconds
+        """
+        pid = os.getpid()
+        events = []
+        for name, category, trace, start, duration, args in self.spans:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self._origin_ns) / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": trace,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str | None = None) -> int:
+        """Write the recorded spans as Chrome trace-event JSON.
+
+        Args:
+            path: File to write, ``self.path`` if None
+
+        Returns:
+            Number of spans written
+
+        Raises:
+            ValueError: If no path is given or configured
+        """
+        path = path or self.path
+        if not path:
+            raise ValueError("No trace file path given")
+        document = self.chrome_trace()
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(document, file, separators=(",", ":"))
+        return len(document["traceEvents"])
+
+    def stats(self) -> dict[str, Any]:
+        """Get the sample rate, trace counts and spans kept."""
+        return {
+            "sample_rate": self.sample_rate,
+            "traces": self.traces,
+            "sampled": self.sampled,
+            "spans": len(self._spans),
+        }
+
+    def _enter(self) -> tuple[int, Any]:
+        """Enter a span, starting a trace if there is none.
+
+        Returns:
+            Trace ID, or 0 if the trace is not sampled, and the context token
+        """
+        trace = _current_trace.get()
+        if trace is None:
+            self.traces += 1
+            if self.sample_rate >= 1.0 or self._random.random() < self.sample_rate:
+                self.sampled += 1
+                trace = next(self._trace_ids)
+            else:
+                trace = 0
+        return trace, _current_trace.set(trace)
+
+    def _record(
+        self,
+        name: str,
+        category: str,
+        label: SpanLabel | None,
+        span_args: dict[str, Any] | None,
+        call_args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        trace: int,
+        start: int,
+    ) -> None:
+        duration = time.perf_counter_ns() - start
+        if label is not None:
+            name, span_args = label(*call_args, **kwargs)
+        self._spans.append((name, category, trace, start, duration, span_args))
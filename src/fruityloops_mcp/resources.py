@@ -0,0 +1,172 @@
+"""Per-resource locking for concurrent tool calls.
+
+Tools declare the resources they touch as keys such as ``("mixer_track", 3)``
+or ``("midi", None, 0)``. Keys conflict when one is a prefix of the other, so
+``("transport",)`` conflicts with itself and ``("pattern",)`` conflicts with
+every ``("pattern", n)``. Calls with conflicting keys run one at a time in
+arrival order; all other calls run concurrently.
+"""
+
+import asyncio
+import contextlib
+import itertools
+from collections.abc import AsyncIterator, Callable, Hashable, Sequence
+from typing import Any
+
+ResourceKey = tuple[Hashable, ...]
+ResourceFn = Callable[[dict[str, Any]], list[ResourceKey]]
+
+
+def resource(kind: str, arg: str | None = None) -> ResourceFn:
+    """Declare that a tool touches one resource.
+
+    Args:
+        kind: Resource kind, e.g. ``mixer_track``
+        arg: Tool argument holding the resource index; without it the tool
+            touches every resource of the kind
+
+    Returns:
+        Function mapping tool arguments to resource keys
+    """
+    if arg is None:
+        return lambda _args: [(kind,)]
+    return lambda args: [(kind, args.get(arg))]
+
+
+def midi_resources(args: dict[str, Any]) -> list[ResourceKey]:
+    """Get the MIDI channels a MIDI send tool touches.
+
+    Keys are ``("midi", port, channel)``; a batch touches every channel its
+    events use.
+    """
+    port = args.get("port")
+    events = args.get("events")
+    if events is None:
+        return [("midi", port, args.get("channel", 0))]
+    channels = {e.get("channel", 0) for e in events if isinstance(e, dict)}
+    return [("midi", port, channel) for channel in sorted(channels)]
+
+
+def coalesced_resources(kind: str, arg: str = "volumes") -> ResourceFn:
+    """Declare that a tool writes many resources through a write coalescer.
+
+    Each call gets keys ``(kind, index, "coalesced", call)`` with a new
+    ``call`` number. They conflict with every call on ``(kind, index)``, so
+    a bulk write and a single write to one object still run in arrival
+    order, but not with each other, so concurrent bulk writes reach the
+    coalescer together and can be merged.
+
+    Args:
+        kind: Resource kind, e.g. ``mixer_track``
+        arg: Tool argument holding the list of ``index`` and value pairs
+
+    Returns:
+        Function mapping tool arguments to resource keys
+    """
+    calls = itertools.count()
+
+    def keys(args: dict[str, Any]) -> list[ResourceKey]:
+        call = next(calls)
+        indexes = {item.get("index") for item in args.get(arg, ()) if isinstance(item, dict)}
+        return [(kind, index, "coalesced", call) for index in sorted(indexes, key=str)]
+
+    return keys
+
+
+def conflicts(a: ResourceKey, b: ResourceKey) -> bool:
+    """Check if two resource keys conflict, i.e. one is a prefix of the other."""
+    n = min(len(a), len(b))
+    return a[:n] == b[:n]
+
+
+def _prefixes(key: ResourceKey) -> list[ResourceKey]:
+    return [key[:n] for n in range(1, len(key))]
+
+
+class ResourceLocks:
+    """Serializes calls on conflicting resources in arrival order.
+
+    Each call waits for every earlier call whose keys conflict with its own,
+    whether that call is running or still waiting, so conflicting calls never
+    overtake each other and none is starved. Calls are chained: a call only
+    waits for the latest earlier call on the same key and on each of its
+    prefixes, plus calls on narrower keys made since, so acquiring costs the
+    same however many calls are queued.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no resources held."""
+        # Latest call per key
+        self._last: dict[ResourceKey, asyncio.Future[None]] = {}
+        # Calls on narrower keys made since the latest call on a key
+        self._below: dict[ResourceKey, set[asyncio.Future[None]]] = {}
+        self.acquired = 0
+        self.waited = 0
+        self.pending = 0
+
+    @contextlib.asynccontextmanager
+    async def hold(self, keys: Sequence[ResourceKey]) -> AsyncIterator[None]:
+        """Hold resources for the duration of the block.
+
+        Args:
+            keys: Resource keys the call touches; no keys means no locking
+        """
+        if not keys:
+            yield
+            return
+
+        blockers: set[asyncio.Future[None]] = set()
+        for key in keys:
+            if (last := self._last.get(key)) is not None:
+                blockers.add(last)
+            blockers.update(self._below.get(key, ()))
+            for prefix in _prefixes(key):
+                if (last := self._last.get(prefix)) is not None:
+                    blockers.add(last)
+
+        claim: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        for key in keys:
+            self._last[key] = claim
+            self._below.pop(key, None)
+            for prefix in _prefixes(key):
+                self._below.setdefault(prefix, set()).add(claim)
+        self.pending += 1
+
+        acquired = False
+        try:
+            if blockers:
+                self.waited += 1
+                await asyncio.wait(blockers)
+            acquired = True
+            self.acquired += 1
+            yield
+        finally:
+            self.pending -= 1
+            if acquired or all(b.done() for b in blockers):
+                self._release(keys, claim)
+            else:
+                # Cancelled while waiting: later calls rely on this one to
+                # order them after its blockers, so release only once they have
+                waiting = asyncio.ensure_future(asyncio.wait(blockers))
+                waiting.add_done_callback(lambda _: self._release(keys, claim))
+
+    def stats(self) -> dict[str, int]:
+        """Get lock counters.
+
+        Returns:
+            Calls that acquired their resources, calls that had to wait for
+            a conflicting call first, and calls currently holding or waiting
+        """
+        return {"acquired": self.acquired, "waited": self.waited, "pending": self.pending}
+
+    def _release(self, keys: Sequence[ResourceKey], claim: asyncio.Future[None]) -> None:
+        claim.set_result(None)
+        for key in keys:
+            if self._last.get(key) is claim:
+                del self._last[key]
+            for prefix in _prefixes(key):
+                below = self._below.get(prefix)
+                if below is not None:
+                    below.discard(claim)
+                    if not below:
+                        del self._below[prefix]
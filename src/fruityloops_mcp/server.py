@@ -2,19 +2,60 @@
 
 import asyncio
 import logging
-from typing import Any
+import os
+import time
+from typing import TYPE_CHECKING, Any
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
-from mcp.types import TextContent, Tool
+from mcp.types import CallToolRequest, ListToolsResult, TextContent
 
+from fruityloops_mcp.coalesce import WriteCoalescer
+from fruityloops_mcp.fl_executor import FLExecutor
+from fruityloops_mcp.lazy import LazyModule, module_available
+from fruityloops_mcp.metrics import ServerMetrics, prometheus_text
 from fruityloops_mcp.midi_interface import MIDIInterface
+from fruityloops_mcp.midi_pool import MIDIPool
+from fruityloops_mcp.midi_reconnect import ReconnectPolicy
+from fruityloops_mcp.profiling import Tracer
+from fruityloops_mcp.resources import (
+    ResourceLocks,
+    coalesced_resources,
+    midi_resources,
+    resource,
+)
+from fruityloops_mcp.state_cache import StateCache, StateKey
+from fruityloops_mcp.tools import (
+    RESULT_FORMATS,
+    ToolRegistry,
+    ToolResult,
+    ToolSpec,
+    collect_tools,
+    object_schema,
+    tool,
+)
+
+if TYPE_CHECKING:
+    from starlette.applications import Starlette
+
+    from fruityloops_mcp.http_transport import SessionTracker
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+TRANSPORTS = ("stdio", "http")
+
+# MIDIInterface methods timed when profiling
+TRACED_MIDI_METHODS = (
+    "send_note_on",
+    "send_note_off",
+    "send_control_change",
+    "send_program_change",
+    "send_pitch_bend",
+    "send_batch",
+)
+
+
 # Create stub module class for when FL Studio API is not available
 class StubModule:
     """A stub module that returns itself for any attribute access or call."""
@@ -29,483 +70,323 @@ class StubModule:
         return self
 
 
-# Import FL Studio API modules (these will only work when FL Studio is running)
-try:
-    import channels
-    import general
-    import mixer
-    import patterns
-    import playlist
-    import transport
-    import ui
+# FL Studio API modules (these only exist when FL Studio is running). They are
+# looked up without being imported, and imported on first use.
+FL_MODULES = ("channels", "general", "mixer", "patterns", "playlist", "transport", "ui")
+FL_STUDIO_AVAILABLE = all(module_available(name) for name in FL_MODULES)
+
+
+def _fl_module(name: str) -> Any:
+    """Get a deferred FL Studio API module, or a stub outside FL Studio."""
+    return LazyModule(name) if FL_STUDIO_AVAILABLE else StubModule(name)
+
+
+transport = _fl_module("transport")
+mixer = _fl_module("mixer")
+channels = _fl_module("channels")
+patterns = _fl_module("patterns")
+general = _fl_module("general")
+ui = _fl_module("ui")
+playlist = _fl_module("playlist")
+
+
+# Reusable argument schemas
+NOTE_PARAM = {
+    "type": "integer",
+    "description": "MIDI note number (0-127)",
+    "minimum": 0,
+    "maximum": 127,
+}
+VELOCITY_PARAM = {
+    "type": "integer",
+    "description": "Note velocity (0-127)",
+    "default": 64,
+    "minimum": 0,
+    "maximum": 127,
+}
+CHANNEL_PARAM = {
+    "type": "integer",
+    "description": "MIDI channel (0-15)",
+    "default": 0,
+    "minimum": 0,
+    "maximum": 15,
+}
+VOLUME_PARAM = {"type": "number", "description": "Volume level (0.0-1.0)"}
+MIXER_TRACK_PARAM = {"type": "integer", "description": "Mixer track number"}
+CHANNEL_NUM_PARAM = {"type": "integer", "description": "Channel number"}
+PATTERN_NUM_PARAM = {"type": "integer", "description": "Pattern number"}
+MIXER_FIELDS = ("name", "volume", "pan", "muted")
+CHANNEL_FIELDS = ("name", "volume", "pan", "muted")
+PATTERN_FIELDS = ("name", "length")
+
+
+def snapshot_schema(fields: tuple[str, ...], first: int = 0) -> dict[str, Any]:
+    """Build the argument schema of a bulk snapshot tool.
+
+    Args:
+        fields: Fields the tool can return
+        first: Index of the first object
 
-    FL_STUDIO_AVAILABLE = True
-except ImportError:
-    logger.warning("FL Studio API not available. Running in stub mode.")
-    FL_STUDIO_AVAILABLE = False
+    Returns:
+        JSON schema with optional ``start``, ``limit`` and ``fields`` arguments
+    """
+    return object_schema(
+        {
+            "start": {
+                "type": "integer",
+                "description": f"First index to return (default: {first})",
+            },
+            "limit": {"type": "integer", "description": "Maximum number of items to return"},
+            "fields": {
+                "type": "array",
+                "items": {"type": "string", "enum": list(fields)},
+                "description": "Fields to return for each item (default: all)",
+            },
+        }
+    )
 
-    # Create stub modules that return themselves for any attribute access
-    transport = StubModule("transport")
-    mixer = StubModule("mixer")
-    channels = StubModule("channels")
-    patterns = StubModule("patterns")
-    general = StubModule("general")
-    ui = StubModule("ui")
-    playlist = StubModule("playlist")
+
+def volumes_schema(index_description: str) -> dict[str, Any]:
+    """Build the argument schema of a bulk volume setter tool.
+
+    Args:
+        index_description: Description of the object index
+
+    Returns:
+        JSON schema with a required ``volumes`` array of index and volume pairs
+    """
+    return object_schema(
+        {
+            "volumes": {
+                "type": "array",
+                "description": "Volumes to set; the last value given for an index wins",
+                "minItems": 1,
+                "maxItems": MAX_BULK_WRITES,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "index": {"type": "integer", "description": index_description},
+                        "volume": VOLUME_PARAM,
+                    },
+                    "required": ["index", "volume"],
+                },
+            }
+        },
+        required=["volumes"],
+    )
+
+
+PORT_PARAM = {
+    "type": "string",
+    "description": "MIDI port name; the server's default port if omitted",
+}
+PLAYBACK_ID_PARAM = {
+    "type": "integer",
+    "description": "Playback ID returned when it was started; all playbacks if omitted",
+}
+
+RECORDING_ID_PARAM = {
+    "type": "integer",
+    "description": "Recording ID returned when it was started; all recordings if omitted",
+}
+
+MAX_BATCH_EVENTS = 10_000
+MAX_BULK_WRITES = 10_000
+
+# One midi_send_batch event
+BATCH_EVENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "type": {
+            "type": "string",
+            "enum": [
+                "note_on",
+                "note_off",
+                "cc",
+                "program_change",
+                "pitchwheel",
+            ],
+            "description": "Event type",
+        },
+        "note": NOTE_PARAM,
+        "velocity": VELOCITY_PARAM,
+        "control": {
+            "type": "integer",
+            "description": "Control number for cc events (0-127)",
+            "minimum": 0,
+            "maximum": 127,
+        },
+        "value": {
+            "type": "integer",
+            "description": "Control value for cc events (0-127)",
+            "minimum": 0,
+            "maximum": 127,
+        },
+        "program": {
+            "type": "integer",
+            "description": "Program number (0-127)",
+            "minimum": 0,
+            "maximum": 127,
+        },
+        "pitch": {
+            "type": "integer",
+            "description": "Pitch bend value (-8192 to 8191)",
+            "minimum": -8192,
+            "maximum": 8191,
+        },
+        "channel": CHANNEL_PARAM,
+        "time": {
+            "type": "number",
+            "description": "Offset in seconds from now",
+            "default": 0,
+            "minimum": 0,
+        },
+    },
+    "required": ["type"],
+}
+
+# Sequence events give their offset in seconds or in ticks from the start
+SEQUENCE_EVENT_SCHEMA = {
+    **BATCH_EVENT_SCHEMA,
+    "properties": {
+        **BATCH_EVENT_SCHEMA["properties"],
+        "time": {
+            "type": "number",
+            "description": "Offset in seconds from the start",
+            "minimum": 0,
+        },
+        "tick": {
+            "type": "number",
+            "description": "Offset in ticks from the start at the sequence tempo",
+            "minimum": 0,
+        },
+    },
+}
 
 
 class FLStudioMCPServer:
-    """MCP Server for FL Studio Python API integration."""
+    """MCP Server for FL Studio Python API integration.
 
-    def __init__(self, midi_port: str = "FLStudio_MIDI"):
+    Tools are declared as ``@tool`` decorated methods and collected into a
+    ``ToolRegistry`` at construction time. Both ``tools/list`` and
+    ``tools/call`` are served from that registry, and the tool list is
+    cached until tools are added or removed.
+    """
+
+    def __init__(
+        self,
+        midi_port: str = "FLStudio_MIDI",
+        max_midi_ports: int = 8,
+        fl_executor: FLExecutor | None = None,
+        state_cache: StateCache | None = None,
+        result_format: str = "json",
+        flush_window: float = 0.005,
+        tracer: Tracer | None = None,
+        **midi_options: Any,
+    ):
         """Initialize the FL Studio MCP server.
 
         Args:
             midi_port: Name of the MIDI port to use for MIDI interface
+            max_midi_ports: Maximum ports opened through the ``port`` tool
+                argument before the least recently used one is closed
+            fl_executor: Runs FL Studio API calls; by default on a dedicated
+                thread with a 5 second timeout
+            state_cache: Caches FL Studio getter results; by default for 2
+                seconds
+            result_format: Text content of structured tool results: ``json``
+                for compact JSON or ``text`` for prose
+            flush_window: Seconds bulk volume writes are collected, and
+                repeated writes to the same target coalesced, before they
+                are applied
+            tracer: Records spans around tool calls, FL Studio API calls
+                and MIDI sends when given; nothing is instrumented otherwise
+            **midi_options: Extra ``MIDIInterface`` options such as
+                ``output_mode``, ``queue_size`` and ``backpressure``
+
+        Raises:
+            ValueError: If the result format is unknown
         """
+        if result_format not in RESULT_FORMATS:
+            raise ValueError(
+                f"Unknown result format {result_format!r}, expected one of {RESULT_FORMATS}"
+            )
+        self.result_format = result_format
+        self.tracer = tracer
         self.server = Server("fruityloops-mcp")
-        self.midi = MIDIInterface(port_name=midi_port)
+        self.midi = self._traced_midi(MIDIInterface(port_name=midi_port, **midi_options))
+        self.midi_pool = MIDIPool(
+            self.midi,
+            lambda name: self._traced_midi(
+                MIDIInterface(port_name=name, port_catalog=self.midi.port_catalog, **midi_options)
+            ),
+            max_ports=max_midi_ports,
+        )
+        self.fl = fl_executor or FLExecutor()
+        self.state = state_cache or StateCache()
+        self.mixer_volumes = WriteCoalescer(
+            lambda values: self._apply_writes(
+                "mixer_track", "volume", "mixer.setTrackVolumes", mixer.setTrackVolume, values
+            ),
+            window=flush_window,
+        )
+        self.channel_volumes = WriteCoalescer(
+            lambda values: self._apply_writes(
+                "channel", "volume", "channels.setChannelVolumes", channels.setChannelVolume, values
+            ),
+            window=flush_window,
+        )
+        self.sessions: SessionTracker | None = None
+        self.metrics = ServerMetrics()
+        self.locks = ResourceLocks()
+        self.tools = ToolRegistry(collect_tools(self))
+        self.tools.list_tools(FL_STUDIO_AVAILABLE)  # Build the tool list up front
         self._setup_handlers()
+        if tracer is not None:
+            self._instrument(tracer)
+
+    def _instrument(self, tracer: Tracer) -> None:
+        """Time MCP requests, tool calls and FL Studio API calls."""
+        handlers = self.server.request_handlers
+        handlers[CallToolRequest] = tracer.wrap(
+            handlers[CallToolRequest],
+            "tools/call",
+            "mcp",
+            lambda request: ("tools/call", {"tool": request.params.name}),
+        )
+        tracer.instrument(self, ["_run_tool"], "tool", lambda spec, _args: (spec.name, None))
+        tracer.instrument(self.fl, ["call"], "fl", lambda name, *_args: (name, None))
+
+    def _traced_midi(self, midi: MIDIInterface) -> MIDIInterface:
+        """Time the MIDI interface's sends when profiling."""
+        if self.tracer is not None:
+            self.tracer.instrument(midi, TRACED_MIDI_METHODS, "midi", args={"port": midi.port_name})
+        return midi
 
     def _setup_handlers(self) -> None:
         """Set up request handlers for the MCP server."""
 
         @self.server.list_tools()
-        async def list_tools() -> list[Tool]:
+        async def list_tools() -> ListToolsResult:
             """List available tools."""
-            tools = [
-                # MIDI Tools (always available)
-                Tool(
-                    name="midi_connect",
-                    description="Connect to MIDI port",
-                    inputSchema={"type": "object", "properties": {}},
-                ),
-                Tool(
-                    name="midi_disconnect",
-                    description="Disconnect from MIDI port",
-                    inputSchema={"type": "object", "properties": {}},
-                ),
-                Tool(
-                    name="midi_list_ports",
-                    description="List available MIDI input and output ports",
-                    inputSchema={"type": "object", "properties": {}},
-                ),
-                Tool(
-                    name="midi_send_note",
-                    description="Send a MIDI note with specified duration",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "note": {
-                                "type": "integer",
-                                "description": "MIDI note number (0-127)",
-                                "minimum": 0,
-                                "maximum": 127,
-                            },
-                            "velocity": {
-                                "type": "integer",
-                                "description": "Note velocity (0-127)",
-                                "default": 64,
-                                "minimum": 0,
-                                "maximum": 127,
-                            },
-                            "duration": {
-                                "type": "number",
-                                "description": "Note duration in seconds",
-                                "default": 0.5,
-                                "minimum": 0,
-                            },
-                            "channel": {
-                                "type": "integer",
-                                "description": "MIDI channel (0-15)",
-                                "default": 0,
-                                "minimum": 0,
-                                "maximum": 15,
-                            },
-                        },
-                        "required": ["note"],
-                    },
-                ),
-                Tool(
-                    name="midi_send_note_on",
-                    description="Send a MIDI note on message",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "note": {
-                                "type": "integer",
-                                "description": "MIDI note number (0-127)",
-                                "minimum": 0,
-                                "maximum": 127,
-                            },
-                            "velocity": {
-                                "type": "integer",
-                                "description": "Note velocity (0-127)",
-                                "default": 64,
-                                "minimum": 0,
-                                "maximum": 127,
-                            },
-                            "channel": {
-                                "type": "integer",
-                                "description": "MIDI channel (0-15)",
-                                "default": 0,
-                                "minimum": 0,
-                                "maximum": 15,
-                            },
-                        },
-                        "required": ["note"],
-                    },
-                ),
-                Tool(
-                    name="midi_send_note_off",
-                    description="Send a MIDI note off message",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "note": {
-                                "type": "integer",
-                                "description": "MIDI note number (0-127)",
-                                "minimum": 0,
-                                "maximum": 127,
-                            },
-                            "velocity": {
-                                "type": "integer",
-                                "description": "Note velocity (0-127)",
-                                "default": 64,
-                                "minimum": 0,
-                                "maximum": 127,
-                            },
-                            "channel": {
-                                "type": "integer",
-                                "description": "MIDI channel (0-15)",
-                                "default": 0,
-                                "minimum": 0,
-                                "maximum": 15,
-                            },
-                        },
-                        "required": ["note"],
-                    },
-                ),
-                Tool(
-                    name="midi_send_cc",
-                    description="Send a MIDI control change message",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "control": {
-                                "type": "integer",
-                                "description": "Control number (0-127)",
-                                "minimum": 0,
-                                "maximum": 127,
-                            },
-                            "value": {
-                                "type": "integer",
-                                "description": "Control value (0-127)",
-                                "minimum": 0,
-                                "maximum": 127,
-                            },
-                            "channel": {
-                                "type": "integer",
-                                "description": "MIDI channel (0-15)",
-                                "default": 0,
-                                "minimum": 0,
-                                "maximum": 15,
-                            },
-                        },
-                        "required": ["control", "value"],
-                    },
-                ),
-                Tool(
-                    name="midi_send_program_change",
-                    description="Send a MIDI program change message",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "program": {
-                                "type": "integer",
-                                "description": "Program number (0-127)",
-                                "minimum": 0,
-                                "maximum": 127,
-                            },
-                            "channel": {
-                                "type": "integer",
-                                "description": "MIDI channel (0-15)",
-                                "default": 0,
-                                "minimum": 0,
-                                "maximum": 15,
-                            },
-                        },
-                        "required": ["program"],
-                    },
-                ),
-                Tool(
-                    name="midi_send_pitch_bend",
-                    description="Send a MIDI pitch bend message",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "pitch": {
-                                "type": "integer",
-                                "description": "Pitch bend value (-8192 to 8191)",
-                                "minimum": -8192,
-                                "maximum": 8191,
-                            },
-                            "channel": {
-                                "type": "integer",
-                                "description": "MIDI channel (0-15)",
-                                "default": 0,
-                                "minimum": 0,
-                                "maximum": 15,
-                            },
-                        },
-                        "required": ["pitch"],
-                    },
-                ),
-            ]
-
-            # FL Studio tools (only if FL Studio is available)
-            if FL_STUDIO_AVAILABLE:
-                fl_tools = [
-                    # Transport controls
-                    Tool(
-                        name="transport_start",
-                        description="Start FL Studio playback",
-                        inputSchema={"type": "object", "properties": {}},
-                    ),
-                    Tool(
-                        name="transport_stop",
-                        description="Stop FL Studio playback",
-                        inputSchema={"type": "object", "properties": {}},
-                    ),
-                    Tool(
-                        name="transport_record",
-                        description="Toggle recording in FL Studio",
-                        inputSchema={"type": "object", "properties": {}},
-                    ),
-                    Tool(
-                        name="transport_get_song_pos",
-                        description="Get current song position",
-                        inputSchema={"type": "object", "properties": {}},
-                    ),
-                    Tool(
-                        name="transport_set_song_pos",
-                        description="Set song position",
-                        inputSchema={
-                            "type": "object",
-                            "properties": {
-                                "position": {
-                                    "type": "integer",
-                                    "description": "Song position in ticks",
-                                }
-                            },
-                            "required": ["position"],
-                        },
-                    ),
-                    # Mixer controls
-                    Tool(
-                        name="mixer_get_track_volume",
-                        description="Get mixer track volume",
-                        inputSchema={
-                            "type": "object",
-                            "properties": {
-                                "track_num": {
-                                    "type": "integer",
-                                    "description": "Mixer track number",
-                                }
-                            },
-                            "required": ["track_num"],
-                        },
-                    ),
-                    Tool(
-                        name="mixer_set_track_volume",
-                        description="Set mixer track volume",
-                        inputSchema={
-                            "type": "object",
-                            "properties": {
-                                "track_num": {
-                                    "type": "integer",
-                                    "description": "Mixer track number",
-                                },
-                                "volume": {
-                                    "type": "number",
-                                    "description": "Volume level (0.0-1.0)",
-                                },
-                            },
-                            "required": ["track_num", "volume"],
-                        },
-                    ),
-                    Tool(
-                        name="mixer_get_track_name",
-                        description="Get mixer track name",
-                        inputSchema={
-                            "type": "object",
-                            "properties": {
-                                "track_num": {
-                                    "type": "integer",
-                                    "description": "Mixer track number",
-                                }
-                            },
-                            "required": ["track_num"],
-                        },
-                    ),
-                    Tool(
-                        name="mixer_set_track_name",
-                        description="Set mixer track name",
-                        inputSchema={
-                            "type": "object",
-                            "properties": {
-                                "track_num": {
-                                    "type": "integer",
-                                    "description": "Mixer track number",
-                                },
-                                "name": {"type": "string", "description": "Track name"},
-                            },
-                            "required": ["track_num", "name"],
-                        },
-                    ),
-                    # Channel controls
-                    Tool(
-                        name="channels_channel_count",
-                        description="Get total number of channels",
-                        inputSchema={"type": "object", "properties": {}},
-                    ),
-                    Tool(
-                        name="channels_get_channel_name",
-                        description="Get channel name",
-                        inputSchema={
-                            "type": "object",
-                            "properties": {
-                                "channel_num": {
-                                    "type": "integer",
-                                    "description": "Channel number",
-                                }
-                            },
-                            "required": ["channel_num"],
-                        },
-                    ),
-                    Tool(
-                        name="channels_set_channel_volume",
-                        description="Set channel volume",
-                        inputSchema={
-                            "type": "object",
-                            "properties": {
-                                "channel_num": {
-                                    "type": "integer",
-                                    "description": "Channel number",
-                                },
-                                "volume": {
-                                    "type": "number",
-                                    "description": "Volume level (0.0-1.0)",
-                                },
-                            },
-                            "required": ["channel_num", "volume"],
-                        },
-                    ),
-                    Tool(
-                        name="channels_mute_channel",
-                        description="Mute or unmute a channel",
-                        inputSchema={
-                            "type": "object",
-                            "properties": {
-                                "channel_num": {
-                                    "type": "integer",
-                                    "description": "Channel number",
-                                },
-                                "mute": {
-                                    "type": "boolean",
-                                    "description": "True to mute, False to unmute",
-                                },
-                            },
-                            "required": ["channel_num", "mute"],
-                        },
-                    ),
-                    # Pattern controls
-                    Tool(
-                        name="patterns_pattern_count",
-                        description="Get total number of patterns",
-                        inputSchema={"type": "object", "properties": {}},
-                    ),
-                    Tool(
-                        name="patterns_get_pattern_name",
-                        description="Get pattern name",
-                        inputSchema={
-                            "type": "object",
-                            "properties": {
-                                "pattern_num": {
-                                    "type": "integer",
-                                    "description": "Pattern number",
-                                }
-                            },
-                            "required": ["pattern_num"],
-                        },
-                    ),
-                    Tool(
-                        name="patterns_set_pattern_name",
-                        description="Set pattern name",
-                        inputSchema={
-                            "type": "object",
-                            "properties": {
-                                "pattern_num": {
-                                    "type": "integer",
-                                    "description": "Pattern number",
-                                },
-                                "name": {"type": "string", "description": "Pattern name"},
-                            },
-                            "required": ["pattern_num", "name"],
-                        },
-                    ),
-                    # General controls
-                    Tool(
-                        name="general_get_project_title",
-                        description="Get the current project title",
-                        inputSchema={"type": "object", "properties": {}},
-                    ),
-                    Tool(
-                        name="general_get_version",
-                        description="Get FL Studio version",
-                        inputSchema={"type": "object", "properties": {}},
-                    ),
-                    # UI controls
-                    Tool(
-                        name="ui_show_window",
-                        description="Show a specific FL Studio window",
-                        inputSchema={
-                            "type": "object",
-                            "properties": {
-                                "window_id": {
-                                    "type": "integer",
-                                    "description": "Window ID to show",
-                                }
-                            },
-                            "required": ["window_id"],
-                        },
-                    ),
-                    # Playlist controls
-                    Tool(
-                        name="playlist_get_track_name",
-                        description="Get playlist track name",
-                        inputSchema={
-                            "type": "object",
-                            "properties": {
-                                "track_num": {
-                                    "type": "integer",
-                                    "description": "Playlist track number",
-                                }
-                            },
-                            "required": ["track_num"],
-                        },
-                    ),
-                ]
-                tools.extend(fl_tools)
-
-            return tools
+            return self.tools.list_tools(FL_STUDIO_AVAILABLE)
 
         @self.server.call_tool()
-        async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
-            """Execute a tool by name with given arguments."""
+        async def call_tool(
+            name: str, arguments: dict[str, Any]
+        ) -> list[TextContent] | tuple[list[TextContent], dict[str, Any]]:
+            """Execute a tool by name with given arguments.
+
+            Structured results are returned both as ``structuredContent`` and
+            as text rendered in the configured result format.
+            """
             try:
+                spec = self.tools.get(name)
+                if spec is None:
+                    raise ValueError(f"Unknown tool: {name}")
+
                 # Check if FL Studio tool is being called without FL Studio available
-                if not name.startswith("midi_") and not FL_STUDIO_AVAILABLE:
+                if spec.requires_fl and not FL_STUDIO_AVAILABLE:
                     return [
                         TextContent(
                             type="text",
@@ -513,12 +394,30 @@ class FLStudioMCPServer:
                         )
                     ]
 
-                result = await self._execute_tool(name, arguments)
+                result = await self._run_tool(spec, arguments)
+                if self.sessions is not None:
+                    self.sessions.record_call(self._http_session_id())
+                if isinstance(result, ToolResult):
+                    start = time.perf_counter_ns()
+                    text = result.render(self.result_format)
+                    self.metrics.serialize.record(time.perf_counter_ns() - start)
+                    return [TextContent(type="text", text=text)], result.data
                 return [TextContent(type="text", text=result)]
             except Exception as e:
                 logger.error(f"Error executing tool {name}: {e}")
+                if self.sessions is not None:
+                    self.sessions.record_call(self._http_session_id(), failed=True)
                 return [TextContent(type="text", text=f"Error: {e}")]
 
+    def _http_session_id(self) -> str | None:
+        """Get the HTTP session ID of the request being handled, if any."""
+        try:
+            request = self.server.request_context.request
+        except LookupError:
+            return None
+        headers = getattr(request, "headers", None)
+        return headers.get("mcp-session-id") if headers is not None else None
+
     async def _execute_tool(self, name: str, args: dict[str, Any]) -> str:
         """Execute a specific tool with arguments.
 
@@ -527,196 +426,1463 @@ class FLStudioMCPServer:
             args: Tool arguments
 
         Returns:
-            Result string
+            Result as prose, or JSON for results without a prose form
 
         Raises:
             ValueError: If tool name is unknown
         """
-        # MIDI Tools
-        if name == "midi_connect":
-            success = self.midi.connect()
-            return (
-                f"Connected to MIDI port: {self.midi.port_name}"
-                if success
-                else f"Failed to connect to MIDI port: {self.midi.port_name}"
-            )
-        elif name == "midi_disconnect":
-            self.midi.disconnect()
-            return f"Disconnected from MIDI port: {self.midi.port_name}"
-        elif name == "midi_list_ports":
-            ports = self.midi.list_ports()
-            return f"Available MIDI ports:\nInput: {ports['input']}\nOutput: {ports['output']}"
-        elif name == "midi_send_note":
-            note = args["note"]
-            velocity = args.get("velocity", 64)
-            duration = args.get("duration", 0.5)
-            channel = args.get("channel", 0)
-
-            self.midi.send_note_on(note, velocity, channel)
-            await asyncio.sleep(duration)
-            self.midi.send_note_off(note, velocity, channel)
-            return f"Sent MIDI note {note} with velocity {velocity} for {duration}s on channel {channel}"
-        elif name == "midi_send_note_on":
-            note = args["note"]
-            velocity = args.get("velocity", 64)
-            channel = args.get("channel", 0)
-            success = self.midi.send_note_on(note, velocity, channel)
-            return (
-                f"Sent MIDI note_on: note={note}, velocity={velocity}, channel={channel}"
-                if success
-                else f"Failed to send MIDI note_on: note={note}"
-            )
-        elif name == "midi_send_note_off":
-            note = args["note"]
-            velocity = args.get("velocity", 64)
-            channel = args.get("channel", 0)
-            success = self.midi.send_note_off(note, velocity, channel)
-            return (
-                f"Sent MIDI note_off: note={note}, velocity={velocity}, channel={channel}"
-                if success
-                else f"Failed to send MIDI note_off: note={note}"
+        spec = self.tools.get(name)
+        if spec is None:
+            raise ValueError(f"Unknown tool: {name}")
+        result = await self._run_tool(spec, args)
+        return result.to_text() if isinstance(result, ToolResult) else result
+
+    async def _run_tool(self, spec: ToolSpec, args: dict[str, Any]) -> ToolResult | str:
+        """Run a resolved tool.
+
+        Calls touching the same resource, such as one MIDI channel or mixer
+        track, run one at a time in arrival order; other calls run
+        concurrently. The call's latency, including waiting for locks, and
+        whether it failed are recorded in ``self.metrics``.
+
+        Args:
+            spec: Tool spec returned by the registry
+            args: Tool arguments
+
+        Returns:
+            Structured result or plain text, as returned by the handler
+        """
+        start = time.perf_counter_ns()
+        failed = True
+        try:
+            if spec.resources is None:
+                result = await spec.handler(args)
+            else:
+                async with self.locks.hold(spec.resources(args)):
+                    result = await spec.handler(args)
+            failed = False
+            return result
+        finally:
+            self.metrics.record_tool(spec.name, time.perf_counter_ns() - start, failed)
+
+    async def _fl_get(self, key: StateKey, name: str, func: Any, *args: Any) -> Any:
+        """Call an FL Studio getter through the state cache.
+
+        Args:
+            key: State cache key of the value
+            name: API call name, e.g. ``mixer.getTrackVolume``
+            func: API function
+            *args: Arguments for ``func``
+
+        Returns:
+            Cached or current value
+        """
+        return await self.state.read(key, lambda: self.fl.call(name, func, *args))
+
+    async def _fl_set(self, key: StateKey, name: str, func: Any, *args: Any) -> None:
+        """Call an FL Studio setter and invalidate the cached value it changes.
+
+        Args:
+            key: State cache key of the changed value
+            name: API call name, e.g. ``mixer.setTrackVolume``
+            func: API function
+            *args: Arguments for ``func``
+        """
+        try:
+            await self.fl.call(name, func, *args)
+        finally:
+            self.state.invalidate(*key)
+
+    async def _apply_writes(
+        self, kind: str, field: str, name: str, setter: Any, values: dict[int, Any]
+    ) -> None:
+        """Apply coalesced writes to many FL Studio objects in one executor call.
+
+        The calls that made the writes hold the objects' resources until the
+        writes are applied, so no lock is taken here. Cached values are
+        invalidated afterwards.
+
+        Args:
+            kind: Resource and state cache object type, e.g. ``mixer_track``
+            field: State cache field written, e.g. ``volume``
+            name: API call name the latency is recorded under
+            setter: API function called with each object index and value
+            values: Object index to value
+        """
+
+        def apply() -> None:
+            for index, value in values.items():
+                setter(index, value)
+
+        try:
+            await self.fl.call(name, apply)
+        finally:
+            for index in values:
+                self.state.invalidate(kind, index, field)
+
+    async def _set_volumes(
+        self, coalescer: WriteCoalescer, pairs: list[dict[str, Any]], label: str
+    ) -> ToolResult:
+        """Write index and volume pairs through a coalescer.
+
+        Args:
+            coalescer: Coalescer of the object type
+            pairs: ``index`` and ``volume`` pairs from the tool arguments
+            label: Object type in the result message, e.g. ``mixer track``
+
+        Returns:
+            Result with the pairs requested, applied and coalesced away
+        """
+        applied = await coalescer.write({pair["index"]: pair["volume"] for pair in pairs})
+        return ToolResult(
+            {"requested": len(pairs), "applied": applied, "coalesced": len(pairs) - applied},
+            f"Set {{applied}} {label} volumes ({{coalesced}} coalesced)",
+        )
+
+    async def _snapshot(
+        self,
+        kind: str,
+        name: str,
+        count: Any,
+        getters: dict[str, Any],
+        args: dict[str, Any],
+        first: int = 0,
+    ) -> ToolResult:
+        """Read many FL Studio objects in one executor call.
+
+        The values read are also stored in the state cache.
+
+        Args:
+            kind: State cache object type, e.g. ``mixer_track``
+            name: API call name the latency is recorded under
+            count: API function returning the number of objects
+            getters: API function per field, called with the object index
+            args: Tool arguments with optional ``start``, ``limit`` and ``fields``
+            first: Index of the first object
+
+        Returns:
+            Result with the total object count and the requested items
+
+        Raises:
+            ValueError: If an unknown field is requested
+        """
+        fields = args.get("fields") or list(getters)
+        unknown = [f for f in fields if f not in getters]
+        if unknown:
+            raise ValueError(f"Unknown fields {unknown}, expected some of {list(getters)}")
+        start = args.get("start", first)
+        limit = args.get("limit")
+
+        def collect() -> tuple[int, list[tuple[int, list[Any]]]]:
+            total = count()
+            stop = first + total if limit is None else min(first + total, start + limit)
+            return total, [(i, [getters[f](i) for f in fields]) for i in range(start, stop)]
+
+        total, rows = await self.fl.call(name, collect)
+        self.state.put((kind, None, "count"), total)
+        items = []
+        for index, values in rows:
+            item: dict[str, Any] = {"index": index}
+            for field, value in zip(fields, values):
+                item[field] = value
+                self.state.put((kind, index, field), value)
+            items.append(item)
+        return ToolResult({"total": total, "items": items})
+
+    def _midi_for(self, args: dict[str, Any]) -> MIDIInterface:
+        """Get the MIDI interface for a tool's optional ``port`` argument.
+
+        Ports other than the default one are opened on first use.
+        """
+        return self.midi_pool.get(args.get("port"))
+
+    # MIDI Tools (always available)
+
+    @tool(
+        "midi_connect",
+        "Connect to MIDI port",
+        object_schema({"port": PORT_PARAM}),
+        requires_fl=False,
+        resources=resource("midi", "port"),
+    )
+    async def _tool_midi_connect(self, args: dict[str, Any]) -> ToolResult:
+        midi = self.midi_pool.get(args.get("port"), connect=False)
+        success = midi.connect()
+        return ToolResult(
+            {"port": midi.port_name, "connected": success},
+            "Connected to MIDI port: {port}"
+            if success
+            else "Failed to connect to MIDI port: {port}",
+        )
+
+    @tool(
+        "midi_disconnect",
+        "Disconnect from MIDI port",
+        object_schema({"port": PORT_PARAM}),
+        requires_fl=False,
+        resources=resource("midi", "port"),
+    )
+    async def _tool_midi_disconnect(self, args: dict[str, Any]) -> ToolResult:
+        port = args.get("port")
+        # Joining the sequencer, recorder and writer threads may take a moment
+        await asyncio.to_thread(self.midi_pool.release, port)
+        return ToolResult(
+            {"port": port or self.midi.port_name, "connected": False},
+            "Disconnected from MIDI port: {port}",
+        )
+
+    @tool(
+        "midi_list_ports",
+        "List available MIDI input and output ports",
+        object_schema(
+            {
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Enumerate ports now instead of using the cached listing",
+                    "default": False,
+                }
+            }
+        ),
+        requires_fl=False,
+    )
+    async def _tool_midi_list_ports(self, args: dict[str, Any]) -> ToolResult:
+        ports = self.midi.list_ports(refresh=args.get("refresh", False))
+        return ToolResult(
+            {"input": ports["input"], "output": ports["output"]},
+            "Available MIDI ports:\nInput: {input}\nOutput: {output}",
+        )
+
+    @tool(
+        "midi_send_note",
+        "Send a MIDI note with specified duration",
+        object_schema(
+            {
+                "note": NOTE_PARAM,
+                "velocity": VELOCITY_PARAM,
+                "duration": {
+                    "type": "number",
+                    "description": "Note duration in seconds",
+                    "default": 0.5,
+                    "minimum": 0,
+                },
+                "channel": CHANNEL_PARAM,
+                "port": PORT_PARAM,
+            },
+            required=["note"],
+        ),
+        requires_fl=False,
+        resources=midi_resources,
+    )
+    async def _tool_midi_send_note(self, args: dict[str, Any]) -> ToolResult:
+        midi = self._midi_for(args)
+        note = args["note"]
+        velocity = args.get("velocity", 64)
+        duration = args.get("duration", 0.5)
+        channel = args.get("channel", 0)
+
+        # The note off is scheduled on the event loop so the call returns immediately
+        if not midi.send_note_on(note, velocity, channel):
+            return ToolResult(
+                {"sent": False, "note": note}, "Failed to send MIDI note: note={note}"
             )
-        elif name == "midi_send_cc":
-            control = args["control"]
-            value = args["value"]
-            channel = args.get("channel", 0)
-            success = self.midi.send_control_change(control, value, channel)
-            return (
-                f"Sent MIDI CC: control={control}, value={value}, channel={channel}"
-                if success
-                else f"Failed to send MIDI CC: control={control}"
+        midi.schedule_note_off(note, velocity, channel, duration)
+        return ToolResult(
+            {
+                "sent": True,
+                "note": note,
+                "velocity": velocity,
+                "duration": duration,
+                "channel": channel,
+            },
+            "Sent MIDI note {note} with velocity {velocity} for {duration}s on channel {channel}",
+        )
+
+    @tool(
+        "midi_send_note_on",
+        "Send a MIDI note on message",
+        object_schema(
+            {
+                "note": NOTE_PARAM,
+                "velocity": VELOCITY_PARAM,
+                "channel": CHANNEL_PARAM,
+                "port": PORT_PARAM,
+            },
+            required=["note"],
+        ),
+        requires_fl=False,
+        resources=midi_resources,
+    )
+    async def _tool_midi_send_note_on(self, args: dict[str, Any]) -> ToolResult:
+        midi = self._midi_for(args)
+        note = args["note"]
+        velocity = args.get("velocity", 64)
+        channel = args.get("channel", 0)
+        success = midi.send_note_on(note, velocity, channel)
+        return ToolResult(
+            {"sent": success, "note": note, "velocity": velocity, "channel": channel},
+            "Sent MIDI note_on: note={note}, velocity={velocity}, channel={channel}"
+            if success
+            else "Failed to send MIDI note_on: note={note}",
+        )
+
+    @tool(
+        "midi_send_note_off",
+        "Send a MIDI note off message",
+        object_schema(
+            {
+                "note": NOTE_PARAM,
+                "velocity": VELOCITY_PARAM,
+                "channel": CHANNEL_PARAM,
+                "port": PORT_PARAM,
+            },
+            required=["note"],
+        ),
+        requires_fl=False,
+        resources=midi_resources,
+    )
+    async def _tool_midi_send_note_off(self, args: dict[str, Any]) -> ToolResult:
+        midi = self._midi_for(args)
+        note = args["note"]
+        velocity = args.get("velocity", 64)
+        channel = args.get("channel", 0)
+        success = midi.send_note_off(note, velocity, channel)
+        return ToolResult(
+            {"sent": success, "note": note, "velocity": velocity, "channel": channel},
+            "Sent MIDI note_off: note={note}, velocity={velocity}, channel={channel}"
+            if success
+            else "Failed to send MIDI note_off: note={note}",
+        )
+
+    @tool(
+        "midi_send_cc",
+        "Send a MIDI control change message",
+        object_schema(
+            {
+                "control": {
+                    "type": "integer",
+                    "description": "Control number (0-127)",
+                    "minimum": 0,
+                    "maximum": 127,
+                },
+                "value": {
+                    "type": "integer",
+                    "description": "Control value (0-127)",
+                    "minimum": 0,
+                    "maximum": 127,
+                },
+                "channel": CHANNEL_PARAM,
+                "port": PORT_PARAM,
+            },
+            required=["control", "value"],
+        ),
+        requires_fl=False,
+        resources=midi_resources,
+    )
+    async def _tool_midi_send_cc(self, args: dict[str, Any]) -> ToolResult:
+        midi = self._midi_for(args)
+        control = args["control"]
+        value = args["value"]
+        channel = args.get("channel", 0)
+        success = midi.send_control_change(control, value, channel)
+        return ToolResult(
+            {"sent": success, "control": control, "value": value, "channel": channel},
+            "Sent MIDI CC: control={control}, value={value}, channel={channel}"
+            if success
+            else "Failed to send MIDI CC: control={control}",
+        )
+
+    @tool(
+        "midi_send_program_change",
+        "Send a MIDI program change message",
+        object_schema(
+            {
+                "program": {
+                    "type": "integer",
+                    "description": "Program number (0-127)",
+                    "minimum": 0,
+                    "maximum": 127,
+                },
+                "channel": CHANNEL_PARAM,
+                "port": PORT_PARAM,
+            },
+            required=["program"],
+        ),
+        requires_fl=False,
+        resources=midi_resources,
+    )
+    async def _tool_midi_send_program_change(self, args: dict[str, Any]) -> ToolResult:
+        midi = self._midi_for(args)
+        program = args["program"]
+        channel = args.get("channel", 0)
+        success = midi.send_program_change(program, channel)
+        return ToolResult(
+            {"sent": success, "program": program, "channel": channel},
+            "Sent MIDI program change: program={program}, channel={channel}"
+            if success
+            else "Failed to send MIDI program change: program={program}",
+        )
+
+    @tool(
+        "midi_send_pitch_bend",
+        "Send a MIDI pitch bend message",
+        object_schema(
+            {
+                "pitch": {
+                    "type": "integer",
+                    "description": "Pitch bend value (-8192 to 8191)",
+                    "minimum": -8192,
+                    "maximum": 8191,
+                },
+                "channel": CHANNEL_PARAM,
+                "port": PORT_PARAM,
+            },
+            required=["pitch"],
+        ),
+        requires_fl=False,
+        resources=midi_resources,
+    )
+    async def _tool_midi_send_pitch_bend(self, args: dict[str, Any]) -> ToolResult:
+        midi = self._midi_for(args)
+        pitch = args["pitch"]
+        channel = args.get("channel", 0)
+        success = midi.send_pitch_bend(pitch, channel)
+        return ToolResult(
+            {"sent": success, "pitch": pitch, "channel": channel},
+            "Sent MIDI pitch bend: pitch={pitch}, channel={channel}"
+            if success
+            else "Failed to send MIDI pitch bend: pitch={pitch}",
+        )
+
+    @tool(
+        "midi_send_batch",
+        "Send many MIDI events in one call, optionally with per-event time offsets",
+        object_schema(
+            {
+                "events": {
+                    "type": "array",
+                    "description": "MIDI events to send",
+                    "minItems": 1,
+                    "maxItems": MAX_BATCH_EVENTS,
+                    "items": BATCH_EVENT_SCHEMA,
+                },
+                "port": PORT_PARAM,
+            },
+            required=["events"],
+        ),
+        requires_fl=False,
+        resources=midi_resources,
+    )
+    async def _tool_midi_send_batch(self, args: dict[str, Any]) -> ToolResult:
+        midi = self._midi_for(args)
+        events = args["events"]
+        if len(events) > MAX_BATCH_EVENTS:
+            raise ValueError(f"Batch exceeds {MAX_BATCH_EVENTS} events")
+        success = midi.send_batch(events)
+        scheduled = sum(1 for event in events if event.get("time", 0))
+        return ToolResult(
+            {"sent": success, "events": len(events), "scheduled": scheduled},
+            "Sent MIDI batch: {events} events ({scheduled} scheduled)"
+            if success
+            else "Failed to send MIDI batch of {events} events",
+        )
+
+    @tool(
+        "midi_play_sequence",
+        "Play a phrase of MIDI events with precise server-side timing",
+        object_schema(
+            {
+                "events": {
+                    "type": "array",
+                    "description": "MIDI events with time or tick offsets",
+                    "minItems": 1,
+                    "maxItems": MAX_BATCH_EVENTS,
+                    "items": SEQUENCE_EVENT_SCHEMA,
+                },
+                "tempo": {
+                    "type": "number",
+                    "description": "Tempo in BPM for tick offsets",
+                    "default": 120,
+                    "exclusiveMinimum": 0,
+                },
+                "ppq": {
+                    "type": "integer",
+                    "description": "Ticks per quarter note",
+                    "default": 480,
+                    "minimum": 1,
+                },
+                "wait": {
+                    "type": "boolean",
+                    "description": "Return once the phrase has played, with its timing jitter",
+                    "default": False,
+                },
+                "port": PORT_PARAM,
+            },
+            required=["events"],
+        ),
+        requires_fl=False,
+        resources=midi_resources,
+    )
+    async def _tool_midi_play_sequence(self, args: dict[str, Any]) -> ToolResult:
+        midi = self._midi_for(args)
+        events = args["events"]
+        if len(events) > MAX_BATCH_EVENTS:
+            raise ValueError(f"Sequence exceeds {MAX_BATCH_EVENTS} events")
+        player = midi.play_sequence(events, args.get("tempo", 120.0), args.get("ppq", 480))
+        if player is None:
+            return ToolResult(
+                {"started": False, "events": len(events)},
+                "Failed to play MIDI sequence of {events} events",
             )
-        elif name == "midi_send_program_change":
-            program = args["program"]
-            channel = args.get("channel", 0)
-            success = self.midi.send_program_change(program, channel)
-            return (
-                f"Sent MIDI program change: program={program}, channel={channel}"
-                if success
-                else f"Failed to send MIDI program change: program={program}"
+        if args.get("wait", False):
+            await player.wait()
+            return ToolResult(
+                {"started": True, "events": len(events), **player.summary()},
+                lambda data: (
+                    f"Played MIDI sequence {data['id']}: {data['events']} events, "
+                    f"timing p50={data['timing']['p50_us']}us "
+                    f"p99={data['timing']['p99_us']}us max={data['timing']['max_us']}us"
+                ),
             )
-        elif name == "midi_send_pitch_bend":
-            pitch = args["pitch"]
-            channel = args.get("channel", 0)
-            success = self.midi.send_pitch_bend(pitch, channel)
-            return (
-                f"Sent MIDI pitch bend: pitch={pitch}, channel={channel}"
-                if success
-                else f"Failed to send MIDI pitch bend: pitch={pitch}"
+        return ToolResult(
+            {"started": True, "events": len(events), "id": player.id},
+            "Playing MIDI sequence {id}: {events} events",
+        )
+
+    @tool(
+        "midi_play_file",
+        "Play a Standard MIDI File (.mid) in the background with precise timing",
+        object_schema(
+            {
+                "path": {"type": "string", "description": "Path of the .mid file"},
+                "start": {
+                    "type": "number",
+                    "description": "Seconds into the file to start from",
+                    "default": 0,
+                    "minimum": 0,
+                },
+                "loop": {
+                    "type": "boolean",
+                    "description": "Repeat from start after the end of the file",
+                    "default": False,
+                },
+                "tempo_scale": {
+                    "type": "number",
+                    "description": "Playback speed, 2 plays twice as fast",
+                    "default": 1,
+                    "exclusiveMinimum": 0,
+                },
+                "port": PORT_PARAM,
+            },
+            required=["path"],
+        ),
+        requires_fl=False,
+        resources=resource("midi", "port"),
+    )
+    async def _tool_midi_play_file(self, args: dict[str, Any]) -> ToolResult:
+        midi = self._midi_for(args)
+        path = args["path"]
+        player = midi.play_file(
+            path, args.get("start", 0.0), args.get("loop", False), args.get("tempo_scale", 1.0)
+        )
+        if player is None:
+            return ToolResult({"started": False, "path": path}, "Failed to play MIDI file: {path}")
+        return ToolResult(
+            {"started": True, "path": path, "id": player.id}, "Playing MIDI file {id}: {path}"
+        )
+
+    @tool(
+        "midi_stop_playback",
+        "Stop MIDI sequences and files that are playing and silence their notes",
+        object_schema({"id": PLAYBACK_ID_PARAM, "port": PORT_PARAM}),
+        requires_fl=False,
+    )
+    async def _tool_midi_stop_playback(self, args: dict[str, Any]) -> ToolResult:
+        midi = self._midi_for(args)
+        # Joining the sequencer threads may take a moment
+        stopped = await asyncio.to_thread(midi.stop_playback, args.get("id"))
+        return ToolResult({"stopped": stopped}, "Stopped MIDI playback: {stopped}")
+
+    @tool(
+        "midi_pause_playback",
+        "Pause MIDI sequences and files that are playing and silence their notes",
+        object_schema({"id": PLAYBACK_ID_PARAM, "port": PORT_PARAM}),
+        requires_fl=False,
+    )
+    async def _tool_midi_pause_playback(self, args: dict[str, Any]) -> ToolResult:
+        paused = self._midi_for(args).pause_playback(args.get("id"))
+        return ToolResult({"paused": paused}, "Paused MIDI playback: {paused}")
+
+    @tool(
+        "midi_resume_playback",
+        "Resume paused MIDI sequences and files",
+        object_schema({"id": PLAYBACK_ID_PARAM, "port": PORT_PARAM}),
+        requires_fl=False,
+    )
+    async def _tool_midi_resume_playback(self, args: dict[str, Any]) -> ToolResult:
+        resumed = self._midi_for(args).resume_playback(args.get("id"))
+        return ToolResult({"resumed": resumed}, "Resumed MIDI playback: {resumed}")
+
+    @tool(
+        "midi_get_input_events",
+        "Get recently received MIDI input events, oldest first",
+        object_schema(
+            {
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of events, the most recent are returned",
+                    "minimum": 1,
+                },
+                "types": {
+                    "type": "array",
+                    "description": "Only include these message types, e.g. note_on",
+                    "items": {"type": "string"},
+                },
+                "channels": {
+                    "type": "array",
+                    "description": "Only include these MIDI channels (0-15)",
+                    "items": {"type": "integer", "minimum": 0, "maximum": 15},
+                },
+                "since": {
+                    "type": "number",
+                    "description": "Only include events received after this Unix timestamp",
+                },
+                "port": PORT_PARAM,
+            }
+        ),
+        requires_fl=False,
+    )
+    async def _tool_midi_get_input_events(self, args: dict[str, Any]) -> ToolResult:
+        midi = self._midi_for(args)
+        events = midi.recent_input_events(
+            limit=args.get("limit"),
+            types=args.get("types"),
+            channels=args.get("channels"),
+            since=args.get("since"),
+        )
+        if not events:
+            return ToolResult({"events": []}, "No MIDI input events received")
+        return ToolResult(
+            {"events": [e.to_dict() for e in events]},
+            lambda _data: (
+                f"MIDI input events ({len(events)}):\n" + "\n".join(str(e) for e in events)
+            ),
+        )
+
+    @tool(
+        "midi_record_start",
+        "Record received MIDI input to a Standard MIDI File (.mid), written as it arrives",
+        object_schema(
+            {
+                "path": {"type": "string", "description": "Path of the .mid file to create"},
+                "tempo": {
+                    "type": "number",
+                    "description": "Tempo in BPM for converting arrival times to ticks",
+                    "default": 120,
+                    "exclusiveMinimum": 0,
+                },
+                "ppq": {
+                    "type": "integer",
+                    "description": "Ticks per quarter note",
+                    "default": 480,
+                    "minimum": 1,
+                    "maximum": 32767,
+                },
+                "port": PORT_PARAM,
+            },
+            required=["path"],
+        ),
+        requires_fl=False,
+    )
+    async def _tool_midi_record_start(self, args: dict[str, Any]) -> ToolResult:
+        midi = self._midi_for(args)
+        path = args["path"]
+        recorder = midi.start_recording(path, args.get("tempo", 120.0), args.get("ppq", 480))
+        if recorder is None:
+            return ToolResult(
+                {"started": False, "path": path}, "Failed to record MIDI input to: {path}"
             )
+        return ToolResult(
+            {"started": True, "path": path, "id": recorder.id},
+            "Recording MIDI input {id} to: {path}",
+        )
 
-        # FL Studio Transport Tools
-        elif name == "transport_start":
-            transport.start()
-            return "FL Studio playback started"
-        elif name == "transport_stop":
-            transport.stop()
-            return "FL Studio playback stopped"
-        elif name == "transport_record":
-            transport.record()
-            return "FL Studio recording toggled"
-        elif name == "transport_get_song_pos":
-            pos = transport.getSongPos()
-            return f"Current song position: {pos}"
-        elif name == "transport_set_song_pos":
-            position = args["position"]
-            transport.setSongPos(position)
-            return f"Song position set to: {position}"
-
-        # FL Studio Mixer Tools
-        elif name == "mixer_get_track_volume":
-            track_num = args["track_num"]
-            volume = mixer.getTrackVolume(track_num)
-            return f"Track {track_num} volume: {volume}"
-        elif name == "mixer_set_track_volume":
-            track_num = args["track_num"]
-            volume = args["volume"]
-            mixer.setTrackVolume(track_num, volume)
-            return f"Track {track_num} volume set to: {volume}"
-        elif name == "mixer_get_track_name":
-            track_num = args["track_num"]
-            name_str = mixer.getTrackName(track_num)
-            return f"Track {track_num} name: {name_str}"
-        elif name == "mixer_set_track_name":
-            track_num = args["track_num"]
-            name_str = args["name"]
-            mixer.setTrackName(track_num, name_str)
-            return f"Track {track_num} name set to: {name_str}"
-
-        # FL Studio Channel Tools
-        elif name == "channels_channel_count":
-            count = channels.channelCount()
-            return f"Total channels: {count}"
-        elif name == "channels_get_channel_name":
-            channel_num = args["channel_num"]
-            name_str = channels.getChannelName(channel_num)
-            return f"Channel {channel_num} name: {name_str}"
-        elif name == "channels_set_channel_volume":
-            channel_num = args["channel_num"]
-            volume = args["volume"]
-            channels.setChannelVolume(channel_num, volume)
-            return f"Channel {channel_num} volume set to: {volume}"
-        elif name == "channels_mute_channel":
-            channel_num = args["channel_num"]
-            mute = args["mute"]
-            channels.muteChannel(channel_num, mute)
-            return f"Channel {channel_num} {'muted' if mute else 'unmuted'}"
-
-        # FL Studio Pattern Tools
-        elif name == "patterns_pattern_count":
-            count = patterns.patternCount()
-            return f"Total patterns: {count}"
-        elif name == "patterns_get_pattern_name":
-            pattern_num = args["pattern_num"]
-            name_str = patterns.getPatternName(pattern_num)
-            return f"Pattern {pattern_num} name: {name_str}"
-        elif name == "patterns_set_pattern_name":
-            pattern_num = args["pattern_num"]
-            name_str = args["name"]
-            patterns.setPatternName(pattern_num, name_str)
-            return f"Pattern {pattern_num} name set to: {name_str}"
-
-        # FL Studio General Tools
-        elif name == "general_get_project_title":
-            title = general.getProjectTitle()
-            return f"Project title: {title}"
-        elif name == "general_get_version":
-            version = general.getVersion()
-            return f"FL Studio version: {version}"
-
-        # FL Studio UI Tools
-        elif name == "ui_show_window":
-            window_id = args["window_id"]
-            ui.showWindow(window_id)
-            return f"Showing window: {window_id}"
-
-        # FL Studio Playlist Tools
-        elif name == "playlist_get_track_name":
-            track_num = args["track_num"]
-            name_str = playlist.getTrackName(track_num)
-            return f"Playlist track {track_num} name: {name_str}"
-
-        else:
-            raise ValueError(f"Unknown tool: {name}")
+    @tool(
+        "midi_record_stop",
+        "Stop recording MIDI input and finish the .mid files",
+        object_schema({"id": RECORDING_ID_PARAM, "port": PORT_PARAM}),
+        requires_fl=False,
+    )
+    async def _tool_midi_record_stop(self, args: dict[str, Any]) -> ToolResult:
+        midi = self._midi_for(args)
+        # Writing the last events and closing the files may take a moment
+        stopped = await asyncio.to_thread(midi.stop_recording, args.get("id"))
+        return ToolResult(
+            {"stopped": stopped},
+            lambda data: (
+                "\n".join(
+                    f"Stopped MIDI recording {r['id']}: {r['events']} events, "
+                    f"{r['seconds']}s written to {r['path']}"
+                    for r in data["stopped"]
+                )
+                or "No MIDI recordings to stop"
+            ),
+        )
+
+    # Server Diagnostics Tools (always available)
+
+    @tool(
+        "server_get_metrics",
+        "Get tool latency percentiles, call and error counts, and MIDI throughput",
+        object_schema(
+            {
+                "format": {
+                    "type": "string",
+                    "enum": ["json", "prometheus"],
+                    "description": "JSON, or the Prometheus text exposition format",
+                    "default": "json",
+                }
+            }
+        ),
+        requires_fl=False,
+    )
+    async def _tool_server_get_metrics(self, args: dict[str, Any]) -> ToolResult | str:
+        if args.get("format") == "prometheus":
+            return self.prometheus_metrics()
+        return ToolResult(self.metrics_summary())
+
+    @tool(
+        "server_export_trace",
+        "Write profiling spans recorded so far as Chrome trace-event JSON",
+        object_schema(
+            {
+                "path": {
+                    "type": "string",
+                    "description": "File to write; the configured trace file if omitted",
+                }
+            }
+        ),
+        requires_fl=False,
+    )
+    async def _tool_server_export_trace(self, args: dict[str, Any]) -> ToolResult:
+        tracer = self.tracer
+        if tracer is None:
+            return ToolResult({"exported": False}, "Profiling is not enabled")
+        path = args.get("path") or tracer.path
+        if not path:
+            return ToolResult({"exported": False}, "No trace file path given")
+        count = await asyncio.to_thread(self._export_trace, tracer, path)
+        if count is None:
+            return ToolResult({"exported": False, "path": path}, "Failed to write trace: {path}")
+        return ToolResult(
+            {"exported": True, "path": path, "spans": count, **tracer.stats()},
+            "Wrote {spans} trace spans to {path}",
+        )
+
+    # FL Studio Transport Tools
+
+    @tool("transport_start", "Start FL Studio playback", resources=resource("transport"))
+    async def _tool_transport_start(self, _args: dict[str, Any]) -> ToolResult:
+        await self.fl.call("transport.start", transport.start)
+        return ToolResult({"playing": True}, "FL Studio playback started")
+
+    @tool("transport_stop", "Stop FL Studio playback", resources=resource("transport"))
+    async def _tool_transport_stop(self, _args: dict[str, Any]) -> ToolResult:
+        await self.fl.call("transport.stop", transport.stop)
+        return ToolResult({"playing": False}, "FL Studio playback stopped")
+
+    @tool("transport_record", "Toggle recording in FL Studio", resources=resource("transport"))
+    async def _tool_transport_record(self, _args: dict[str, Any]) -> ToolResult:
+        await self.fl.call("transport.record", transport.record)
+        return ToolResult({"recording_toggled": True}, "FL Studio recording toggled")
+
+    @tool("transport_get_song_pos", "Get current song position", resources=resource("transport"))
+    async def _tool_transport_get_song_pos(self, _args: dict[str, Any]) -> ToolResult:
+        pos = await self.fl.call("transport.getSongPos", transport.getSongPos)
+        return ToolResult({"position": pos}, "Current song position: {position}")
+
+    @tool(
+        "transport_set_song_pos",
+        "Set song position",
+        object_schema(
+            {"position": {"type": "integer", "description": "Song position in ticks"}},
+            required=["position"],
+        ),
+        resources=resource("transport"),
+    )
+    async def _tool_transport_set_song_pos(self, args: dict[str, Any]) -> ToolResult:
+        position = args["position"]
+        await self.fl.call("transport.setSongPos", transport.setSongPos, position)
+        return ToolResult({"position": position}, "Song position set to: {position}")
+
+    # FL Studio Mixer Tools
+
+    @tool(
+        "mixer_get_track_volume",
+        "Get mixer track volume",
+        object_schema({"track_num": MIXER_TRACK_PARAM}, required=["track_num"]),
+        resources=resource("mixer_track", "track_num"),
+    )
+    async def _tool_mixer_get_track_volume(self, args: dict[str, Any]) -> ToolResult:
+        track_num = args["track_num"]
+        volume = await self._fl_get(
+            ("mixer_track", track_num, "volume"),
+            "mixer.getTrackVolume",
+            mixer.getTrackVolume,
+            track_num,
+        )
+        return ToolResult({"track": track_num, "volume": volume}, "Track {track} volume: {volume}")
 
-    async def run(self) -> None:
-        """Run the MCP server using stdio transport."""
+    @tool(
+        "mixer_set_track_volume",
+        "Set mixer track volume",
+        object_schema(
+            {"track_num": MIXER_TRACK_PARAM, "volume": VOLUME_PARAM},
+            required=["track_num", "volume"],
+        ),
+        resources=resource("mixer_track", "track_num"),
+    )
+    async def _tool_mixer_set_track_volume(self, args: dict[str, Any]) -> ToolResult:
+        track_num = args["track_num"]
+        volume = args["volume"]
+        await self._fl_set(
+            ("mixer_track", track_num, "volume"),
+            "mixer.setTrackVolume",
+            mixer.setTrackVolume,
+            track_num,
+            volume,
+        )
+        return ToolResult(
+            {"track": track_num, "volume": volume}, "Track {track} volume set to: {volume}"
+        )
+
+    @tool(
+        "mixer_get_track_name",
+        "Get mixer track name",
+        object_schema({"track_num": MIXER_TRACK_PARAM}, required=["track_num"]),
+        resources=resource("mixer_track", "track_num"),
+    )
+    async def _tool_mixer_get_track_name(self, args: dict[str, Any]) -> ToolResult:
+        track_num = args["track_num"]
+        name_str = await self._fl_get(
+            ("mixer_track", track_num, "name"), "mixer.getTrackName", mixer.getTrackName, track_num
+        )
+        return ToolResult({"track": track_num, "name": name_str}, "Track {track} name: {name}")
+
+    @tool(
+        "mixer_set_track_name",
+        "Set mixer track name",
+        object_schema(
+            {
+                "track_num": MIXER_TRACK_PARAM,
+                "name": {"type": "string", "description": "Track name"},
+            },
+            required=["track_num", "name"],
+        ),
+        resources=resource("mixer_track", "track_num"),
+    )
+    async def _tool_mixer_set_track_name(self, args: dict[str, Any]) -> ToolResult:
+        track_num = args["track_num"]
+        name_str = args["name"]
+        await self._fl_set(
+            ("mixer_track", track_num, "name"),
+            "mixer.setTrackName",
+            mixer.setTrackName,
+            track_num,
+            name_str,
+        )
+        return ToolResult(
+            {"track": track_num, "name": name_str}, "Track {track} name set to: {name}"
+        )
+
+    @tool(
+        "mixer_get_all_tracks",
+        "Get name, volume, pan and mute state of many mixer tracks in one call",
+        snapshot_schema(MIXER_FIELDS),
+        resources=resource("mixer_track"),
+    )
+    async def _tool_mixer_get_all_tracks(self, args: dict[str, Any]) -> ToolResult:
+        getters = {
+            "name": mixer.getTrackName,
+            "volume": mixer.getTrackVolume,
+            "pan": mixer.getTrackPan,
+            "muted": mixer.isTrackMuted,
+        }
+        return await self._snapshot(
+            "mixer_track", "mixer.snapshot", mixer.trackCount, getters, args
+        )
+
+    @tool(
+        "mixer_set_volumes",
+        "Set the volumes of many mixer tracks in one call; repeated writes to a track "
+        "within the flush window are coalesced and only the last value is applied",
+        volumes_schema("Mixer track number"),
+        resources=coalesced_resources("mixer_track"),
+    )
+    async def _tool_mixer_set_volumes(self, args: dict[str, Any]) -> ToolResult:
+        return await self._set_volumes(self.mixer_volumes, args["volumes"], "mixer track")
+
+    # FL Studio Channel Tools
+
+    @tool("channels_channel_count", "Get total number of channels", resources=resource("channel"))
+    async def _tool_channels_channel_count(self, _args: dict[str, Any]) -> ToolResult:
+        count = await self._fl_get(
+            ("channel", None, "count"), "channels.channelCount", channels.channelCount
+        )
+        return ToolResult({"count": count}, "Total channels: {count}")
+
+    @tool(
+        "channels_get_channel_name",
+        "Get channel name",
+        object_schema({"channel_num": CHANNEL_NUM_PARAM}, required=["channel_num"]),
+        resources=resource("channel", "channel_num"),
+    )
+    async def _tool_channels_get_channel_name(self, args: dict[str, Any]) -> ToolResult:
+        channel_num = args["channel_num"]
+        name_str = await self._fl_get(
+            ("channel", channel_num, "name"),
+            "channels.getChannelName",
+            channels.getChannelName,
+            channel_num,
+        )
+        return ToolResult(
+            {"channel": channel_num, "name": name_str}, "Channel {channel} name: {name}"
+        )
+
+    @tool(
+        "channels_set_channel_volume",
+        "Set channel volume",
+        object_schema(
+            {"channel_num": CHANNEL_NUM_PARAM, "volume": VOLUME_PARAM},
+            required=["channel_num", "volume"],
+        ),
+        resources=resource("channel", "channel_num"),
+    )
+    async def _tool_channels_set_channel_volume(self, args: dict[str, Any]) -> ToolResult:
+        channel_num = args["channel_num"]
+        volume = args["volume"]
+        await self._fl_set(
+            ("channel", channel_num, "volume"),
+            "channels.setChannelVolume",
+            channels.setChannelVolume,
+            channel_num,
+            volume,
+        )
+        return ToolResult(
+            {"channel": channel_num, "volume": volume}, "Channel {channel} volume set to: {volume}"
+        )
+
+    @tool(
+        "channels_mute_channel",
+        "Mute or unmute a channel",
+        object_schema(
+            {
+                "channel_num": CHANNEL_NUM_PARAM,
+                "mute": {"type": "boolean", "description": "True to mute, False to unmute"},
+            },
+            required=["channel_num", "mute"],
+        ),
+        resources=resource("channel", "channel_num"),
+    )
+    async def _tool_channels_mute_channel(self, args: dict[str, Any]) -> ToolResult:
+        channel_num = args["channel_num"]
+        mute = args["mute"]
+        await self._fl_set(
+            ("channel", channel_num, "muted"),
+            "channels.muteChannel",
+            channels.muteChannel,
+            channel_num,
+            mute,
+        )
+        return ToolResult(
+            {"channel": channel_num, "muted": mute},
+            "Channel {channel} muted" if mute else "Channel {channel} unmuted",
+        )
+
+    @tool(
+        "channels_get_all",
+        "Get name, volume, pan and mute state of many channels in one call",
+        snapshot_schema(CHANNEL_FIELDS),
+        resources=resource("channel"),
+    )
+    async def _tool_channels_get_all(self, args: dict[str, Any]) -> ToolResult:
+        getters = {
+            "name": channels.getChannelName,
+            "volume": channels.getChannelVolume,
+            "pan": channels.getChannelPan,
+            "muted": channels.isChannelMuted,
+        }
+        return await self._snapshot(
+            "channel", "channels.snapshot", channels.channelCount, getters, args
+        )
+
+    @tool(
+        "channels_set_volumes",
+        "Set the volumes of many channels in one call; repeated writes to a channel "
+        "within the flush window are coalesced and only the last value is applied",
+        volumes_schema("Channel number"),
+        resources=coalesced_resources("channel"),
+    )
+    async def _tool_channels_set_volumes(self, args: dict[str, Any]) -> ToolResult:
+        return await self._set_volumes(self.channel_volumes, args["volumes"], "channel")
+
+    # FL Studio Pattern Tools
+
+    @tool("patterns_pattern_count", "Get total number of patterns", resources=resource("pattern"))
+    async def _tool_patterns_pattern_count(self, _args: dict[str, Any]) -> ToolResult:
+        count = await self._fl_get(
+            ("pattern", None, "count"), "patterns.patternCount", patterns.patternCount
+        )
+        return ToolResult({"count": count}, "Total patterns: {count}")
+
+    @tool(
+        "patterns_get_pattern_name",
+        "Get pattern name",
+        object_schema({"pattern_num": PATTERN_NUM_PARAM}, required=["pattern_num"]),
+        resources=resource("pattern", "pattern_num"),
+    )
+    async def _tool_patterns_get_pattern_name(self, args: dict[str, Any]) -> ToolResult:
+        pattern_num = args["pattern_num"]
+        name_str = await self._fl_get(
+            ("pattern", pattern_num, "name"),
+            "patterns.getPatternName",
+            patterns.getPatternName,
+            pattern_num,
+        )
+        return ToolResult(
+            {"pattern": pattern_num, "name": name_str}, "Pattern {pattern} name: {name}"
+        )
+
+    @tool(
+        "patterns_set_pattern_name",
+        "Set pattern name",
+        object_schema(
+            {
+                "pattern_num": PATTERN_NUM_PARAM,
+                "name": {"type": "string", "description": "Pattern name"},
+            },
+            required=["pattern_num", "name"],
+        ),
+        resources=resource("pattern", "pattern_num"),
+    )
+    async def _tool_patterns_set_pattern_name(self, args: dict[str, Any]) -> ToolResult:
+        pattern_num = args["pattern_num"]
+        name_str = args["name"]
+        await self._fl_set(
+            ("pattern", pattern_num, "name"),
+            "patterns.setPatternName",
+            patterns.setPatternName,
+            pattern_num,
+            name_str,
+        )
+        return ToolResult(
+            {"pattern": pattern_num, "name": name_str}, "Pattern {pattern} name set to: {name}"
+        )
+
+    @tool(
+        "patterns_get_all",
+        "Get name and length of many patterns in one call",
+        snapshot_schema(PATTERN_FIELDS, first=1),
+        resources=resource("pattern"),
+    )
+    async def _tool_patterns_get_all(self, args: dict[str, Any]) -> ToolResult:
+        getters = {"name": patterns.getPatternName, "length": patterns.getPatternLength}
+        return await self._snapshot(
+            "pattern", "patterns.snapshot", patterns.patternCount, getters, args, first=1
+        )
+
+    # FL Studio General Tools
+
+    @tool("general_get_project_title", "Get the current project title")
+    async def _tool_general_get_project_title(self, _args: dict[str, Any]) -> ToolResult:
+        title = await self._fl_get(
+            ("project", None, "title"), "general.getProjectTitle", general.getProjectTitle
+        )
+        return ToolResult({"title": title}, "Project title: {title}")
+
+    @tool("general_get_version", "Get FL Studio version")
+    async def _tool_general_get_version(self, _args: dict[str, Any]) -> ToolResult:
+        version = await self._fl_get(
+            ("project", None, "version"), "general.getVersion", general.getVersion
+        )
+        return ToolResult({"version": version}, "FL Studio version: {version}")
+
+    # FL Studio UI Tools
+
+    @tool(
+        "ui_show_window",
+        "Show a specific FL Studio window",
+        object_schema(
+            {"window_id": {"type": "integer", "description": "Window ID to show"}},
+            required=["window_id"],
+        ),
+        resources=resource("ui"),
+    )
+    async def _tool_ui_show_window(self, args: dict[str, Any]) -> ToolResult:
+        window_id = args["window_id"]
+        await self.fl.call("ui.showWindow", ui.showWindow, window_id)
+        return ToolResult({"window": window_id}, "Showing window: {window}")
+
+    # FL Studio Playlist Tools
+
+    @tool(
+        "playlist_get_track_name",
+        "Get playlist track name",
+        object_schema(
+            {"track_num": {"type": "integer", "description": "Playlist track number"}},
+            required=["track_num"],
+        ),
+        resources=resource("playlist_track", "track_num"),
+    )
+    async def _tool_playlist_get_track_name(self, args: dict[str, Any]) -> ToolResult:
+        track_num = args["track_num"]
+        name_str = await self._fl_get(
+            ("playlist_track", track_num, "name"),
+            "playlist.getTrackName",
+            playlist.getTrackName,
+            track_num,
+        )
+        return ToolResult(
+            {"track": track_num, "name": name_str}, "Playlist track {track} name: {name}"
+        )
+
+    def metrics_summary(self) -> dict[str, Any]:
+        """Get server metrics.
+
+        Returns:
+            Uptime, per-tool call and error counts and latency percentiles
+            in microseconds, result serialization time, output throughput
+            per MIDI port, and FL Studio executor statistics
+        """
+        return {
+            **self.metrics.summary(),
+            "midi": {midi.port_name: midi.throughput_stats() for midi in self.midi_pool},
+            "fl": self.fl.stats(),
+        }
+
+    def prometheus_metrics(self) -> str:
+        """Get server metrics in the Prometheus text exposition format."""
+        return prometheus_text(
+            self.metrics,
+            midi={midi.port_name: midi.throughput_stats() for midi in self.midi_pool},
+            fl=self.fl.stats()["calls"],
+        )
+
+    async def run(self, transport: str = "stdio", **http_options: Any) -> None:
+        """Run the MCP server.
+
+        Args:
+            transport: ``stdio`` to serve one client over stdin/stdout, or
+                ``http`` to serve many concurrent clients over streamable HTTP
+            **http_options: Options for ``run_http``
+
+        Raises:
+            ValueError: If the transport is unknown
+        """
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown transport {transport!r}, expected one of {TRANSPORTS}")
         try:
-            async with stdio_server() as (read_stream, write_stream):
-                await self.server.run(
-                    read_stream,
-                    write_stream,
-                    self.server.create_initialization_options(),
-                )
+            if transport == "http":
+                await self.run_http(**http_options)
+            else:
+                async with stdio_server() as (read_stream, write_stream):
+                    await self.server.run(
+                        read_stream,
+                        write_stream,
+                        self.server.create_initialization_options(),
+                    )
         except Exception as e:
             logger.error(f"Error running MCP server: {e}")
+        finally:
+            # Finish recordings and send pending note offs before exiting
+            self.midi_pool.close()
+            self.midi.disconnect()
+            self.fl.shutdown()
+            if self.tracer is not None and self.tracer.path:
+                self._export_trace(self.tracer, self.tracer.path)
+
+    def _export_trace(self, tracer: Tracer, path: str) -> int | None:
+        """Write recorded spans to a trace file, logging failures.
+
+        Returns:
+            Number of spans written, or None if the file could not be written
+        """
+        try:
+            count = tracer.export(path)
+        except OSError as e:
+            logger.error(f"Error writing trace file {path}: {e}")
+            return None
+        logger.info(f"Wrote {count} trace spans to {path}")
+        return count
+
+    def http_app(
+        self,
+        max_sessions: int = 100,
+        json_response: bool = False,
+        session_idle_timeout: float | None = 600.0,
+        allowed_hosts: list[str] | None = None,
+        allowed_origins: list[str] | None = None,
+    ) -> "Starlette":
+        """Create an ASGI app serving this server over streamable HTTP.
+
+        Every client session shares this server and its MIDI interfaces.
+        Session counters are available from ``self.sessions``, and metrics
+        in the Prometheus text format from ``/metrics``.
+
+        Args:
+            max_sessions: Maximum concurrently open client sessions
+            json_response: Answer with plain JSON instead of SSE streams
+            session_idle_timeout: Seconds without requests before a client
+                session is closed, None to keep idle sessions open
+            allowed_hosts: Accepted ``Host`` header values, loopback
+                addresses on any port if None
+            allowed_origins: Accepted ``Origin`` header values, those of the
+                allowed hosts if None
+
+        Returns:
+            Starlette app with the MCP endpoint at ``/mcp``
+        """
+        from fruityloops_mcp.http_transport import create_http_app
+
+        app = create_http_app(
+            self.server,
+            max_sessions=max_sessions,
+            json_response=json_response,
+            metrics=self.prometheus_metrics,
+            idle_timeout=session_idle_timeout,
+            allowed_hosts=allowed_hosts,
+            allowed_origins=allowed_origins,
+        )
+        self.sessions = app.state.sessions
+        return app
+
+    async def run_http(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        max_sessions: int = 100,
+        max_connections: int | None = None,
+        json_response: bool = False,
+        session_idle_timeout: float | None = 600.0,
+        allowed_hosts: list[str] | None = None,
+        allowed_origins: list[str] | None = None,
+    ) -> None:
+        """Serve the MCP server over streamable HTTP until cancelled.
+
+        Requests with a ``Host`` or ``Origin`` header that is not allowed are
+        refused, which keeps web pages from reaching the server through DNS
+        rebinding.
+
+        Args:
+            host: Interface to listen on
+            port: TCP port to listen on
+            max_sessions: Maximum concurrently open client sessions
+            max_connections: Maximum concurrent HTTP connections, None for
+                no limit; further connections get ``503``
+            json_response: Answer with plain JSON instead of SSE streams
+            session_idle_timeout: Seconds without requests before a client
+                session is closed, None to keep idle sessions open
+            allowed_hosts: Accepted ``Host`` header values, ``host:*``
+                matching any port; loopback addresses and the bound host on
+                ``port`` if None
+            allowed_origins: Accepted ``Origin`` header values, those of the
+                allowed hosts if None
+        """
+        import uvicorn
+
+        from fruityloops_mcp.http_transport import default_allowed_hosts
+
+        app = self.http_app(
+            max_sessions=max_sessions,
+            json_response=json_response,
+            session_idle_timeout=session_idle_timeout,
+            allowed_hosts=allowed_hosts or default_allowed_hosts(host, port),
+            allowed_origins=allowed_origins,
+        )
+        config = uvicorn.Config(
+            app,
+            host=host,
+            port=port,
+            limit_concurrency=max_connections,
+            log_level="warning",
+        )
+        logger.info(f"Serving MCP over HTTP at http://{host}:{port}/mcp")
+        await uvicorn.Server(config).serve()
+
+
+def midi_options_from_env() -> dict[str, Any]:
+    """Read MIDI output options from environment variables.
+
+    Recognized variables are ``MIDI_OUTPUT_MODE`` (``direct`` or ``threaded``),
+    ``MIDI_QUEUE_SIZE``, ``MIDI_BACKPRESSURE`` (``block``, ``drop_oldest``
+    or ``error``), ``MIDI_PORT_CACHE_TTL`` and ``MIDI_PORT_POLL_INTERVAL``
+    (seconds), ``MIDI_RECONNECT`` (``1`` to reconnect lost ports),
+    ``MIDI_OUTAGE_POLICY`` (``buffer`` or ``drop``), and ``MIDI_MAX_PORTS``
+    (ports kept open through the tools' ``port`` argument). Unset variables
+    keep the defaults.
+
+    Returns:
+        Keyword arguments for ``FLStudioMCPServer``
+    """
+    options: dict[str, Any] = {}
+    if mode := os.environ.get("MIDI_OUTPUT_MODE"):
+        options["output_mode"] = mode
+    if queue_size := os.environ.get("MIDI_QUEUE_SIZE"):
+        options["queue_size"] = int(queue_size)
+    if backpressure := os.environ.get("MIDI_BACKPRESSURE"):
+        options["backpressure"] = backpressure
+    if cache_ttl := os.environ.get("MIDI_PORT_CACHE_TTL"):
+        options["port_cache_ttl"] = float(cache_ttl)
+    if poll_interval := os.environ.get("MIDI_PORT_POLL_INTERVAL"):
+        options["port_poll_interval"] = float(poll_interval)
+    if os.environ.get("MIDI_RECONNECT", "").lower() in ("1", "true", "yes"):
+        options["reconnect"] = True
+        if outage_policy := os.environ.get("MIDI_OUTAGE_POLICY"):
+            options["reconnect_policy"] = ReconnectPolicy(outage_policy=outage_policy)
+    if max_ports := os.environ.get("MIDI_MAX_PORTS"):
+        options["max_midi_ports"] = int(max_ports)
+    return options
+
+
+def fl_options_from_env() -> dict[str, Any]:
+    """Read FL Studio API execution options from environment variables.
+
+    ``FL_EXECUTION_POLICY`` selects ``inline``, ``thread`` or ``pool``,
+    ``FL_CALL_TIMEOUT`` the timeout in seconds (``0`` for none),
+    ``FL_MAX_WORKERS`` the size of the ``pool``, ``FL_STATE_CACHE_TTL``
+    how long getter results are cached (``0`` to disable) and
+    ``FL_FLUSH_WINDOW`` how long bulk volume writes are coalesced.
+
+    Returns:
+        Keyword arguments for ``FLStudioMCPServer``, empty if no variable is set
+    """
+    options: dict[str, Any] = {}
+    executor_options: dict[str, Any] = {}
+    if policy := os.environ.get("FL_EXECUTION_POLICY"):
+        executor_options["policy"] = policy
+    if timeout := os.environ.get("FL_CALL_TIMEOUT"):
+        executor_options["timeout"] = float(timeout) or None
+    if max_workers := os.environ.get("FL_MAX_WORKERS"):
+        executor_options["max_workers"] = int(max_workers)
+    if executor_options:
+        options["fl_executor"] = FLExecutor(**executor_options)
+    if cache_ttl := os.environ.get("FL_STATE_CACHE_TTL"):
+        options["state_cache"] = StateCache(ttl=float(cache_ttl))
+    if flush_window := os.environ.get("FL_FLUSH_WINDOW"):
+        options["flush_window"] = float(flush_window)
+    return options
+
+
+def result_options_from_env() -> dict[str, Any]:
+    """Read the tool result format from the environment.
+
+    ``MCP_RESULT_FORMAT`` selects ``json`` (default) or ``text`` as the text
+    content sent alongside structured tool results.
+
+    Returns:
+        Keyword arguments for ``FLStudioMCPServer``, empty if the variable is unset
+    """
+    if result_format := os.environ.get("MCP_RESULT_FORMAT"):
+        return {"result_format": result_format}
+    return {}
+
+
+def transport_options_from_env() -> dict[str, Any]:
+    """Read transport options from environment variables.
+
+    ``MCP_TRANSPORT`` selects ``stdio`` (default) or ``http``. The HTTP
+    transport reads ``MCP_HTTP_HOST``, ``MCP_HTTP_PORT``, ``MCP_MAX_SESSIONS``,
+    ``MCP_MAX_CONNECTIONS``, ``MCP_SESSION_IDLE_TIMEOUT`` (seconds, ``0``
+    to keep idle sessions open), and ``MCP_ALLOWED_HOSTS`` and
+    ``MCP_ALLOWED_ORIGINS`` (comma-separated ``Host`` and ``Origin`` header
+    values).
+
+    Returns:
+        Keyword arguments for ``FLStudioMCPServer.run``
+    """
+    transport = os.environ.get("MCP_TRANSPORT", "stdio")
+    options: dict[str, Any] = {"transport": transport}
+    if transport != "http":
+        return options
+    if host := os.environ.get("MCP_HTTP_HOST"):
+        options["host"] = host
+    if port := os.environ.get("MCP_HTTP_PORT"):
+        options["port"] = int(port)
+    if max_sessions := os.environ.get("MCP_MAX_SESSIONS"):
+        options["max_sessions"] = int(max_sessions)
+    if max_connections := os.environ.get("MCP_MAX_CONNECTIONS"):
+        options["max_connections"] = int(max_connections)
+    if idle_timeout := os.environ.get("MCP_SESSION_IDLE_TIMEOUT"):
+        options["session_idle_timeout"] = float(idle_timeout) or None
+    for name in ("allowed_hosts", "allowed_origins"):
+        if values := os.environ.get(f"MCP_{name.upper()}"):
+            options[name] = [value.strip() for value in values.split(",") if value.strip()]
+    return options
+
+
+def profile_options_from_env(
+    path: str | None = None, sample_rate: float | None = None
+) -> dict[str, Any]:
+    """Read profiling options from environment variables.
+
+    ``MCP_PROFILE`` names the file sampled trace spans are written to, as
+    Chrome trace-event JSON, when the server exits; profiling is off while
+    it is unset. ``MCP_PROFILE_SAMPLE_RATE`` is the fraction of tool calls
+    traced, ``1`` by default.
+
+    Args:
+        path: Trace file given on the command line, overriding ``MCP_PROFILE``
+        sample_rate: Sample rate given on the command line, overriding
+            ``MCP_PROFILE_SAMPLE_RATE``
+
+    Returns:
+        Keyword arguments for ``FLStudioMCPServer``, empty if profiling is off
+    """
+    path = path or os.environ.get("MCP_PROFILE")
+    if not path:
+        return {}
+    if sample_rate is None:
+        sample_rate = float(os.environ.get("MCP_PROFILE_SAMPLE_RATE", "1"))
+    return {"tracer": Tracer(sample_rate=sample_rate, path=path)}
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Main entry point for the FL Studio MCP server.
+
+    Args:
+        argv: Command line arguments, ``sys.argv[1:]`` if None; unknown
+            arguments are ignored with a warning
+    """
+    import argparse
 
+    parser = argparse.ArgumentParser(
+        prog="fruityloops-mcp", description="MCP server for FL Studio", allow_abbrev=False
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="record trace spans and write them to PATH as Chrome trace JSON on exit",
+    )
+    parser.add_argument(
+        "--profile-sample-rate",
+        type=float,
+        metavar="RATE",
+        help="fraction of tool calls traced when profiling (default 1)",
+    )
+    args, unknown = parser.parse_known_args(argv)
 
-def main() -> None:
-    """Main entry point for the FL Studio MCP server."""
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper())
     logger.info("FL Studio MCP Server starting...")
-    server = FLStudioMCPServer()
-    asyncio.run(server.run())
+    if unknown:
+        logger.warning(f"Ignoring unknown arguments: {unknown}")
+    if not FL_STUDIO_AVAILABLE:
+        logger.warning("FL Studio API not available. Running in stub mode.")
+    server = FLStudioMCPServer(
+        **midi_options_from_env(),
+        **fl_options_from_env(),
+        **result_options_from_env(),
+        **profile_options_from_env(args.profile, args.profile_sample_rate),
+    )
+    asyncio.run(server.run(**transport_options_from_env()))
 
 
 if __name__ == "__main__":
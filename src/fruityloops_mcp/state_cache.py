@@ -0,0 +1,155 @@
+"""Read-through cache of FL Studio project state."""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+# (object type, index, field), e.g. ("mixer_track", 3, "name"); the index is
+# None for project-wide values such as ("pattern", None, "count")
+StateKey = tuple[str, int | None, str]
+
+
+class StateCache:
+    """Caches FL Studio getter results for ``ttl`` seconds.
+
+    Values are fetched through ``read`` on a miss. Concurrent misses for the
+    same key share one fetch. Setters call ``invalidate`` for what they
+    changed; a fetch that was in flight when an invalidation happened is
+    returned to its callers but not stored, so it cannot resurrect a stale
+    value. The TTL bounds how long changes made in FL Studio itself go
+    unnoticed.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 2.0,
+        max_entries: int = 4096,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize an empty cache.
+
+        Args:
+            ttl: Seconds a value is reused; 0 disables caching
+            max_entries: Entries kept before the oldest are evicted
+            clock: Monotonic time source
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: dict[StateKey, tuple[float, Any]] = {}
+        self._inflight: dict[StateKey, asyncio.Future[Any]] = {}
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Check if values are cached at all."""
+        return self.ttl > 0
+
+    async def read(self, key: StateKey, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Get a value, fetching it on a miss.
+
+        Args:
+            key: Cache key
+            fetch: Coroutine function returning the current value
+
+        Returns:
+            Cached or freshly fetched value
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if self._clock() < entry[0]:
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        if not self.enabled:
+            return await fetch()
+
+        generation = self._generation
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved so waiter-less futures do not warn
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if generation == self._generation:
+                self._store(key, value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    def put(self, key: StateKey, value: Any) -> None:
+        """Store a value read from FL Studio by other means, e.g. a snapshot."""
+        if self.enabled:
+            self._store(key, value)
+
+    def invalidate(
+        self, kind: str | None = None, index: int | None = None, field: str | None = None
+    ) -> int:
+        """Drop cached values matching a pattern.
+
+        Arguments left as None match anything, so ``invalidate("mixer_track", 3)``
+        drops every field of mixer track 3 and ``invalidate()`` drops everything.
+
+        Args:
+            kind: Object type
+            index: Object index
+            field: Field name
+
+        Returns:
+            Number of entries dropped
+        """
+        self._generation += 1
+        self.invalidations += 1
+        if kind is not None and index is not None and field is not None:
+            return 1 if self._entries.pop((kind, index, field), None) is not None else 0
+        stale = [
+            key
+            for key in self._entries
+            if (kind is None or key[0] == kind)
+            and (index is None or key[1] == index)
+            and (field is None or key[2] == field)
+        ]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache counters.
+
+        Returns:
+            Hits, misses, hit rate, invalidations and current entry count
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+        }
+
+    def _store(self, key: StateKey, value: Any) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (self._clock() + self.ttl, value)
+        if len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
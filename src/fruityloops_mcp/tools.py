@@ -0,0 +1,256 @@
+"""Tool registry for the FL Studio MCP server."""
+
+import json
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from mcp.types import ListToolsResult, Tool
+
+from fruityloops_mcp.resources import ResourceFn
+
+RESULT_FORMATS = ("json", "text")
+
+
+@dataclass(frozen=True, slots=True)
+class ToolResult:
+    """Structured result of a tool call.
+
+    The data is returned to MCP clients as ``structuredContent``. Its text
+    form is only built when asked for: compact JSON, or the prose produced
+    by ``template``.
+
+    Attributes:
+        data: JSON-serializable result fields
+        template: ``str.format`` template filled with ``data``, or a function
+            building the prose from ``data``; None renders JSON only
+    """
+
+    data: dict[str, Any]
+    template: str | Callable[[dict[str, Any]], str] | None = None
+
+    def to_json(self) -> str:
+        """Render the data as compact JSON."""
+        return json.dumps(self.data, separators=(",", ":"), default=str)
+
+    def to_text(self) -> str:
+        """Render the result as prose, falling back to JSON without a template."""
+        if self.template is None:
+            return self.to_json()
+        if isinstance(self.template, str):
+            return self.template.format(**self.data)
+        return self.template(self.data)
+
+    def render(self, result_format: str = "json") -> str:
+        """Render the text content sent alongside the structured data.
+
+        Args:
+            result_format: ``json`` or ``text``
+
+        Returns:
+            Compact JSON or prose
+        """
+        return self.to_text() if result_format == "text" else self.to_json()
+
+
+ToolHandler = Callable[[dict[str, Any]], Awaitable[ToolResult | str]]
+
+
+def object_schema(
+    properties: dict[str, Any] | None = None, required: list[str] | None = None
+) -> dict[str, Any]:
+    """Build a JSON schema for a tool's argument object.
+
+    Args:
+        properties: Mapping of argument name to its JSON schema
+        required: Names of required arguments
+
+    Returns:
+        JSON schema dictionary
+    """
+    schema: dict[str, Any] = {"type": "object", "properties": dict(properties or {})}
+    if required:
+        schema["required"] = list(required)
+    return schema
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """Declarative description of a single MCP tool.
+
+    Attributes:
+        name: Tool name exposed to MCP clients
+        description: Human-readable tool description
+        handler: Coroutine function called with the tool arguments, returning
+            a ``ToolResult`` or plain text
+        input_schema: JSON schema for the tool arguments
+        requires_fl: True if the tool needs the FL Studio API to be available
+        resources: Maps tool arguments to the resource keys the call touches,
+            None if it touches no shared resource
+    """
+
+    name: str
+    description: str
+    handler: ToolHandler
+    input_schema: dict[str, Any] = field(default_factory=object_schema)
+    requires_fl: bool = True
+    resources: ResourceFn | None = None
+
+    def to_tool(self) -> Tool:
+        """Build the MCP ``Tool`` definition for this spec."""
+        return Tool(name=self.name, description=self.description, inputSchema=self.input_schema)
+
+
+def tool(
+    name: str,
+    description: str,
+    input_schema: dict[str, Any] | None = None,
+    requires_fl: bool = True,
+    resources: ResourceFn | None = None,
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Mark a server method as an MCP tool handler.
+
+    The decorated method is collected by ``collect_tools`` and registered
+    under ``name`` when the server is constructed.
+
+    Args:
+        name: Tool name exposed to MCP clients
+        description: Human-readable tool description
+        input_schema: JSON schema for the tool arguments, empty object if omitted
+        requires_fl: True if the tool needs the FL Studio API to be available
+        resources: Maps tool arguments to the resource keys the call touches;
+            see ``fruityloops_mcp.resources``
+
+    Returns:
+        Decorator that attaches the tool metadata to the method
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        func._tool_meta = {  # type: ignore[attr-defined]
+            "name": name,
+            "description": description,
+            "input_schema": input_schema if input_schema is not None else object_schema(),
+            "requires_fl": requires_fl,
+            "resources": resources,
+        }
+        return func
+
+    return decorator
+
+
+def collect_tools(instance: object) -> list[ToolSpec]:
+    """Build tool specs for every ``@tool`` method on an object.
+
+    Methods are returned in definition order, base classes first, so the
+    order of ``tools/list`` follows the order of the source.
+
+    Args:
+        instance: Object whose class defines ``@tool`` decorated methods
+
+    Returns:
+        List of tool specs bound to ``instance``
+    """
+    specs: list[ToolSpec] = []
+    seen: set[str] = set()
+    for cls in reversed(type(instance).__mro__):
+        for attr, value in vars(cls).items():
+            meta = getattr(value, "_tool_meta", None)
+            if meta is None or attr in seen:
+                continue
+            seen.add(attr)
+            specs.append(ToolSpec(handler=getattr(instance, attr), **meta))
+    return specs
+
+
+class ToolRegistry:
+    """Registry mapping tool names to their specs.
+
+    Lookups are a single dictionary access regardless of how many tools are
+    registered, and iteration preserves registration order. The MCP tool list
+    is built once per FL Studio availability state and served from a cache
+    until a tool is registered or unregistered.
+    """
+
+    def __init__(self, specs: list[ToolSpec] | None = None):
+        """Initialize the registry.
+
+        Args:
+            specs: Optional tool specs to register immediately
+        """
+        self._specs: dict[str, ToolSpec] = {}
+        self._list_cache: dict[bool, ListToolsResult] = {}
+        for spec in specs or []:
+            self.register(spec)
+
+    def register(self, spec: ToolSpec) -> None:
+        """Register a tool.
+
+        Args:
+            spec: Tool spec to register
+
+        Raises:
+            ValueError: If a tool with the same name is already registered
+        """
+        if spec.name in self._specs:
+            raise ValueError(f"Tool already registered: {spec.name}")
+        self._specs[spec.name] = spec
+        self.invalidate()
+
+    def unregister(self, name: str) -> None:
+        """Remove a tool from the registry.
+
+        Args:
+            name: Tool name
+
+        Raises:
+            KeyError: If the tool is not registered
+        """
+        del self._specs[name]
+        self.invalidate()
+
+    def get(self, name: str) -> ToolSpec | None:
+        """Look up a tool by name.
+
+        Args:
+            name: Tool name
+
+        Returns:
+            The tool spec, or None if no tool has that name
+        """
+        return self._specs.get(name)
+
+    def list_tools(self, fl_available: bool) -> ListToolsResult:
+        """Get the MCP tool list for the tools that can currently run.
+
+        The result is built on first use for each availability state and
+        reused until the registry changes. Callers must not mutate it.
+
+        Args:
+            fl_available: Whether the FL Studio API is available
+
+        Returns:
+            Cached ``tools/list`` result with tools in registration order
+        """
+        result = self._list_cache.get(fl_available)
+        if result is None:
+            tools = [
+                spec.to_tool()
+                for spec in self._specs.values()
+                if fl_available or not spec.requires_fl
+            ]
+            result = ListToolsResult(tools=tools)
+            self._list_cache[fl_available] = result
+        return result
+
+    def invalidate(self) -> None:
+        """Drop the cached tool lists so they are rebuilt on next use."""
+        self._list_cache.clear()
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._specs
+
+    def __iter__(self) -> Iterator[ToolSpec]:
+        return iter(self._specs.values())
+
+    def __len__(self) -> int:
+        return len(self._specs)
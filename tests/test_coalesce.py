@@ -0,0 +1,144 @@
+"""Tests for coalescing bulk writes."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from fruityloops_mcp.coalesce import WriteCoalescer
+from fruityloops_mcp.server import FLStudioMCPServer, fl_options_from_env
+
+
+class TestWriteCoalescer:
+    """Test the WriteCoalescer class."""
+
+    @pytest.mark.asyncio
+    async def test_last_write_wins(self):
+        """Test concurrent writes to a target are applied once with the last value."""
+        batches = []
+
+        async def apply(values):
+            batches.append(values)
+
+        coalescer = WriteCoalescer(apply, window=0.01)
+        first, second = await asyncio.gather(
+            coalescer.write({1: 0.1, 2: 0.2}),
+            coalescer.write({1: 0.9}),
+        )
+        assert batches == [{1: 0.9, 2: 0.2}]
+        assert (first, second) == (1, 1)
+        assert coalescer.stats() == {"writes": 3, "coalesced": 1, "flushes": 1, "applied": 2}
+
+    @pytest.mark.asyncio
+    async def test_separate_windows(self):
+        """Test writes after a flush start a new batch."""
+        batches = []
+
+        async def apply(values):
+            batches.append(values)
+
+        coalescer = WriteCoalescer(apply, window=0)
+        await coalescer.write({1: 0.1})
+        await coalescer.write({1: 0.2})
+        assert batches == [{1: 0.1}, {1: 0.2}]
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_writer(self):
+        """Test a failed flush raises in all writers of the batch."""
+
+        async def apply(_values):
+            raise RuntimeError("boom")
+
+        coalescer = WriteCoalescer(apply)
+        results = await asyncio.gather(
+            coalescer.write({1: 0.1}), coalescer.write({2: 0.2}), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_empty_write(self):
+        """Test an empty write applies nothing."""
+        coalescer = WriteCoalescer(lambda _values: None)
+        assert await coalescer.write({}) == 0
+        assert coalescer.flushes == 0
+
+
+class TestServerBulkVolumes:
+    """Test the bulk volume tools."""
+
+    @pytest.fixture
+    def server(self):
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            server = FLStudioMCPServer(flush_window=0.01)
+        yield server
+        server.fl.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_mixer_set_volumes_coalesces(self, server):
+        """Test repeated writes across calls reach FL Studio once."""
+        with patch("fruityloops_mcp.server.mixer") as mock_mixer:
+            results = await asyncio.gather(
+                *(
+                    server._execute_tool(
+                        "mixer_set_volumes",
+                        {"volumes": [{"index": 1, "volume": v / 10}, {"index": 2, "volume": 0.5}]},
+                    )
+                    for v in range(5)
+                )
+            )
+        calls = sorted(c.args for c in mock_mixer.setTrackVolume.call_args_list)
+        assert calls == [(1, 0.4), (2, 0.5)]
+        assert results[-1] == "Set 2 mixer track volumes (0 coalesced)"
+        assert results[0] == "Set 0 mixer track volumes (2 coalesced)"
+        assert server.fl.stats()["calls"]["mixer.setTrackVolumes"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_single_write_after_bulk_write_wins(self, server):
+        """Test a bulk write and a later single write apply in arrival order."""
+        with patch("fruityloops_mcp.server.mixer") as mock_mixer:
+            bulk = asyncio.ensure_future(
+                server._execute_tool(
+                    "mixer_set_volumes", {"volumes": [{"index": 3, "volume": 0.2}]}
+                )
+            )
+            await asyncio.sleep(0)
+            single = asyncio.ensure_future(
+                server._execute_tool("mixer_set_track_volume", {"track_num": 3, "volume": 0.8})
+            )
+            later = asyncio.ensure_future(
+                server._execute_tool(
+                    "mixer_set_volumes", {"volumes": [{"index": 3, "volume": 0.5}]}
+                )
+            )
+            await asyncio.gather(bulk, single, later)
+        calls = [c.args for c in mock_mixer.setTrackVolume.call_args_list]
+        assert calls == [(3, 0.2), (3, 0.8), (3, 0.5)]
+
+    @pytest.mark.asyncio
+    async def test_duplicates_in_one_call(self, server):
+        """Test an index given twice in one call is set to its last value."""
+        with patch("fruityloops_mcp.server.channels") as mock_channels:
+            result = await server._execute_tool(
+                "channels_set_volumes",
+                {"volumes": [{"index": 3, "volume": 0.1}, {"index": 3, "volume": 0.7}]},
+            )
+        mock_channels.setChannelVolume.assert_called_once_with(3, 0.7)
+        assert result == "Set 1 channel volumes (1 coalesced)"
+
+    @pytest.mark.asyncio
+    async def test_invalidates_cache(self, server):
+        """Test applied volumes are re-read from FL Studio."""
+        with patch("fruityloops_mcp.server.mixer") as mock_mixer:
+            mock_mixer.getTrackVolume.return_value = 0.2
+            await server._execute_tool("mixer_get_track_volume", {"track_num": 1})
+            await server._execute_tool(
+                "mixer_set_volumes", {"volumes": [{"index": 1, "volume": 0.6}]}
+            )
+            mock_mixer.getTrackVolume.return_value = 0.6
+            result = await server._execute_tool("mixer_get_track_volume", {"track_num": 1})
+        assert result == "Track 1 volume: 0.6"
+
+    def test_flush_window_from_env(self, monkeypatch):
+        """Test FL_FLUSH_WINDOW."""
+        monkeypatch.setenv("FL_FLUSH_WINDOW", "0.02")
+        assert fl_options_from_env()["flush_window"] == 0.02
@@ -193,8 +193,7 @@ class TestServerMIDINoteHandler:
 
     @pytest.mark.asyncio
     @patch("fruityloops_mcp.server.MIDIInterface")
-    @patch("fruityloops_mcp.server.asyncio.sleep")
-    async def test_midi_send_note_success(self, mock_sleep, mock_midi_class):
+    async def test_midi_send_note_success(self, mock_midi_class):
         """Test successful MIDI note send with duration."""
         mock_midi = mock_midi_class.return_value
         mock_midi.send_note_on.return_value = True
@@ -206,9 +205,8 @@ class TestServerMIDINoteHandler:
         )
 
         assert "Sent MIDI note 60" in result
-        mock_sleep.assert_called_once_with(0.5)
         mock_midi.send_note_on.assert_called_once_with(60, 100, 1)
-        mock_midi.send_note_off.assert_called_once_with(60, 100, 1)
+        mock_midi.schedule_note_off.assert_called_once_with(60, 100, 1, 0.5)
 
 
 class TestStubModule:
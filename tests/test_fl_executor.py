@@ -0,0 +1,162 @@
+"""Tests for running FL Studio API calls off the event loop."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from mcp import types
+
+from fruityloops_mcp.fl_executor import (
+    FLCallTimeoutError,
+    FLExecutor,
+    FLExecutorFullError,
+)
+from fruityloops_mcp.server import FLStudioMCPServer, fl_options_from_env
+
+
+class TestFLExecutor:
+    """Test the FLExecutor class."""
+
+    @pytest.mark.asyncio
+    async def test_thread_policy_runs_off_loop(self):
+        """Test calls run on the dedicated thread and record latency."""
+        executor = FLExecutor()
+        name = await executor.call("test.name", lambda: threading.current_thread().name)
+        assert name.startswith("fl-api")
+        assert await executor.call("test.add", lambda a, b: a + b, 2, 3) == 5
+
+        stats = executor.stats()
+        assert stats["policy"] == "thread"
+        assert stats["calls"]["test.add"]["count"] == 1
+        assert stats["calls"]["test.add"]["errors"] == 0
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_inline_policy(self):
+        """Test inline calls run on the event loop thread."""
+        executor = FLExecutor(policy="inline")
+        name = await executor.call("test.name", lambda: threading.current_thread().name)
+        assert name == threading.current_thread().name
+
+    @pytest.mark.asyncio
+    async def test_stalled_call_times_out_without_blocking_loop(self):
+        """Test a stalled host call times out while the loop keeps running."""
+        executor = FLExecutor(timeout=0.05)
+        release = threading.Event()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while not release.is_set():
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        tick_task = asyncio.create_task(ticker())
+        with pytest.raises(FLCallTimeoutError, match="mixer.getTrackVolume"):
+            await executor.call("mixer.getTrackVolume", release.wait)
+        release.set()
+        await tick_task
+
+        assert ticks >= 5
+        stats = executor.stats()
+        assert stats["timeouts"] == 1
+        assert stats["calls"]["mixer.getTrackVolume"]["errors"] == 1
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_pool_policy_runs_in_parallel(self):
+        """Test the pool policy runs calls concurrently."""
+        executor = FLExecutor(policy="pool", max_workers=4)
+        start = time.perf_counter()
+        await asyncio.gather(*(executor.call("test.sleep", time.sleep, 0.05) for _ in range(4)))
+        assert time.perf_counter() - start < 0.15
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_errors_are_counted_and_raised(self):
+        """Test exceptions from the API propagate and are counted."""
+        executor = FLExecutor()
+        with pytest.raises(RuntimeError):
+            await executor.call("test.fail", Mock(side_effect=RuntimeError("boom")))
+        assert executor.stats()["calls"]["test.fail"]["errors"] == 1
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_full(self):
+        """Test calls beyond max_pending are rejected."""
+        executor = FLExecutor(max_pending=1)
+        release = threading.Event()
+        blocked = asyncio.create_task(executor.call("test.wait", release.wait))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(FLExecutorFullError):
+            await executor.call("test.noop", lambda: None)
+        assert executor.rejected == 1
+
+        release.set()
+        assert await blocked is True
+        executor.shutdown()
+
+    def test_invalid_policy(self):
+        """Test unknown policies are rejected."""
+        with pytest.raises(ValueError, match="execution policy"):
+            FLExecutor(policy="process")
+
+
+class TestServerFLCalls:
+    """Test the server routes FL Studio API calls through its executor."""
+
+    @pytest.mark.asyncio
+    async def test_tool_uses_executor(self):
+        """Test FL tools record per-call latency."""
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            server = FLStudioMCPServer()
+        with patch("fruityloops_mcp.server.mixer") as mock_mixer:
+            mock_mixer.getTrackVolume.return_value = 0.8
+            result = await server._execute_tool("mixer_get_track_volume", {"track_num": 1})
+        assert result == "Track 1 volume: 0.8"
+        assert server.fl.stats()["calls"]["mixer.getTrackVolume"]["count"] == 1
+        server.fl.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_timeout_reported_as_tool_error(self):
+        """Test a stalled FL call becomes a tool error."""
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            server = FLStudioMCPServer(fl_executor=FLExecutor(timeout=0.01))
+        release = threading.Event()
+        handler = server.server.request_handlers[types.CallToolRequest]
+        request = types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(name="transport_start", arguments={}),
+        )
+        with (
+            patch("fruityloops_mcp.server.FL_STUDIO_AVAILABLE", True),
+            patch("fruityloops_mcp.server.transport") as mock_transport,
+        ):
+            mock_transport.start.side_effect = release.wait
+            result = await handler(request)
+        release.set()
+        assert "timed out" in result.root.content[0].text
+        server.fl.shutdown()
+
+    def test_options_from_env(self, monkeypatch):
+        """Test FL_EXECUTION_POLICY, FL_CALL_TIMEOUT and FL_MAX_WORKERS."""
+        monkeypatch.setenv("FL_EXECUTION_POLICY", "pool")
+        monkeypatch.setenv("FL_CALL_TIMEOUT", "0")
+        monkeypatch.setenv("FL_MAX_WORKERS", "2")
+        executor = fl_options_from_env()["fl_executor"]
+        assert (executor.policy, executor.timeout, executor.max_workers) == ("pool", None, 2)
+
+    def test_no_env_keeps_default(self, monkeypatch):
+        """Test the default executor is used without variables."""
+        for name in (
+            "FL_EXECUTION_POLICY",
+            "FL_CALL_TIMEOUT",
+            "FL_MAX_WORKERS",
+            "FL_STATE_CACHE_TTL",
+            "FL_FLUSH_WINDOW",
+        ):
+            monkeypatch.delenv(name, raising=False)
+        assert fl_options_from_env() == {}
@@ -0,0 +1,314 @@
+"""Tests for the streamable HTTP transport."""
+
+import asyncio
+import contextlib
+import socket
+from unittest.mock import patch
+
+import httpx
+import pytest
+import uvicorn
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+from fruityloops_mcp.http_transport import SessionTracker, default_allowed_hosts
+from fruityloops_mcp.server import FLStudioMCPServer, transport_options_from_env
+
+
+def _fake_app(session_id="abc", requests=None):
+    """ASGI app that echoes the body and assigns ``session_id`` to new sessions.
+
+    The method and headers of every request are appended to ``requests``.
+    """
+
+    async def app(scope, receive, send):
+        if requests is not None:
+            requests.append((scope["method"], dict(scope["headers"])))
+        message = await receive()
+        headers = [(b"content-type", b"application/json")]
+        if not any(k == b"mcp-session-id" for k, _ in scope["headers"]):
+            headers.append((b"mcp-session-id", session_id.encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": message.get("body", b"")})
+
+    return app
+
+
+async def _request(app, method="POST", session_id=None, body=b"{}"):
+    headers = {"mcp-session-id": session_id} if session_id else {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, "/mcp", headers=headers, content=body)
+
+
+class TestSessionTracker:
+    """Test the SessionTracker middleware."""
+
+    @pytest.mark.asyncio
+    async def test_accounts_for_sessions(self):
+        """Test sessions are opened, counted and closed."""
+        tracker = SessionTracker(_fake_app(), max_sessions=2)
+
+        response = await _request(tracker, body=b"hello")
+        assert response.headers["mcp-session-id"] == "abc"
+        await _request(tracker, session_id="abc", body=b"world!")
+
+        stats = tracker.session("abc")
+        assert stats.requests == 2
+        assert stats.bytes_in == 11
+        assert stats.bytes_out == 11
+
+        tracker.record_call("abc")
+        tracker.record_call("abc", failed=True)
+        tracker.record_call("unknown")
+        assert (stats.tool_calls, stats.tool_errors) == (2, 1)
+
+        await _request(tracker, method="DELETE", session_id="abc", body=b"")
+        assert tracker.session("abc") is None
+        summary = tracker.stats()
+        assert (summary["active"], summary["opened"], summary["closed"]) == (0, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_rejects_beyond_limit(self):
+        """Test new sessions get 503 once the limit is reached."""
+        tracker = SessionTracker(_fake_app("one"), max_sessions=1)
+        await _request(tracker)
+
+        response = await _request(tracker)
+        assert response.status_code == 503
+        assert "Session limit" in response.json()["error"]["message"]
+        assert tracker.rejected == 1
+
+        # Requests in an open session are still served
+        response = await _request(tracker, session_id="one")
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_idle_sessions_expire(self):
+        """Test an idle session frees its slot and is ended in the app."""
+        requests = []
+        tracker = SessionTracker(_fake_app("one", requests), max_sessions=1, idle_timeout=60)
+        await _request(tracker)
+        stats = tracker.session("one")
+        stats.last_active -= 120
+        stats.open_requests = 1  # e.g. an SSE stream
+        assert (await _request(tracker)).status_code == 503
+
+        stats.open_requests = 0
+        assert (await _request(tracker)).status_code == 200
+        method, headers = requests[-2]
+        assert method == "DELETE"
+        assert headers[b"mcp-session-id"] == b"one"
+        assert headers[b"host"] == b"test"
+        summary = tracker.stats()
+        assert (summary["expired"], summary["closed"], summary["rejected"]) == (1, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_sessions_dropped_by_app_are_forgotten(self):
+        """Test sessions the app answers with 404 do not count against the limit."""
+        app = _fake_app("one")
+        ended = set()
+
+        async def ending_app(scope, receive, send):
+            if (b"mcp-session-id", b"one") in scope["headers"] and "one" in ended:
+                await send({"type": "http.response.start", "status": 404, "headers": []})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await app(scope, receive, send)
+
+        tracker = SessionTracker(ending_app, max_sessions=1)
+        await _request(tracker)
+        assert (await _request(tracker)).status_code == 503
+
+        ended.add("one")
+        assert (await _request(tracker, session_id="one")).status_code == 404
+        assert (await _request(tracker)).status_code == 200
+        assert (tracker.closed, tracker.expired) == (1, 0)
+
+    def test_invalid_limit(self):
+        """Test max_sessions must be positive."""
+        with pytest.raises(ValueError, match="max_sessions"):
+            SessionTracker(_fake_app(), max_sessions=0)
+
+
+@contextlib.asynccontextmanager
+async def _serve(server, max_sessions, idle_timeout=600.0):
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    app = server.http_app(max_sessions=max_sessions, session_idle_timeout=idle_timeout)
+    http = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+    task = asyncio.create_task(http.serve(sockets=[sock]))
+    while not http.started:
+        await asyncio.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{sock.getsockname()[1]}/mcp"
+    finally:
+        http.should_exit = True
+        await task
+        sock.close()
+
+
+class TestHTTPServer:
+    """Test FLStudioMCPServer over HTTP."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_sessions_share_midi(self):
+        """Test many sessions call tools through one shared MIDI interface."""
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            server = FLStudioMCPServer()
+        server.midi.send_control_change.return_value = True
+
+        async def client(url, value):
+            async with (
+                streamablehttp_client(url) as (read, write, get_session_id),
+                ClientSession(read, write) as session,
+            ):
+                await session.initialize()
+                result = await session.call_tool("midi_send_cc", {"control": 7, "value": value})
+                stats = server.sessions.session(get_session_id())
+                assert stats.tool_calls == 1
+                return result.structuredContent
+
+        async with _serve(server, max_sessions=20) as url:
+            results = await asyncio.gather(*(client(url, v) for v in range(20)))
+            await asyncio.sleep(0.05)
+
+        assert [r["value"] for r in results] == list(range(20))
+        assert all(r["sent"] for r in results)
+        assert server.midi.send_control_change.call_count == 20
+        stats = server.sessions.stats()
+        assert (stats["opened"], stats["rejected"]) == (20, 0)
+
+    @pytest.mark.asyncio
+    async def test_abandoned_session_expires(self):
+        """Test a client that leaves without deleting its session frees the slot."""
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            server = FLStudioMCPServer()
+
+        async def client(url):
+            async with (
+                streamablehttp_client(url, terminate_on_close=False) as (read, write, session_id),
+                ClientSession(read, write) as session,
+            ):
+                await session.initialize()
+                return session_id()
+
+        async with _serve(server, max_sessions=1, idle_timeout=0.05) as url:
+            abandoned = await client(url)
+            await asyncio.sleep(0.1)
+            await client(url)
+            async with httpx.AsyncClient() as http:
+                response = await http.post(
+                    url, headers={"mcp-session-id": abandoned}, json={"jsonrpc": "2.0"}
+                )
+
+        assert response.status_code == 404
+        stats = server.sessions.stats()
+        assert (stats["opened"], stats["expired"], stats["rejected"]) == (2, 1, 0)
+
+    @pytest.mark.asyncio
+    async def test_metrics_endpoint(self):
+        """Test metrics are served in the Prometheus text format."""
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            server = FLStudioMCPServer()
+        server.midi.port_name = "FLStudio_MIDI"
+        server.midi.throughput_stats.return_value = {
+            "messages": 3,
+            "bytes": 9,
+            "messages_per_sec": 0.3,
+            "bytes_per_sec": 0.9,
+        }
+        await server._execute_tool("midi_disconnect", {})
+
+        async with _serve(server, max_sessions=1) as url, httpx.AsyncClient() as client:
+            response = await client.get(url.replace("/mcp", "/metrics"))
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'fruityloops_mcp_tool_calls_total{tool="midi_disconnect"} 1' in response.text
+        assert 'fruityloops_mcp_midi_bytes_sent_total{port="FLStudio_MIDI"} 9' in response.text
+
+    @pytest.mark.asyncio
+    async def test_foreign_host_and_origin_rejected(self):
+        """Test requests naming another site are refused before reaching the server."""
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            server = FLStudioMCPServer()
+        initialize = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "initialize",
+            "params": {
+                "protocolVersion": "2025-06-18",
+                "capabilities": {},
+                "clientInfo": {"name": "test", "version": "1"},
+            },
+        }
+        accept = {"accept": "application/json, text/event-stream"}
+
+        async with _serve(server, max_sessions=5) as url, httpx.AsyncClient() as client:
+            port = url.split(":")[2].split("/")[0]
+            rebound = await client.post(
+                url, headers={**accept, "host": f"evil.example:{port}"}, json=initialize
+            )
+            cross_site = await client.post(
+                url, headers={**accept, "origin": "http://evil.example"}, json=initialize
+            )
+            local = await client.post(
+                url, headers={**accept, "origin": f"http://localhost:{port}"}, json=initialize
+            )
+
+        assert rebound.status_code == 421
+        assert cross_site.status_code == 403
+        assert local.status_code == 200
+        assert server.sessions.stats()["opened"] == 1
+
+    @pytest.mark.asyncio
+    async def test_run_rejects_unknown_transport(self):
+        """Test run validates the transport name."""
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            server = FLStudioMCPServer()
+        with pytest.raises(ValueError, match="transport"):
+            await server.run(transport="websocket")
+
+
+class TestTransportOptions:
+    """Test transport options from the environment."""
+
+    def test_defaults_to_stdio(self, monkeypatch):
+        """Test stdio is used without MCP_TRANSPORT."""
+        monkeypatch.delenv("MCP_TRANSPORT", raising=False)
+        assert transport_options_from_env() == {"transport": "stdio"}
+
+    def test_http_options(self, monkeypatch):
+        """Test the HTTP transport variables."""
+        monkeypatch.setenv("MCP_TRANSPORT", "http")
+        monkeypatch.setenv("MCP_HTTP_HOST", "0.0.0.0")
+        monkeypatch.setenv("MCP_HTTP_PORT", "9000")
+        monkeypatch.setenv("MCP_MAX_SESSIONS", "500")
+        monkeypatch.setenv("MCP_MAX_CONNECTIONS", "1000")
+        monkeypatch.setenv("MCP_SESSION_IDLE_TIMEOUT", "0")
+        assert transport_options_from_env() == {
+            "transport": "http",
+            "host": "0.0.0.0",
+            "port": 9000,
+            "max_sessions": 500,
+            "max_connections": 1000,
+            "session_idle_timeout": None,
+        }
+
+    def test_allowed_hosts(self, monkeypatch):
+        """Test allowed hosts and origins are comma-separated lists."""
+        monkeypatch.setenv("MCP_TRANSPORT", "http")
+        monkeypatch.setenv("MCP_ALLOWED_HOSTS", "studio.local:8000, 10.0.0.2:*")
+        monkeypatch.setenv("MCP_ALLOWED_ORIGINS", "https://studio.local")
+        options = transport_options_from_env()
+        assert options["allowed_hosts"] == ["studio.local:8000", "10.0.0.2:*"]
+        assert options["allowed_origins"] == ["https://studio.local"]
+
+    def test_default_allowed_hosts(self):
+        """Test loopback names and a specific bind address are allowed."""
+        loopback = ["127.0.0.1:9000", "localhost:9000", "[::1]:9000"]
+        assert default_allowed_hosts("127.0.0.1", 9000) == loopback
+        assert default_allowed_hosts("0.0.0.0", 9000) == loopback
+        assert default_allowed_hosts("192.168.1.20", 9000) == [*loopback, "192.168.1.20:9000"]
+        assert default_allowed_hosts("fe80::1", 9000) == [*loopback, "[fe80::1]:9000"]
@@ -0,0 +1,49 @@
+"""Tests for deferred module imports."""
+
+import sys
+
+import pytest
+
+from fruityloops_mcp.lazy import LazyModule, module_available
+
+
+class TestLazyModule:
+    """Test the LazyModule class."""
+
+    def test_imports_on_first_access(self, monkeypatch):
+        """Test the module is imported when an attribute is first read."""
+        monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+        colorsys = LazyModule("colorsys")
+        assert not colorsys.loaded
+        assert "colorsys" not in sys.modules
+
+        assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert colorsys.loaded
+        assert "colorsys" in sys.modules
+
+    def test_missing_module(self):
+        """Test a missing module raises ImportError on use."""
+        missing = LazyModule("fruityloops_mcp_missing_module")
+        with pytest.raises(ImportError):
+            missing.anything  # noqa: B018
+
+
+class TestModuleAvailable:
+    """Test the module_available function."""
+
+    def test_available(self):
+        """Test installed and already imported modules are found."""
+        assert module_available("json")
+        assert module_available("sys")
+
+    def test_missing(self):
+        """Test missing modules and packages are not found."""
+        assert not module_available("fruityloops_mcp_missing_module")
+        assert not module_available("fruityloops_mcp_missing_package.module")
+
+    def test_injected_module_without_spec(self, monkeypatch):
+        """Test modules placed in sys.modules by a host application count."""
+        module = type(sys)("fl_injected")
+        module.__spec__ = None
+        monkeypatch.setitem(sys.modules, "fl_injected", module)
+        assert module_available("fl_injected")
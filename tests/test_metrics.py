@@ -0,0 +1,189 @@
+"""Tests for latency histograms, throughput and server metrics."""
+
+import json
+import random
+from unittest.mock import Mock, patch
+
+import pytest
+
+from fruityloops_mcp.metrics import (
+    LatencyHistogram,
+    ServerMetrics,
+    ThroughputMeter,
+    _bucket_index,
+    _bucket_upper,
+    prometheus_text,
+)
+from fruityloops_mcp.midi_interface import MIDIInterface
+from fruityloops_mcp.server import FLStudioMCPServer
+
+
+class TestLatencyHistogram:
+    """Test the LatencyHistogram class."""
+
+    def test_buckets_are_contiguous(self):
+        """Test every value maps to a bucket whose upper bound covers it."""
+        for value in [*range(200), 1_000, 12_345, 10**6, 10**9, 6 * 10**10]:
+            index = _bucket_index(value)
+            assert _bucket_upper(index - 1) < value <= _bucket_upper(index) if index else True
+        for index in range(1, 1024):
+            assert _bucket_index(_bucket_upper(index)) == index
+            assert _bucket_index(_bucket_upper(index - 1) + 1) == index
+
+    def test_percentiles_within_precision(self):
+        """Test percentiles are within about 3% of the exact values."""
+        rng = random.Random(7)
+        values = sorted(int(rng.lognormvariate(11, 1.5)) for _ in range(20_000))
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+        for pct in (50, 90, 99, 99.9):
+            exact = values[int(-(-len(values) * pct // 100)) - 1]
+            assert abs(histogram.percentile(pct) - exact) <= exact / 32 + 1
+        assert histogram.percentile(100) == values[-1] == histogram.max_ns
+        assert histogram.count == len(values)
+
+    def test_empty_and_out_of_range(self):
+        """Test an empty histogram and values beyond its range."""
+        histogram = LatencyHistogram(max_ns=1_000_000)
+        assert histogram.percentile(99) == 0
+        assert histogram.summary()["mean_us"] == 0.0
+        histogram.record(-5)
+        histogram.record(10**12)
+        assert histogram.count == 2
+        assert histogram.percentile(100) == 10**12
+        assert histogram.percentile(50) == 0
+
+    def test_summary(self):
+        """Test the summary is in microseconds."""
+        histogram = LatencyHistogram()
+        for _ in range(10):
+            histogram.record(2_000)
+        summary = histogram.summary()
+        assert summary["count"] == 10
+        assert summary["mean_us"] == 2.0
+        assert summary["p999_us"] == summary["max_us"] == 2.0
+
+
+class TestThroughputMeter:
+    """Test the ThroughputMeter class."""
+
+    def test_totals_and_rates(self):
+        """Test totals and rates averaged over the window."""
+        meter = ThroughputMeter(window=2)
+        with patch("fruityloops_mcp.metrics.time.monotonic", side_effect=[100.2, 100.9, 101.5]):
+            meter.record(3, 9)
+            meter.record(1, 2)
+            summary = meter.summary()
+        assert summary == {
+            "messages": 4,
+            "bytes": 11,
+            "messages_per_sec": 2.0,
+            "bytes_per_sec": 5.5,
+        }
+
+    def test_old_seconds_leave_the_window(self):
+        """Test rates drop back to zero when nothing is sent."""
+        meter = ThroughputMeter(window=2)
+        with patch("fruityloops_mcp.metrics.time.monotonic", side_effect=[10.0, 20.0]):
+            meter.record(5, 15)
+            summary = meter.summary()
+        assert summary["messages"] == 5
+        assert summary["messages_per_sec"] == 0.0
+
+    def test_midi_interface_counts_writes(self):
+        """Test raw and mido writes are counted with their sizes."""
+        port = Mock(spec=["send", "close"])
+        with patch("fruityloops_mcp.midi_interface.mido") as mock_mido:
+            mock_mido.get_output_names.return_value = ["FLStudio_MIDI"]
+            mock_mido.get_input_names.return_value = ["FLStudio_MIDI"]
+            mock_mido.open_output.return_value = port
+            mock_mido.Message.side_effect = lambda *_a, **_k: b"\x90\x3c\x40"
+            midi = MIDIInterface()
+            midi.connect()
+            midi.send_note_on(60)
+            midi.send_batch(
+                [{"type": "note_on", "note": 60}, {"type": "program_change", "program": 1}]
+            )
+            midi.disconnect()
+        stats = midi.throughput_stats()
+        assert stats["messages"] == 3
+        assert stats["bytes"] == 9
+
+
+class TestServerMetrics:
+    """Test metrics recorded by the server."""
+
+    @pytest.fixture
+    def server(self):
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            server = FLStudioMCPServer()
+        server.midi.port_name = "FLStudio_MIDI"
+        server.midi.throughput_stats.return_value = {
+            "messages": 2,
+            "bytes": 6,
+            "messages_per_sec": 0.2,
+            "bytes_per_sec": 0.6,
+        }
+        yield server
+        server.fl.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_records_calls_and_errors(self, server):
+        """Test tool calls and failures are counted with their latency."""
+        server.midi.send_control_change.return_value = True
+        await server._execute_tool("midi_send_cc", {"control": 7, "value": 1})
+        server.midi.send_control_change.side_effect = RuntimeError("port gone")
+        with pytest.raises(RuntimeError):
+            await server._execute_tool("midi_send_cc", {"control": 7, "value": 1})
+
+        tool = server.metrics.tools["midi_send_cc"]
+        assert (tool.calls, tool.errors) == (2, 1)
+        assert tool.latency.count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_metrics_tool(self, server):
+        """Test the metrics tool returns tools, MIDI and FL Studio sections."""
+        await server._execute_tool("midi_disconnect", {})
+        data = json.loads(await server._execute_tool("server_get_metrics", {}))
+        assert data["tools"]["midi_disconnect"]["calls"] == 1
+        assert set(data["tools"]["midi_disconnect"]["latency"]) >= {"p50_us", "p99_us", "p999_us"}
+        assert data["midi"]["FLStudio_MIDI"]["bytes"] == 6
+        assert data["fl"]["policy"] == "thread"
+
+    @pytest.mark.asyncio
+    async def test_get_metrics_prometheus(self, server):
+        """Test the metrics tool can return the Prometheus text format."""
+        await server._execute_tool("midi_disconnect", {})
+        text = await server._execute_tool("server_get_metrics", {"format": "prometheus"})
+        assert "# TYPE fruityloops_mcp_tool_duration_seconds summary" in text
+        assert 'fruityloops_mcp_tool_calls_total{tool="midi_disconnect"} 1' in text
+        assert 'fruityloops_mcp_midi_messages_per_second{port="FLStudio_MIDI"} 0.2' in text
+
+
+class TestPrometheusText:
+    """Test the Prometheus text format."""
+
+    def test_format(self):
+        """Test summaries, counters and label escaping."""
+        metrics = ServerMetrics()
+        metrics.record_tool("a", 1_500_000)
+        metrics.record_tool("a", 2_500_000, failed=True)
+        fl = {'x"y': {"count": 2, "mean_us": 10.0, "p50_us": 8.0, "p99_us": 12.0, "errors": 1}}
+        text = prometheus_text(metrics, fl=fl, prefix="test")
+
+        lines = text.splitlines()
+        assert text.endswith("\n")
+        assert 'test_tool_calls_total{tool="a"} 2' in lines
+        assert 'test_tool_errors_total{tool="a"} 1' in lines
+        assert 'test_tool_duration_seconds_sum{tool="a"} 0.004000000' in lines
+        assert 'test_tool_duration_seconds_count{tool="a"} 2' in lines
+        assert any(
+            line.startswith('test_tool_duration_seconds{tool="a",quantile="0.99"}')
+            for line in lines
+        )
+        assert 'test_fl_call_duration_seconds_count{call="x\\"y"} 2' in lines
+        assert 'test_fl_call_errors_total{call="x\\"y"} 1' in lines
+        for line in lines:
+            if not line.startswith("#"):
+                float(line.rsplit(" ", 1)[1])
@@ -0,0 +1,200 @@
+"""Tests for batched MIDI sends."""
+
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+from mcp import types
+
+from fruityloops_mcp.midi_interface import MIDIInterface
+from fruityloops_mcp.server import MAX_BATCH_EVENTS, FLStudioMCPServer
+
+
+@pytest.fixture
+def midi():
+    """Create MIDI interface instance with mocked connection."""
+    midi_instance = MIDIInterface(port_name="FLStudio_MIDI")
+    midi_instance._output_port = Mock()
+    midi_instance._input_port = Mock()
+    midi_instance._is_connected = True
+    return midi_instance
+
+
+def _sent(midi):
+    return [c[0][0] for c in midi._output_port.send.call_args_list]
+
+
+class TestMIDIInterfaceBatch:
+    """Test MIDIInterface.send_batch."""
+
+    @pytest.mark.asyncio
+    async def test_send_all_event_types(self, midi):
+        """Test every event type is converted and sent in order."""
+        events = [
+            {"type": "note_on", "note": 60, "velocity": 100, "channel": 1},
+            {"type": "note_off", "note": 60},
+            {"type": "cc", "control": 7, "value": 90},
+            {"type": "program_change", "program": 5, "channel": 9},
+            {"type": "pitchwheel", "pitch": -8192},
+        ]
+        assert midi.send_batch(events) is True
+
+        sent = _sent(midi)
+        assert [m.type for m in sent] == [
+            "note_on",
+            "note_off",
+            "control_change",
+            "program_change",
+            "pitchwheel",
+        ]
+        assert sent[0].channel == 1
+        assert sent[0].velocity == 100
+        assert sent[1].velocity == 64
+        assert sent[3].channel == 9
+        assert sent[4].pitch == -8192
+
+    @pytest.mark.asyncio
+    async def test_timed_events_are_scheduled(self, midi):
+        """Test events with a time offset are sent later."""
+        events = [
+            {"type": "note_on", "note": 60},
+            {"type": "note_off", "note": 60, "time": 0.02},
+            {"type": "note_on", "note": 64, "time": 0.01},
+        ]
+        assert midi.send_batch(events) is True
+        assert [m.note for m in _sent(midi)] == [60]
+
+        await asyncio.sleep(0.06)
+        sent = _sent(midi)
+        assert [(m.type, m.note) for m in sent] == [
+            ("note_on", 60),
+            ("note_on", 64),
+            ("note_off", 60),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_disconnect_flushes_only_note_offs(self, midi):
+        """Test disconnect delivers timed note-offs and drops other timed events."""
+        output = midi._output_port
+        midi.send_batch(
+            [
+                {"type": "note_on", "note": 60},
+                {"type": "note_on", "note": 62, "time": 5},
+                {"type": "note_off", "note": 60, "time": 5},
+            ]
+        )
+        midi.disconnect()
+
+        assert [(m.type, m.note) for m in [c[0][0] for c in output.send.call_args_list]] == [
+            ("note_on", 60),
+            ("note_off", 60),
+        ]
+
+    @pytest.mark.parametrize(
+        "event, message",
+        [
+            ({"type": "bogus"}, "unknown type"),
+            ({"type": "note_on"}, "missing 'note'"),
+            ({"type": "note_on", "note": 128}, "note must be an integer"),
+            ({"type": "note_on", "note": True}, "note must be an integer"),
+            ({"type": "cc", "control": 7, "value": -1}, "value must be an integer"),
+            ({"type": "pitchwheel", "pitch": 9000}, "pitch must be an integer"),
+            ({"type": "note_on", "note": 60, "channel": 16}, "channel must be"),
+            ({"type": "note_on", "note": 60, "time": -1}, "time must be"),
+        ],
+    )
+    def test_invalid_event_sends_nothing(self, midi, event, message):
+        """Test an invalid event rejects the whole batch."""
+        with pytest.raises(ValueError, match=message):
+            midi.send_batch([{"type": "note_on", "note": 60}, event])
+        midi._output_port.send.assert_not_called()
+
+    def test_send_batch_not_connected(self):
+        """Test sending a batch when not connected."""
+        midi = MIDIInterface()
+        assert midi.send_batch([{"type": "note_on", "note": 60}]) is False
+
+    def test_send_batch_error(self, midi):
+        """Test a send error fails the batch without raising."""
+        midi._output_port.send.side_effect = RuntimeError("boom")
+        assert midi.send_batch([{"type": "note_on", "note": 60}]) is False
+        assert midi.is_connected
+
+    def test_send_batch_port_closed(self, midi):
+        """Test a closed port marks the interface disconnected."""
+
+        class MockPortNotOpenError(Exception):
+            pass
+
+        midi._output_port.send.side_effect = MockPortNotOpenError("closed")
+        with patch(
+            "fruityloops_mcp.midi_interface.mido.ports.PortNotOpenError",
+            MockPortNotOpenError,
+            create=True,
+        ):
+            assert midi.send_batch([{"type": "cc", "control": 1, "value": 1}]) is False
+        assert not midi.is_connected
+
+    def test_timed_only_batch_sends_nothing_immediately(self, midi):
+        """Test a batch with only timed events needs a running loop."""
+        with pytest.raises(RuntimeError):
+            midi.send_batch([{"type": "note_on", "note": 60, "time": 1}])
+
+
+class TestServerBatchTool:
+    """Test the midi_send_batch tool."""
+
+    @pytest.fixture
+    def mock_midi(self):
+        """Mock the server's MIDI interface."""
+        with patch("fruityloops_mcp.server.MIDIInterface") as MockMIDI:
+            mock_instance = MockMIDI.return_value
+            mock_instance.send_batch.return_value = True
+            yield mock_instance
+
+    @pytest.mark.asyncio
+    async def test_send_batch_tool(self, mock_midi):
+        """Test the tool passes events through and reports scheduled events."""
+        server = FLStudioMCPServer()
+        events = [
+            {"type": "note_on", "note": 60},
+            {"type": "note_off", "note": 60, "time": 0.5},
+        ]
+        result = await server._execute_tool("midi_send_batch", {"events": events})
+        mock_midi.send_batch.assert_called_once_with(events)
+        assert result == "Sent MIDI batch: 2 events (1 scheduled)"
+
+    @pytest.mark.asyncio
+    async def test_send_batch_tool_failure(self, mock_midi):
+        """Test the tool reports a failed batch."""
+        mock_midi.send_batch.return_value = False
+        server = FLStudioMCPServer()
+        result = await server._execute_tool(
+            "midi_send_batch", {"events": [{"type": "note_on", "note": 60}]}
+        )
+        assert "Failed to send MIDI batch" in result
+
+    @pytest.mark.asyncio
+    async def test_send_batch_tool_too_many_events(self, mock_midi):
+        """Test oversized batches are rejected."""
+        server = FLStudioMCPServer()
+        events = [{"type": "note_on", "note": 60}] * (MAX_BATCH_EVENTS + 1)
+        with pytest.raises(ValueError, match="exceeds"):
+            await server._execute_tool("midi_send_batch", {"events": events})
+        mock_midi.send_batch.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_send_batch_schema_rejects_bad_type(self, mock_midi):
+        """Test tools/call validates batch events against the schema."""
+        server = FLStudioMCPServer()
+        handler = server.server.request_handlers[types.CallToolRequest]
+        request = types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(
+                name="midi_send_batch", arguments={"events": [{"type": "sysex"}]}
+            ),
+        )
+        result = await handler(request)
+        assert result.root.isError
+        assert "validation" in result.root.content[0].text.lower()
+        mock_midi.send_batch.assert_not_called()
@@ -0,0 +1,217 @@
+"""Tests for raw MIDI byte encoding."""
+
+import itertools
+import threading
+from unittest.mock import Mock, patch
+
+import mido
+import pytest
+
+from fruityloops_mcp.midi_encoding import (
+    ENCODERS,
+    encode_control_change,
+    encode_note_off,
+    encode_note_on,
+    encode_pitchwheel,
+    encode_program_change,
+    raw_sender,
+)
+from fruityloops_mcp.midi_interface import MIDIInterface
+
+
+class RawPort:
+    """Output port with a raw byte interface."""
+
+    def __init__(self):
+        self.sent = []
+        self.raw = []
+
+    def send(self, msg):
+        self.sent.append(msg)
+
+    def send_bytes(self, data):
+        self.raw.append(data)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def raw_midi():
+    """Connect a MIDI interface to a port with a raw interface."""
+    port = RawPort()
+    with patch("fruityloops_mcp.midi_interface.mido") as mock_mido:
+        mock_mido.get_output_names.return_value = ["FLStudio_MIDI"]
+        mock_mido.get_input_names.return_value = ["FLStudio_MIDI"]
+        mock_mido.open_output.return_value = port
+        mock_mido.open_input.return_value = Mock()
+        midi = MIDIInterface()
+        midi.connect()
+        yield midi, port
+
+
+class TestEncoders:
+    """Test the byte encoders against mido."""
+
+    @pytest.mark.parametrize("channel", [0, 9, 15])
+    def test_notes_match_mido(self, channel):
+        """Test note messages encode to the same bytes as mido."""
+        for note, velocity in itertools.product([0, 1, 60, 127], [0, 64, 127]):
+            for msg_type, encode in (("note_on", encode_note_on), ("note_off", encode_note_off)):
+                expected = mido.Message(msg_type, note=note, velocity=velocity, channel=channel)
+                assert encode(note, velocity, channel) == bytes(expected.bytes())
+
+    def test_control_and_program_change_match_mido(self):
+        """Test control and program changes encode to the same bytes as mido."""
+        for channel, number in itertools.product(range(16), [0, 7, 127]):
+            cc = mido.Message("control_change", control=number, value=127 - number, channel=channel)
+            pc = mido.Message("program_change", program=number, channel=channel)
+            assert encode_control_change(number, 127 - number, channel) == bytes(cc.bytes())
+            assert encode_program_change(number, channel) == bytes(pc.bytes())
+
+    @pytest.mark.parametrize("pitch", [-8192, -1, 0, 1, 100, 8191])
+    def test_pitchwheel_matches_mido(self, pitch):
+        """Test pitch wheel messages encode to the same bytes as mido."""
+        expected = mido.Message("pitchwheel", pitch=pitch, channel=3)
+        assert encode_pitchwheel(pitch, 3) == bytes(expected.bytes())
+
+    @pytest.mark.parametrize(
+        "encode, args, message",
+        [
+            (encode_note_on, (128, 64, 0), "note must be in 0..127"),
+            (encode_note_on, (60, -1, 0), "velocity must be in 0..127"),
+            (encode_note_off, (60, 64, 16), "channel must be in 0..15"),
+            (encode_control_change, (7, 200, 0), "value must be in 0..127"),
+            (encode_program_change, (-1, 0), "program must be in 0..127"),
+            (encode_pitchwheel, (8192, 0), "pitch must be in -8192..8191"),
+        ],
+    )
+    def test_out_of_range_values(self, encode, args, message):
+        """Test out-of-range values raise ValueError like mido does."""
+        with pytest.raises(ValueError, match=message):
+            encode(*args)
+
+    def test_encoders_accept_mido_field_names(self):
+        """Test ENCODERS can be called with mido keyword arguments."""
+        assert ENCODERS["note_on"](note=60, velocity=1, channel=0) == b"\x90\x3c\x01"
+        assert ENCODERS["pitchwheel"](pitch=0, channel=0) == b"\xe0\x00\x40"
+
+
+class TestRawSender:
+    """Test raw interface detection."""
+
+    def test_port_with_send_bytes(self):
+        """Test ports defining send_bytes use it."""
+        port = RawPort()
+        assert raw_sender(port) == port.send_bytes
+
+    def test_rtmidi_port(self):
+        """Test mido rtmidi ports write to the underlying MidiOut under the port lock."""
+        port_type = type("Output", (), {"__module__": "mido.backends.rtmidi"})
+        port = port_type()
+        port.closed = False
+        port._lock = threading.Lock()
+        port._rt = Mock()
+        locked = []
+        port._rt.send_message.side_effect = lambda _data: locked.append(port._lock.locked())
+
+        send = raw_sender(port)
+        send(b"\x90\x3c\x40")
+        port._rt.send_message.assert_called_once_with(b"\x90\x3c\x40")
+        assert locked == [True]
+        assert not port._lock.locked()
+
+        port.closed = True
+        with pytest.raises(ValueError, match="closed port"):
+            send(b"\x90\x3c\x40")
+
+    def test_ports_without_raw_interface(self):
+        """Test plain ports and mocks fall back to mido."""
+        assert raw_sender(Mock()) is None
+        assert raw_sender(object()) is None
+
+
+class TestMIDIInterfaceRawOutput:
+    """Test MIDIInterface with a raw-capable port."""
+
+    def test_sends_bytes(self, raw_midi):
+        """Test every send method writes encoded bytes."""
+        midi, port = raw_midi
+        assert midi.uses_raw_output
+        assert midi.send_note_on(60, 100, 1) is True
+        assert midi.send_note_off(60, 0, 1) is True
+        assert midi.send_control_change(7, 90) is True
+        assert midi.send_program_change(5, 9) is True
+        assert midi.send_pitch_bend(0) is True
+
+        assert port.raw == [
+            b"\x91\x3c\x64",
+            b"\x81\x3c\x00",
+            b"\xb0\x07\x5a",
+            b"\xc9\x05",
+            b"\xe0\x00\x40",
+        ]
+        assert port.sent == []
+
+    def test_out_of_range_returns_false(self, raw_midi):
+        """Test invalid values fail the send without writing anything."""
+        midi, port = raw_midi
+        assert midi.send_note_on(128) is False
+        assert midi.send_pitch_bend(9000) is False
+        assert port.raw == []
+        assert midi.is_connected
+
+    def test_batch_sends_bytes(self, raw_midi):
+        """Test batches are encoded to bytes."""
+        midi, port = raw_midi
+        events = [
+            {"type": "note_on", "note": 60},
+            {"type": "cc", "control": 1, "value": 2, "channel": 2},
+        ]
+        assert midi.send_batch(events) is True
+        assert port.raw == [b"\x90\x3c\x40", b"\xb2\x01\x02"]
+
+    def test_raw_output_disabled(self):
+        """Test raw_output=False keeps using mido messages."""
+        port = RawPort()
+        with patch("fruityloops_mcp.midi_interface.mido") as mock_mido:
+            mock_mido.get_output_names.return_value = ["FLStudio_MIDI"]
+            mock_mido.get_input_names.return_value = ["FLStudio_MIDI"]
+            mock_mido.open_output.return_value = port
+            mock_mido.open_input.return_value = Mock()
+            midi = MIDIInterface(raw_output=False)
+            midi.connect()
+            assert not midi.uses_raw_output
+            midi.send_note_on(60)
+        assert port.raw == []
+        assert len(port.sent) == 1
+
+    def test_disconnect_clears_raw_output(self, raw_midi):
+        """Test the raw interface is dropped with the port."""
+        midi, _port = raw_midi
+        midi.disconnect()
+        assert not midi.uses_raw_output
+
+    def test_threaded_writer_sends_bytes(self):
+        """Test the writer thread writes through the raw interface."""
+        port = RawPort()
+        with patch("fruityloops_mcp.midi_interface.mido") as mock_mido:
+            mock_mido.get_output_names.return_value = ["FLStudio_MIDI"]
+            mock_mido.get_input_names.return_value = ["FLStudio_MIDI"]
+            mock_mido.open_output.return_value = port
+            mock_mido.open_input.return_value = Mock()
+            midi = MIDIInterface(output_mode="threaded")
+            midi.connect()
+            midi.send_note_on(60)
+            midi.disconnect()
+        assert port.raw == [b"\x90\x3c\x40"]
+
+    def test_real_mido_fallback(self):
+        """Test a port without a raw interface still receives mido messages."""
+        midi = MIDIInterface()
+        midi._output_port = Mock()
+        midi._is_connected = True
+        assert midi.send_note_on(60) is True
+        sent = midi._output_port.send.call_args[0][0]
+        assert isinstance(sent, mido.Message)
+        assert sent.bytes() == [0x90, 60, 64]
@@ -0,0 +1,256 @@
+"""Tests for streaming Standard MIDI File playback."""
+
+import asyncio
+import itertools
+import time
+import tracemalloc
+from unittest.mock import Mock, patch
+
+import mido
+import pytest
+
+from fruityloops_mcp.midi_file import MidiFileReader, file_steps
+from fruityloops_mcp.midi_interface import MIDIInterface
+from fruityloops_mcp.server import FLStudioMCPServer
+
+
+class RecordingPort:
+    """Output port recording raw messages with their arrival time."""
+
+    def __init__(self):
+        self.received: list[tuple[int, bytes]] = []
+
+    def send(self, msg):
+        self.received.append((time.perf_counter_ns(), msg))
+
+    def send_bytes(self, data):
+        self.received.append((time.perf_counter_ns(), data))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def recording_midi():
+    """Connect a MIDI interface to a recording port."""
+    port = RecordingPort()
+    with patch("fruityloops_mcp.midi_interface.mido") as mock_mido:
+        mock_mido.get_output_names.return_value = ["FLStudio_MIDI"]
+        mock_mido.get_input_names.return_value = ["FLStudio_MIDI"]
+        mock_mido.open_output.return_value = port
+        mock_mido.open_input.return_value = Mock()
+        midi = MIDIInterface()
+        midi.connect()
+        yield midi, port
+        midi.disconnect()
+
+
+def _write_file(path, *tracks, ticks_per_beat=96):
+    """Write a MIDI file with one track per list of messages."""
+    midi_file = mido.MidiFile(ticks_per_beat=ticks_per_beat)
+    for messages in tracks:
+        midi_file.tracks.append(mido.MidiTrack(messages))
+    midi_file.save(str(path))
+    return str(path)
+
+
+def _write_large_file(path, notes):
+    """Write a single-track file of ``notes`` note on/off pairs directly."""
+    events = b"\x00\x90\x3c\x40\x01\x80\x3c\x00" * notes + b"\x00\xff\x2f\x00"
+    header = b"MThd" + (6).to_bytes(4, "big") + b"\x00\x00\x00\x01\x00\x60"
+    with open(path, "wb") as file:
+        file.write(header + b"MTrk" + len(events).to_bytes(4, "big") + events)
+    return str(path)
+
+
+@pytest.fixture
+def tempo_file(tmp_path):
+    """Two tracks: a tempo change after one beat, and notes on every beat."""
+    return _write_file(
+        tmp_path / "tempo.mid",
+        [
+            mido.MetaMessage("set_tempo", tempo=500_000, time=0),
+            mido.MetaMessage("set_tempo", tempo=250_000, time=96),
+        ],
+        [
+            mido.Message("control_change", control=7, value=100, time=0),
+            mido.Message("note_on", note=60, velocity=64, time=0),
+            mido.Message("note_off", note=60, time=96),
+            mido.Message("note_on", note=62, velocity=64, time=0),
+            mido.Message("note_off", note=62, time=96),
+        ],
+    )
+
+
+class TestMidiFileReader:
+    """Test decoding and merging tracks."""
+
+    def test_header(self, tempo_file):
+        """Test the header fields are read."""
+        with MidiFileReader(tempo_file) as reader:
+            assert reader.format == 1
+            assert reader.ticks_per_beat == 96
+            assert reader.track_count == 2
+
+    def test_tempo_changes_apply(self, tempo_file):
+        """Test times follow tempo changes on another track."""
+        with MidiFileReader(tempo_file) as reader:
+            messages = [(round(t, 6), m) for t, m in reader.messages() if m is not None]
+        assert messages == [
+            (0.0, bytes([0xB0, 7, 100])),
+            (0.0, bytes([0x90, 60, 64])),
+            (0.5, bytes([0x80, 60, 64])),
+            (0.5, bytes([0x90, 62, 64])),
+            (0.75, bytes([0x80, 62, 64])),
+        ]
+
+    def test_matches_mido(self, tmp_path):
+        """Test messages match mido's parser, including running status."""
+        path = _write_file(
+            tmp_path / "song.mid",
+            [mido.Message("note_on", note=n, velocity=n, time=10) for n in range(40, 50)]
+            + [mido.Message("pitchwheel", pitch=100, time=5)],
+            [mido.Message("program_change", program=3, channel=1, time=7)],
+        )
+        with MidiFileReader(path) as reader:
+            ours = [m for _, m in reader.messages() if m is not None]
+        theirs = [bytes(m.bytes()) for m in mido.MidiFile(path) if not m.is_meta]
+        assert ours == theirs
+
+    def test_not_a_midi_file(self, tmp_path):
+        """Test other files are rejected."""
+        path = tmp_path / "notes.txt"
+        path.write_text("not a MIDI file")
+        with pytest.raises(ValueError, match="not a Standard MIDI File"):
+            MidiFileReader(str(path))
+        (tmp_path / "empty.mid").write_bytes(b"")
+        with pytest.raises(ValueError, match="empty"):
+            MidiFileReader(str(tmp_path / "empty.mid"))
+
+
+class TestFileSteps:
+    """Test turning a file into sequencer steps."""
+
+    def test_groups_messages_by_time(self, tempo_file):
+        """Test messages at one time are written together."""
+        steps = list(file_steps(MidiFileReader(tempo_file)))
+        assert [(round(t, 6), len(m)) for t, m in steps] == [(0.0, 2), (0.5, 2), (0.75, 1)]
+
+    def test_start_chases_controllers(self, tempo_file):
+        """Test starting later skips notes but keeps controller state."""
+        steps = list(file_steps(MidiFileReader(tempo_file), start=0.5))
+        assert steps[0] == (0.0, [bytes([0xB0, 7, 100])])
+        assert [(round(t, 6), m[0][0]) for t, m in steps[1:]] == [(0.0, 0x80), (0.25, 0x80)]
+
+    def test_tempo_scale(self, tempo_file):
+        """Test doubling the speed halves the offsets."""
+        steps = list(file_steps(MidiFileReader(tempo_file), tempo_scale=2.0))
+        assert [round(t, 6) for t, _ in steps] == [0.0, 0.25, 0.375]
+
+    def test_loop(self, tempo_file):
+        """Test looping repeats the file after its length."""
+        steps = list(itertools.islice(file_steps(MidiFileReader(tempo_file), loop=True), 7))
+        assert [round(t, 6) for t, _ in steps] == [0.0, 0.5, 0.75, 0.75, 1.25, 1.5, 1.5]
+
+    def test_convert(self, tempo_file):
+        """Test messages are converted for the output port."""
+        steps = list(file_steps(MidiFileReader(tempo_file), convert=mido.Message.from_bytes))
+        assert steps[0][1][1] == mido.Message("note_on", note=60, velocity=64)
+
+    def test_closing_closes_reader(self, tempo_file):
+        """Test the file is unmapped when the steps are closed early."""
+        reader = MidiFileReader(tempo_file)
+        steps = file_steps(reader)
+        next(steps)
+        steps.close()
+        assert reader._data.closed
+
+    def test_memory_stays_flat(self, tmp_path):
+        """Test streaming a file holds a small fraction of it in memory."""
+        path = _write_large_file(tmp_path / "large.mid", 50_000)
+        tracemalloc.start()
+        try:
+            count = sum(len(messages) for _, messages in file_steps(MidiFileReader(path)))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert count == 100_000
+        assert peak < 64 * 1024
+
+
+class TestPlayFile:
+    """Test playing files through the output port."""
+
+    def test_timing(self, recording_midi, tempo_file):
+        """Test messages arrive at their file times, scaled."""
+        midi, port = recording_midi
+        player = midi.play_file(tempo_file, tempo_scale=10.0)
+        assert player.join(2)
+        assert player.state == "finished"
+        arrivals = [arrival for arrival, _ in port.received]
+        assert [data for _, data in port.received][1] == bytes([0x90, 60, 64])
+        assert abs((arrivals[4] - arrivals[0]) / 1e9 - 0.075) < 0.005
+
+    def test_pause_resume_stop(self, recording_midi, tempo_file):
+        """Test pausing silences every channel and stopping ends playback."""
+        midi, port = recording_midi
+        player = midi.play_file(tempo_file, loop=True)
+        time.sleep(0.02)
+        assert midi.pause_playback() == [player.id]
+        time.sleep(0.02)
+        assert player.state == "paused"
+        assert {data[0] for _, data in port.received[-16:]} == set(range(0xB0, 0xC0))
+        assert midi.resume_playback(player.id) == [player.id]
+        assert midi.stop_playback() == [player.id]
+        assert player.state == "stopped"
+        assert midi.sequencer_stats()["playing"] == []
+
+    def test_invalid_arguments(self, recording_midi, tempo_file, tmp_path):
+        """Test bad arguments fail before anything plays."""
+        midi, port = recording_midi
+        with pytest.raises(ValueError):
+            midi.play_file(tempo_file, tempo_scale=0)
+        with pytest.raises(OSError):
+            midi.play_file(str(tmp_path / "missing.mid"))
+        assert port.received == []
+
+    def test_not_connected(self, tempo_file):
+        """Test playing while disconnected returns None."""
+        assert MIDIInterface().play_file(tempo_file) is None
+
+
+class TestServerFileTools:
+    """Test the file playback tools."""
+
+    @pytest.fixture
+    def server(self, recording_midi):
+        midi, port = recording_midi
+        with patch("fruityloops_mcp.server.MIDIInterface", return_value=midi):
+            server = FLStudioMCPServer()
+        yield server, port
+        server.fl.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_play_pause_resume_stop(self, server, tempo_file):
+        """Test controlling file playback through the tools."""
+        server, port = server
+        result = await server._execute_tool("midi_play_file", {"path": tempo_file, "loop": True})
+        assert result.startswith("Playing MIDI file")
+        await asyncio.sleep(0.02)
+        assert (await server._execute_tool("midi_pause_playback", {})).startswith(
+            "Paused MIDI playback: ["
+        )
+        assert (await server._execute_tool("midi_resume_playback", {})).startswith(
+            "Resumed MIDI playback: ["
+        )
+        assert (await server._execute_tool("midi_stop_playback", {})).startswith(
+            "Stopped MIDI playback: ["
+        )
+        assert port.received
+
+    @pytest.mark.asyncio
+    async def test_missing_file(self, server, tmp_path):
+        """Test a missing file is reported as a tool error."""
+        server, _ = server
+        with pytest.raises(OSError):
+            await server._execute_tool("midi_play_file", {"path": str(tmp_path / "x.mid")})
@@ -0,0 +1,290 @@
+"""Tests for the background MIDI input listener."""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from unittest.mock import Mock, patch
+
+import mido
+import pytest
+
+from fruityloops_mcp.midi_input import InputEvent, InputListener
+from fruityloops_mcp.midi_interface import MIDIInterface
+from fruityloops_mcp.server import FLStudioMCPServer
+
+
+class PollingInput:
+    """Input port stand-in read by polling."""
+
+    def __init__(self):
+        self.messages = deque()
+        self.polls = 0
+
+    def poll(self):
+        self.polls += 1
+        return self.messages.popleft() if self.messages else None
+
+    def close(self):
+        pass
+
+
+class CallbackInput:
+    """Input port stand-in that pushes messages to a callback, like rtmidi."""
+
+    def __init__(self):
+        self._callback = None
+
+    @property
+    def callback(self):
+        return self._callback
+
+    @callback.setter
+    def callback(self, func):
+        self._callback = func
+
+    def feed(self, message):
+        """Deliver a message from a backend thread."""
+        thread = threading.Thread(target=self._callback, args=(message,))
+        thread.start()
+        thread.join()
+
+    def close(self):
+        pass
+
+
+def note(n, channel=0):
+    """Build a note on message."""
+    return mido.Message("note_on", note=n, channel=channel)
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        time.sleep(0.001)
+
+
+class TestInputEvent:
+    """Test the InputEvent class."""
+
+    def test_to_dict(self):
+        """Test the event dictionary uses the arrival time."""
+        event = InputEvent(note(60), 123.5)
+        assert event.to_dict() == {
+            "type": "note_on",
+            "time": 123.5,
+            "note": 60,
+            "velocity": 64,
+            "channel": 0,
+        }
+
+    def test_str(self):
+        """Test the single-line format."""
+        event = InputEvent(mido.Message("clock"), 1.0)
+        assert str(event) == "1.000000 clock"
+        assert str(InputEvent(note(60), 2.0)) == "2.000000 note_on channel=0 note=60 velocity=64"
+
+
+class TestInputListener:
+    """Test the InputListener class."""
+
+    def test_polling_port(self):
+        """Test messages are read from a polling port into the ring buffer."""
+        port = PollingInput()
+        listener = InputListener()
+        assert listener.start(port) is True
+        port.messages.extend([note(60), note(62)])
+        _wait_until(lambda: listener.received == 2)
+        listener.stop()
+
+        assert [e.message.note for e in listener.recent()] == [60, 62]
+        assert not listener.is_running
+
+    def test_callback_port(self):
+        """Test callback-capable ports get the listener as their callback."""
+        port = CallbackInput()
+        listener = InputListener()
+        listener.start(port)
+        assert port.callback is not None
+        port.feed(note(60))
+        listener.stop()
+
+        assert port.callback is None
+        assert listener.received == 1
+
+    def test_unsupported_port(self):
+        """Test ports without callbacks or polling are not listened to."""
+        listener = InputListener()
+        assert listener.start(Mock()) is False
+        assert not listener.is_running
+
+    def test_ring_buffer_is_bounded(self):
+        """Test only the most recent events are kept."""
+        listener = InputListener(buffer_size=5)
+        for n in range(20):
+            listener._on_message(note(n))
+        assert [e.message.note for e in listener.recent()] == [15, 16, 17, 18, 19]
+        assert listener.received == 20
+
+    def test_flood_of_realtime_messages(self):
+        """Test clock and active sensing floods use no buffer space."""
+        listener = InputListener(buffer_size=5)
+        listener._on_message(note(60))
+        clock = mido.Message("clock")
+        active_sensing = mido.Message("active_sensing")
+        for _ in range(100_000):
+            listener._on_message(clock)
+            listener._on_message(active_sensing)
+
+        assert listener.ignored == 200_000
+        assert [e.message.type for e in listener.recent()] == ["note_on"]
+        assert listener.stats()["buffered"] == 1
+
+    def test_ignore_types_can_be_changed(self):
+        """Test clock messages are kept when not ignored."""
+        listener = InputListener(ignore_types=())
+        listener._on_message(mido.Message("clock"))
+        assert listener.recent()[0].message.type == "clock"
+
+    def test_recent_filters(self):
+        """Test filtering recent events by type, channel, time and limit."""
+        listener = InputListener()
+        listener._on_message(note(60, channel=0))
+        listener._on_message(mido.Message("control_change", control=1, channel=1))
+        listener._on_message(note(62, channel=1))
+        listener._on_message(mido.Message("start"))
+
+        assert [e.message.type for e in listener.recent(types=["note_on"])] == [
+            "note_on",
+            "note_on",
+        ]
+        assert [e.message.type for e in listener.recent(channels=[1])] == [
+            "control_change",
+            "note_on",
+        ]
+        assert [e.message.type for e in listener.recent(limit=1)] == ["start"]
+        first = listener.recent()[0].timestamp
+        assert all(e.timestamp > first for e in listener.recent(since=first))
+
+        listener.clear()
+        assert listener.recent() == []
+
+    @pytest.mark.asyncio
+    async def test_subscription_stream(self):
+        """Test subscriptions receive matching events from a receive thread."""
+        port = CallbackInput()
+        listener = InputListener()
+        listener.start(port)
+        subscription = listener.subscribe(types=["note_on"], channels=[2])
+
+        port.feed(note(60, channel=0))
+        port.feed(mido.Message("control_change", channel=2))
+        port.feed(note(61, channel=2))
+        port.feed(note(62, channel=2))
+
+        received = []
+        async for event in subscription:
+            received.append(event.message.note)
+            if len(received) == 2:
+                subscription.close()
+        assert received == [61, 62]
+        assert listener.stats()["subscriptions"] == 0
+        listener.stop()
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_is_bounded(self):
+        """Test a subscriber that never reads keeps only maxsize events."""
+        listener = InputListener()
+        subscription = listener.subscribe(maxsize=10)
+        for n in range(1000):
+            listener._on_message(note(n % 128))
+            if n % 100 == 0:
+                await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert subscription._queue.qsize() == 10
+        assert listener.stats()["dropped"] == 990
+        subscription.close()
+
+    @pytest.mark.asyncio
+    async def test_closed_subscription_stops_iteration(self):
+        """Test iterating a closed subscription ends immediately."""
+        listener = InputListener()
+        with listener.subscribe() as subscription:
+            pass
+        assert [event async for event in subscription] == []
+
+    def test_subscribe_requires_loop(self):
+        """Test subscribing without a running event loop fails."""
+        with pytest.raises(RuntimeError):
+            InputListener().subscribe()
+
+    def test_poll_error_stops_thread(self):
+        """Test a failing port ends the polling thread."""
+        port = PollingInput()
+        port.poll = Mock(side_effect=OSError("gone"))
+        listener = InputListener()
+        listener.start(port)
+        _wait_until(lambda: not listener._thread.is_alive())
+        listener.stop()
+
+
+class TestMIDIInterfaceInput:
+    """Test input listening on MIDIInterface."""
+
+    def test_connect_starts_listener(self):
+        """Test connect listens to the input port and disconnect stops."""
+        port = PollingInput()
+        with patch("fruityloops_mcp.midi_interface.mido") as mock_mido:
+            mock_mido.get_output_names.return_value = ["FLStudio_MIDI"]
+            mock_mido.get_input_names.return_value = ["FLStudio_MIDI"]
+            mock_mido.open_output.return_value = Mock()
+            mock_mido.open_input.return_value = port
+
+            midi = MIDIInterface(input_buffer_size=10)
+            midi.connect()
+            port.messages.append(note(64))
+            _wait_until(lambda: midi.input_stats()["received"] == 1)
+            midi.disconnect()
+
+        assert [e.message.note for e in midi.recent_input_events()] == [64]
+        assert not midi._listener.is_running
+
+    @pytest.mark.asyncio
+    async def test_subscribe_input(self):
+        """Test subscribing through the interface."""
+        midi = MIDIInterface()
+        subscription = midi.subscribe_input(types=["note_on"])
+        midi._listener._on_message(note(60))
+        event = await asyncio.wait_for(subscription.__anext__(), 1)
+        assert event.message.note == 60
+        subscription.close()
+
+
+class TestInputEventsTool:
+    """Test the midi_get_input_events tool."""
+
+    @pytest.mark.asyncio
+    async def test_no_events(self):
+        """Test the tool with an empty buffer."""
+        server = FLStudioMCPServer()
+        result = await server._execute_tool("midi_get_input_events", {})
+        assert result == "No MIDI input events received"
+
+    @pytest.mark.asyncio
+    async def test_events_with_filters(self):
+        """Test the tool passes filters and formats events."""
+        server = FLStudioMCPServer()
+        listener = server.midi._listener
+        listener._on_message(note(60, channel=0))
+        listener._on_message(note(61, channel=3))
+        listener._on_message(note(62, channel=3))
+
+        result = await server._execute_tool(
+            "midi_get_input_events", {"channels": [3], "types": ["note_on"], "limit": 1}
+        )
+        assert result.startswith("MIDI input events (1):")
+        assert "note=62" in result
+        assert "note=61" not in result
@@ -0,0 +1,352 @@
+"""Tests for queued MIDI output."""
+
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from fruityloops_mcp.midi_interface import MIDIInterface
+from fruityloops_mcp.midi_output import LatencyStats, OutputQueueFullError, OutputWriter
+from fruityloops_mcp.server import FLStudioMCPServer, midi_options_from_env
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        time.sleep(0.001)
+
+
+class GatedSend:
+    """Send callable that blocks until released."""
+
+    def __init__(self):
+        self.sent = []
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+
+    def __call__(self, message):
+        self.entered.set()
+        self.gate.wait(2)
+        self.sent.append(message)
+
+
+class TestLatencyStats:
+    """Test the LatencyStats class."""
+
+    def test_empty_summary(self):
+        """Test summary with no samples."""
+        summary = LatencyStats().summary()
+        assert summary["count"] == 0
+        assert summary["mean_us"] == 0.0
+        assert summary["p99_us"] == 0.0
+
+    def test_record_and_percentiles(self):
+        """Test recording samples and computing percentiles."""
+        stats = LatencyStats()
+        for latency_ns in range(1000, 101_000, 1000):
+            stats.record(latency_ns)
+
+        assert stats.count == 100
+        assert stats.max_ns == 100_000
+        assert stats.percentile(50) == 51_000
+        assert stats.percentile(100) == 100_000
+        assert stats.summary()["mean_us"] == pytest.approx(50.5)
+
+    def test_window_is_bounded(self):
+        """Test only recent samples are kept for percentiles."""
+        stats = LatencyStats(window=10)
+        for latency_ns in range(100):
+            stats.record(latency_ns)
+        assert stats.count == 100
+        assert stats.percentile(0) == 90
+
+
+class TestOutputWriter:
+    """Test the OutputWriter class."""
+
+    def test_invalid_arguments(self):
+        """Test invalid queue size and policy are rejected."""
+        with pytest.raises(ValueError):
+            OutputWriter(Mock(), maxsize=0)
+        with pytest.raises(ValueError, match="backpressure"):
+            OutputWriter(Mock(), backpressure="sometimes")
+
+    def test_messages_written_in_order(self):
+        """Test queued messages are written by the writer thread in order."""
+        sent = []
+        writer = OutputWriter(sent.append)
+        writer.start()
+        for i in range(100):
+            assert writer.put(i) is True
+        writer.stop(drain=True)
+
+        assert sent == list(range(100))
+        assert writer.sent == 100
+        assert writer.latency.count == 100
+        assert writer.stats()["pending"] == 0
+
+    def test_writes_on_separate_thread(self):
+        """Test messages are written from the writer thread."""
+        threads = []
+        writer = OutputWriter(lambda _msg: threads.append(threading.current_thread()))
+        writer.start()
+        writer.put("msg")
+        writer.stop()
+        assert threads and threads[0] is not threading.current_thread()
+
+    def test_put_when_stopped(self):
+        """Test messages are rejected when the writer is not running."""
+        writer = OutputWriter(Mock())
+        assert writer.put("msg") is False
+        assert writer.is_running is False
+
+    def test_start_and_stop_are_idempotent(self):
+        """Test calling start and stop twice is harmless."""
+        writer = OutputWriter(Mock())
+        writer.start()
+        writer.start()
+        assert writer.is_running
+        writer.stop()
+        writer.stop()
+        assert not writer.is_running
+
+    def test_drop_oldest_policy(self):
+        """Test drop_oldest discards the oldest queued message when full."""
+        send = GatedSend()
+        writer = OutputWriter(send, maxsize=2, backpressure="drop_oldest")
+        writer.start()
+        writer.put("first")  # Taken by the writer, which then blocks
+        assert send.entered.wait(2)
+
+        writer.put("a")
+        writer.put("b")
+        writer.put("c")  # Queue is full, "a" is dropped
+        send.gate.set()
+        writer.stop()
+
+        assert send.sent == ["first", "b", "c"]
+        assert writer.dropped == 1
+
+    def test_error_policy(self):
+        """Test the error policy raises when the queue is full."""
+        send = GatedSend()
+        writer = OutputWriter(send, maxsize=1, backpressure="error")
+        writer.start()
+        writer.put("first")
+        assert send.entered.wait(2)
+
+        writer.put("queued")
+        with pytest.raises(OutputQueueFullError):
+            writer.put("rejected")
+        send.gate.set()
+        writer.stop()
+
+        assert send.sent == ["first", "queued"]
+        assert writer.dropped == 1
+
+    def test_block_policy_waits_for_space(self):
+        """Test the block policy waits for the writer to free space."""
+        send = GatedSend()
+        writer = OutputWriter(send, maxsize=1, backpressure="block", block_timeout=2)
+        writer.start()
+        writer.put("first")
+        assert send.entered.wait(2)
+        writer.put("queued")
+
+        threading.Timer(0.05, send.gate.set).start()
+        assert writer.put("blocked") is True
+        writer.stop()
+
+        assert send.sent == ["first", "queued", "blocked"]
+
+    def test_block_policy_times_out(self):
+        """Test the block policy gives up after the timeout."""
+        send = GatedSend()
+        writer = OutputWriter(send, maxsize=1, backpressure="block", block_timeout=0.05)
+        writer.start()
+        writer.put("first")
+        assert send.entered.wait(2)
+        writer.put("queued")
+
+        assert writer.put("timed_out") is False
+        assert writer.dropped == 1
+        send.gate.set()
+        writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_block_policy_does_not_wait_on_event_loop(self):
+        """Test the block policy rejects at once instead of stalling the event loop."""
+        send = GatedSend()
+        writer = OutputWriter(send, maxsize=1, backpressure="block", block_timeout=2)
+        writer.start()
+        writer.put("first")
+        assert send.entered.wait(2)
+        writer.put("queued")
+
+        start = time.monotonic()
+        assert writer.put("rejected") is False
+        assert time.monotonic() - start < 0.5
+        assert writer.dropped == 1
+        send.gate.set()
+        writer.stop()
+
+        assert send.sent == ["first", "queued"]
+
+    def test_stop_without_drain_discards_queue(self):
+        """Test stop(drain=False) drops queued messages."""
+        send = GatedSend()
+        writer = OutputWriter(send, maxsize=10)
+        writer.start()
+        writer.put("first")
+        assert send.entered.wait(2)
+        writer.put("a")
+        writer.put("b")
+
+        send.gate.set()
+        writer.stop(drain=False)
+        assert "b" not in send.sent
+        assert writer.dropped >= 1
+
+    def test_send_errors_are_reported(self):
+        """Test send errors are counted and passed to on_error."""
+        on_error = Mock()
+        writer = OutputWriter(Mock(side_effect=RuntimeError("boom")), on_error=on_error)
+        writer.start()
+        writer.put("msg")
+        writer.stop()
+
+        assert writer.errors == 1
+        assert writer.sent == 0
+        on_error.assert_called_once()
+
+
+class TestMIDIInterfaceThreadedOutput:
+    """Test MIDIInterface in threaded output mode."""
+
+    @pytest.fixture
+    def connected(self):
+        """Connect a threaded MIDI interface to mocked ports."""
+        with patch("fruityloops_mcp.midi_interface.mido") as mock_mido:
+            mock_mido.get_output_names.return_value = ["FLStudio_MIDI"]
+            mock_mido.get_input_names.return_value = ["FLStudio_MIDI"]
+            mock_output = Mock()
+            mock_mido.open_output.return_value = mock_output
+            mock_mido.open_input.return_value = Mock()
+
+            midi = MIDIInterface(output_mode="threaded", queue_size=16)
+            assert midi.connect() is True
+            yield midi, mock_output
+            midi.disconnect()
+
+    def test_invalid_options(self):
+        """Test invalid output mode and backpressure are rejected."""
+        with pytest.raises(ValueError, match="output mode"):
+            MIDIInterface(output_mode="async")
+        with pytest.raises(ValueError, match="backpressure"):
+            MIDIInterface(backpressure="never")
+
+    def test_direct_mode_has_no_stats(self):
+        """Test output statistics are only available in threaded mode."""
+        assert MIDIInterface().output_stats() is None
+
+    def test_sends_are_queued(self, connected):
+        """Test send methods keep returning True and messages reach the port."""
+        midi, mock_output = connected
+        assert midi.send_note_on(60) is True
+        assert midi.send_note_off(60) is True
+        assert midi.send_control_change(7, 100) is True
+        assert midi.send_program_change(1) is True
+        assert midi.send_pitch_bend(100) is True
+
+        _wait_until(lambda: mock_output.send.call_count == 5)
+        stats = midi.output_stats()
+        assert stats["sent"] == 5
+        assert stats["latency"]["count"] == 5
+
+    def test_batch_is_queued(self, connected):
+        """Test batches go through the writer thread."""
+        midi, mock_output = connected
+        assert midi.send_batch([{"type": "note_on", "note": n} for n in range(10)]) is True
+        _wait_until(lambda: mock_output.send.call_count == 10)
+
+    def test_disconnect_drains_queue(self, connected):
+        """Test disconnect writes queued messages before closing the port."""
+        midi, mock_output = connected
+        for n in range(10):
+            midi.send_note_on(n)
+        midi.disconnect()
+
+        assert mock_output.send.call_count == 10
+        mock_output.close.assert_called_once()
+        assert midi.output_stats() is None
+
+    def test_writer_port_error_marks_disconnected(self, connected):
+        """Test a closed port reported by the writer thread is tracked."""
+
+        class MockPortNotOpenError(Exception):
+            pass
+
+        midi, mock_output = connected
+        mock_output.send.side_effect = MockPortNotOpenError("closed")
+        with patch(
+            "fruityloops_mcp.midi_interface.mido.ports.PortNotOpenError",
+            MockPortNotOpenError,
+            create=True,
+        ):
+            midi.send_note_on(60)
+            _wait_until(lambda: not midi.is_connected)
+
+    def test_queue_full_error_returns_false(self):
+        """Test a full queue with the error policy returns False."""
+        with patch("fruityloops_mcp.midi_interface.mido") as mock_mido:
+            mock_mido.get_output_names.return_value = ["FLStudio_MIDI"]
+            mock_mido.get_input_names.return_value = ["FLStudio_MIDI"]
+            send = GatedSend()
+            mock_mido.open_output.return_value = Mock(send=send)
+            mock_mido.open_input.return_value = Mock()
+
+            midi = MIDIInterface(output_mode="threaded", queue_size=1, backpressure="error")
+            midi.connect()
+            midi.send_note_on(1)
+            assert send.entered.wait(2)
+            assert midi.send_note_on(2) is True
+            assert midi.send_note_on(3) is False
+            send.gate.set()
+            midi.disconnect()
+
+
+class TestServerMIDIOptions:
+    """Test MIDI options on the server."""
+
+    def test_options_passed_to_midi_interface(self):
+        """Test extra server options are forwarded to MIDIInterface."""
+        with patch("fruityloops_mcp.server.MIDIInterface") as MockMIDI:
+            FLStudioMCPServer(midi_port="Port", output_mode="threaded", queue_size=8)
+            MockMIDI.assert_called_once_with(port_name="Port", output_mode="threaded", queue_size=8)
+
+    def test_options_from_env(self, monkeypatch):
+        """Test MIDI options are read from environment variables."""
+        monkeypatch.setenv("MIDI_OUTPUT_MODE", "threaded")
+        monkeypatch.setenv("MIDI_QUEUE_SIZE", "256")
+        monkeypatch.setenv("MIDI_BACKPRESSURE", "drop_oldest")
+        assert midi_options_from_env() == {
+            "output_mode": "threaded",
+            "queue_size": 256,
+            "backpressure": "drop_oldest",
+        }
+
+    def test_options_from_env_unset(self, monkeypatch):
+        """Test unset environment variables keep the defaults."""
+        for name in (
+            "MIDI_OUTPUT_MODE",
+            "MIDI_QUEUE_SIZE",
+            "MIDI_BACKPRESSURE",
+            "MIDI_PORT_CACHE_TTL",
+            "MIDI_PORT_POLL_INTERVAL",
+            "MIDI_RECONNECT",
+        ):
+            monkeypatch.delenv(name, raising=False)
+        assert midi_options_from_env() == {}
@@ -0,0 +1,229 @@
+"""Tests for the multi-port MIDI pool."""
+
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from fruityloops_mcp.midi_interface import MIDIInterface
+from fruityloops_mcp.midi_pool import MIDIPool
+from fruityloops_mcp.server import FLStudioMCPServer, midi_options_from_env
+
+
+def _interface(name):
+    midi = Mock()
+    midi.port_name = name
+    midi.is_connected = False
+    midi.is_busy = False
+
+    def connect():
+        midi.is_connected = True
+        return True
+
+    midi.connect.side_effect = connect
+    return midi
+
+
+def _closed(pool):
+    """Wait for evicted ports to finish disconnecting."""
+    for thread in pool._closing:
+        thread.join(2)
+
+
+@pytest.fixture
+def pool():
+    return MIDIPool(_interface("default"), Mock(side_effect=_interface), max_ports=2)
+
+
+class TestMIDIPool:
+    """Test the MIDIPool class."""
+
+    def test_default_port(self, pool):
+        """Test no name or the default name returns the default interface unconnected."""
+        assert pool.get() is pool.default
+        assert pool.get("default") is pool.default
+        pool.default.connect.assert_not_called()
+        assert len(pool) == 0
+
+    def test_opens_lazily(self, pool):
+        """Test a named port is created and connected on first use, then reused."""
+        midi = pool.get("synth")
+        assert midi.port_name == "synth"
+        midi.connect.assert_called_once()
+        assert pool.get("synth") is midi
+        midi.connect.assert_called_once()
+        assert "synth" in pool
+        assert pool.stats()["opened"] == 1
+
+    def test_without_connect(self, pool):
+        """Test connect=False leaves a new port unconnected."""
+        midi = pool.get("synth", connect=False)
+        midi.connect.assert_not_called()
+
+    def test_evicts_least_recently_used(self, pool):
+        """Test the least recently used port is disconnected beyond max_ports."""
+        a = pool.get("a")
+        b = pool.get("b")
+        pool.get("a")
+        pool.get("c")
+
+        _closed(pool)
+        b.disconnect.assert_called_once()
+        a.disconnect.assert_not_called()
+        assert pool.stats() == {
+            "default": "default",
+            "ports": ["a", "c"],
+            "opened": 3,
+            "evicted": 1,
+        }
+
+    def test_busy_ports_are_not_evicted(self, pool):
+        """Test a playing or recording port is skipped until it is idle."""
+        a = pool.get("a")
+        a.is_busy = True
+        b = pool.get("b")
+        c = pool.get("c")
+        _closed(pool)
+        b.disconnect.assert_called_once()
+        assert pool.stats()["ports"] == ["a", "c"]
+
+        c.is_busy = True
+        pool.get("d")
+        assert pool.stats()["ports"] == ["a", "c", "d"]
+        a.disconnect.assert_not_called()
+
+        a.is_busy = False
+        pool.get("e")
+        _closed(pool)
+        a.disconnect.assert_called_once()
+        assert pool.stats()["ports"] == ["c", "e"]
+
+    def test_eviction_does_not_wait_for_disconnect(self, pool):
+        """Test evicting a slow port leaves get() to return at once."""
+        a = pool.get("a")
+        pool.get("b")
+        disconnecting = threading.Event()
+        a.disconnect.side_effect = lambda: (disconnecting.set(), time.sleep(0.5))
+
+        start = time.monotonic()
+        pool.get("c")
+        assert time.monotonic() - start < 0.25
+        assert disconnecting.wait(2)
+        pool.close()
+        a.disconnect.assert_called_once()
+
+    def test_release(self, pool):
+        """Test releasing drops named ports and only disconnects the default."""
+        midi = pool.get("synth")
+        pool.release("synth")
+        midi.disconnect.assert_called_once()
+        assert "synth" not in pool
+
+        pool.release()
+        pool.default.disconnect.assert_called_once()
+        pool.release("unknown")
+
+    def test_close(self, pool):
+        """Test close disconnects pooled ports but not the default."""
+        ports = [pool.get("a"), pool.get("b")]
+        pool.close()
+        for midi in ports:
+            midi.disconnect.assert_called_once()
+        pool.default.disconnect.assert_not_called()
+        assert list(pool) == [pool.default]
+
+    @pytest.mark.asyncio
+    async def test_interface_busy_with_subscription(self):
+        """Test an input subscription marks an interface busy."""
+        midi = MIDIInterface()
+        assert not midi.is_busy
+        subscription = midi.subscribe_input()
+        assert midi.is_busy
+        subscription.close()
+        assert not midi.is_busy
+
+    def test_invalid_max_ports(self):
+        """Test max_ports must be positive."""
+        with pytest.raises(ValueError, match="max_ports"):
+            MIDIPool(_interface("default"), _interface, max_ports=0)
+
+
+class TestServerPorts:
+    """Test the port argument of the MIDI tools."""
+
+    @pytest.fixture
+    def server(self):
+        with patch(
+            "fruityloops_mcp.server.MIDIInterface",
+            side_effect=lambda port_name, **_: _interface(port_name),
+        ):
+            yield FLStudioMCPServer(midi_port="default", max_midi_ports=2)
+
+    @pytest.mark.asyncio
+    async def test_default_port_used_without_argument(self, server):
+        """Test tools keep using the default port."""
+        server.midi.send_control_change.return_value = True
+        await server._execute_tool("midi_send_cc", {"control": 7, "value": 100})
+        server.midi.send_control_change.assert_called_once_with(7, 100, 0)
+        assert len(server.midi_pool) == 0
+
+    @pytest.mark.asyncio
+    async def test_routes_to_named_port(self, server):
+        """Test the port argument opens and uses another port."""
+        result = await server._execute_tool(
+            "midi_send_note_on", {"note": 60, "velocity": 90, "port": "synth"}
+        )
+        synth = server.midi_pool.get("synth")
+        synth.send_note_on.assert_called_once_with(60, 90, 0)
+        server.midi.send_note_on.assert_not_called()
+        assert "synth" in server.midi_pool
+        assert result.startswith("Sent MIDI note_on")
+
+    @pytest.mark.asyncio
+    async def test_connect_and_disconnect_named_port(self, server):
+        """Test midi_connect and midi_disconnect accept a port."""
+        result = await server._execute_tool("midi_connect", {"port": "synth"})
+        assert result == "Connected to MIDI port: synth"
+        synth = server.midi_pool.get("synth")
+        synth.connect.assert_called_once()
+
+        result = await server._execute_tool("midi_disconnect", {"port": "synth"})
+        assert result == "Disconnected from MIDI port: synth"
+        synth.disconnect.assert_called_once()
+        server.midi.disconnect.assert_not_called()
+        assert "synth" not in server.midi_pool
+
+    @pytest.mark.asyncio
+    async def test_disconnect_runs_off_event_loop(self, server):
+        """Test midi_disconnect joins the port's threads outside the event loop."""
+        threads = []
+        server.midi.disconnect.side_effect = lambda: threads.append(threading.current_thread())
+
+        await server._execute_tool("midi_disconnect", {})
+
+        assert threads and threads[0] is not threading.current_thread()
+
+    def test_schemas_accept_port(self, server):
+        """Test MIDI tool schemas declare the port argument."""
+        for spec in server.tools:
+            if spec.name.startswith("midi_") and spec.name != "midi_list_ports":
+                assert "port" in spec.input_schema["properties"], spec.name
+
+    def test_pooled_ports_share_catalog(self):
+        """Test pooled interfaces use the default interface's port listing."""
+        with patch("fruityloops_mcp.midi_interface.mido") as mock_mido:
+            mock_mido.get_output_names.return_value = ["default", "synth"]
+            mock_mido.get_input_names.return_value = ["default", "synth"]
+            server = FLStudioMCPServer(midi_port="default")
+            synth = server.midi_pool.get("synth", connect=False)
+            assert synth.port_catalog is server.midi.port_catalog
+            server.midi.list_ports()
+            synth.list_ports()
+            assert mock_mido.get_output_names.call_count == 1
+        server.fl.shutdown()
+
+    def test_max_ports_from_env(self, monkeypatch):
+        """Test MIDI_MAX_PORTS."""
+        monkeypatch.setenv("MIDI_MAX_PORTS", "3")
+        assert midi_options_from_env()["max_midi_ports"] == 3
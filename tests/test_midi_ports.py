@@ -0,0 +1,215 @@
+"""Tests for cached MIDI port enumeration."""
+
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from fruityloops_mcp.midi_interface import MIDIInterface
+from fruityloops_mcp.midi_ports import PortCatalog, PortChange
+from fruityloops_mcp.server import FLStudioMCPServer, midi_options_from_env
+
+
+class FakeSystem:
+    """Stand-in for the system's MIDI port enumeration."""
+
+    def __init__(self, inputs=("A",), outputs=("A",)):
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.calls = 0
+
+    def get_input_names(self):
+        self.calls += 1
+        return list(self.inputs)
+
+    def get_output_names(self):
+        return list(self.outputs)
+
+
+@pytest.fixture
+def system():
+    """Create a fake port enumeration."""
+    return FakeSystem()
+
+
+class TestPortCatalog:
+    """Test the PortCatalog class."""
+
+    def test_listing_is_cached(self, system):
+        """Test repeated lookups within the TTL enumerate once."""
+        catalog = PortCatalog(system.get_input_names, system.get_output_names, ttl=60)
+        assert catalog.get() == {"input": ["A"], "output": ["A"]}
+        system.inputs.append("B")
+        assert catalog.get() == {"input": ["A"], "output": ["A"]}
+        assert system.calls == 1
+        assert catalog.hits == 1
+
+    def test_expired_listing_is_refreshed(self, system):
+        """Test a zero TTL enumerates on every lookup."""
+        catalog = PortCatalog(system.get_input_names, system.get_output_names, ttl=0)
+        catalog.get()
+        catalog.get()
+        assert system.calls == 2
+
+    def test_refresh_and_invalidate(self, system):
+        """Test forcing a new enumeration."""
+        catalog = PortCatalog(system.get_input_names, system.get_output_names, ttl=60)
+        catalog.get()
+        catalog.get(refresh=True)
+        catalog.invalidate()
+        catalog.get()
+        assert system.calls == 3
+
+    def test_missing_required_port_refreshes(self, system):
+        """Test looking for a port not in the cached listing enumerates again."""
+        catalog = PortCatalog(system.get_input_names, system.get_output_names, ttl=60)
+        catalog.get()
+        system.inputs.append("B")
+        system.outputs.append("B")
+
+        assert "B" in catalog.get(require="B")["output"]
+        assert system.calls == 2
+        catalog.get(require="B")
+        assert system.calls == 2
+
+    def test_changes_are_reported(self, system):
+        """Test added and removed ports reach listeners."""
+        catalog = PortCatalog(system.get_input_names, system.get_output_names)
+        changes = []
+        catalog.add_listener(changes.append)
+        assert catalog.refresh() == []  # The first listing is the baseline
+
+        system.inputs = ["B"]
+        system.outputs = ["A", "B"]
+        catalog.refresh()
+        assert changes == [
+            PortChange("added", "input", "B"),
+            PortChange("removed", "input", "A"),
+            PortChange("added", "output", "B"),
+        ]
+
+        catalog.remove_listener(changes.append)
+        system.outputs = []
+        catalog.refresh()
+        assert len(changes) == 3
+
+    def test_changes_survive_invalidate(self, system):
+        """Test invalidating the cache does not lose the previous listing."""
+        catalog = PortCatalog(system.get_input_names, system.get_output_names)
+        catalog.get()
+        catalog.invalidate()
+        system.inputs.append("C")
+        assert catalog.refresh() == [PortChange("added", "input", "C")]
+
+    def test_listener_errors_are_contained(self, system):
+        """Test a failing listener does not break enumeration."""
+        catalog = PortCatalog(system.get_input_names, system.get_output_names)
+        catalog.add_listener(Mock(side_effect=RuntimeError("boom")))
+        catalog.refresh()
+        system.inputs.append("B")
+        assert len(catalog.refresh()) == 1
+
+    def test_background_polling(self, system):
+        """Test the poller detects a new port."""
+        catalog = PortCatalog(system.get_input_names, system.get_output_names)
+        added = threading.Event()
+        catalog.add_listener(lambda change: added.set())
+        catalog.start_polling(0.005)
+        catalog.start_polling(0.005)
+        assert catalog.is_polling
+
+        system.outputs.append("New")
+        assert added.wait(2)
+        catalog.stop_polling()
+        catalog.stop_polling()
+        assert not catalog.is_polling
+
+    def test_polling_survives_enumeration_errors(self, system):
+        """Test the poller keeps running when enumeration fails."""
+        failing = Mock(side_effect=OSError("backend"))
+        catalog = PortCatalog(failing, system.get_output_names)
+        catalog.start_polling(0.001)
+        while failing.call_count < 3:
+            pass
+        assert catalog.is_polling
+        catalog.stop_polling()
+
+
+class TestMIDIInterfacePorts:
+    """Test MIDIInterface use of the port catalog."""
+
+    @pytest.fixture
+    def mock_mido(self):
+        """Patch mido with a single FLStudio_MIDI port."""
+        with patch("fruityloops_mcp.midi_interface.mido") as mock_mido:
+            mock_mido.get_output_names.return_value = ["FLStudio_MIDI"]
+            mock_mido.get_input_names.return_value = ["FLStudio_MIDI"]
+            mock_mido.open_output.return_value = Mock()
+            mock_mido.open_input.return_value = Mock()
+            yield mock_mido
+
+    def test_connect_and_list_share_the_cache(self, mock_mido):
+        """Test connect, list_ports and reconnect enumerate once."""
+        midi = MIDIInterface(port_cache_ttl=60)
+        midi.list_ports()
+        midi.connect()
+        midi.disconnect()
+        midi.connect()
+        assert mock_mido.get_output_names.call_count == 1
+        assert midi.port_stats()["hits"] == 2
+
+    def test_list_ports_refresh(self, mock_mido):
+        """Test list_ports can bypass the cache."""
+        midi = MIDIInterface(port_cache_ttl=60)
+        midi.list_ports()
+        midi.list_ports(refresh=True)
+        assert mock_mido.get_output_names.call_count == 2
+
+    def test_connect_finds_new_port(self, mock_mido):
+        """Test connect re-enumerates when the port is missing from the cache."""
+        mock_mido.get_output_names.return_value = []
+        midi = MIDIInterface(port_cache_ttl=60)
+        assert midi.connect() is False
+
+        mock_mido.get_output_names.return_value = ["FLStudio_MIDI"]
+        assert midi.connect() is True
+
+    def test_port_polling_on_connect(self, mock_mido):
+        """Test port_poll_interval starts the poller on connect."""
+        midi = MIDIInterface(port_poll_interval=60)
+        with midi:
+            assert midi.port_stats()["polling"] is True
+        assert midi.port_stats()["polling"] is False
+
+    def test_port_listener(self, mock_mido):
+        """Test port listeners receive changes found by list_ports."""
+        midi = MIDIInterface()
+        changes = []
+        midi.add_port_listener(changes.append)
+        midi.list_ports()
+        mock_mido.get_input_names.return_value = []
+        midi.list_ports(refresh=True)
+        midi.remove_port_listener(changes.append)
+
+        assert changes == [PortChange("removed", "input", "FLStudio_MIDI")]
+
+
+class TestServerPorts:
+    """Test port options on the server."""
+
+    @pytest.mark.asyncio
+    async def test_list_ports_tool_refresh(self):
+        """Test midi_list_ports forwards the refresh flag."""
+        with patch("fruityloops_mcp.server.MIDIInterface") as MockMIDI:
+            MockMIDI.return_value.list_ports.return_value = {"input": [], "output": []}
+            server = FLStudioMCPServer()
+            await server._execute_tool("midi_list_ports", {"refresh": True})
+            MockMIDI.return_value.list_ports.assert_called_once_with(refresh=True)
+
+    def test_options_from_env(self, monkeypatch):
+        """Test port cache options are read from the environment."""
+        monkeypatch.setenv("MIDI_PORT_CACHE_TTL", "5")
+        monkeypatch.setenv("MIDI_PORT_POLL_INTERVAL", "0.5")
+        options = midi_options_from_env()
+        assert options["port_cache_ttl"] == 5.0
+        assert options["port_poll_interval"] == 0.5
@@ -0,0 +1,380 @@
+"""Tests for automatic MIDI reconnection."""
+
+import random
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import mido
+import pytest
+
+from fruityloops_mcp.midi_interface import MIDIInterface, _is_port_lost
+from fruityloops_mcp.midi_ports import PortChange
+from fruityloops_mcp.midi_reconnect import ReconnectPolicy, ReconnectSupervisor
+from fruityloops_mcp.server import midi_options_from_env
+
+FAST = ReconnectPolicy(initial_delay=0.001, max_delay=0.01, jitter=0)
+
+
+class ClosableOutput(mido.ports.BaseOutput):
+    """Real mido output port keeping what it sends."""
+
+    def _open(self, **_kwargs):
+        self.sent = []
+
+    def _send(self, msg):
+        self.sent.append(msg)
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        time.sleep(0.001)
+
+
+class TestReconnectPolicy:
+    """Test the ReconnectPolicy class."""
+
+    def test_exponential_backoff(self):
+        """Test delays grow by the multiplier up to the maximum."""
+        policy = ReconnectPolicy(initial_delay=0.1, multiplier=2, max_delay=1, jitter=0)
+        assert [policy.delay(n) for n in range(1, 6)] == [0.1, 0.2, 0.4, 0.8, 1]
+
+    def test_jitter_stays_in_bounds(self):
+        """Test jitter varies the delay within the configured fraction."""
+        policy = ReconnectPolicy(initial_delay=1, max_delay=10, jitter=0.5)
+        rng = random.Random(1)
+        delays = {policy.delay(1, rng) for _ in range(100)}
+        assert len(delays) > 1
+        assert all(0.5 <= d <= 1.5 for d in delays)
+
+    def test_invalid_policy(self):
+        """Test invalid settings are rejected."""
+        with pytest.raises(ValueError, match="outage policy"):
+            ReconnectPolicy(outage_policy="retry")
+        with pytest.raises(ValueError, match="jitter"):
+            ReconnectPolicy(jitter=2)
+
+
+class TestReconnectSupervisor:
+    """Test the ReconnectSupervisor class."""
+
+    def test_reconnects_after_failures(self):
+        """Test attempts continue until reopen succeeds."""
+        reopen = Mock(side_effect=[False, RuntimeError("busy"), True])
+        supervisor = ReconnectSupervisor(reopen, FAST)
+        supervisor.start()
+        supervisor.start()  # Already reconnecting
+        _wait_until(lambda: not supervisor.is_reconnecting)
+
+        stats = supervisor.stats()
+        assert stats["attempts"] == 3
+        assert stats["reconnects"] == 1
+        assert stats["outages"] == 1
+        assert stats["last_outage_s"] > 0
+        assert stats["total_outage_s"] == stats["last_outage_s"]
+
+    def test_held_sends_are_replayed_in_order(self):
+        """Test sends held during the outage run after reconnecting."""
+        reopened = threading.Event()
+        supervisor = ReconnectSupervisor(reopened.is_set, FAST)
+        supervisor.start()
+        sent = []
+        for n in range(3):
+            assert supervisor.hold(lambda n=n: sent.append(n)) is True
+        reopened.set()
+        _wait_until(lambda: not supervisor.is_reconnecting)
+
+        assert sent == [0, 1, 2]
+        assert supervisor.replayed == 3
+
+    def test_sends_held_while_replaying_are_replayed(self):
+        """Test the outage lasts, and resume waits, until nothing is left to replay."""
+        sent = []
+        resume = Mock(side_effect=lambda: sent.append("resumed"))
+        policy = ReconnectPolicy(initial_delay=60)
+        supervisor = ReconnectSupervisor(Mock(return_value=True), policy, resume=resume)
+        supervisor.start()
+
+        def first():
+            sent.append(1)
+            assert supervisor.is_reconnecting
+            assert supervisor.hold(lambda: sent.append(2)) is True
+
+        supervisor.hold(first)
+        supervisor.wake()
+        _wait_until(lambda: not supervisor.is_reconnecting)
+
+        assert sent == [1, 2, "resumed"]
+        assert supervisor.replayed == 2
+        resume.assert_called_once()
+
+    def test_hold_buffer_is_bounded(self):
+        """Test the oldest held sends are dropped when the buffer is full."""
+        policy = ReconnectPolicy(initial_delay=60, buffer_size=2)
+        supervisor = ReconnectSupervisor(Mock(return_value=False), policy)
+        supervisor.start()
+        for _ in range(5):
+            supervisor.hold(Mock())
+        assert supervisor.stats()["held"] == 2
+        assert supervisor.dropped == 3
+        supervisor.stop()
+        assert supervisor.dropped == 5
+
+    def test_drop_policy(self):
+        """Test the drop policy fails sends during an outage."""
+        policy = ReconnectPolicy(initial_delay=60, outage_policy="drop")
+        supervisor = ReconnectSupervisor(Mock(return_value=False), policy)
+        supervisor.start()
+        assert supervisor.hold(Mock()) is False
+        supervisor.stop()
+
+    def test_hold_without_outage(self):
+        """Test nothing is held when the port is not being reconnected."""
+        assert ReconnectSupervisor(Mock()).hold(Mock()) is False
+
+    def test_gives_up_after_max_attempts(self):
+        """Test the supervisor stops after max_attempts."""
+        policy = ReconnectPolicy(initial_delay=0.001, jitter=0, max_attempts=3)
+        supervisor = ReconnectSupervisor(Mock(return_value=False), policy)
+        supervisor.start()
+        held = Mock()
+        supervisor.hold(held)
+        _wait_until(lambda: not supervisor.is_reconnecting)
+
+        assert supervisor.attempts == 3
+        assert supervisor.failures == 1
+        held.assert_not_called()
+
+    def test_wake_skips_backoff(self):
+        """Test wake triggers an attempt before the delay elapses."""
+        reopen = Mock(return_value=True)
+        supervisor = ReconnectSupervisor(reopen, ReconnectPolicy(initial_delay=60))
+        supervisor.start()
+        supervisor.wake()
+        _wait_until(lambda: not supervisor.is_reconnecting)
+        reopen.assert_called_once()
+
+    def test_stop_cancels_reconnect(self):
+        """Test stop ends the outage without reopening."""
+        reopen = Mock(return_value=True)
+        supervisor = ReconnectSupervisor(reopen, ReconnectPolicy(initial_delay=60))
+        supervisor.start()
+        supervisor.stop()
+        assert not supervisor.is_reconnecting
+        reopen.assert_not_called()
+
+
+class TestMIDIInterfaceReconnect:
+    """Test MIDIInterface with reconnect enabled."""
+
+    @pytest.fixture
+    def mock_mido(self):
+        """Patch mido with ports whose sends can be made to fail."""
+        with patch("fruityloops_mcp.midi_interface.mido") as mock_mido:
+            mock_mido.get_output_names.return_value = ["FLStudio_MIDI"]
+            mock_mido.get_input_names.return_value = ["FLStudio_MIDI"]
+            mock_mido.open_output.side_effect = lambda name: Mock()
+            mock_mido.open_input.return_value = Mock()
+            yield mock_mido
+
+    def test_disabled_by_default(self):
+        """Test reconnect metrics are only available when enabled."""
+        assert MIDIInterface().reconnect_stats() is None
+
+    def test_port_loss_reconnects_and_replays(self, mock_mido):
+        """Test a lost port is reopened and held sends are replayed."""
+        midi = MIDIInterface(reconnect=True, reconnect_policy=FAST, port_cache_ttl=0)
+        midi.connect()
+        lost_port = midi._output_port
+        lost_port.send.side_effect = ValueError("send() called on closed port")
+        mock_mido.get_output_names.return_value = []
+
+        assert midi.send_note_on(60) is False
+        assert not midi.is_connected
+        assert midi.send_note_on(61) is True  # Held during the outage
+        assert midi.send_control_change(7, 100) is True
+
+        mock_mido.get_output_names.return_value = ["FLStudio_MIDI"]
+        _wait_until(lambda: midi.is_connected and not midi.reconnect_stats()["reconnecting"])
+
+        new_port = midi._output_port
+        assert new_port is not lost_port
+        lost_port.close.assert_called_once()
+        assert new_port.send.call_count == 2
+        built = [c[0][0] for c in mock_mido.Message.call_args_list]
+        assert built[-2:] == ["note_on", "control_change"]
+        stats = midi.reconnect_stats()
+        assert stats["reconnects"] == 1
+        assert stats["replayed"] == 2
+        assert stats["attempts"] >= 1
+        midi.disconnect()
+
+    def test_disconnect_during_outage(self, mock_mido):
+        """Test disconnect stops reconnecting and releases the lost port."""
+        policy = ReconnectPolicy(initial_delay=60)
+        midi = MIDIInterface(reconnect=True, reconnect_policy=policy)
+        midi.connect()
+        lost_port = midi._output_port
+        lost_port.send.side_effect = ValueError("send() called on closed port")
+        midi.send_note_on(60)
+        assert midi.reconnect_stats()["reconnecting"]
+
+        midi.disconnect()
+        assert not midi.reconnect_stats()["reconnecting"]
+        assert midi._output_port is None
+        lost_port.close.assert_called_once()
+        assert midi.send_note_on(60) is False
+
+    def test_closed_mido_port_is_lost(self):
+        """Test a real mido port closed under the interface starts a reconnect."""
+        opened = []
+
+        def open_output(name, **_kwargs):
+            opened.append(ClosableOutput(name))
+            return opened[-1]
+
+        with patch.multiple(
+            mido,
+            get_output_names=Mock(return_value=["FLStudio_MIDI"]),
+            get_input_names=Mock(return_value=["FLStudio_MIDI"]),
+            open_output=open_output,
+            open_input=Mock(),
+        ):
+            midi = MIDIInterface(reconnect=True, reconnect_policy=FAST, port_cache_ttl=0)
+            midi.connect()
+            opened[0].close()
+            assert midi.send_note_on(60) is False
+            assert not midi.is_connected
+            _wait_until(lambda: midi.is_connected)
+            assert midi.send_note_on(62) is True
+            midi.disconnect()
+
+        assert len(opened) == 2
+        assert [m.note for m in opened[1].sent if m.type == "note_on"] == [62]
+        assert midi.reconnect_stats()["reconnects"] == 1
+
+    def test_sends_during_replay_keep_order(self):
+        """Test a send made while held sends are replayed goes out after them."""
+        opened = []
+        replaying = threading.Event()
+        release = threading.Event()
+
+        class GatedOutput(ClosableOutput):
+            def send(self, msg):
+                if msg.type == "note_on" and msg.note == 61:
+                    replaying.set()
+                    release.wait(2)
+                super().send(msg)
+
+        def open_output(name, **_kwargs):
+            opened.append(GatedOutput(name))
+            return opened[-1]
+
+        with patch.multiple(
+            mido,
+            get_output_names=Mock(return_value=["FLStudio_MIDI"]),
+            get_input_names=Mock(return_value=["FLStudio_MIDI"]),
+            open_output=open_output,
+            open_input=Mock(),
+        ):
+            midi = MIDIInterface(reconnect=True, reconnect_policy=FAST, port_cache_ttl=0)
+            midi.connect()
+            opened[0].close()
+            assert midi.send_note_on(60) is False
+            assert midi.send_note_on(61) is True  # Held
+            assert midi.send_note_off(61) is True  # Held
+            assert replaying.wait(2)
+            assert not midi.is_connected
+            assert midi.send_note_on(62) is True  # Held behind the replay
+            release.set()
+            _wait_until(lambda: midi.is_connected)
+            assert midi.send_note_off(62) is True
+            midi.disconnect()
+
+        sent = [(m.type, m.note) for m in opened[1].sent if m.type.startswith("note")]
+        assert sent == [("note_on", 61), ("note_off", 61), ("note_on", 62), ("note_off", 62)]
+        assert midi.reconnect_stats()["replayed"] == 3
+
+    def test_lost_port_released_without_reconnect(self):
+        """Test a lost port is released and reconnecting leaves one writer thread."""
+        opened = []
+
+        def open_output(name, **_kwargs):
+            opened.append(ClosableOutput(name))
+            return opened[-1]
+
+        def writer_threads():
+            return [t for t in threading.enumerate() if t.name == "midi-output-writer"]
+
+        with patch.multiple(
+            mido,
+            get_output_names=Mock(return_value=["FLStudio_MIDI"]),
+            get_input_names=Mock(return_value=["FLStudio_MIDI"]),
+            open_output=open_output,
+            open_input=Mock(),
+        ):
+            midi = MIDIInterface(output_mode="threaded")
+            midi.connect()
+            opened[0].close()
+            midi.send_note_on(60)
+            _wait_until(lambda: not midi.is_connected)
+            _wait_until(lambda: not writer_threads())
+            assert midi._output_port is None
+            assert not midi._listener.is_running
+
+            midi.disconnect()
+            assert midi.connect()
+            assert len(writer_threads()) == 1
+            midi.disconnect()
+
+        assert not writer_threads()
+        assert all(port.closed for port in opened)
+        assert midi._output_port is None and midi._input_port is None
+
+    def test_port_loss_errors(self):
+        """Test which send errors mean the port is gone."""
+        rtmidi_error = type("SystemError", (Exception,), {"__module__": "rtmidi._rtmidi"})
+        assert _is_port_lost(ValueError("send() called on closed port"))
+        assert _is_port_lost(rtmidi_error("MidiOutAlsa::sendMessage: error sending MIDI"))
+        assert not _is_port_lost(ValueError("data byte must be in range 0..127"))
+        assert not _is_port_lost(OSError("busy"))
+
+    def test_port_removed_is_lost(self, mock_mido):
+        """Test the connected port disappearing from the listing starts a reconnect."""
+        midi = MIDIInterface(reconnect=True, reconnect_policy=ReconnectPolicy(initial_delay=60))
+        midi.connect()
+        midi._on_port_change(PortChange("removed", "output", "Other"))
+        assert midi.is_connected
+        midi._on_port_change(PortChange("removed", "input", "FLStudio_MIDI"))
+        assert not midi.is_connected
+        assert midi.reconnect_stats()["reconnecting"]
+        midi.disconnect()
+
+    def test_port_added_wakes_supervisor(self):
+        """Test the reappearing port triggers an immediate attempt."""
+        midi = MIDIInterface(reconnect=True)
+        midi._supervisor = Mock(is_reconnecting=True)
+        midi._on_port_change(PortChange("added", "output", "Other"))
+        midi._supervisor.wake.assert_not_called()
+        midi._on_port_change(PortChange("added", "output", "FLStudio_MIDI"))
+        midi._supervisor.wake.assert_called_once()
+
+
+class TestReconnectOptions:
+    """Test reconnect options from the environment."""
+
+    def test_options_from_env(self, monkeypatch):
+        """Test MIDI_RECONNECT and MIDI_OUTAGE_POLICY."""
+        monkeypatch.setenv("MIDI_RECONNECT", "1")
+        monkeypatch.setenv("MIDI_OUTAGE_POLICY", "drop")
+        options = midi_options_from_env()
+        assert options["reconnect"] is True
+        assert options["reconnect_policy"].outage_policy == "drop"
+
+    def test_reconnect_off(self, monkeypatch):
+        """Test reconnect stays off unless enabled."""
+        monkeypatch.setenv("MIDI_RECONNECT", "0")
+        assert "reconnect" not in midi_options_from_env()
@@ -0,0 +1,332 @@
+"""Tests for recording MIDI input to Standard MIDI Files."""
+
+import os
+import struct
+import threading
+import time
+import tracemalloc
+from unittest.mock import Mock, patch
+
+import mido
+import pytest
+
+from fruityloops_mcp.midi_file import MidiFileReader, MidiFileWriter
+from fruityloops_mcp.midi_input import InputEvent
+from fruityloops_mcp.midi_interface import MIDIInterface
+from fruityloops_mcp.midi_recorder import InputRecorder
+from fruityloops_mcp.server import FLStudioMCPServer
+
+
+class CallbackInput:
+    """Input port stand-in that pushes messages to a callback, like rtmidi."""
+
+    def __init__(self):
+        self._callback = None
+
+    @property
+    def callback(self):
+        return self._callback
+
+    @callback.setter
+    def callback(self, func):
+        self._callback = func
+
+    def feed(self, message):
+        """Deliver a message from a backend thread."""
+        thread = threading.Thread(target=self._callback, args=(message,))
+        thread.start()
+        thread.join()
+
+    def close(self):
+        pass
+
+
+def note(n, velocity=64):
+    """Build a note on message."""
+    return mido.Message("note_on", note=n, velocity=velocity)
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        time.sleep(0.001)
+
+
+def _absolute(path):
+    """Read a file with mido as (absolute tick, message) pairs."""
+    midi_file = mido.MidiFile(path)
+    tick = 0
+    events = []
+    for message in midi_file.tracks[0]:
+        tick += message.time
+        events.append((tick, message))
+    return midi_file, events
+
+
+@pytest.fixture
+def input_port():
+    """Connect a MIDI interface whose input port is fed by the test."""
+    port = CallbackInput()
+    with patch("fruityloops_mcp.midi_interface.mido") as mock_mido:
+        mock_mido.get_output_names.return_value = ["FLStudio_MIDI"]
+        mock_mido.get_input_names.return_value = ["FLStudio_MIDI"]
+        mock_mido.open_output.return_value = Mock(spec=["send", "close"])
+        mock_mido.open_input.return_value = port
+        yield port
+
+
+class TestMidiFileWriter:
+    """Test the MidiFileWriter class."""
+
+    def test_round_trip(self, tmp_path):
+        """Test a written file reads back with mido and MidiFileReader."""
+        path = str(tmp_path / "take.mid")
+        with MidiFileWriter(path, ticks_per_beat=480, tempo=500_000) as writer:
+            assert writer.write(0, b"\x90\x3c\x40")
+            assert writer.write(480, b"\x80\x3c\x00")
+            assert writer.write(960, b"\xf0\x7e\x7f\x06\x01\xf7")
+            assert not writer.write(960, b"\xf8")
+            writer.close(end_tick=1920)
+        assert writer.closed
+        assert writer.events == 3
+
+        midi_file, events = _absolute(path)
+        assert midi_file.type == 0
+        assert midi_file.ticks_per_beat == 480
+        assert [(tick, m.type) for tick, m in events] == [
+            (0, "set_tempo"),
+            (0, "note_on"),
+            (480, "note_off"),
+            (960, "sysex"),
+            (1920, "end_of_track"),
+        ]
+        assert events[3][1].data == (0x7E, 0x7F, 0x06, 0x01)
+
+        with MidiFileReader(path) as reader:
+            assert [(s, m) for s, m in reader.messages()] == [
+                (0.0, b"\x90\x3c\x40"),
+                (0.5, b"\x80\x3c\x00"),
+                (2.0, None),
+            ]
+
+    def test_track_length_is_filled_in(self, tmp_path):
+        """Test the track chunk length matches the bytes written."""
+        path = tmp_path / "take.mid"
+        writer = MidiFileWriter(str(path))
+        for tick in range(0, 100_000, 1000):
+            writer.write(tick, b"\xb0\x07\x64")
+        size = writer.close()
+        data = path.read_bytes()
+        assert size == len(data) == writer.size
+        assert data[14:18] == b"MTrk"
+        assert struct.unpack(">I", data[18:22])[0] == len(data) - 22
+        assert data.endswith(b"\xff\x2f\x00")
+
+    def test_earlier_ticks_are_clamped(self, tmp_path):
+        """Test a message earlier than the previous one gets a zero delta."""
+        path = str(tmp_path / "take.mid")
+        with MidiFileWriter(path) as writer:
+            writer.write(100, b"\x90\x3c\x40")
+            writer.write(50, b"\x90\x3e\x40")
+        _, events = _absolute(path)
+        assert [tick for tick, m in events if m.type == "note_on"] == [100, 100]
+
+    def test_invalid_arguments(self, tmp_path):
+        """Test out of range time division and tempo are rejected."""
+        with pytest.raises(ValueError, match="out of range"):
+            MidiFileWriter(str(tmp_path / "a.mid"), ticks_per_beat=0)
+        with pytest.raises(ValueError, match="out of range"):
+            MidiFileWriter(str(tmp_path / "a.mid"), tempo=1 << 24)
+
+
+class TestInputRecorder:
+    """Test the InputRecorder class."""
+
+    def test_arrival_times_become_ticks(self, tmp_path):
+        """Test events are placed at their arrival time at the tempo."""
+        path = str(tmp_path / "take.mid")
+        recorder = InputRecorder(path, tempo=90, ticks_per_beat=96).start()
+        start = recorder._start_ns
+        recorder.record(InputEvent(note(60), 0.0, start + 1_000_000_000))
+        recorder.record(InputEvent(note(62), 0.0, start + 2_500_000_000))
+        summary = recorder.stop()
+
+        midi_file, events = _absolute(path)
+        assert midi_file.ticks_per_beat == 96
+        assert events[0][1].tempo == 666_667
+        # 90 BPM at 96 ticks per beat is 144 ticks per second
+        assert [(tick, m.note) for tick, m in events if m.type == "note_on"] == [
+            (144, 60),
+            (360, 62),
+        ]
+        assert summary["events"] == 2
+        assert summary["recording"] is False
+        assert summary["bytes"] == os.path.getsize(path)
+
+    def test_written_while_recording(self, tmp_path):
+        """Test events reach the file before the recording stops."""
+        path = tmp_path / "take.mid"
+        recorder = InputRecorder(str(path), flush_interval=0.01).start()
+        header_size = path.stat().st_size
+        recorder.record(InputEvent(note(60), 0.0, time.perf_counter_ns()))
+        _wait_until(lambda: path.stat().st_size > header_size)
+        assert recorder.summary()["recording"] is True
+        recorder.stop()
+
+    def test_queue_is_bounded(self, tmp_path):
+        """Test events beyond the queue limit are dropped and counted."""
+        recorder = InputRecorder(str(tmp_path / "a.mid"), flush_interval=10, max_pending=2)
+        recorder.start()
+        for n in range(5):
+            recorder.record(InputEvent(note(n), 0.0, time.perf_counter_ns()))
+        summary = recorder.stop()
+        assert (summary["events"], summary["dropped"]) == (2, 3)
+
+    def test_memory_stays_flat(self, tmp_path):
+        """Test a long recording does not accumulate events in memory."""
+        path = tmp_path / "long.mid"
+        recorder = InputRecorder(str(path), flush_interval=0.001).start()
+        message = note(60)
+        tracemalloc.start()
+        try:
+            for _ in range(60):
+                for _ in range(500):
+                    recorder.record(InputEvent(message, 0.0, time.perf_counter_ns()))
+                _wait_until(lambda: not recorder._queue)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        recorder.stop()
+        assert path.stat().st_size > 30_000 * 4
+        assert peak < 256 * 1024
+
+    def test_unexpected_error_leaves_valid_file(self, tmp_path):
+        """Test an error other than OSError stops the recording and closes the file."""
+        path = tmp_path / "take.mid"
+        recorder = InputRecorder(str(path), flush_interval=0.01).start()
+        recorder.record(InputEvent(note(60), 0.0, time.perf_counter_ns()))
+        bad = Mock()
+        bad.bin.side_effect = ValueError("unexpected message")
+        recorder.record(InputEvent(bad, 0.0, time.perf_counter_ns()))
+        _wait_until(lambda: not recorder.is_recording)
+
+        summary = recorder.stop()
+        assert (summary["events"], summary["errors"]) == (1, 1)
+        data = path.read_bytes()
+        assert struct.unpack(">I", data[18:22])[0] == len(data) - 22
+        _, events = _absolute(str(path))
+        assert [m.type for _, m in events] == ["set_tempo", "note_on", "end_of_track"]
+
+    def test_unwritable_path(self, tmp_path):
+        """Test starting fails if the file cannot be created."""
+        with pytest.raises(OSError):
+            InputRecorder(str(tmp_path / "missing" / "a.mid")).start()
+
+    def test_invalid_tempo(self, tmp_path):
+        """Test a non-positive tempo is rejected."""
+        with pytest.raises(ValueError, match="tempo"):
+            InputRecorder(str(tmp_path / "a.mid"), tempo=0)
+
+
+class TestMIDIInterfaceRecording:
+    """Test recording through MIDIInterface."""
+
+    def test_records_input_port(self, input_port, tmp_path):
+        """Test messages received by the listener are recorded."""
+        path = str(tmp_path / "take.mid")
+        midi = MIDIInterface()
+        midi.connect()
+        recorder = midi.start_recording(path)
+        input_port.feed(note(60))
+        input_port.feed(mido.Message("control_change", control=64, value=127))
+        input_port.feed(mido.Message("clock"))
+        (summary,) = midi.stop_recording()
+        midi.disconnect()
+
+        assert summary["id"] == recorder.id
+        assert summary["events"] == 2
+        _, events = _absolute(path)
+        assert [m.type for _, m in events] == [
+            "set_tempo",
+            "note_on",
+            "control_change",
+            "end_of_track",
+        ]
+        assert midi.input_stats()["sinks"] == 0
+
+    def test_disconnect_finishes_recordings(self, input_port, tmp_path):
+        """Test disconnecting stops recordings and leaves valid files."""
+        path = str(tmp_path / "take.mid")
+        midi = MIDIInterface()
+        midi.connect()
+        midi.start_recording(path)
+        input_port.feed(note(60))
+        midi.disconnect()
+
+        assert midi.stop_recording() == []
+        _, events = _absolute(path)
+        assert events[1][1].note == 60
+
+    def test_not_connected(self, tmp_path):
+        """Test nothing is recorded without a connection."""
+        midi = MIDIInterface()
+        assert midi.start_recording(str(tmp_path / "a.mid")) is None
+        assert not (tmp_path / "a.mid").exists()
+
+
+class TestRecordTools:
+    """Test the midi_record_start and midi_record_stop tools."""
+
+    @pytest.mark.asyncio
+    async def test_record_and_stop(self, input_port, tmp_path):
+        """Test a recording started and stopped through the tools."""
+        path = str(tmp_path / "take.mid")
+        server = FLStudioMCPServer()
+        server.midi.connect()
+        result = await server._execute_tool("midi_record_start", {"path": path, "tempo": 100})
+        assert result.startswith("Recording MIDI input ")
+        assert result.endswith(f"to: {path}")
+
+        input_port.feed(note(60))
+        result = await server._execute_tool("midi_record_stop", {})
+        assert result.startswith("Stopped MIDI recording ")
+        assert "1 events" in result
+        assert mido.MidiFile(path).tracks[0][0].tempo == 600_000
+
+        result = await server._execute_tool("midi_record_stop", {})
+        assert result == "No MIDI recordings to stop"
+        server.midi.disconnect()
+        server.fl.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_shutdown_finishes_recording(self, input_port, tmp_path):
+        """Test stopping the server finishes recordings and pending note offs."""
+        path = tmp_path / "take.mid"
+        server = FLStudioMCPServer()
+        server.midi.connect()
+        output_port = server.midi._output_port
+        await server._execute_tool("midi_record_start", {"path": str(path)})
+        input_port.feed(note(60))
+        server.midi.schedule_note_off(60, delay=60)
+        output_port.send.assert_not_called()
+
+        with patch("fruityloops_mcp.server.stdio_server", side_effect=RuntimeError("closed")):
+            await server.run()
+
+        assert not server.midi.is_connected
+        data = path.read_bytes()
+        assert struct.unpack(">I", data[18:22])[0] == len(data) - 22
+        _, events = _absolute(str(path))
+        assert events[1][1].note == 60
+        output_port.send.assert_called_once()  # The pending note off
+
+    @pytest.mark.asyncio
+    async def test_record_not_connected(self, tmp_path):
+        """Test the tool reports that recording could not start."""
+        server = FLStudioMCPServer()
+        path = str(tmp_path / "take.mid")
+        result = await server._execute_tool("midi_record_start", {"path": path})
+        assert result == f"Failed to record MIDI input to: {path}"
+        server.fl.shutdown()
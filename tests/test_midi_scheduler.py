@@ -0,0 +1,152 @@
+"""Tests for deferred MIDI scheduling."""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from fruityloops_mcp.midi_interface import MIDIInterface
+from fruityloops_mcp.midi_scheduler import MIDIScheduler
+
+
+class TestMIDIScheduler:
+    """Test the MIDIScheduler class."""
+
+    @pytest.mark.asyncio
+    async def test_callback_runs_after_delay(self):
+        """Test a scheduled callback runs once its delay has passed."""
+        scheduler = MIDIScheduler()
+        callback = Mock()
+
+        scheduler.schedule(0.01, callback)
+        assert scheduler.pending == 1
+        callback.assert_not_called()
+
+        await asyncio.sleep(0.05)
+        callback.assert_called_once()
+        assert scheduler.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_callbacks_run_in_deadline_order(self):
+        """Test callbacks run by deadline, not by scheduling order."""
+        scheduler = MIDIScheduler()
+        order = []
+
+        scheduler.schedule(0.03, lambda: order.append("late"))
+        scheduler.schedule(0.01, lambda: order.append("early"))
+        scheduler.schedule(0.02, lambda: order.append("middle"))
+
+        await asyncio.sleep(0.08)
+        assert order == ["early", "middle", "late"]
+
+    @pytest.mark.asyncio
+    async def test_equal_deadlines_keep_scheduling_order(self):
+        """Test callbacks with the same deadline run first-in first-out."""
+        scheduler = MIDIScheduler()
+        order = []
+
+        for i in range(5):
+            scheduler.schedule(0, lambda i=i: order.append(i))
+
+        await asyncio.sleep(0.01)
+        assert order == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_negative_delay_runs_immediately(self):
+        """Test negative delays are treated as zero."""
+        scheduler = MIDIScheduler()
+        callback = Mock()
+
+        scheduler.schedule(-1, callback)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        callback.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_flush_runs_flushable_and_drops_others(self):
+        """Test flush() runs note-off style callbacks and drops the rest."""
+        scheduler = MIDIScheduler()
+        order = []
+
+        scheduler.schedule(10, lambda: order.append("off_late"), flush=True)
+        scheduler.schedule(10, lambda: order.append("dropped"))
+        scheduler.schedule(5, lambda: order.append("off_early"), flush=True)
+
+        scheduler.flush()
+        assert order == ["off_early", "off_late"]
+        assert scheduler.pending == 0
+
+        await asyncio.sleep(0.01)
+        assert order == ["off_early", "off_late"]
+
+    @pytest.mark.asyncio
+    async def test_failing_callback_does_not_stop_others(self):
+        """Test an exception in one callback does not prevent later ones."""
+        scheduler = MIDIScheduler()
+        callback = Mock()
+
+        scheduler.schedule(0, Mock(side_effect=RuntimeError("boom")))
+        scheduler.schedule(0, callback)
+
+        await asyncio.sleep(0.01)
+        callback.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_many_pending_callbacks(self):
+        """Test thousands of pending callbacks are all delivered."""
+        scheduler = MIDIScheduler()
+        fired = []
+
+        for i in range(5000):
+            scheduler.schedule((i % 50) / 1000, lambda i=i: fired.append(i))
+
+        assert scheduler.pending == 5000
+        await asyncio.sleep(0.1)
+        assert len(fired) == 5000
+        assert scheduler.pending == 0
+
+    def test_schedule_without_running_loop_raises(self):
+        """Test scheduling outside an event loop raises RuntimeError."""
+        scheduler = MIDIScheduler()
+        with pytest.raises(RuntimeError):
+            scheduler.schedule(0.1, Mock())
+
+
+class TestMIDIInterfaceScheduling:
+    """Test note-off scheduling through MIDIInterface."""
+
+    @pytest.fixture
+    def midi(self):
+        """Create MIDI interface instance with mocked connection."""
+        midi_instance = MIDIInterface(port_name="FLStudio_MIDI")
+        midi_instance._output_port = Mock()
+        midi_instance._input_port = Mock()
+        midi_instance._is_connected = True
+        return midi_instance
+
+    @pytest.mark.asyncio
+    async def test_schedule_note_off_sends_later(self, midi):
+        """Test schedule_note_off returns immediately and sends after the delay."""
+        output = midi._output_port
+        midi.schedule_note_off(60, 64, 0, 0.01)
+        output.send.assert_not_called()
+
+        await asyncio.sleep(0.05)
+        output.send.assert_called_once()
+        msg = output.send.call_args[0][0]
+        assert msg.type == "note_off"
+        assert msg.note == 60
+
+    @pytest.mark.asyncio
+    async def test_disconnect_flushes_pending_note_offs(self, midi):
+        """Test disconnect sends pending note-offs before closing the port."""
+        output = midi._output_port
+        midi.schedule_note_off(60, 64, 0, 10)
+        midi.schedule_note_off(64, 64, 0, 10)
+
+        midi.disconnect()
+
+        assert output.send.call_count == 2
+        assert [c[0][0].note for c in output.send.call_args_list] == [60, 64]
+        output.close.assert_called_once()
+        assert midi._scheduler.pending == 0
@@ -0,0 +1,240 @@
+"""Tests for server-side timed MIDI sequence playback.
+
+A fake output port records when each message reaches it, so timing error
+can be measured against the requested offsets.
+"""
+
+import asyncio
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from fruityloops_mcp.midi_interface import MIDIInterface
+from fruityloops_mcp.midi_output import LatencyStats
+from fruityloops_mcp.midi_sequencer import SequencePlayer, ticks_to_seconds
+from fruityloops_mcp.server import FLStudioMCPServer
+
+
+class RecordingPort:
+    """Output port recording raw messages with their arrival time."""
+
+    def __init__(self):
+        self.received: list[tuple[int, bytes]] = []
+
+    def send(self, msg):
+        self.received.append((time.perf_counter_ns(), msg))
+
+    def send_bytes(self, data):
+        self.received.append((time.perf_counter_ns(), data))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def recording_midi():
+    """Connect a MIDI interface to a recording port."""
+    port = RecordingPort()
+    with patch("fruityloops_mcp.midi_interface.mido") as mock_mido:
+        mock_mido.get_output_names.return_value = ["FLStudio_MIDI"]
+        mock_mido.get_input_names.return_value = ["FLStudio_MIDI"]
+        mock_mido.open_output.return_value = port
+        mock_mido.open_input.return_value = Mock()
+        midi = MIDIInterface()
+        midi.connect()
+        yield midi, port
+        midi.disconnect()
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class TestSequencePlayer:
+    """Test the SequencePlayer class."""
+
+    def test_ticks_to_seconds(self):
+        """Test one beat at 120 BPM lasts half a second."""
+        assert ticks_to_seconds(480, 120, 480) == 0.5
+        assert ticks_to_seconds(96, 60, 96) == 1.0
+
+    def test_plays_steps_in_order(self):
+        """Test steps are written in order and timing is recorded."""
+        written = []
+        stats = LatencyStats()
+        player = SequencePlayer(
+            [(0.0, ["a"]), (0.005, ["b", "c"]), (0.01, ["d"])], written.extend, stats=stats
+        ).start()
+        assert player.join(1)
+        assert written == ["a", "b", "c", "d"]
+        assert player.state == "finished"
+        assert player.summary()["steps"] == 3
+        assert stats.count == 3
+
+    def test_stop_releases(self):
+        """Test stopping skips remaining steps and calls release."""
+        written = []
+        release = Mock()
+        player = SequencePlayer([(0.0, ["a"]), (5.0, ["b"])], written.extend, release).start()
+        time.sleep(0.02)
+        player.stop()
+        assert player.join(1)
+        assert written == ["a"]
+        assert player.state == "stopped"
+        release.assert_called()
+
+    def test_pause_shifts_later_steps(self):
+        """Test time spent paused is added to later deadlines."""
+        times = []
+        release = Mock()
+        player = SequencePlayer(
+            [(0.0, [0]), (0.05, [1])],
+            lambda _m: times.append(time.perf_counter()),
+            release,
+        ).start()
+        time.sleep(0.01)
+        player.pause()
+        time.sleep(0.1)
+        assert player.state == "paused"
+        player.resume()
+        assert player.join(1)
+        assert times[1] - times[0] >= 0.14
+        release.assert_called_once()
+
+    def test_steps_read_lazily(self):
+        """Test a generator of steps is consumed as it plays."""
+        consumed = []
+
+        def steps():
+            for i in range(3):
+                consumed.append(i)
+                yield i * 0.01, [i]
+
+        player = SequencePlayer(steps(), lambda _m: None)
+        assert consumed == []
+        player.start().join(1)
+        assert consumed == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_wait(self):
+        """Test waiting for the end of playback from the event loop."""
+        player = SequencePlayer([(0.01, [1])], lambda _m: None).start()
+        await asyncio.wait_for(player.wait(), 1)
+        assert player.done
+        await player.wait()
+
+
+class TestSequenceTiming:
+    """Test timing accuracy against a recording port."""
+
+    def test_timing_error_percentiles(self, recording_midi):
+        """Test events arrive within tight bounds of their offsets."""
+        midi, port = recording_midi
+        events = [
+            {"type": "note_on" if i % 2 == 0 else "note_off", "note": 60, "time": i * 0.005}
+            for i in range(60)
+        ]
+        start = time.perf_counter_ns()
+        player = midi.play_sequence(events)
+        assert player.join(5)
+
+        assert len(port.received) == 60
+        errors_us = [
+            (arrival - start) / 1000 - i * 5000 for i, (arrival, _) in enumerate(port.received)
+        ]
+        # Errors include the thread start-up; jitter around the typical error is
+        # what matters, measured from the median so one slow write cannot skew it
+        typical_us = _percentile(errors_us, 50)
+        jitter_us = [abs(e - typical_us) for e in errors_us]
+        assert _percentile(jitter_us, 50) < 1000
+        # With 60 events p99 is the maximum; leave room for a preempted write
+        assert _percentile(jitter_us, 95) < 5000
+        assert player.timing.summary()["p50_us"] < 1000
+
+    def test_no_drift_over_many_events(self, recording_midi):
+        """Test the last event is not later than the first by more than jitter."""
+        midi, port = recording_midi
+        events = [
+            {"type": "cc", "control": 1, "value": i % 128, "time": i * 0.002} for i in range(200)
+        ]
+        player = midi.play_sequence(events)
+        assert player.join(5)
+        first, last = port.received[0][0], port.received[-1][0]
+        assert abs((last - first) / 1e9 - 199 * 0.002) < 0.005
+
+    def test_ticks_and_note_off_order(self, recording_midi):
+        """Test tick offsets and note offs sent before note ons at one offset."""
+        midi, port = recording_midi
+        events = [
+            {"type": "note_on", "note": 60, "tick": 0},
+            {"type": "note_on", "note": 60, "tick": 48},
+            {"type": "note_off", "note": 60, "tick": 48},
+        ]
+        player = midi.play_sequence(events, tempo=600, ppq=96)
+        assert player.join(1)
+        arrivals = [arrival for arrival, _ in port.received]
+        assert [data[0] for _, data in port.received] == [0x90, 0x80, 0x90]
+        # 48 ticks at 600 BPM and 96 PPQ is 50 ms
+        assert abs((arrivals[1] - arrivals[0]) / 1e9 - 0.05) < 0.005
+
+    def test_stop_sends_all_notes_off(self, recording_midi):
+        """Test stopping sends All Notes Off on the channels used."""
+        midi, port = recording_midi
+        events = [
+            {"type": "note_on", "note": 60, "channel": 2},
+            {"type": "note_off", "note": 60, "channel": 2, "time": 5},
+        ]
+        player = midi.play_sequence(events)
+        time.sleep(0.02)
+        assert midi.stop_playback() == [player.id]
+        assert port.received[-1][1] == bytes([0xB2, 123, 0])
+        assert midi.sequencer_stats()["playing"] == []
+
+    def test_invalid_tick(self, recording_midi):
+        """Test invalid ticks are rejected before anything plays."""
+        midi, port = recording_midi
+        with pytest.raises(ValueError, match="tick"):
+            midi.play_sequence([{"type": "note_on", "note": 60, "tick": -1}])
+        assert port.received == []
+
+    def test_not_connected(self):
+        """Test playing while disconnected returns None."""
+        midi = MIDIInterface()
+        assert midi.play_sequence([{"type": "note_on", "note": 60}]) is None
+
+
+class TestServerSequenceTools:
+    """Test the sequence tools."""
+
+    @pytest.fixture
+    def server(self, recording_midi):
+        midi, port = recording_midi
+        with patch("fruityloops_mcp.server.MIDIInterface", return_value=midi):
+            server = FLStudioMCPServer()
+        yield server, port
+        server.fl.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_play_and_wait(self, server):
+        """Test waiting returns the phrase's timing."""
+        server, port = server
+        events = [{"type": "note_on", "note": 60}, {"type": "note_off", "note": 60, "tick": 24}]
+        result = await server._execute_tool(
+            "midi_play_sequence", {"events": events, "tempo": 240, "ppq": 96, "wait": True}
+        )
+        assert result.startswith("Played MIDI sequence")
+        assert len(port.received) == 2
+
+    @pytest.mark.asyncio
+    async def test_play_in_background_and_stop(self, server):
+        """Test playback continues after the call returns until stopped."""
+        server, port = server
+        events = [{"type": "note_on", "note": 60}, {"type": "note_off", "note": 60, "time": 5}]
+        result = await server._execute_tool("midi_play_sequence", {"events": events})
+        assert result.startswith("Playing MIDI sequence")
+        await asyncio.sleep(0.02)
+        result = await server._execute_tool("midi_stop_playback", {})
+        assert result.startswith("Stopped MIDI playback: [")
+        assert server.midi.sequencer_stats()["playing"] == []
@@ -0,0 +1,230 @@
+"""Tests for opt-in trace spans."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+from mcp import types
+
+from fruityloops_mcp.profiling import Tracer
+from fruityloops_mcp.server import FLStudioMCPServer, main, profile_options_from_env
+
+
+class TestTracer:
+    """Test the Tracer class."""
+
+    def test_sync_spans_nest_in_one_trace(self):
+        """Test nested calls are recorded in the trace of the outermost one."""
+        tracer = Tracer()
+        inner = tracer.wrap(lambda x: x * 2, "inner", "test")
+        outer = tracer.wrap(lambda x: inner(x) + 1, "outer", "test")
+        assert outer(2) == 5
+        assert outer(3) == 7
+
+        spans = tracer.spans
+        assert [(name, trace) for name, _, trace, *_ in spans] == [
+            ("inner", 1),
+            ("outer", 1),
+            ("inner", 2),
+            ("outer", 2),
+        ]
+        assert spans[1][4] >= spans[0][4]
+        assert tracer.stats() == {"sample_rate": 1.0, "traces": 2, "sampled": 2, "spans": 4}
+
+    @pytest.mark.asyncio
+    async def test_async_spans_and_labels(self):
+        """Test coroutines are timed and labels name spans from arguments."""
+        tracer = Tracer()
+
+        async def work(name):
+            await asyncio.sleep(0.01)
+            return name
+
+        traced = tracer.wrap(work, "work", "test", lambda name: (f"work {name}", {"n": name}))
+        assert await asyncio.gather(traced("a"), traced("b")) == ["a", "b"]
+        spans = sorted(tracer.spans)
+        assert [(s[0], s[5]) for s in spans] == [("work a", {"n": "a"}), ("work b", {"n": "b"})]
+        assert spans[0][2] != spans[1][2]
+        assert all(s[4] >= 10_000_000 for s in spans)
+
+    def test_errors_are_recorded(self):
+        """Test a span is recorded when the call raises."""
+        tracer = Tracer()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            tracer.wrap(fail, "fail", "test")()
+        assert tracer.spans[0][0] == "fail"
+
+    def test_sampling_is_per_trace(self):
+        """Test a trace is recorded whole or not at all."""
+        tracer = Tracer(sample_rate=0.5)
+        tracer._random.seed(1)
+        inner = tracer.wrap(lambda: None, "inner", "test")
+        outer = tracer.wrap(inner, "outer", "test")
+        for _ in range(200):
+            outer()
+
+        stats = tracer.stats()
+        assert stats["traces"] == 200
+        assert 60 < stats["sampled"] < 140
+        assert stats["spans"] == 2 * stats["sampled"]
+
+    def test_sample_rate_zero_records_nothing(self):
+        """Test nothing is recorded at a zero sample rate."""
+        tracer = Tracer(sample_rate=0.0)
+        tracer.wrap(lambda: None, "f", "test")()
+        assert tracer.spans == []
+        assert tracer.stats()["traces"] == 1
+
+    def test_invalid_sample_rate(self):
+        """Test sample rates outside 0 to 1 are rejected."""
+        with pytest.raises(ValueError, match="Sample rate"):
+            Tracer(sample_rate=1.5)
+
+    def test_spans_are_bounded(self):
+        """Test only the newest spans are kept."""
+        tracer = Tracer(max_spans=3)
+        for _ in range(5):
+            tracer.wrap(lambda: None, "f", "test")()
+        assert [trace for _, _, trace, *_ in tracer.spans] == [3, 4, 5]
+
+    def test_export_chrome_trace(self, tmp_path):
+        """Test spans are written as complete Chrome trace events."""
+        tracer = Tracer(path=str(tmp_path / "trace.json"))
+        tracer.wrap(lambda: None, "f", "test", args={"port": "p"})()
+        assert tracer.export() == 1
+
+        document = json.loads((tmp_path / "trace.json").read_text())
+        (event,) = document["traceEvents"]
+        assert event["ph"] == "X"
+        assert (event["name"], event["cat"], event["tid"]) == ("f", "test", 1)
+        assert event["args"] == {"port": "p"}
+        assert event["ts"] >= 0 and event["dur"] >= 0
+
+    def test_export_needs_a_path(self):
+        """Test exporting without any path fails."""
+        with pytest.raises(ValueError, match="path"):
+            Tracer().export()
+
+
+class TestServerProfiling:
+    """Test instrumenting the server."""
+
+    @pytest.fixture
+    def server(self, tmp_path):
+        with patch("fruityloops_mcp.server.MIDIInterface") as mock_midi:
+            mock_midi.return_value.port_name = "FLStudio_MIDI"
+            mock_midi.return_value.send_control_change.return_value = True
+            server = FLStudioMCPServer(tracer=Tracer(path=str(tmp_path / "trace.json")))
+        yield server
+        server.fl.shutdown()
+
+    def test_disabled_instruments_nothing(self):
+        """Test no method is wrapped without a tracer."""
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            server = FLStudioMCPServer()
+        assert "_run_tool" not in vars(server)
+        assert "call" not in vars(server.fl)
+        assert "send_note_on" not in vars(server.midi)
+        server.fl.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_call_tool_trace(self, server):
+        """Test a tools/call request, its tool and MIDI send share a trace."""
+        handler = server.server.request_handlers[types.CallToolRequest]
+        request = types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(
+                name="midi_send_cc", arguments={"control": 7, "value": 1}
+            ),
+        )
+        await handler(request)
+
+        spans = {
+            (name, category): (trace, args)
+            for name, category, trace, _, _, args in server.tracer.spans
+        }
+        trace, args = spans[("tools/call", "mcp")]
+        assert args == {"tool": "midi_send_cc"}
+        assert spans[("midi_send_cc", "tool")][0] == trace
+        assert spans[("send_control_change", "midi")] == (trace, {"port": "FLStudio_MIDI"})
+
+    @pytest.mark.asyncio
+    async def test_fl_calls_are_traced(self, server):
+        """Test FL Studio API calls are recorded under their call name."""
+        assert await server.fl.call("mixer.getTrackVolume", lambda: 0.5) == 0.5
+        assert server.tracer.spans[0][:2] == ("mixer.getTrackVolume", "fl")
+
+    def test_pooled_ports_are_traced(self, server):
+        """Test interfaces opened through the port argument are instrumented."""
+        midi = server.midi_pool.get("Other", connect=False)
+        assert "send_note_on" in vars(midi)
+
+    @pytest.mark.asyncio
+    async def test_export_tool(self, server, tmp_path):
+        """Test the export tool writes the spans recorded so far."""
+        await server._execute_tool("midi_send_cc", {"control": 7, "value": 1})
+        path = tmp_path / "now.json"
+        result = await server._execute_tool("server_export_trace", {"path": str(path)})
+        assert result.startswith("Wrote 2 trace spans")
+        assert len(json.loads(path.read_text())["traceEvents"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_export_tool_disabled(self):
+        """Test the export tool reports that profiling is off."""
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            server = FLStudioMCPServer()
+        result = await server._execute_tool("server_export_trace", {})
+        assert result == "Profiling is not enabled"
+
+    @pytest.mark.asyncio
+    async def test_trace_written_on_exit(self, server, tmp_path):
+        """Test the trace file is written when the server stops."""
+        await server._execute_tool("midi_send_cc", {"control": 7, "value": 1})
+        with patch("fruityloops_mcp.server.stdio_server", side_effect=RuntimeError("closed")):
+            await server.run()
+        assert len(json.loads((tmp_path / "trace.json").read_text())["traceEvents"]) == 2
+
+
+class TestProfileOptions:
+    """Test enabling profiling from the environment and command line."""
+
+    def test_off_by_default(self, monkeypatch):
+        """Test profiling is off without a trace file."""
+        monkeypatch.delenv("MCP_PROFILE", raising=False)
+        assert profile_options_from_env() == {}
+
+    def test_from_env(self, monkeypatch):
+        """Test the trace file and sample rate come from the environment."""
+        monkeypatch.setenv("MCP_PROFILE", "/tmp/trace.json")
+        monkeypatch.setenv("MCP_PROFILE_SAMPLE_RATE", "0.25")
+        tracer = profile_options_from_env()["tracer"]
+        assert (tracer.path, tracer.sample_rate) == ("/tmp/trace.json", 0.25)
+
+    def test_arguments_override_env(self, monkeypatch):
+        """Test command line values take precedence."""
+        monkeypatch.setenv("MCP_PROFILE", "/tmp/env.json")
+        monkeypatch.setenv("MCP_PROFILE_SAMPLE_RATE", "0.25")
+        tracer = profile_options_from_env("/tmp/cli.json", 0.5)["tracer"]
+        assert (tracer.path, tracer.sample_rate) == ("/tmp/cli.json", 0.5)
+
+    @patch("fruityloops_mcp.server.asyncio.run")
+    @patch("fruityloops_mcp.server.FLStudioMCPServer")
+    def test_main_flags(self, mock_server, _mock_run, monkeypatch):
+        """Test --profile and --profile-sample-rate reach the server."""
+        monkeypatch.delenv("MCP_PROFILE", raising=False)
+        main(["--profile", "/tmp/trace.json", "--profile-sample-rate", "0.1"])
+        tracer = mock_server.call_args.kwargs["tracer"]
+        assert (tracer.path, tracer.sample_rate) == ("/tmp/trace.json", 0.1)
+
+    @patch("fruityloops_mcp.server.asyncio.run")
+    @patch("fruityloops_mcp.server.FLStudioMCPServer")
+    def test_main_without_flags(self, mock_server, _mock_run, monkeypatch):
+        """Test the server is not profiled by default."""
+        monkeypatch.delenv("MCP_PROFILE", raising=False)
+        main([])
+        assert "tracer" not in mock_server.call_args.kwargs
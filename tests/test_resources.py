@@ -0,0 +1,199 @@
+"""Tests for per-resource locking of tool calls."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from fruityloops_mcp.resources import (
+    ResourceLocks,
+    coalesced_resources,
+    conflicts,
+    midi_resources,
+    resource,
+)
+from fruityloops_mcp.server import FLStudioMCPServer
+from fruityloops_mcp.tools import ToolSpec
+
+
+class TestResourceKeys:
+    """Test resource key helpers."""
+
+    def test_conflicts(self):
+        """Test keys conflict when one is a prefix of the other."""
+        assert conflicts(("transport",), ("transport",))
+        assert conflicts(("pattern",), ("pattern", 3))
+        assert conflicts(("midi", None), ("midi", None, 5))
+        assert not conflicts(("mixer_track", 1), ("mixer_track", 2))
+        assert not conflicts(("mixer_track", 1), ("channel", 1))
+
+    def test_resource(self):
+        """Test resource() reads the index argument."""
+        assert resource("transport")({}) == [("transport",)]
+        assert resource("mixer_track", "track_num")({"track_num": 4}) == [("mixer_track", 4)]
+
+    def test_midi_resources(self):
+        """Test MIDI keys per port and channel, including batches."""
+        assert midi_resources({"note": 60}) == [("midi", None, 0)]
+        assert midi_resources({"channel": 9, "port": "b"}) == [("midi", "b", 9)]
+        events = [{"channel": 2}, {"type": "note_on"}, {"channel": 2}]
+        assert midi_resources({"events": events}) == [("midi", None, 0), ("midi", None, 2)]
+
+    def test_coalesced_resources(self):
+        """Test bulk write keys conflict with their objects but not each other."""
+        keys = coalesced_resources("mixer_track")
+        volumes = [{"index": 3, "volume": 0.1}, {"index": 1}, {"index": 3}]
+        first = keys({"volumes": volumes})
+        second = keys({"volumes": volumes})
+        assert [key[:2] for key in first] == [("mixer_track", 1), ("mixer_track", 3)]
+        assert conflicts(first[1], ("mixer_track", 3))
+        assert not conflicts(first[1], second[1])
+
+
+class TestResourceLocks:
+    """Test the ResourceLocks class."""
+
+    @pytest.mark.asyncio
+    async def test_conflicting_calls_run_in_arrival_order(self):
+        """Test conflicting calls are serialized first come, first served."""
+        locks = ResourceLocks()
+        order = []
+        active = 0
+
+        async def call(i, key):
+            nonlocal active
+            async with locks.hold([key]):
+                active += 1
+                assert active == 1
+                order.append(i)
+                await asyncio.sleep(0.001 * (5 - i))
+                active -= 1
+
+        await asyncio.gather(*(call(i, ("mixer_track", 1)) for i in range(5)))
+        assert order == [0, 1, 2, 3, 4]
+        assert locks.stats() == {"acquired": 5, "waited": 4, "pending": 0}
+
+    @pytest.mark.asyncio
+    async def test_independent_calls_overlap(self):
+        """Test calls on different resources run concurrently."""
+        locks = ResourceLocks()
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def first():
+            async with locks.hold([("mixer_track", 1)]):
+                started.set()
+                await release.wait()
+
+        async def second():
+            await started.wait()
+            async with locks.hold([("mixer_track", 2)]):
+                release.set()
+
+        await asyncio.wait_for(asyncio.gather(first(), second()), 1)
+        assert locks.waited == 0
+
+    @pytest.mark.asyncio
+    async def test_whole_kind_waits_for_members(self):
+        """Test a kind-wide key waits for earlier per-index holders."""
+        locks = ResourceLocks()
+        order = []
+
+        async def call(name, key, delay):
+            async with locks.hold([key]):
+                await asyncio.sleep(delay)
+                order.append(name)
+
+        await asyncio.gather(
+            call("pattern 1", ("pattern", 1), 0.01),
+            call("count", ("pattern",), 0),
+            call("pattern 2", ("pattern", 2), 0),
+        )
+        assert order == ["pattern 1", "count", "pattern 2"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_releases(self):
+        """Test a call cancelled while waiting does not block later ones."""
+        locks = ResourceLocks()
+        release = asyncio.Event()
+
+        async def holder():
+            async with locks.hold([("transport",)]):
+                await release.wait()
+
+        async def waiter():
+            async with locks.hold([("transport",)]):
+                pass
+
+        held = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        later = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+
+        # A call arriving after the cancellation still queues behind the holder
+        arrived_late = asyncio.create_task(waiter())
+        await asyncio.sleep(0.01)
+        assert not later.done() and not arrived_late.done()
+
+        release.set()
+        await asyncio.wait_for(asyncio.gather(held, later, arrived_late), 1)
+        assert locks.stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_no_keys(self):
+        """Test calls without keys are not tracked."""
+        locks = ResourceLocks()
+        async with locks.hold([]):
+            pass
+        assert locks.acquired == 0
+
+
+class TestServerLocking:
+    """Test tool calls through the server are locked per resource."""
+
+    @pytest.fixture
+    def server(self):
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            yield FLStudioMCPServer()
+
+    def test_tools_declare_resources(self, server):
+        """Test tools touching shared state declare resources."""
+        assert server.tools.get("mixer_set_track_volume").resources({"track_num": 2}) == [
+            ("mixer_track", 2)
+        ]
+        assert server.tools.get("transport_start").resources({}) == [("transport",)]
+        assert server.tools.get("midi_list_ports").resources is None
+
+    @pytest.mark.asyncio
+    async def test_same_track_serialized(self, server):
+        """Test overlapping calls on one track never interleave."""
+        log = []
+
+        async def handler(args):
+            log.append(("start", args["track_num"]))
+            await asyncio.sleep(0.005)
+            log.append(("end", args["track_num"]))
+            return "ok"
+
+        server.tools.register(
+            ToolSpec(
+                "slow_track",
+                "Slow track tool",
+                handler,
+                requires_fl=False,
+                resources=resource("mixer_track", "track_num"),
+            )
+        )
+        await asyncio.gather(
+            server._execute_tool("slow_track", {"track_num": 1}),
+            server._execute_tool("slow_track", {"track_num": 1}),
+            server._execute_tool("slow_track", {"track_num": 2}),
+        )
+        # Track 2 overlaps the first track 1 call; the second track 1 call waits
+        assert log[:2] == [("start", 1), ("start", 2)]
+        assert log.index(("end", 1)) < log.index(("start", 1), 1)
+        assert server.locks.stats()["waited"] == 1
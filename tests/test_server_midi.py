@@ -69,25 +69,32 @@ class TestServerMIDITools:
     @pytest.mark.asyncio
     @patch("asyncio.sleep", new_callable=AsyncMock)
     async def test_midi_send_note(self, mock_sleep, server, mock_midi_interface):
-        """Test midi_send_note tool."""
+        """Test midi_send_note tool schedules the note off instead of sleeping."""
         args = {"note": 60, "velocity": 100, "duration": 0.1, "channel": 1}
         result = await server._execute_tool("midi_send_note", args)
         mock_midi_interface.send_note_on.assert_called_once_with(60, 100, 1)
-        mock_sleep.assert_called_once_with(0.1)
-        mock_midi_interface.send_note_off.assert_called_once_with(60, 100, 1)
+        mock_midi_interface.schedule_note_off.assert_called_once_with(60, 100, 1, 0.1)
+        mock_sleep.assert_not_called()
+        mock_midi_interface.send_note_off.assert_not_called()
         assert "Sent MIDI note 60" in result
 
     @pytest.mark.asyncio
-    @patch("asyncio.sleep", new_callable=AsyncMock)
-    async def test_midi_send_note_with_defaults(self, mock_sleep, server, mock_midi_interface):
+    async def test_midi_send_note_with_defaults(self, server, mock_midi_interface):
         """Test midi_send_note tool with default values."""
         args = {"note": 60}
         result = await server._execute_tool("midi_send_note", args)
         mock_midi_interface.send_note_on.assert_called_once_with(60, 64, 0)
-        mock_sleep.assert_called_once_with(0.5)
-        mock_midi_interface.send_note_off.assert_called_once_with(60, 64, 0)
+        mock_midi_interface.schedule_note_off.assert_called_once_with(60, 64, 0, 0.5)
         assert "Sent MIDI note 60" in result
 
+    @pytest.mark.asyncio
+    async def test_midi_send_note_failure(self, server, mock_midi_interface):
+        """Test midi_send_note does not schedule a note off when note on fails."""
+        mock_midi_interface.send_note_on.return_value = False
+        result = await server._execute_tool("midi_send_note", {"note": 60})
+        mock_midi_interface.schedule_note_off.assert_not_called()
+        assert "Failed to send MIDI note" in result
+
     @pytest.mark.asyncio
     async def test_midi_send_note_on(self, server, mock_midi_interface):
         """Test midi_send_note_on tool."""
@@ -148,25 +155,21 @@ class TestServerMIDIEdgeCases:
             return FLStudioMCPServer()
 
     @pytest.mark.asyncio
-    @patch("asyncio.sleep", new_callable=AsyncMock)
-    async def test_midi_send_note_with_zero_duration(self, mock_sleep, server, mock_midi_interface):
+    async def test_midi_send_note_with_zero_duration(self, server, mock_midi_interface):
         """Test midi_send_note with zero duration."""
         args = {"note": 60, "duration": 0}
         result = await server._execute_tool("midi_send_note", args)
         mock_midi_interface.send_note_on.assert_called_once_with(60, 64, 0)
-        mock_sleep.assert_called_once_with(0)
-        mock_midi_interface.send_note_off.assert_called_once_with(60, 64, 0)
+        mock_midi_interface.schedule_note_off.assert_called_once_with(60, 64, 0, 0)
         assert "Sent MIDI note" in result
 
     @pytest.mark.asyncio
-    @patch("asyncio.sleep", new_callable=AsyncMock)
-    async def test_midi_send_note_with_long_duration(self, mock_sleep, server, mock_midi_interface):
-        """Test midi_send_note with a very long duration."""
+    async def test_midi_send_note_with_long_duration(self, server, mock_midi_interface):
+        """Test midi_send_note with a very long duration returns immediately."""
         args = {"note": 60, "duration": 1000}
-        result = await server._execute_tool("midi_send_note", args)
+        result = await asyncio.wait_for(server._execute_tool("midi_send_note", args), timeout=1)
         mock_midi_interface.send_note_on.assert_called_once_with(60, 64, 0)
-        mock_sleep.assert_called_once_with(1000)
-        mock_midi_interface.send_note_off.assert_called_once_with(60, 64, 0)
+        mock_midi_interface.schedule_note_off.assert_called_once_with(60, 64, 0, 1000)
         assert "Sent MIDI note" in result
 
     @pytest.mark.asyncio
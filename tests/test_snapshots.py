@@ -0,0 +1,112 @@
+"""Tests for the bulk snapshot tools."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from fruityloops_mcp.server import FLStudioMCPServer
+
+
+@pytest.fixture
+def server():
+    with patch("fruityloops_mcp.server.MIDIInterface"):
+        server = FLStudioMCPServer()
+    yield server
+    server.fl.shutdown()
+
+
+@pytest.fixture
+def mock_mixer():
+    with patch("fruityloops_mcp.server.mixer") as mixer:
+        mixer.trackCount.return_value = 5
+        mixer.getTrackName.side_effect = lambda i: f"Insert {i}"
+        mixer.getTrackVolume.side_effect = lambda i: i / 10
+        mixer.getTrackPan.return_value = 0.0
+        mixer.isTrackMuted.side_effect = lambda i: i == 3
+        yield mixer
+
+
+class TestMixerSnapshot:
+    """Test mixer_get_all_tracks."""
+
+    @pytest.mark.asyncio
+    async def test_all_tracks(self, server, mock_mixer):
+        """Test every track and field is returned."""
+        result = json.loads(await server._execute_tool("mixer_get_all_tracks", {}))
+        assert result["total"] == 5
+        assert len(result["items"]) == 5
+        assert result["items"][3] == {
+            "index": 3,
+            "name": "Insert 3",
+            "volume": 0.3,
+            "pan": 0.0,
+            "muted": True,
+        }
+
+    @pytest.mark.asyncio
+    async def test_range_and_projection(self, server, mock_mixer):
+        """Test start, limit and fields keep the payload small."""
+        result = json.loads(
+            await server._execute_tool(
+                "mixer_get_all_tracks", {"start": 3, "limit": 10, "fields": ["name"]}
+            )
+        )
+        assert result["items"] == [
+            {"index": 3, "name": "Insert 3"},
+            {"index": 4, "name": "Insert 4"},
+        ]
+        mock_mixer.getTrackVolume.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_one_executor_call(self, server, mock_mixer):
+        """Test the snapshot is read in a single executor call."""
+        await server._execute_tool("mixer_get_all_tracks", {})
+        assert server.fl.stats()["calls"]["mixer.snapshot"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_populates_state_cache(self, server, mock_mixer):
+        """Test later getters are served from the snapshot."""
+        await server._execute_tool("mixer_get_all_tracks", {"fields": ["name"]})
+        result = await server._execute_tool("mixer_get_track_name", {"track_num": 2})
+        assert result == "Track 2 name: Insert 2"
+        assert mock_mixer.getTrackName.call_count == 5
+
+    @pytest.mark.asyncio
+    async def test_unknown_field(self, server, mock_mixer):
+        """Test unknown fields are rejected."""
+        with pytest.raises(ValueError, match="Unknown fields"):
+            await server._execute_tool("mixer_get_all_tracks", {"fields": ["color"]})
+
+
+class TestChannelAndPatternSnapshots:
+    """Test channels_get_all and patterns_get_all."""
+
+    @pytest.mark.asyncio
+    async def test_channels(self, server):
+        """Test channel names and mute state."""
+        with patch("fruityloops_mcp.server.channels") as mock_channels:
+            mock_channels.channelCount.return_value = 2
+            mock_channels.getChannelName.side_effect = ["Kick", "Snare"]
+            mock_channels.isChannelMuted.side_effect = [False, True]
+            result = json.loads(
+                await server._execute_tool("channels_get_all", {"fields": ["name", "muted"]})
+            )
+        assert result == {
+            "total": 2,
+            "items": [
+                {"index": 0, "name": "Kick", "muted": False},
+                {"index": 1, "name": "Snare", "muted": True},
+            ],
+        }
+
+    @pytest.mark.asyncio
+    async def test_patterns_are_one_based(self, server):
+        """Test patterns are numbered from 1."""
+        with patch("fruityloops_mcp.server.patterns") as mock_patterns:
+            mock_patterns.patternCount.return_value = 3
+            mock_patterns.getPatternName.side_effect = lambda i: f"Pattern {i}"
+            mock_patterns.getPatternLength.return_value = 16
+            result = json.loads(await server._execute_tool("patterns_get_all", {}))
+        assert [item["index"] for item in result["items"]] == [1, 2, 3]
+        assert result["items"][0] == {"index": 1, "name": "Pattern 1", "length": 16}
@@ -0,0 +1,104 @@
+"""Startup time budgets for the server process.
+
+MCP clients start a server process per session, so importing the server and
+answering ``initialize`` are on every session's critical path.
+"""
+
+import json
+import subprocess
+import sys
+import time
+
+# Modules that must not be imported until a tool needs them
+DEFERRED_MODULES = (
+    "mido",
+    "rtmidi",
+    "channels",
+    "general",
+    "mixer",
+    "patterns",
+    "playlist",
+    "transport",
+    "ui",
+)
+
+# Self time of this package's own modules; includes compiling them when no
+# bytecode cache is available
+PACKAGE_IMPORT_BUDGET_MS = 250
+
+# Process start to the first initialize response, dominated by importing mcp
+INITIALIZE_BUDGET_S = 3.0
+
+INITIALIZE_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "startup-test", "version": "0"},
+    },
+}
+
+
+def _import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Import a module in a fresh interpreter with ``-X importtime``.
+
+    Returns:
+        Module name to (self, cumulative) import time in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+class TestStartup:
+    """Test the server starts without loading what it does not need yet."""
+
+    def test_import_defers_optional_modules(self):
+        """Test importing the server loads neither mido nor the FL Studio API."""
+        times = _import_times("fruityloops_mcp.server")
+        assert "fruityloops_mcp.server" in times
+        loaded = {name.split(".")[0] for name in times}
+        assert loaded.isdisjoint(DEFERRED_MODULES), loaded & set(DEFERRED_MODULES)
+
+    def test_package_import_budget(self):
+        """Test this package's own modules import within budget."""
+        times = _import_times("fruityloops_mcp.server")
+        own_ms = sum(s for name, (s, _) in times.items() if name.startswith("fruityloops_mcp"))
+        assert own_ms / 1000 < PACKAGE_IMPORT_BUDGET_MS
+
+    def test_time_to_initialize_response(self):
+        """Test a spawned stdio server answers initialize within budget."""
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "fruityloops_mcp"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            process.stdin.write(json.dumps(INITIALIZE_REQUEST).encode() + b"\n")
+            process.stdin.flush()
+            response = json.loads(process.stdout.readline())
+            elapsed = time.perf_counter() - start
+        finally:
+            process.stdin.close()
+            try:
+                process.wait(5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+        assert response["id"] == 1
+        assert response["result"]["serverInfo"]["name"] == "fruityloops-mcp"
+        assert elapsed < INITIALIZE_BUDGET_S
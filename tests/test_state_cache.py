@@ -0,0 +1,168 @@
+"""Tests for the FL Studio state cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from fruityloops_mcp.server import FLStudioMCPServer, fl_options_from_env
+from fruityloops_mcp.state_cache import StateCache
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStateCache:
+    """Test the StateCache class."""
+
+    @pytest.mark.asyncio
+    async def test_read_through_and_ttl(self):
+        """Test values are fetched once per TTL."""
+        clock = FakeClock()
+        cache = StateCache(ttl=1.0, clock=clock)
+        fetch = AsyncMock(side_effect=["Kick", "Snare"])
+        key = ("channel", 0, "name")
+
+        assert await cache.read(key, fetch) == "Kick"
+        assert await cache.read(key, fetch) == "Kick"
+        clock.now = 1.0
+        assert await cache.read(key, fetch) == "Snare"
+        assert fetch.await_count == 2
+        assert cache.stats() == {
+            "hits": 1,
+            "misses": 2,
+            "hit_rate": 1 / 3,
+            "invalidations": 0,
+            "entries": 1,
+        }
+
+    @pytest.mark.asyncio
+    async def test_invalidate_patterns(self):
+        """Test invalidation by exact key and by wildcard."""
+        cache = StateCache()
+        for key in [
+            ("mixer_track", 1, "name"),
+            ("mixer_track", 1, "volume"),
+            ("pattern", 1, "name"),
+        ]:
+            await cache.read(key, AsyncMock(return_value=0))
+
+        assert cache.invalidate("mixer_track", 1, "name") == 1
+        assert cache.invalidate("mixer_track", 1, "name") == 0
+        assert cache.invalidate("mixer_track") == 1
+        assert cache.invalidate() == 1
+        assert cache.stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_fetch(self):
+        """Test concurrent reads of one key make one host call."""
+        cache = StateCache()
+        release = asyncio.Event()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return 42
+
+        readers = [asyncio.create_task(cache.read(("x", 0, "v"), fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*readers) == [42] * 5
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_fetch_is_not_stored(self):
+        """Test a value fetched across an invalidation is not cached."""
+        cache = StateCache()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "old"
+
+        reader = asyncio.create_task(cache.read(("x", 0, "v"), fetch))
+        await asyncio.sleep(0)
+        cache.invalidate("x", 0, "v")
+        release.set()
+        assert await reader == "old"
+        assert cache.stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_fetch_errors_are_not_cached(self):
+        """Test a failing fetch is retried on the next read."""
+        cache = StateCache()
+        fetch = AsyncMock(side_effect=[RuntimeError("busy"), 7])
+        with pytest.raises(RuntimeError):
+            await cache.read(("x", 0, "v"), fetch)
+        assert await cache.read(("x", 0, "v"), fetch) == 7
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        """Test a zero TTL always fetches."""
+        cache = StateCache(ttl=0)
+        fetch = AsyncMock(return_value=1)
+        await cache.read(("x", 0, "v"), fetch)
+        await cache.read(("x", 0, "v"), fetch)
+        assert fetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_evicts_oldest(self):
+        """Test the cache is bounded."""
+        cache = StateCache(max_entries=2)
+        for i in range(3):
+            await cache.read(("x", i, "v"), AsyncMock(return_value=i))
+        assert cache.stats()["entries"] == 2
+        assert ("x", 0, "v") not in cache._entries
+
+
+class TestServerStateCache:
+    """Test getters and setters use the state cache."""
+
+    @pytest.fixture
+    def server(self):
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            server = FLStudioMCPServer()
+        yield server
+        server.fl.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_getter_cached_until_setter(self, server):
+        """Test repeated getters hit the cache and setters invalidate it."""
+        with patch("fruityloops_mcp.server.mixer") as mock_mixer:
+            mock_mixer.getTrackName.return_value = "Drums"
+            for _ in range(3):
+                result = await server._execute_tool("mixer_get_track_name", {"track_num": 2})
+            assert result == "Track 2 name: Drums"
+            assert mock_mixer.getTrackName.call_count == 1
+
+            await server._execute_tool("mixer_set_track_name", {"track_num": 2, "name": "Bass"})
+            mock_mixer.getTrackName.return_value = "Bass"
+            result = await server._execute_tool("mixer_get_track_name", {"track_num": 2})
+            assert result == "Track 2 name: Bass"
+            assert mock_mixer.getTrackName.call_count == 2
+
+        assert server.state.stats()["hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_other_tracks_stay_cached(self, server):
+        """Test a setter only invalidates its own track and field."""
+        with patch("fruityloops_mcp.server.mixer") as mock_mixer:
+            await server._execute_tool("mixer_get_track_volume", {"track_num": 1})
+            await server._execute_tool("mixer_get_track_volume", {"track_num": 2})
+            await server._execute_tool("mixer_set_track_volume", {"track_num": 2, "volume": 0.5})
+            await server._execute_tool("mixer_get_track_volume", {"track_num": 1})
+            assert mock_mixer.getTrackVolume.call_count == 2
+
+    def test_ttl_from_env(self, monkeypatch):
+        """Test FL_STATE_CACHE_TTL."""
+        monkeypatch.setenv("FL_STATE_CACHE_TTL", "0.5")
+        assert fl_options_from_env()["state_cache"].ttl == 0.5
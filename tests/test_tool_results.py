@@ -0,0 +1,119 @@
+"""Tests for structured tool results."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+from mcp import types
+
+from fruityloops_mcp.server import FLStudioMCPServer, result_options_from_env
+from fruityloops_mcp.tools import ToolResult, ToolSpec
+
+
+def _request(name, arguments):
+    return types.CallToolRequest(
+        method="tools/call",
+        params=types.CallToolRequestParams(name=name, arguments=arguments),
+    )
+
+
+class TestToolResult:
+    """Test the ToolResult class."""
+
+    def test_json(self):
+        """Test the JSON form is compact."""
+        result = ToolResult({"track": 1, "volume": 0.5})
+        assert result.to_json() == '{"track":1,"volume":0.5}'
+        assert result.to_text() == result.to_json()
+
+    def test_template(self):
+        """Test the prose form fills the template with the data."""
+        result = ToolResult({"track": 1, "volume": 0.5}, "Track {track} volume: {volume}")
+        assert result.to_text() == "Track 1 volume: 0.5"
+        assert result.render("text") == "Track 1 volume: 0.5"
+        assert result.render("json") == '{"track":1,"volume":0.5}'
+
+    def test_callable_template(self):
+        """Test a function can build the prose form."""
+        result = ToolResult({"events": [1, 2]}, lambda data: f"{len(data['events'])} events")
+        assert result.to_text() == "2 events"
+
+    def test_text_built_lazily(self):
+        """Test the prose is not built unless asked for."""
+        calls = []
+        result = ToolResult({"n": 1}, lambda data: calls.append(data) or "text")
+        result.render("json")
+        assert calls == []
+
+
+class TestServerResults:
+    """Test structured results through the MCP call handler."""
+
+    @pytest.fixture
+    def server(self):
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            server = FLStudioMCPServer()
+        server.midi.send_control_change.return_value = True
+        yield server
+        server.fl.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_structured_content(self, server):
+        """Test results carry structuredContent and matching JSON text."""
+        handler = server.server.request_handlers[types.CallToolRequest]
+        result = await handler(_request("midi_send_cc", {"control": 7, "value": 100}))
+        expected = {"sent": True, "control": 7, "value": 100, "channel": 0}
+        assert result.root.structuredContent == expected
+        assert json.loads(result.root.content[0].text) == expected
+        assert not result.root.isError
+
+    @pytest.mark.asyncio
+    async def test_fl_tool_structured_content(self, server):
+        """Test FL Studio tool results keep the values' types."""
+        handler = server.server.request_handlers[types.CallToolRequest]
+        with (
+            patch("fruityloops_mcp.server.FL_STUDIO_AVAILABLE", True),
+            patch("fruityloops_mcp.server.mixer") as mock_mixer,
+        ):
+            mock_mixer.getTrackVolume.return_value = 0.8
+            result = await handler(_request("mixer_get_track_volume", {"track_num": 3}))
+        assert result.root.structuredContent == {"track": 3, "volume": 0.8}
+
+    @pytest.mark.asyncio
+    async def test_text_format(self):
+        """Test the text result format sends prose alongside the data."""
+        with patch("fruityloops_mcp.server.MIDIInterface"):
+            server = FLStudioMCPServer(result_format="text")
+        server.midi.send_control_change.return_value = False
+        handler = server.server.request_handlers[types.CallToolRequest]
+        result = await handler(_request("midi_send_cc", {"control": 7, "value": 1}))
+        assert result.root.content[0].text == "Failed to send MIDI CC: control=7"
+        assert result.root.structuredContent["sent"] is False
+
+    @pytest.mark.asyncio
+    async def test_plain_text_tools_unchanged(self, server):
+        """Test tools returning plain text have no structured content."""
+
+        async def handler(_args):
+            return "plain"
+
+        server.tools.register(ToolSpec("plain", "Plain tool", handler, requires_fl=False))
+        call = server.server.request_handlers[types.CallToolRequest]
+        result = await call(_request("plain", {}))
+        assert result.root.content[0].text == "plain"
+        assert result.root.structuredContent is None
+
+    def test_invalid_format(self):
+        """Test unknown result formats are rejected."""
+        with (
+            patch("fruityloops_mcp.server.MIDIInterface"),
+            pytest.raises(ValueError, match="result format"),
+        ):
+            FLStudioMCPServer(result_format="xml")
+
+    def test_options_from_env(self, monkeypatch):
+        """Test MCP_RESULT_FORMAT."""
+        monkeypatch.delenv("MCP_RESULT_FORMAT", raising=False)
+        assert result_options_from_env() == {}
+        monkeypatch.setenv("MCP_RESULT_FORMAT", "text")
+        assert result_options_from_env() == {"result_format": "text"}
@@ -0,0 +1,253 @@
+"""Tests for the tool registry."""
+
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from mcp import types
+
+from fruityloops_mcp.server import FLStudioMCPServer
+from fruityloops_mcp.tools import ToolRegistry, ToolSpec, collect_tools, object_schema, tool
+
+
+async def _echo(args: dict[str, Any]) -> str:
+    return f"echo {args}"
+
+
+class TestObjectSchema:
+    """Test the object_schema helper."""
+
+    def test_empty_schema(self):
+        """Test schema without properties has no required key."""
+        assert object_schema() == {"type": "object", "properties": {}}
+
+    def test_schema_with_required(self):
+        """Test schema with properties and required arguments."""
+        schema = object_schema({"note": {"type": "integer"}}, required=["note"])
+        assert schema == {
+            "type": "object",
+            "properties": {"note": {"type": "integer"}},
+            "required": ["note"],
+        }
+
+
+class TestToolRegistry:
+    """Test the ToolRegistry class."""
+
+    def test_register_and_get(self):
+        """Test registering and looking up a tool."""
+        registry = ToolRegistry()
+        spec = ToolSpec(name="echo", description="Echo", handler=_echo)
+        registry.register(spec)
+
+        assert registry.get("echo") is spec
+        assert "echo" in registry
+        assert len(registry) == 1
+
+    def test_get_unknown_returns_none(self):
+        """Test looking up an unknown tool."""
+        assert ToolRegistry().get("missing") is None
+
+    def test_register_duplicate_raises(self):
+        """Test registering the same name twice."""
+        registry = ToolRegistry([ToolSpec(name="echo", description="Echo", handler=_echo)])
+        with pytest.raises(ValueError, match="already registered"):
+            registry.register(ToolSpec(name="echo", description="Echo", handler=_echo))
+
+    def test_unregister(self):
+        """Test removing a tool."""
+        registry = ToolRegistry([ToolSpec(name="echo", description="Echo", handler=_echo)])
+        registry.unregister("echo")
+        assert "echo" not in registry
+        with pytest.raises(KeyError):
+            registry.unregister("echo")
+
+    def test_list_tools_filters_fl_tools(self):
+        """Test FL Studio tools are hidden when FL Studio is unavailable."""
+        registry = ToolRegistry(
+            [
+                ToolSpec(name="midi_x", description="MIDI", handler=_echo, requires_fl=False),
+                ToolSpec(name="fl_x", description="FL", handler=_echo),
+            ]
+        )
+        assert [t.name for t in registry.list_tools(False).tools] == ["midi_x"]
+        assert [t.name for t in registry.list_tools(True).tools] == ["midi_x", "fl_x"]
+
+    def test_list_tools_is_cached(self):
+        """Test the tool list is built once per availability state."""
+        registry = ToolRegistry([ToolSpec(name="fl_x", description="FL", handler=_echo)])
+        with patch.object(
+            ToolSpec, "to_tool", autospec=True, side_effect=ToolSpec.to_tool
+        ) as to_tool:
+            first = registry.list_tools(True)
+            second = registry.list_tools(True)
+            assert first is second
+            assert to_tool.call_count == 1
+
+            registry.list_tools(False)
+            registry.list_tools(False)
+            assert to_tool.call_count == 1  # No FL tools to build
+
+    def test_register_invalidates_cache(self):
+        """Test registering a tool rebuilds the cached list."""
+        registry = ToolRegistry([ToolSpec(name="a", description="A", handler=_echo)])
+        before = registry.list_tools(True)
+        registry.register(ToolSpec(name="b", description="B", handler=_echo))
+        after = registry.list_tools(True)
+        assert after is not before
+        assert [t.name for t in after.tools] == ["a", "b"]
+
+    def test_unregister_invalidates_cache(self):
+        """Test unregistering a tool rebuilds the cached list."""
+        registry = ToolRegistry(
+            [
+                ToolSpec(name="a", description="A", handler=_echo),
+                ToolSpec(name="b", description="B", handler=_echo),
+            ]
+        )
+        registry.list_tools(True)
+        registry.unregister("a")
+        assert [t.name for t in registry.list_tools(True).tools] == ["b"]
+
+    def test_explicit_invalidate(self):
+        """Test invalidate() drops cached lists."""
+        registry = ToolRegistry([ToolSpec(name="a", description="A", handler=_echo)])
+        before = registry.list_tools(True)
+        registry.invalidate()
+        assert registry.list_tools(True) is not before
+
+    def test_iteration_preserves_order(self):
+        """Test iteration follows registration order."""
+        names = [f"tool_{i}" for i in range(5)]
+        registry = ToolRegistry([ToolSpec(name=n, description=n, handler=_echo) for n in names])
+        assert [spec.name for spec in registry] == names
+
+    def test_to_tool(self):
+        """Test converting a spec to an MCP tool definition."""
+        schema = object_schema({"x": {"type": "integer"}}, required=["x"])
+        spec = ToolSpec(name="echo", description="Echo", handler=_echo, input_schema=schema)
+        mcp_tool = spec.to_tool()
+        assert mcp_tool.name == "echo"
+        assert mcp_tool.inputSchema == schema
+
+
+class TestCollectTools:
+    """Test collecting @tool methods from an object."""
+
+    def test_collect_in_definition_order(self):
+        """Test decorated methods are collected in order, base classes first."""
+
+        class Base:
+            @tool("base_tool", "Base tool", requires_fl=False)
+            async def _base(self, _args: dict[str, Any]) -> str:
+                return "base"
+
+        class Child(Base):
+            @tool("child_tool", "Child tool")
+            async def _child(self, _args: dict[str, Any]) -> str:
+                return "child"
+
+            async def _not_a_tool(self, _args: dict[str, Any]) -> str:
+                return "nope"
+
+        specs = collect_tools(Child())
+        assert [s.name for s in specs] == ["base_tool", "child_tool"]
+        assert specs[0].requires_fl is False
+        assert specs[1].requires_fl is True
+        assert specs[1].input_schema == {"type": "object", "properties": {}}
+
+    @pytest.mark.asyncio
+    async def test_collected_handlers_are_bound(self):
+        """Test collected handlers are bound to the instance."""
+
+        class Owner:
+            value = "bound"
+
+            @tool("owner_tool", "Owner tool")
+            async def _owner(self, _args: dict[str, Any]) -> str:
+                return self.value
+
+        (spec,) = collect_tools(Owner())
+        assert await spec.handler({}) == "bound"
+
+
+class TestServerRegistry:
+    """Test the server is driven by the tool registry."""
+
+    def test_all_tools_registered(self):
+        """Test every tool is present in the server registry."""
+        server = FLStudioMCPServer()
+        assert "midi_connect" in server.tools
+        assert "playlist_get_track_name" in server.tools
+        assert server.tools.get("midi_send_note").requires_fl is False
+        assert server.tools.get("transport_start").requires_fl is True
+
+    @pytest.mark.asyncio
+    async def test_list_tools_handler_with_fl(self):
+        """Test tools/list returns MIDI and FL Studio tools."""
+        server = FLStudioMCPServer()
+        handler = server.server.request_handlers[types.ListToolsRequest]
+        with patch("fruityloops_mcp.server.FL_STUDIO_AVAILABLE", True):
+            result = await handler(types.ListToolsRequest(method="tools/list"))
+        names = [t.name for t in result.root.tools]
+        assert names == [spec.name for spec in server.tools]
+
+    @pytest.mark.asyncio
+    async def test_list_tools_handler_without_fl(self):
+        """Test tools/list returns only MIDI and server tools without FL Studio."""
+        server = FLStudioMCPServer()
+        handler = server.server.request_handlers[types.ListToolsRequest]
+        with patch("fruityloops_mcp.server.FL_STUDIO_AVAILABLE", False):
+            result = await handler(types.ListToolsRequest(method="tools/list"))
+        names = [t.name for t in result.root.tools]
+        assert names
+        assert all(name.startswith(("midi_", "server_")) for name in names)
+
+    @pytest.mark.asyncio
+    async def test_list_tools_handler_serves_cache(self):
+        """Test repeated tools/list requests return the same prebuilt result."""
+        with patch("fruityloops_mcp.server.FL_STUDIO_AVAILABLE", True):
+            server = FLStudioMCPServer()
+            handler = server.server.request_handlers[types.ListToolsRequest]
+            first = await handler(types.ListToolsRequest(method="tools/list"))
+            second = await handler(types.ListToolsRequest(method="tools/list"))
+        assert first.root is second.root
+
+    @pytest.mark.asyncio
+    async def test_call_tool_unknown(self):
+        """Test tools/call reports unknown tools."""
+        server = FLStudioMCPServer()
+        handler = server.server.request_handlers[types.CallToolRequest]
+        request = types.CallToolRequest(
+            method="tools/call", params=types.CallToolRequestParams(name="nope", arguments={})
+        )
+        result = await handler(request)
+        assert "Unknown tool: nope" in result.root.content[0].text
+
+    @pytest.mark.asyncio
+    async def test_call_tool_fl_unavailable(self):
+        """Test tools/call refuses FL Studio tools without FL Studio."""
+        server = FLStudioMCPServer()
+        handler = server.server.request_handlers[types.CallToolRequest]
+        request = types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(name="transport_start", arguments={}),
+        )
+        with patch("fruityloops_mcp.server.FL_STUDIO_AVAILABLE", False):
+            result = await handler(request)
+        assert "FL Studio API not available" in result.root.content[0].text
+
+    @pytest.mark.asyncio
+    async def test_call_tool_dispatches_registered_plugin(self):
+        """Test tools registered after construction are callable."""
+        server = FLStudioMCPServer()
+        server.tools.register(
+            ToolSpec(name="plugin_echo", description="Echo", handler=_echo, requires_fl=False)
+        )
+        handler = server.server.request_handlers[types.CallToolRequest]
+        request = types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(name="plugin_echo", arguments={"a": 1}),
+        )
+        result = await handler(request)
+        assert result.root.content[0].text == "echo {'a': 1}"